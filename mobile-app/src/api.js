@@ -507,6 +507,121 @@ export async function syncPendientes(lista, silent = true) {
   return data;
 }
 
+// ==========================================================
+// EVIDENCIAS: SUBIDA REANUDABLE
+// init -> PUT por offset (Content-Range) -> finalizar con sha256.
+// `estado` ({ uploadId, size, sha256, evidenciaId }) lo persiste el
+// llamador (IndexedDB) para reanudar desde el último byte confirmado.
+// ==========================================================
+const EVID_CHUNK = 256 * 1024;
+
+async function sha256Hex(blob) {
+  const buf = await blob.arrayBuffer();
+  const hash = await crypto.subtle.digest("SHA-256", buf);
+  return Array.from(new Uint8Array(hash))
+    .map((b) => b.toString(16).padStart(2, "0"))
+    .join("");
+}
+
+export async function dataURLToBlob(dataUrl) {
+  const res = await fetch(dataUrl);
+  return await res.blob();
+}
+
+async function evidJson(res) {
+  const data = await safeReadJson(res, {});
+  if (!res.ok && res.status !== 409) {
+    throw buildError(
+      data?.detail || `Error subiendo evidencia (${res.status})`,
+      res.status,
+      data,
+    );
+  }
+  return data;
+}
+
+export async function subirEvidenciaReanudable(
+  blob,
+  { tipo = "FOTO", estado = null, onEstado = null } = {},
+) {
+  if (!hasNetworkConnection()) {
+    throw buildError("offline", 0);
+  }
+
+  let st = { ...(estado || {}) };
+  if (st.evidenciaId) return st.evidenciaId;
+
+  const guardar = async (patch) => {
+    st = { ...st, ...patch };
+    if (onEstado) await onEstado(st);
+  };
+
+  if (!st.sha256) {
+    await guardar({ sha256: await sha256Hex(blob), size: blob.size });
+  }
+
+  async function iniciar() {
+    const res = await authFetch(`${API}/api/evidencias/uploads/`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ tipo, size: blob.size, sha256: st.sha256 }),
+    });
+    const data = await evidJson(res);
+    await guardar({ uploadId: data.id });
+    return 0;
+  }
+
+  let offset = 0;
+  if (!st.uploadId) {
+    offset = await iniciar();
+  } else {
+    const res = await authFetch(`${API}/api/evidencias/uploads/${st.uploadId}/`, {
+      method: "GET",
+    });
+    if (res.status === 404) {
+      // venció en el server: se arranca de nuevo
+      offset = await iniciar();
+    } else {
+      offset = Number((await evidJson(res)).offset || 0);
+    }
+  }
+
+  while (offset < blob.size) {
+    const end = Math.min(offset + EVID_CHUNK, blob.size);
+    const res = await authFetch(
+      `${API}/api/evidencias/uploads/${st.uploadId}/`,
+      {
+        method: "PUT",
+        headers: {
+          "Content-Type": "application/octet-stream",
+          "Content-Range": `bytes ${offset}-${end - 1}/${blob.size}`,
+        },
+        body: blob.slice(offset, end),
+      },
+      30000,
+    );
+    // 409: el server confirma otro offset; seguimos desde ahí
+    offset = Number((await evidJson(res)).offset || 0);
+  }
+
+  const res = await authFetch(
+    `${API}/api/evidencias/uploads/${st.uploadId}/finalizar/`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ sha256: st.sha256 }),
+    },
+    30000,
+  );
+  const data = await evidJson(res);
+  if (res.status === 409) {
+    throw buildError("Subida incompleta, se reintentará", 409, data);
+  }
+
+  await guardar({ evidenciaId: data.id });
+  return data.id;
+}
+
 // ==========================================================
 // TABLEROS
 // ==========================================================
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { openDB } from "idb";
-import { enviarOT } from "../api";
+import { dataURLToBlob, enviarOT, subirEvidenciaReanudable } from "../api";
 
 const DB_NAME = "offlineOTdb";
 const STORE = "pendientes";
@@ -71,6 +71,67 @@ export default function useOfflineQueue() {
     await db.delete(STORE, id);
   }
 
+  async function actualizarPendiente(p) {
+    const db = await initDB();
+    await db.put(STORE, p);
+  }
+
+  // ✅ Sube fotos/firma por la API reanudable y reemplaza el base64 por ids.
+  // El avance de cada subida queda en p.uploads: si se corta la señal,
+  // el próximo intento sigue desde el último byte confirmado.
+  async function subirEvidencias(p, data) {
+    const fotos = Array.isArray(data.fotos_b64) ? data.fotos_b64 : [];
+    const firma = data.firma_tecnico_img || "";
+    if (!fotos.length && !firma) return data;
+
+    const uploads = { ...(p.uploads || {}) };
+
+    async function subir(key, dataUrl, tipo) {
+      try {
+        const blob = await dataURLToBlob(dataUrl);
+        return await subirEvidenciaReanudable(blob, {
+          tipo,
+          estado: uploads[key],
+          onEstado: async (st) => {
+            uploads[key] = st;
+            await actualizarPendiente({ ...p, uploads });
+          },
+        });
+      } catch (e) {
+        // 400 sin offset = el server no acepta el archivo: queda en base64
+        if (e?.status === 400 && !("offset" in (e?.body || {}))) {
+          delete uploads[key];
+          return null;
+        }
+        e.fase = "evidencias";
+        throw e;
+      }
+    }
+
+    const fotosIds = [...(data.fotos_ids || [])];
+    const fotosB64 = [];
+    for (let i = 0; i < fotos.length; i++) {
+      const id = await subir(`foto_${i}`, fotos[i], "FOTO");
+      if (id) fotosIds.push(id);
+      else fotosB64.push(fotos[i]);
+    }
+
+    let firmaId = data.firma_tecnico_id || null;
+    let firmaB64 = "";
+    if (firma) {
+      firmaId = await subir("firma", firma, "FIRMA");
+      if (!firmaId) firmaB64 = firma;
+    }
+
+    return {
+      ...data,
+      fotos_b64: fotosB64,
+      fotos_ids: fotosIds,
+      firma_tecnico_img: firmaB64,
+      firma_tecnico_id: firmaId,
+    };
+  }
+
   useEffect(() => {
     if (!online) return;
 
@@ -89,11 +150,18 @@ export default function useOfflineQueue() {
         }
 
         try {
-          await enviarOT(normalized, true);   // genera PDF
+          const liviano = await subirEvidencias(p, normalized);
+          await enviarOT(liviano, true);   // genera PDF
           await borrarPendiente(p.id);  // remove local
         } catch (e) {
           const status = e?.status || 0;
 
+          // ✅ Falla subiendo evidencias: se reanuda en el próximo ciclo
+          if (e?.fase === "evidencias") {
+            console.warn("⏸️ Evidencias a medio subir (se reanudará):", e);
+            continue;
+          }
+
 
           // ✅ Si es 400: es un error de datos, NO reintentar eternamente
           if (status === 400) {
@@ -118,5 +186,6 @@ export default function useOfflineQueue() {
     guardarPendiente,
     obtenerPendientes,
     borrarPendiente,
+    actualizarPendiente,
   };
 }
@@ -17,6 +17,7 @@ import {
   Legend,
 } from "recharts";
 import { API, authHeaders, getCurrentUser } from "../api";
+import { decodeColumnar } from "../services/luminariasApi";
 
 const RAMAL_RANGES = {
   ACC_NORTE: { min: 11, max: 32, label: "Acc Norte" },
@@ -41,13 +42,14 @@ async function fetchLuminarias({ ramal, from, to }) {
   if (ramal) params.set("ramal", ramal);
   if (from) params.set("from", from);
   if (to) params.set("to", to);
+  params.set("format", "columnar");
 
   const url = `${API}/api/luminarias/historial/?${params.toString()}`;
   const res = await fetch(url, {
     headers: authHeaders(),
   });
   if (!res.ok) throw new Error("Error cargando dashboard de luminarias");
-  return await res.json();
+  return decodeColumnar(await res.json());
 }
 
 function upper(s) {
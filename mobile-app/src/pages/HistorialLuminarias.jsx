@@ -2,6 +2,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { API, authHeaders, getCurrentUser } from "../api";
+import { decodeColumnar } from "../services/luminariasApi";
 import "../styles/historial_luminarias.css";
 
 /* =======================================================
@@ -22,13 +23,14 @@ async function fetchLuminarias({ ramal, from, to }) {
   if (ramal) params.set("ramal", ramal);
   if (from) params.set("from", from);
   if (to) params.set("to", to);
+  params.set("format", "columnar");
 
   const url = `${API}/api/luminarias/historial/?${params.toString()}`;
   const res = await fetch(url, {
     headers: authHeaders(),
   });
   if (!res.ok) throw new Error("Error cargando historial luminarias");
-  return await res.json();
+  return decodeColumnar(await res.json());
 }
 
 /* =======================================================
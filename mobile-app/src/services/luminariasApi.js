@@ -1,5 +1,29 @@
 import { API, authFetch, getAccessToken, getRefreshToken } from "../api";
 
+// ?format=columnar (ver core/renderers.py en el backend):
+// { n, columns: { col: [...] }, dicts: { col: ["valor", ...] } }
+// Las columnas con tabla vienen como índices. Devuelve la lista de filas.
+export function decodeColumnar(payload) {
+  if (Array.isArray(payload)) return payload;
+
+  const n = Number(payload?.n) || 0;
+  const columns = payload?.columns || {};
+  const dicts = payload?.dicts || {};
+
+  const rows = new Array(n);
+  for (let i = 0; i < n; i++) rows[i] = {};
+
+  for (const name of Object.keys(columns)) {
+    const col = columns[name];
+    const dict = dicts[name];
+    for (let i = 0; i < n; i++) {
+      rows[i][name] = dict ? dict[col[i]] : col[i];
+    }
+  }
+
+  return rows;
+}
+
 function hasSession() {
   return !!(getAccessToken() || getRefreshToken());
 }
@@ -19,6 +43,7 @@ export async function obtenerHistorialLuminarias({
   if (ramal) params.set("ramal", String(ramal).trim());
   if (from) params.set("from", String(from).trim());
   if (to) params.set("to", String(to).trim());
+  params.set("format", "columnar");
 
   const url = `${API}/api/luminarias/historial/?${params.toString()}`;
 
@@ -37,5 +62,5 @@ export async function obtenerHistorialLuminarias({
   }
 
   const data = await res.json().catch(() => []);
-  return Array.isArray(data) ? data : [];
+  return decodeColumnar(data);
 }
@@ -0,0 +1,181 @@
+# core/cache.py
+"""
+Cache de respuestas de lectura, por dominio (namespace).
+
+- Claves: "<namespace>:g<generación>:<hash de las partes>". Las partes las
+  arma cada vista con un key builder explícito (filtros, versión, etc).
+- Invalidación: cada namespace tiene un contador de generación en el cache.
+  Las señales de los modelos lo incrementan y todas las claves viejas
+  quedan huérfanas (vencen solas por TIMEOUT).
+- agrupar(): igual que orders/feed.agrupar; el alta de una OT con 200
+  items invalida cada namespace una vez al salir, no una por save().
+- Contadores de hit / miss por namespace, por proceso (estadisticas()).
+
+Con el backend locmem (default) el cache y las generaciones son por
+proceso: con varios workers conviene que la clave incluya el token de
+versión de core.conditional, o usar CACHE_BACKEND=redis / file.
+"""
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+NAMESPACES = ("tableros", "historial", "luminarias", "stats", "materiales")
+
+_lock = threading.Lock()
+_lote = ContextVar("cache_invalidar_lote", default=None)
+_stats = {ns: {"hits": 0, "misses": 0, "invalidaciones": 0} for ns in NAMESPACES}
+
+
+def _contar(namespace: str, campo: str):
+    with _lock:
+        _stats.setdefault(
+            namespace, {"hits": 0, "misses": 0, "invalidaciones": 0}
+        )[campo] += 1
+
+
+def estadisticas() -> dict:
+    with _lock:
+        return {ns: dict(v) for ns, v in _stats.items()}
+
+
+def reset_estadisticas():
+    with _lock:
+        for v in _stats.values():
+            for k in v:
+                v[k] = 0
+
+
+# ==========================================================
+# Generaciones
+# ==========================================================
+def _gen_key(namespace: str) -> str:
+    return f"gen:{namespace}"
+
+
+def generacion(namespace: str) -> int:
+    key = _gen_key(namespace)
+    # add() no pisa una generación ya existente (carrera entre workers)
+    cache.add(key, 1, timeout=None)
+    return cache.get(key) or 1
+
+
+def _incrementar(namespace: str):
+    try:
+        cache.incr(_gen_key(namespace))
+    except ValueError:
+        # la clave no existía (o la desalojó el LRU): arranca en 2
+        cache.set(_gen_key(namespace), 2, timeout=None)
+
+
+def invalidar(*namespaces):
+    """
+    Invalida ahora y de nuevo al commitear: un request concurrente que
+    releyó la DB antes del commit no deja datos viejos en el cache.
+    """
+    lote = _lote.get()
+    if lote is not None:
+        lote.update(namespaces)
+        return
+
+    for ns in namespaces:
+        _incrementar(ns)
+        _contar(ns, "invalidaciones")
+
+    def al_commit():
+        for ns in namespaces:
+            _incrementar(ns)
+
+    transaction.on_commit(al_commit)
+
+
+@contextmanager
+def agrupar():
+    if _lote.get() is not None:
+        # anidado: invalida el de afuera
+        yield
+        return
+
+    lote = set()
+    token = _lote.set(lote)
+    try:
+        yield
+    finally:
+        _lote.reset(token)
+        if lote:
+            invalidar(*sorted(lote))
+
+
+def invalidar_al_cambiar(model, *namespaces):
+    """
+    Conecta post_save / post_delete de `model` a invalidar(*namespaces).
+    """
+
+    def receiver(sender, **kwargs):
+        invalidar(*namespaces)
+
+    uid = f"cache:{model._meta.label}"
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ==========================================================
+# Lectura
+# ==========================================================
+def clave(namespace: str, partes) -> str:
+    digest = hashlib.sha1(repr(partes).encode()).hexdigest()
+    return f"{namespace}:g{generacion(namespace)}:{digest}"
+
+
+_MISS = object()
+
+
+def get_or_set(namespace: str, partes, fn, timeout=DEFAULT_TIMEOUT):
+    key = clave(namespace, partes)
+    value = cache.get(key, _MISS)
+    if value is not _MISS:
+        _contar(namespace, "hits")
+        return value
+
+    _contar(namespace, "misses")
+    value = fn()
+    cache.set(key, value, timeout)
+    return value
+
+
+def cacheada(namespace: str, key_builder, timeout=DEFAULT_TIMEOUT):
+    """
+    Decorador para el `get` de un APIView: cachea `response.data` de las
+    respuestas 200. `key_builder(request, *args, **kwargs)` devuelve las
+    partes de la clave (una tupla) o None para no cachear ese request.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def inner(self, request, *args, **kwargs):
+            partes = key_builder(request, *args, **kwargs)
+            if partes is None:
+                return func(self, request, *args, **kwargs)
+
+            key = clave(namespace, partes)
+            data = cache.get(key, _MISS)
+            if data is not _MISS:
+                _contar(namespace, "hits")
+                return Response(data)
+
+            _contar(namespace, "misses")
+            response = func(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, response.data, timeout)
+            return response
+
+        return inner
+
+    return decorator
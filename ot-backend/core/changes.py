@@ -0,0 +1,54 @@
+# core/changes.py
+"""
+Tokens de sync incremental (GET .../changes/?since=<token>).
+
+El token es opaco para el cliente: el instante (del servidor) en que se
+armó la respuesta anterior. La consulta siguiente trae lo que tenga
+`updated_at` posterior, menos un solapamiento: `updated_at` se fija en el
+save(), antes del commit, y una transacción que commitea después de
+emitido el token puede traer un `updated_at` anterior a él. Los clientes
+aplican los cambios por id (upsert), así que repetir alguno no molesta.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class TokenInvalido(ValueError):
+    pass
+
+
+def solapamiento() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "OT_CHANGES_OVERLAP_S", 5)))
+
+
+def emitir_token(momento: datetime | None = None) -> str:
+    momento = momento or timezone.now()
+    raw = momento.isoformat().encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def leer_token(token: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        momento = datetime.fromisoformat(raw.decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise TokenInvalido(token)
+
+    if timezone.is_naive(momento):
+        raise TokenInvalido(token)
+    return momento
+
+
+def desde(token: str | None) -> datetime | None:
+    """
+    Corte para `updated_at__gte`, o None si no hay token (snapshot
+    completo). TokenInvalido si el token no es nuestro.
+    """
+    token = (token or "").strip()
+    if not token:
+        return None
+    return leer_token(token) - solapamiento()
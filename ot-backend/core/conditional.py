@@ -0,0 +1,96 @@
+# core/conditional.py
+"""
+GET condicional (ETag / If-None-Match) para vistas de lectura pesadas.
+
+Cada vista da un token de versión barato (MAX(id) / MAX(updated_at) por
+índice, sin COUNT). El ETag combina ese token con el endpoint, los filtros
+del query string y el formato negociado: si el cliente ya tiene esa
+versión se responde 304 sin ejecutar la vista ni serializar nada.
+
+MAX(id) solo ve altas. Las ediciones y bajas in-place las aporta otra
+tabla que cambia con ellas y que ven todos los workers: CambioFeed (el
+outbox del feed, una fila por save / delete de OT, grupo, item o
+historial) o el updated_at de Tablero. La generación de core.cache se
+suma igual, pero con locmem solo la ve el proceso que escribió.
+"""
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+def version_token(*querysets) -> str:
+    """
+    MAX(id) de cada queryset, en orden: una búsqueda por el índice de la
+    PK por queryset (ORDER BY id DESC LIMIT 1), sin recorrer la tabla.
+    """
+    return "/".join(
+        str(qs.order_by("-id").values_list("id", flat=True).first() or 0)
+        for qs in querysets
+    )
+
+
+def version_de(request, version) -> str:
+    """
+    Token de `version(request)`, calculado una sola vez por request (lo
+    usan el ETag y las claves de core.cache).
+    """
+    memo = request.__dict__.setdefault("_versiones", {})
+    if version not in memo:
+        memo[version] = version(request)
+    return memo[version]
+
+
+def filtros(request) -> tuple:
+    """
+    Query string normalizado (orden estable, sin ?format=).
+    """
+    return tuple(
+        (k, tuple(sorted(v)))
+        for k, v in sorted(request.query_params.lists())
+        if k != "format"
+    )
+
+
+def etag_para(request, alcance: str, token: str) -> str:
+    raw = "|".join(
+        [
+            alcance,
+            token,
+            urlencode(filtros(request), doseq=True),
+            getattr(request, "accepted_media_type", "") or "",
+            # mismo media type, distinto cuerpo (?format=columnar)
+            getattr(getattr(request, "accepted_renderer", None), "format", ""),
+        ]
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def condicional(alcance: str, version):
+    """
+    Decorador para el `get` de un APIView.
+    `version(request)` devuelve el token de versión (ver version_token).
+
+    Corre después de autenticación / permisos / negociación de DRF, así que
+    un 304 nunca se le da a quien no podría ver el contenido.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        return etag_para(request, alcance, version_de(request, version))
+
+    def decorator(func):
+        @wraps(func)
+        def inner(self, request, *args, **kwargs):
+            view = condition(etag_func=etag_func)(
+                lambda req, *a, **kw: func(self, req, *a, **kw)
+            )
+            response = view(request, *args, **kwargs)
+            # el celular revalida siempre; ningún proxy compartido la guarda
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return inner
+
+    return decorator
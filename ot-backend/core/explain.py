@@ -0,0 +1,55 @@
+# core/explain.py
+"""
+EXPLAIN de queries ya capturadas: qué tablas se recorren enteras.
+
+Lo usa ExplainMixin (core/testing.py) para verificar que la query
+principal de cada endpoint entra por un índice.
+
+- SQLite: EXPLAIN QUERY PLAN; "SCAN <tabla>" sin índice es recorrido
+  completo ("SCAN <tabla> USING INDEX" es recorrer en orden de índice,
+  lo normal para un ORDER BY ... LIMIT).
+- Postgres: EXPLAIN con enable_seqscan apagado. Con las tablas chicas de
+  los tests el planner elige Seq Scan aunque haya índice; apagándolo,
+  un Seq Scan que queda significa que no hay índice que sirva.
+"""
+import re
+
+from django.db import connections, transaction
+
+
+def plan(sql: str, using: str = "default") -> list:
+    conn = connections[using]
+
+    if conn.vendor == "sqlite":
+        with conn.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    if conn.vendor == "postgresql":
+        with transaction.atomic(using=using), conn.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            return [row[0] for row in cursor.fetchall()]
+
+    raise NotImplementedError(f"EXPLAIN no soportado para {conn.vendor}")
+
+
+def recorridos_completos(lineas, tabla: str, vendor: str) -> list:
+    if vendor == "sqlite":
+        patron = re.compile(rf"^SCAN (TABLE )?{re.escape(tabla)}\b(?!.*\bINDEX\b)")
+    else:
+        patron = re.compile(rf"Seq Scan on {re.escape(tabla)}\b")
+    return [l for l in lineas if patron.search(l.strip())]
+
+
+def filtra_tabla(sql: str, tabla: str) -> bool:
+    """
+    SELECT con WHERE cuyo FROM es `tabla`. Los agregados sin filtro (los
+    tokens de versión de core.conditional) recorren la tabla por diseño.
+    """
+    sql = sql.lstrip()
+    return (
+        sql.upper().startswith("SELECT")
+        and f'FROM "{tabla}"' in sql
+        and " WHERE " in sql
+    )
@@ -0,0 +1,210 @@
+# core/metrics.py
+"""
+Spans de tiempo por request y percentiles en memoria.
+
+- span("pdf"): mide un bloque. Dentro de un request (TimingMiddleware) se
+  acumula por nombre; fuera de un request no hace nada más que medir.
+- Al terminar el request, cada fase (y "total") va a un histograma
+  rodante por (vista, fase): últimas OT_METRICS_WINDOW muestras.
+- prometheus() arma el texto para GET /api/metrics/.
+
+Los spans pueden anidarse (p.ej. "historial" corre por signal dentro de
+"db"): cada uno mide su tiempo completo, no el propio.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_actual = ContextVar("ot_spans", default=None)
+
+_lock = threading.Lock()
+_series = {}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# ==========================================================
+# Spans
+# ==========================================================
+class Spans:
+    def __init__(self):
+        self.ms = defaultdict(float)
+        self.veces = defaultdict(int)
+
+    def agregar(self, nombre: str, ms: float):
+        self.ms[nombre] += ms
+        self.veces[nombre] += 1
+
+    def server_timing(self) -> str:
+        partes = []
+        for nombre, ms in self.ms.items():
+            parte = f"{nombre};dur={ms:.1f}"
+            if self.veces[nombre] > 1:
+                parte += f';desc="x{self.veces[nombre]}"'
+            partes.append(parte)
+        return ", ".join(partes)
+
+    def como_dict(self) -> dict:
+        return {k: round(v, 2) for k, v in self.ms.items()}
+
+
+@contextmanager
+def recolectar():
+    spans = Spans()
+    token = _actual.set(spans)
+    try:
+        yield spans
+    finally:
+        _actual.reset(token)
+
+
+@contextmanager
+def span(nombre: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans = _actual.get()
+        if spans is not None:
+            spans.agregar(nombre, (time.perf_counter() - t0) * 1000)
+
+
+# ==========================================================
+# Histograma rodante
+# ==========================================================
+def _ventana() -> int:
+    return int(getattr(settings, "OT_METRICS_WINDOW", 1000))
+
+
+def observar(vista: str, fase: str, ms: float):
+    key = (vista, fase)
+    with _lock:
+        serie = _series.get(key)
+        if serie is None:
+            serie = _series[key] = {
+                "muestras": deque(maxlen=_ventana()),
+                "count": 0,
+                "sum": 0.0,
+            }
+        serie["muestras"].append(ms)
+        serie["count"] += 1
+        serie["sum"] += ms
+
+
+def observar_request(vista: str, spans: Spans, total_ms: float):
+    for fase, ms in spans.ms.items():
+        observar(vista, fase, ms)
+    observar(vista, "total", total_ms)
+
+
+def _cuantil(ordenadas, q: float) -> float:
+    if not ordenadas:
+        return 0.0
+    k = (len(ordenadas) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordenadas) - 1)
+    return ordenadas[lo] + (ordenadas[hi] - ordenadas[lo]) * (k - lo)
+
+
+def resumen() -> dict:
+    """
+    {(vista, fase): {"p50", "p95", "p99", "count", "sum"}} en ms.
+    """
+    with _lock:
+        copia = {
+            k: (sorted(v["muestras"]), v["count"], v["sum"]) for k, v in _series.items()
+        }
+
+    out = {}
+    for key, (ordenadas, count, total) in copia.items():
+        fila = {f"p{int(q * 100)}": _cuantil(ordenadas, q) for q in QUANTILES}
+        fila["count"] = count
+        fila["sum"] = total
+        out[key] = fila
+    return out
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+# ==========================================================
+# Prometheus (text format 0.0.4)
+# ==========================================================
+def _label(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus(extra_contadores=None) -> str:
+    """
+    `extra_contadores`: {nombre_metrica: (help, {label_value: n})} para
+    contadores de otros módulos (p.ej. hits del cache).
+    """
+    lineas = [
+        "# HELP ot_request_phase_seconds Duración por vista y fase (ventana rodante).",
+        "# TYPE ot_request_phase_seconds summary",
+    ]
+    for (vista, fase), fila in sorted(resumen().items()):
+        labels = f'view="{_label(vista)}",phase="{_label(fase)}"'
+        for q in QUANTILES:
+            valor = fila[f"p{int(q * 100)}"] / 1000
+            lineas.append(
+                f'ot_request_phase_seconds{{{labels},quantile="{q}"}} {valor:.6f}'
+            )
+        lineas.append(f"ot_request_phase_seconds_sum{{{labels}}} {fila['sum'] / 1000:.6f}")
+        lineas.append(f"ot_request_phase_seconds_count{{{labels}}} {fila['count']}")
+
+    for nombre, (ayuda, valores) in (extra_contadores or {}).items():
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} counter")
+        for labels, n in sorted(valores.items()):
+            lineas.append(f"{nombre}{{{labels}}} {n}")
+
+    return "\n".join(lineas) + "\n"
+
+
+# ==========================================================
+# Logs estructurados
+# ==========================================================
+def log_request(logger, request, response, vista: str, spans: Spans, total_ms: float):
+    logger.info(
+        "request",
+        extra={
+            "datos": {
+                "method": request.method,
+                "path": request.path,
+                "view": vista,
+                "status": response.status_code,
+                "ms": round(total_ms, 2),
+                "spans": spans.como_dict(),
+            }
+        },
+    )
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatter de logging: una línea JSON por registro. Lo que venga en
+    extra={"datos": {...}} se agrega al objeto.
+    """
+
+    def format(self, record) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        datos = getattr(record, "datos", None)
+        if isinstance(datos, dict):
+            out.update(datos)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
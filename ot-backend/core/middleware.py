@@ -0,0 +1,169 @@
+# core/middleware.py
+"""
+Middlewares propios.
+
+CompressionMiddleware: compresión de respuestas grandes (JSON de la API)
+según Accept-Encoding: brotli si el paquete está instalado y el cliente lo
+acepta, si no gzip. No toca respuestas streaming (PDFs, descargas): ya
+vienen comprimidas y comprimirlas rompe Content-Length / Range.
+
+QueryBudgetMiddleware: presupuesto de queries por vista (ver abajo).
+
+TimingMiddleware: Server-Timing + log JSON + métricas por request.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .querybudget import ContadorQueries, presupuesto_para
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+logger = logging.getLogger("ot.queries")
+timing_logger = logging.getLogger("ot.timing")
+
+_TIPOS = ("application/json", "text/")
+
+
+def _min_bytes() -> int:
+    return int(getattr(settings, "OT_COMPRESION_MIN_BYTES", 1024))
+
+
+def _acepta_br(header: str) -> bool:
+    # "br;q=0" es un rechazo explícito
+    for parte in header.split(","):
+        token, *params = [p.strip() for p in parte.split(";")]
+        if token.lower() != "br":
+            continue
+        for param in params:
+            clave, _, valor = param.partition("=")
+            if clave.strip() == "q":
+                try:
+                    return float(valor) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if not content_type.startswith(_TIPOS):
+            return response
+        if len(response.content) < _min_bytes():
+            return response
+
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is not None and _acepta_br(ae):
+            return self._brotli(response)
+        return super().process_response(request, response)
+
+    def _brotli(self, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        # calidad 5: ~gzip -9 en tamaño, bastante más rápido que 11
+        comprimido = brotli.compress(response.content, quality=5)
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+        # mismo criterio que GZipMiddleware: el ETag fuerte pasa a débil
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Dev / staging: cuenta queries y tiempo de DB por request.
+    - X-Query-Count / X-Query-Time-Ms en toda respuesta.
+    - X-Query-Budget + log WARNING si se pasa del presupuesto de la vista
+      (OT_QUERY_BUDGETS por nombre de URL, OT_QUERY_BUDGET_DEFAULT).
+    - X-Query-Repeated + log WARNING si una misma forma de SQL se repite
+      OT_QUERY_NPLUS1_MIN veces o más (probable N+1).
+    Apagado salvo OT_QUERY_BUDGET=True (default: DEBUG).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "OT_QUERY_BUDGET", False):
+            return self.get_response(request)
+
+        with ContadorQueries() as contador:
+            response = self.get_response(request)
+
+        response.headers["X-Query-Count"] = str(contador.total)
+        response.headers["X-Query-Time-Ms"] = f"{contador.ms:.1f}"
+
+        match = getattr(request, "resolver_match", None)
+        vista = (match.view_name if match else "") or request.path
+        presupuesto = presupuesto_para(vista)
+
+        if contador.total > presupuesto:
+            response.headers["X-Query-Budget"] = (
+                f"exceeded; queries={contador.total}; budget={presupuesto}"
+            )
+            logger.warning(
+                "query budget excedido en %s %s (%s): %s",
+                request.method,
+                request.path,
+                vista,
+                contador.resumen(),
+            )
+
+        repetidas = contador.repetidas()
+        if repetidas:
+            sql, veces = repetidas[0]
+            response.headers["X-Query-Repeated"] = f"{veces}x {sql[:120]}"
+            logger.warning(
+                "posible N+1 en %s %s (%s): %s",
+                request.method,
+                request.path,
+                vista,
+                "; ".join(f"{n}x {s[:200]}" for s, n in repetidas[:3]),
+            )
+
+        return response
+
+
+class TimingMiddleware:
+    """
+    Spans por request (core.metrics.span) -> header Server-Timing, una
+    línea JSON en el logger ot.timing y el histograma de /api/metrics/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        t0 = time.perf_counter()
+        with metrics.recolectar() as spans:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - t0) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        vista = (match.view_name if match else "") or "sin_ruta"
+
+        header = spans.server_timing()
+        total = f"total;dur={total_ms:.1f}"
+        response.headers["Server-Timing"] = f"{header}, {total}" if header else total
+
+        metrics.observar_request(vista, spans, total_ms)
+        metrics.log_request(timing_logger, request, response, vista, spans, total_ms)
+        return response
@@ -0,0 +1,86 @@
+# core/querybudget.py
+"""
+Conteo de queries por request y detección de N+1.
+
+ContadorQueries engancha un execute_wrapper en todas las conexiones y
+agrupa las queries por "forma" (SQL sin literales y con los IN (...)
+colapsados): la misma forma repetida muchas veces en un request es el
+síntoma típico de un N+1.
+
+Lo usan QueryBudgetMiddleware (dev / staging) y QueryBudgetMixin (tests).
+"""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUM = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_IN = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+_RE_SPACES = re.compile(r"\s+")
+
+
+def normalizar_sql(sql: str) -> str:
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_IN.sub("IN (...)", sql)
+    sql = _RE_NUM.sub("?", sql)
+    return _RE_SPACES.sub(" ", sql).strip()
+
+
+def presupuesto_para(view_name: str) -> int:
+    budgets = getattr(settings, "OT_QUERY_BUDGETS", {}) or {}
+    return int(budgets.get(view_name, getattr(settings, "OT_QUERY_BUDGET_DEFAULT", 20)))
+
+
+def umbral_nmas1() -> int:
+    return int(getattr(settings, "OT_QUERY_NPLUS1_MIN", 5))
+
+
+class ContadorQueries:
+    """
+    with ContadorQueries() as c:
+        ...
+    c.total, c.ms, c.repetidas()
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.ms = 0.0
+        self.formas = Counter()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.ms += (time.perf_counter() - t0) * 1000
+            self.total += 1
+            self.formas[normalizar_sql(sql)] += 1
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+        return False
+
+    def repetidas(self, minimo: int | None = None):
+        """
+        [(forma, veces)] de las formas repetidas al menos `minimo` veces,
+        de la más repetida a la menos.
+        """
+        minimo = umbral_nmas1() if minimo is None else minimo
+        return [(sql, n) for sql, n in self.formas.most_common() if n >= minimo]
+
+    def resumen(self, limite: int = 5) -> str:
+        lineas = [f"{self.total} queries en {self.ms:.1f}ms"]
+        for sql, n in self.formas.most_common(limite):
+            lineas.append(f"  {n:>4}x {sql[:200]}")
+        return "\n".join(lineas)
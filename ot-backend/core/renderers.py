@@ -0,0 +1,121 @@
+# core/renderers.py
+"""
+JSON rápido para la API (orjson), con la misma salida que el JSONRenderer
+de DRF: UTF-8 compacto, Decimal -> número, datetime con "Z", UUID -> str.
+
+Si orjson no está instalado, o OT_JSON_ORJSON=False, todo cae al
+JSONRenderer / JSONParser de DRF (stdlib json) sin cambiar la salida.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+# datetime/time pasan por el encoder de DRF ("Z" en vez de "+00:00");
+# dict con claves no-str igual que json.dumps
+_OPTS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+_default = JSONEncoder().default
+
+_LS, _PS = "\u2028".encode(), "\u2029".encode()
+
+
+def orjson_activo() -> bool:
+    return orjson is not None and getattr(settings, "OT_JSON_ORJSON", True)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not orjson_activo() or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        opts = _OPTS
+        if indent:
+            # orjson solo indenta con 2; cualquier indent pedido sale así
+            opts |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=opts)
+        except TypeError:
+            # enteros > 64 bits, tipos raros: el camino stdlib sabe más
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # igual que DRF: JSON que sea subconjunto estricto de JS
+        if _LS in ret or _PS in ret:
+            ret = ret.replace(_LS, b"\\u2028").replace(_PS, b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if not orjson_activo() or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            # orjson rechaza NaN/Infinity, igual que STRICT_JSON
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+# ==========================================================
+# ?format=columnar
+# ==========================================================
+def columnar(filas, diccionario=()) -> dict:
+    """
+    Lista de dicts -> columnas. Las columnas de `diccionario` (strings muy
+    repetidos: tablero, zona...) van como índices a una tabla por columna.
+
+    {"n": 3,
+     "columns": {"km": [1.5, 2.0, null], "zona": [0, 0, 1]},
+     "dicts": {"zona": ["Zona 1", "Zona 2"]}}
+    """
+    nombres = {}
+    for fila in filas:
+        for k in fila:
+            nombres.setdefault(k, None)
+
+    columnas = {k: [fila.get(k) for fila in filas] for k in nombres}
+    tablas = {}
+    for k in diccionario:
+        valores = columnas.get(k)
+        if valores is None:
+            continue
+        indice = {}
+        columnas[k] = [indice.setdefault(v, len(indice)) for v in valores]
+        tablas[k] = list(indice)
+
+    return {"n": len(filas), "columns": columnas, "dicts": tablas}
+
+
+class ColumnarRenderer(ORJSONRenderer):
+    """
+    Opt-in con ?format=columnar en las vistas que lo agregan a sus
+    renderer_classes. La vista declara `columnar_diccionario` con las
+    columnas a codificar. Lo que no sea una lista de dicts (errores, 4xx)
+    sale como JSON normal.
+    """
+
+    format = "columnar"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list) and all(isinstance(f, dict) for f in data):
+            view = (renderer_context or {}).get("view")
+            data = columnar(data, getattr(view, "columnar_diccionario", ()))
+        return super().render(data, accepted_media_type, renderer_context)
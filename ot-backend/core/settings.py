@@ -52,8 +52,14 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # =========================================================
 MIDDLEWARE = [
+    # Server-Timing + log JSON + /api/metrics/ (core/metrics.py)
+    "core.middleware.TimingMiddleware",
+    # conteo de queries / N+1 por request; apagado salvo OT_QUERY_BUDGET
+    "core.middleware.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # gzip / brotli de respuestas JSON grandes (core/middleware.py)
+    "core.middleware.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -141,21 +147,87 @@ else:
         }
     }
 
+# =========================================================
+# CACHE
+# =========================================================
+# locmem (default, por proceso) | file | redis. Lo usan el throttling de
+# DRF y el cache de lecturas (core/cache.py).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", "300"))
+
+if CACHE_BACKEND == "redis":
+    _cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_URL", "redis://127.0.0.1:6379/1"),
+    }
+elif CACHE_BACKEND == "file":
+    _cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+    }
+else:
+    _cache = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ot-backend",
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    }
+
+CACHES = {
+    "default": {
+        **_cache,
+        "TIMEOUT": CACHE_TIMEOUT,
+        "KEY_PREFIX": "ot",
+    }
+}
+
+# =========================================================
+# QUERY BUDGET (core/middleware.py, dev / staging)
+# =========================================================
+OT_QUERY_BUDGET = (
+    os.getenv("OT_QUERY_BUDGET", str(DEBUG and not IS_TEST)).lower() == "true"
+)
+OT_QUERY_BUDGET_DEFAULT = int(os.getenv("OT_QUERY_BUDGET_DEFAULT", "20"))
+# Por nombre de URL. Incluyen usuario + perfil de la autenticación JWT.
+OT_QUERY_BUDGETS = {
+    "ordenes": 4,
+    "tableros_list": 5,
+    "tableros_autocomplete": 4,
+    "historial": 9,
+    "luminarias-historial": 10,
+}
+# Misma forma de SQL repetida esta cantidad de veces => posible N+1
+OT_QUERY_NPLUS1_MIN = int(os.getenv("OT_QUERY_NPLUS1_MIN", "5"))
+
 # =========================================================
 # LOGGING
 # =========================================================
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "core.metrics.JSONFormatter"},
+    },
     "handlers": {
         "console": {"class": "logging.StreamHandler"},
+        "json": {"class": "logging.StreamHandler", "formatter": "json"},
     },
     "root": {
         "handlers": ["console"],
         "level": "INFO",
     },
+    "loggers": {
+        # ot.timing (una línea por request), ot.queries, ot.historial...
+        "ot": {
+            "handlers": ["json"],
+            "level": os.getenv("OT_LOG_LEVEL", "WARNING" if IS_TEST else "INFO"),
+            "propagate": False,
+        },
+    },
 }
 
+# Muestras por (vista, fase) para los percentiles de /api/metrics/
+OT_METRICS_WINDOW = int(os.getenv("OT_METRICS_WINDOW", "1000"))
+
 logger = logging.getLogger("startup")
 logger.info("DEBUG: %s", DEBUG)
 logger.info("DATABASE_URL present: %s", bool(DATABASE_URL))
@@ -210,6 +282,28 @@ STORAGES = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# =========================================================
+# PDF
+# =========================================================
+# Fuentes TTF para el perfil "archive" (se embeben en subset).
+# Si no existen se usa Vera, que viene con ReportLab.
+OT_PDF_TTF_DIR = os.getenv("OT_PDF_TTF_DIR", "/usr/share/fonts/truetype/dejavu")
+
+# Reporte combinado multi-OT (POST /api/ordenes/reporte-pdf/)
+OT_REPORTE_MAX_OTS = int(os.getenv("OT_REPORTE_MAX_OTS", "500"))
+OT_REPORTE_WORKERS = int(os.getenv("OT_REPORTE_WORKERS", "2"))
+# True: el reporte se arma dentro del request (tests / debugging)
+OT_REPORTE_EN_LINEA = os.getenv("OT_REPORTE_EN_LINEA", "False").lower() == "true"
+# Minutos que puede tardar un job antes de cortarse con ERROR
+OT_REPORTE_TIMEOUT_MIN = int(os.getenv("OT_REPORTE_TIMEOUT_MIN", "15"))
+# Un reporte PENDIENTE / PROCESANDO más viejo que esto quedó colgado (el
+# proceso que lo armaba se reinició): se marca ERROR al consultarlo o con
+# manage.py recuperar_reportes
+OT_REPORTE_COLGADO_MIN = int(os.getenv("OT_REPORTE_COLGADO_MIN", "30"))
+
+# Evidencias binarias (POST /api/evidencias/)
+OT_EVIDENCIA_MAX_BYTES = int(os.getenv("OT_EVIDENCIA_MAX_BYTES", str(10 * 1024 * 1024)))
+
 # =========================================================
 # SECURITY
 # =========================================================
@@ -259,7 +353,25 @@ AUTH_PASSWORD_VALIDATORS = [
 # =========================================================
 # DRF
 # =========================================================
+# Bodies más chicos que esto no se comprimen (core/middleware.py)
+OT_COMPRESION_MIN_BYTES = int(os.getenv("OT_COMPRESION_MIN_BYTES", "1024"))
+
+# JSON con orjson (core/renderers.py). False: stdlib json de DRF.
+OT_JSON_ORJSON = os.getenv("OT_JSON_ORJSON", "True").lower() == "true"
+
+# Sync incremental (core/changes.py): margen para commits tardíos
+OT_CHANGES_OVERLAP_S = int(os.getenv("OT_CHANGES_OVERLAP_S", "5"))
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
@@ -0,0 +1,82 @@
+# core/testing.py
+"""
+Helpers de tests compartidos entre apps.
+"""
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from . import explain
+from .querybudget import ContadorQueries, presupuesto_para
+
+
+class QueryBudgetMixin:
+    """
+    Mixin para TestCase / APITestCase:
+
+        with self.assertQueryBudget("ordenes"):      # OT_QUERY_BUDGETS
+            self.client.get("/api/ordenes/")
+        with self.assertQueryBudget(3):              # número explícito
+            ...
+        with self.assertNoRepeatedQueries():         # sin N+1
+            ...
+
+    A diferencia de assertNumQueries es un máximo, y al fallar lista las
+    formas de SQL más repetidas.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, presupuesto):
+        if isinstance(presupuesto, str):
+            presupuesto = presupuesto_para(presupuesto)
+
+        with ContadorQueries() as contador:
+            yield contador
+
+        if contador.total > presupuesto:
+            self.fail(
+                f"Presupuesto de queries excedido ({contador.total} > {presupuesto})\n"
+                + contador.resumen()
+            )
+
+    @contextmanager
+    def assertNoRepeatedQueries(self, minimo=None):
+        with ContadorQueries() as contador:
+            yield contador
+
+        repetidas = contador.repetidas(minimo)
+        if repetidas:
+            self.fail("Posible N+1:\n" + contador.resumen())
+
+
+class ExplainMixin:
+    """
+    Mixin para TestCase / APITestCase:
+
+        with self.assertUsesIndex("orders_ordentrabajo"):
+            self.client.get("/api/luminarias/historial/?from=2026-01-01")
+
+    Corre EXPLAIN sobre cada SELECT con WHERE sobre la tabla que se haya
+    ejecutado en el bloque y falla si alguno la recorre entera.
+    """
+
+    @contextmanager
+    def assertUsesIndex(self, tabla, using="default"):
+        conn = connections[using]
+        with CaptureQueriesContext(conn) as ctx:
+            yield ctx
+
+        consultas = [
+            q["sql"] for q in ctx.captured_queries if explain.filtra_tabla(q["sql"], tabla)
+        ]
+        if not consultas:
+            self.fail(f"Ninguna query con WHERE sobre {tabla}")
+
+        for sql in consultas:
+            lineas = explain.plan(sql, using)
+            if explain.recorridos_completos(lineas, tabla, conn.vendor):
+                self.fail(
+                    f"Recorrido completo de {tabla}:\n  {sql[:300]}\n"
+                    + "\n".join(f"    {l}" for l in lineas)
+                )
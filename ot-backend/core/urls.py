@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .views import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     # auth + users
@@ -11,6 +13,8 @@ urlpatterns = [
     path("api/", include("orders.urls")),
     # Historial / tableros / etc
     path("api/", include("historial.urls")),
+    # métricas Prometheus (solo admin)
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,35 @@
+# core/views.py
+from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.permissions import IsAdminRole
+
+from . import cache as ot_cache
+from . import metrics
+
+
+class MetricsView(APIView):
+    """
+    Percentiles por vista / fase y contadores del cache, en formato de
+    texto de Prometheus. Solo admin.
+    GET /api/metrics/
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        stats = ot_cache.estadisticas()
+        contadores = {
+            f"ot_cache_{campo}_total": (
+                f"Cache de lecturas: {campo} por namespace (por proceso).",
+                {f'namespace="{ns}"': v[campo] for ns, v in stats.items()},
+            )
+            for campo in ("hits", "misses", "invalidaciones")
+        }
+        return HttpResponse(
+            metrics.prometheus(contadores),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -1,3 +1,31 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Tablero
+
+
+@admin.register(Tablero)
+class TableroAdmin(admin.ModelAdmin):
+    """
+    Borrar desde el admin es la baja lógica (dar_de_baja): el historial
+    cuelga del tablero por CASCADE y los dispositivos se enteran por
+    /api/tableros/changes/.
+    """
+
+    list_display = ("id", "nombre", "zona", "updated_at", "deleted_at")
+    list_filter = ("zona", ("deleted_at", admin.EmptyFieldListFilter))
+    search_fields = ("nombre",)
+    readonly_fields = ("updated_at", "deleted_at")
+    actions = ["restaurar"]
+
+    def delete_model(self, request, obj):
+        obj.dar_de_baja()
+
+    def delete_queryset(self, request, queryset):
+        # uno por uno: save() deja updated_at y dispara las señales de cache
+        for tablero in queryset:
+            tablero.dar_de_baja()
+
+    @admin.action(description="Restaurar tableros dados de baja")
+    def restaurar(self, request, queryset):
+        for tablero in queryset:
+            tablero.restaurar()
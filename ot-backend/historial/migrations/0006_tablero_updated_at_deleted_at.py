@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historial', '0005_alter_historialtarea_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tablero',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tablero',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='tablero',
+            index=models.Index(fields=['updated_at'], name='historial_t_updated_c6311d_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:05
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# icontains en Postgres es UPPER(col::text) LIKE UPPER(%s): el índice
+# trigram tiene que ser sobre esa misma expresión. En SQLite no hay
+# equivalente (LIKE '%x%' siempre recorre).
+TRIGRAM = [
+    ("historial_tablero", "nombre", "tablero_nombre_trgm_idx"),
+    ("historial_historialtarea", "circuito", "hist_circuito_trgm_idx"),
+]
+
+
+def crear_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for tabla, col, nombre in TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{nombre}" ON "{tabla}" '
+            f'USING gin ((UPPER("{col}"::text)) gin_trgm_ops)'
+        )
+
+
+def borrar_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, _, nombre in TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{nombre}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historial', '0006_tablero_updated_at_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historialtarea',
+            index=models.Index(fields=['-fecha', '-creado'], name='historial_h_fecha_51c26b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialtarea',
+            index=models.Index(fields=['tablero', 'circuito'], name='historial_h_tablero_380546_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tablero',
+            index=models.Index(django.db.models.functions.text.Upper('nombre'), name='tablero_nombre_upper_idx'),
+        ),
+        # no-op fuera de Postgres
+        TrigramExtension(),
+        migrations.RunPython(crear_trigram, borrar_trigram),
+    ]
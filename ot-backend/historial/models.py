@@ -1,20 +1,52 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+
+class TableroQuerySet(models.QuerySet):
+    def vigentes(self):
+        """
+        Los que resuelve un nombre: catálogo, tablero_ref de las OTs,
+        /api/tableros/exists/. Uno dado de baja no; vuelve con restaurar()
+        (una OT nueva con su nombre lo restaura).
+        """
+        return self.filter(deleted_at__isnull=True)
 
 
 class Tablero(models.Model):
     nombre = models.CharField(max_length=120, unique=True)
     zona = models.CharField(max_length=120)
 
+    # === Sync incremental (GET /api/tableros/changes/) ===
+    updated_at = models.DateTimeField(auto_now=True)
+    # baja lógica: el nombre sigue reservado y el historial no se toca
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TableroQuerySet.as_manager()
+
     class Meta:
         ordering = ["nombre"]
         indexes = [
             models.Index(fields=["nombre"]),
             models.Index(fields=["zona"]),
+            models.Index(fields=["updated_at"]),
+            # nombre__iexact (resolución de tableros): en Postgres es UPPER(nombre)
+            models.Index(Upper("nombre"), name="tablero_nombre_upper_idx"),
         ]
 
     def __str__(self):
         return f"{self.nombre} ({self.zona})"
 
+    def dar_de_baja(self):
+        if self.deleted_at is None:
+            self.deleted_at = timezone.now()
+            self.save(update_fields=["deleted_at", "updated_at"])
+
+    def restaurar(self):
+        if self.deleted_at is not None:
+            self.deleted_at = None
+            self.save(update_fields=["deleted_at", "updated_at"])
+
 
 class HistorialTarea(models.Model):
     tablero = models.ForeignKey(
@@ -45,6 +77,10 @@ class HistorialTarea(models.Model):
         indexes = [
             models.Index(fields=["tablero", "fecha"]),
             models.Index(fields=["fingerprint"]),
+            # listado sin tablero: orden -fecha -creado
+            models.Index(fields=["-fecha", "-creado"]),
+            # circuitos frecuentes por tablero (group by circuito)
+            models.Index(fields=["tablero", "circuito"]),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -4,6 +4,7 @@ from django.utils.dateparse import parse_date
 from hashlib import sha256
 import re
 
+from core import cache
 from .models import Tablero, HistorialTarea
 
 
@@ -17,6 +18,60 @@ def _canon_tablero(nombre: str) -> str:
     return s
 
 
+# =========================================================
+# CATÁLOGO CACHEADO (nombre -> id)
+# =========================================================
+def catalogo_tableros() -> dict:
+    """
+    {nombre canónico en minúsculas: (id, nombre)} de los tableros vigentes
+    (Tablero.objects.vigentes()). Vive en el namespace "tableros":
+    cualquier save / delete de Tablero lo invalida, también la baja.
+    """
+
+    def cargar():
+        # orden por -id: con nombres repetidos gana el más viejo
+        return {
+            _canon_tablero(nombre).lower(): (pk, nombre)
+            for pk, nombre in Tablero.objects.vigentes()
+            .order_by("-id")
+            .values_list("id", "nombre")
+        }
+
+    return cache.get_or_set("tableros", ("catalogo",), cargar)
+
+
+def buscar_tablero(nombre: str):
+    """
+    (id, nombre del catálogo) o None. Sin query si el catálogo está en
+    cache: solo para lecturas (filtros); para escribir, resolver_tablero.
+    """
+    clave = _canon_tablero(nombre).lower()
+    if not clave:
+        return None
+    return catalogo_tableros().get(clave)
+
+
+def resolver_tablero(nombre: str):
+    """
+    (id, nombre) o None leído de la DB (índice UPPER(nombre)). Es el que
+    usan las escrituras: con cache locmem el catálogo de otro worker puede
+    no tener todavía un tablero recién creado o renombrado, y la OT
+    quedaría con tablero_ref NULL y marca de agua de no catalogado.
+    Los dados de baja no resuelven, igual que en el catálogo.
+    """
+    clave = _canon_tablero(nombre)
+    if not clave:
+        return None
+    # con nombres repetidos gana el más viejo, igual que en el catálogo
+    return (
+        Tablero.objects.vigentes()
+        .filter(nombre__iexact=clave)
+        .order_by("id")
+        .values_list("id", "nombre")
+        .first()
+    )
+
+
 def _resolve_tablero(nombre_tablero: str, zona_ot: str):
     """
     - Si existe Tablero por nombre (case-insensitive): usarlo tal cual.
@@ -28,10 +83,12 @@ def _resolve_tablero(nombre_tablero: str, zona_ot: str):
 
     t = (
         Tablero.objects.filter(nombre__iexact=nombre)
-        .only("id", "nombre", "zona")
+        .only("id", "nombre", "zona", "deleted_at")
         .first()
     )
     if t:
+        # una OT nueva sobre un tablero dado de baja lo vuelve al catálogo
+        t.restaurar()
         return t
 
     z = (zona_ot or "").strip() or "Sin zona"
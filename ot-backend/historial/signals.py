@@ -0,0 +1,8 @@
+from core.cache import invalidar_al_cambiar
+
+from .models import HistorialTarea, Tablero
+
+# El nombre / zona del tablero aparece en el historial y en las filas de
+# luminarias; cualquier alta o baja de tableros invalida los tres.
+invalidar_al_cambiar(Tablero, "tableros", "historial", "luminarias")
+invalidar_al_cambiar(HistorialTarea, "historial", "stats")
@@ -0,0 +1,160 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core import cache as ot_cache
+from historial.models import HistorialTarea, Tablero
+from orders.models import OrdenTrabajo
+
+User = get_user_model()
+
+
+class ReadCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        ot_cache.reset_estadisticas()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        HistorialTarea.objects.create(
+            tablero=self.tablero, fecha=date(2026, 3, 5), circuito="FD1"
+        )
+        self.client.force_authenticate(self.tech)
+
+    def test_second_read_is_a_hit_and_skips_the_query(self):
+        self.client.get("/api/tableros/")
+
+        # perfil (permiso) + token de versión; el listado sale del cache
+        with self.assertNumQueries(2):
+            res = self.client.get("/api/tableros/")
+
+        self.assertEqual(res.data, [{"id": self.tablero.id, "nombre": "TI 1400", "zona": "Zona 1"}])
+        stats = ot_cache.estadisticas()["tableros"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_in_place_edit_invalidates_through_signal(self):
+        self.client.get("/api/tableros/autocomplete/?q=TI")
+        self.client.get("/api/tableros/")
+
+        # mismo count / max(id): solo la generación cambia
+        self.tablero.zona = "Zona 9"
+        self.tablero.save()
+
+        res = self.client.get("/api/tableros/autocomplete/?q=TI")
+        self.assertEqual(res.data, [{"nombre": "TI 1400", "zona": "Zona 9"}])
+        res = self.client.get("/api/tableros/")
+        self.assertEqual(res.data[0]["zona"], "Zona 9")
+        self.assertEqual(ot_cache.estadisticas()["tableros"]["hits"], 0)
+
+    def test_edit_from_another_worker_is_seen_through_the_data_token(self):
+        self.client.get("/api/tableros/autocomplete/?q=TI")
+        self.client.get("/api/tableros/circuitos/?tablero=TI%201400")
+
+        # sin señal: así ve este proceso un cambio hecho en otro worker (locmem)
+        Tablero.objects.filter(pk=self.tablero.pk).update(
+            zona="Zona 9", updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        HistorialTarea.objects.bulk_create(
+            [HistorialTarea(tablero=self.tablero, fecha=date(2026, 3, 6), circuito="FD2")]
+        )
+
+        res = self.client.get("/api/tableros/autocomplete/?q=TI")
+        self.assertEqual(res.data, [{"nombre": "TI 1400", "zona": "Zona 9"}])
+        res = self.client.get("/api/tableros/circuitos/?tablero=TI%201400")
+        self.assertEqual(len(res.data["items"]), 2)
+
+    def test_namespaces_are_independent(self):
+        self.client.get("/api/tableros/circuitos/?tablero=TI%201400")
+        gen_tableros = ot_cache.generacion("tableros")
+
+        HistorialTarea.objects.create(
+            tablero=self.tablero, fecha=date(2026, 3, 6), circuito="FD2"
+        )
+
+        self.assertEqual(ot_cache.generacion("tableros"), gen_tableros)
+        res = self.client.get("/api/tableros/circuitos/?tablero=TI%201400")
+        self.assertEqual(len(res.data["items"]), 2)
+
+    def test_new_ot_invalidates_luminarias(self):
+        url = "/api/luminarias/historial/"
+        self.assertEqual(self.client.get(url).data, [])
+
+        gen = ot_cache.generacion("luminarias")
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-05", tablero="TI 1400", codigos_luminarias=["PC4026"]
+        )
+
+        self.assertGreater(ot_cache.generacion("luminarias"), gen)
+        self.assertEqual(self.client.get(url).data[0]["codigo"], "PC4026")
+
+    def test_new_ot_with_many_items_invalidates_once(self):
+        items = [{"codigo_luminaria": f"PC{4000 + i}", "km_luminaria": i} for i in range(50)]
+        payload = {
+            "fecha": "2026-03-15",
+            "tablero": "TI 1400",
+            "zona": "Zona 1",
+            "alcance": "LUMINARIA",
+            "resultado": "COMPLETO",
+            "luminaria_estado": "OPERATIVA",
+            "luminarias_por_tablero": [
+                {
+                    "tablero": "TI 1400",
+                    "zona": "Zona 1",
+                    "circuito": "C1",
+                    "ramal": "PILAR",
+                    "resultado": "COMPLETO",
+                    "luminaria_estado": "OPERATIVA",
+                    "items": items,
+                }
+            ],
+        }
+        ot_cache.reset_estadisticas()
+
+        res = self.client.post("/api/ordenes/", payload, format="json")
+        self.assertEqual(res.status_code, 201)
+
+        # OT + grupo + 50 items: una invalidación por namespace, no una por save()
+        stats = ot_cache.estadisticas()
+        self.assertEqual(stats["luminarias"]["invalidaciones"], 1)
+        self.assertEqual(stats["stats"]["invalidaciones"], 1)
+
+    def test_key_builder_separates_filters(self):
+        a = self.client.get("/api/historial/?tablero=TI%201400")
+        b = self.client.get("/api/historial/?tablero=OTRO")
+
+        self.assertEqual(a.data["count"], 1)
+        self.assertEqual(b.data["count"], 0)
+        self.assertEqual(ot_cache.estadisticas()["historial"]["misses"], 2)
+
+    def test_get_or_set(self):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            return {"total": 3}
+
+        self.assertEqual(ot_cache.get_or_set("stats", ("x",), fn), {"total": 3})
+        self.assertEqual(ot_cache.get_or_set("stats", ("x",), fn), {"total": 3})
+        self.assertEqual(len(calls), 1)
+
+        ot_cache.invalidar("stats")
+        ot_cache.get_or_set("stats", ("x",), fn)
+        self.assertEqual(len(calls), 2)
+
+    def test_in_place_edit_changes_the_etag(self):
+        etag = self.client.get("/api/tableros/")["ETag"]
+
+        self.tablero.zona = "Zona 9"
+        self.tablero.save()
+
+        res = self.client.get("/api/tableros/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data[0]["zona"], "Zona 9")
@@ -0,0 +1,174 @@
+import gzip
+import unittest
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core import middleware
+from historial.models import HistorialTarea, Tablero
+from orders.models import CambioFeed, OrdenTrabajo
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        HistorialTarea.objects.create(
+            tablero=self.tablero, fecha=date(2026, 3, 5), tarea_realizada="Cambio"
+        )
+        self.ot = OrdenTrabajo.objects.create(
+            fecha="2026-03-05",
+            tablero="TI 1400",
+            codigos_luminarias=["PC4026"],
+        )
+
+        self.client.force_authenticate(self.tech)
+
+    def get(self, url, **extra):
+        return self.client.get(url, **extra)
+
+    def test_second_request_with_etag_gets_304_without_running_view(self):
+        for url in ("/api/tableros/", "/api/historial/", "/api/luminarias/historial/"):
+            with self.subTest(url=url):
+                first = self.get(url)
+                self.assertEqual(first.status_code, status.HTTP_200_OK)
+                etag = first["ETag"]
+                self.assertIn("no-cache", first["Cache-Control"])
+                self.assertIn("private", first["Cache-Control"])
+
+                second = self.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(second.content, b"")
+                self.assertEqual(second["ETag"], etag)
+
+    def test_304_only_costs_the_version_query(self):
+        etag = self.get("/api/tableros/")["ETag"]
+
+        # perfil del usuario (permiso) + token de versión
+        with self.assertNumQueries(2):
+            res = self.get("/api/tableros/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_rows_change_the_etag(self):
+        etag = self.get("/api/tableros/")["ETag"]
+        Tablero.objects.create(nombre="TC20", zona="Zona 2")
+
+        res = self.get("/api/tableros/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(len(res.data), 2)
+
+    def test_deleted_rows_change_the_etag(self):
+        url = "/api/luminarias/historial/"
+        etag = self.get(url)["ETag"]
+        OrdenTrabajo.objects.all().delete()
+
+        res = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+    def test_in_place_edit_from_another_worker_changes_the_etag(self):
+        url = "/api/luminarias/historial/"
+        etag = self.get(url)["ETag"]
+
+        # otro worker: sin señales ni generación acá, solo lo que deja su
+        # transacción (la OT editada + la fila del feed)
+        OrdenTrabajo.objects.filter(pk=self.ot.pk).update(codigos_luminarias=["PC9999"])
+        CambioFeed.objects.create(clave=f"l:{self.ot.pk}")
+
+        res = self.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["codigo"] for r in res.data], ["PC9999"])
+
+    def test_version_tokens_do_not_count_rows(self):
+        for url in ("/api/tableros/", "/api/historial/", "/api/luminarias/historial/"):
+            etag = self.get(url)["ETag"]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertFalse(
+                [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]], url
+            )
+
+    def test_filters_are_part_of_the_etag(self):
+        a = self.get("/api/historial/?tablero=TI%201400")["ETag"]
+        b = self.get("/api/historial/?tablero=TC20")["ETag"]
+        c = self.get("/api/historial/?page=1&tablero=TI%201400")["ETag"]
+
+        self.assertNotEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_unauthenticated_request_never_gets_304(self):
+        etag = self.get("/api/tableros/")["ETag"]
+        self.client.force_authenticate(None)
+
+        res = self.get("/api/tableros/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(OT_COMPRESION_MIN_BYTES=200)
+class CompressionMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        Tablero.objects.bulk_create(
+            Tablero(nombre=f"TI {i}", zona=f"Zona {i % 3}") for i in range(100)
+        )
+        self.client.force_authenticate(self.tech)
+
+    def test_large_json_is_gzipped_and_etag_still_matches(self):
+        res = self.client.get("/api/tableros/", HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertTrue(res["ETag"].startswith("W/"))
+        self.assertEqual(len(gzip.decompress(res.content).decode().split("TI ")), 101)
+
+        again = self.client.get(
+            "/api/tableros/",
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_no_accept_encoding_means_identity(self):
+        res = self.client.get("/api/tableros/")
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+    @override_settings(OT_COMPRESION_MIN_BYTES=10_000_000)
+    def test_small_bodies_are_not_compressed(self):
+        res = self.client.get("/api/tableros/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+    def test_accept_encoding_parsing(self):
+        self.assertTrue(middleware._acepta_br("gzip, deflate, br"))
+        self.assertTrue(middleware._acepta_br("br;q=0.5"))
+        self.assertFalse(middleware._acepta_br("br;q=0, gzip"))
+        self.assertFalse(middleware._acepta_br("gzip, brx"))
+
+    @unittest.skipUnless(middleware.brotli, "brotli no instalado")
+    def test_brotli_preferred_when_accepted(self):
+        res = self.client.get("/api/tableros/", HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertIn(b"TI 99", middleware.brotli.decompress(res.content))
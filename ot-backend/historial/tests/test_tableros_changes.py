@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core import changes
+from historial.models import Tablero
+from historial.services import registrar_historial_desde_ot, resolver_tablero
+from orders.models import OrdenTrabajo
+
+User = get_user_model()
+
+
+class ChangeTokenTests(SimpleTestCase):
+    def test_roundtrip(self):
+        momento = timezone.now()
+        self.assertEqual(changes.leer_token(changes.emitir_token(momento)), momento)
+
+    @override_settings(OT_CHANGES_OVERLAP_S=5)
+    def test_cut_includes_overlap(self):
+        momento = timezone.now()
+        corte = changes.desde(changes.emitir_token(momento))
+        self.assertEqual(corte, momento - timedelta(seconds=5))
+
+    def test_empty_token_means_full_snapshot(self):
+        self.assertIsNone(changes.desde(""))
+        self.assertIsNone(changes.desde(None))
+
+    def test_garbage_is_rejected(self):
+        for token in ("%%%", "bm8tZXMtZmVjaGE", "MjAyNi0wMy0wNVQxMDowMDowMA"):
+            with self.subTest(token=token), self.assertRaises(changes.TokenInvalido):
+                changes.desde(token)
+
+
+@override_settings(OT_CHANGES_OVERLAP_S=0)
+class TablerosChangesApiTests(APITestCase):
+    url = "/api/tableros/changes/"
+
+    def setUp(self):
+        cache.clear()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        self.a = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        self.b = Tablero.objects.create(nombre="TI 1500", zona="Zona 1")
+        self.client.force_authenticate(self.tech)
+
+    def test_without_token_returns_full_catalog(self):
+        self.b.dar_de_baja()
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.data["full"])
+        self.assertEqual(
+            res.data["changes"], [{"id": self.a.id, "nombre": "TI 1400", "zona": "Zona 1"}]
+        )
+        self.assertEqual(res.data["deleted"], [])
+        self.assertTrue(res.data["token"])
+
+    def test_delta_returns_only_changes(self):
+        token = self.client.get(self.url).data["token"]
+
+        self.a.zona = "Zona 9"
+        self.a.save()
+        self.b.dar_de_baja()
+        c = Tablero.objects.create(nombre="TI 1600", zona="Zona 2")
+
+        res = self.client.get(self.url, {"since": token})
+
+        self.assertFalse(res.data["full"])
+        self.assertEqual(
+            res.data["changes"],
+            [
+                {"id": self.a.id, "nombre": "TI 1400", "zona": "Zona 9"},
+                {"id": c.id, "nombre": "TI 1600", "zona": "Zona 2"},
+            ],
+        )
+        self.assertEqual(res.data["deleted"], [self.b.id])
+
+        # sin cambios nuevos la siguiente vuelta viene vacía
+        res = self.client.get(self.url, {"since": res.data["token"]})
+        self.assertEqual((res.data["changes"], res.data["deleted"]), ([], []))
+
+    def test_delta_is_a_single_query(self):
+        token = self.client.get(self.url).data["token"]
+
+        # perfil (permiso) + cambios
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"since": token})
+
+    def test_invalid_token_is_400(self):
+        res = self.client.get(self.url, {"since": "no-es-token"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_soft_deleted_tableros_leave_the_catalog(self):
+        self.b.dar_de_baja()
+
+        nombres = [t["nombre"] for t in self.client.get("/api/tableros/").data]
+        self.assertEqual(nombres, ["TI 1400"])
+        res = self.client.get("/api/tableros/autocomplete/", {"q": "TI"})
+        self.assertEqual([t["nombre"] for t in res.data], ["TI 1400"])
+        res = self.client.get("/api/tableros/exists/", {"nombre": "TI 1500"})
+        self.assertFalse(res.data["exists"])
+
+    def test_new_ot_restores_a_soft_deleted_tablero(self):
+        self.b.dar_de_baja()
+        token = self.client.get(self.url).data["token"]
+
+        registrar_historial_desde_ot({"tablero": "ti 1500", "fecha": "2026-03-05"})
+
+        self.b.refresh_from_db()
+        self.assertIsNone(self.b.deleted_at)
+        res = self.client.get(self.url, {"since": token})
+        self.assertEqual([t["id"] for t in res.data["changes"]], [self.b.id])
+
+    def test_admin_deletes_through_the_api_as_a_soft_delete(self):
+        token = self.client.get(self.url).data["token"]
+        url = f"/api/tableros/{self.b.id}/"
+
+        self.assertEqual(self.client.delete(url).status_code, 403)
+
+        admin = User.objects.create_user(username="1000", password="Admin12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+        self.client.force_authenticate(admin)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+
+        self.b.refresh_from_db()
+        self.assertIsNotNone(self.b.deleted_at)
+        res = self.client.get(self.url, {"since": token})
+        self.assertEqual(res.data["deleted"], [self.b.id])
+
+    def test_soft_deleted_tablero_does_not_resolve_on_writes(self):
+        self.b.dar_de_baja()
+        self.assertIsNone(resolver_tablero("TI 1500"))
+
+        # una OT editada hacia ese nombre no queda apuntando a la baja
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400")
+        ot.tablero = "TI 1500"
+        ot.save()
+        ot.refresh_from_db()
+        self.assertIsNone(ot.tablero_ref_id)
+
+        # una OT nueva lo restaura y queda con la referencia
+        nueva = OrdenTrabajo.objects.create(fecha="2026-03-06", tablero="ti 1500")
+        nueva.refresh_from_db()
+        self.assertEqual(nueva.tablero_ref_id, self.b.id)
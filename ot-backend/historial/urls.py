@@ -1,15 +1,23 @@
 from django.urls import path
 from .views import (
     TablerosListView,
+    TablerosChangesView,
     TableroAutocompleteView,
     HistorialView,
     CircuitosFrecuentesView,
     TableroExistsView,
+    TableroDetailView,
 )
 
 urlpatterns = [
     # catálogo completo (si lo necesitás)
     path("tableros/", TablerosListView.as_view(), name="tableros_list"),
+    # sync incremental del catálogo (?since=<token>)
+    path(
+        "tableros/changes/",
+        TablerosChangesView.as_view(),
+        name="tableros_changes",
+    ),
     # autocomplete liviano
     path(
         "tableros/autocomplete/",
@@ -25,4 +33,6 @@ urlpatterns = [
         name="tableros_circuitos",
     ),
     path("tableros/exists/", TableroExistsView.as_view(), name="tablero_exists"),
+    # baja lógica (admin)
+    path("tableros/<int:pk>/", TableroDetailView.as_view(), name="tablero_detail"),
 ]
@@ -1,16 +1,73 @@
 from datetime import date
 
 from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
-from accounts.permissions import IsAdminOrTechnicianRole
+from accounts.permissions import IsAdminOrTechnicianRole, IsAdminRole
+from core import changes
+from core.cache import cacheada, generacion
+from core.conditional import condicional, filtros, version_de, version_token
+from orders.models import CambioFeed
 from .models import Tablero, HistorialTarea
 from .serializers import TableroSerializer
 
 
+# La generación del cache cubre las ediciones in-place, pero solo en el
+# proceso que escribió (locmem): para los demás workers el token sale de
+# la DB. Tableros: MAX(updated_at) por índice; toda alta, renombre y baja
+# (lógica) pasa por save().
+def _version_tableros(request):
+    u = (
+        Tablero.objects.order_by("-updated_at")
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+    return f"{u.timestamp() if u else 0}/g{generacion('tableros')}"
+
+
+def _version_historial(request):
+    # ediciones y bajas dejan fila en CambioFeed; el nombre del tablero sale
+    # en cada fila: un renombre también cuenta
+    token = version_token(HistorialTarea.objects.all(), CambioFeed.objects.all())
+    tableros = version_de(request, _version_tableros)
+    return f"{token}/{tableros}/g{generacion('historial')}"
+
+
+# ==========================================================
+# Claves de cache (core/cache.py)
+# ==========================================================
+def _clave_tableros(request):
+    return (version_de(request, _version_tableros),)
+
+
+def _clave_historial(request):
+    return (version_de(request, _version_historial), filtros(request))
+
+
+def _clave_autocomplete(request):
+    q = " ".join((request.query_params.get("q") or "").split()).lower()
+    return (
+        "autocomplete",
+        version_de(request, _version_tableros),
+        q,
+        request.query_params.get("limit") or "",
+    )
+
+
+def _clave_circuitos(request):
+    tablero = " ".join((request.query_params.get("tablero") or "").split()).lower()
+    return (
+        "circuitos",
+        version_de(request, _version_historial),
+        tablero,
+        request.query_params.get("limit") or "",
+    )
+
+
 class TablerosListView(APIView):
     """
     Catálogo completo de tableros.
@@ -19,11 +76,66 @@ class TablerosListView(APIView):
 
     permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
 
+    @condicional("tableros", _version_tableros)
+    @cacheada("tableros", _clave_tableros)
     def get(self, request):
-        qs = Tablero.objects.all().order_by("zona", "nombre")
+        qs = Tablero.objects.vigentes().order_by("zona", "nombre")
         return Response(TableroSerializer(qs, many=True).data)
 
 
+class TablerosChangesView(APIView):
+    """
+    Sync incremental del catálogo (el cliente lo guarda offline).
+    GET /api/tableros/changes/             -> snapshot completo
+    GET /api/tableros/changes/?since=<tok> -> altas / ediciones y bajas
+
+    {"token", "full", "changes": [{id, nombre, zona}], "deleted": [id]}
+    El cliente guarda `token` y lo manda en la próxima llamada.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+
+    def get(self, request):
+        try:
+            corte = changes.desde(request.query_params.get("since"))
+        except changes.TokenInvalido:
+            return Response(
+                {"detail": "Token 'since' inválido."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # el token se toma antes de leer: lo que se guarde durante la
+        # lectura vuelve a salir en la próxima
+        token = changes.emitir_token()
+
+        if corte is None:
+            rows = Tablero.objects.vigentes().order_by("zona", "nombre")
+            return Response(
+                {
+                    "token": token,
+                    "full": True,
+                    "changes": list(rows.values("id", "nombre", "zona")),
+                    "deleted": [],
+                }
+            )
+
+        rows = (
+            Tablero.objects.filter(updated_at__gte=corte)
+            .order_by("updated_at", "id")
+            .values("id", "nombre", "zona", "deleted_at")
+        )
+        altas, bajas = [], []
+        for r in rows:
+            if r.pop("deleted_at") is None:
+                altas.append(r)
+            else:
+                bajas.append(r["id"])
+
+        return Response(
+            {"token": token, "full": False, "changes": altas, "deleted": bajas}
+        )
+
+
 class TableroAutocompleteView(APIView):
     """
     Autocomplete liviano.
@@ -32,12 +144,13 @@ class TableroAutocompleteView(APIView):
 
     permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
 
+    @cacheada("tableros", _clave_autocomplete)
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
         limit = int(request.query_params.get("limit") or 20)
         limit = max(5, min(limit, 30))
 
-        qs = Tablero.objects.all()
+        qs = Tablero.objects.vigentes()
 
         if q:
             q = " ".join(q.split())
@@ -57,6 +170,25 @@ def _parse_date(s: str | None) -> date | None:
         return None
 
 
+def fila_historial(h) -> dict:
+    """
+    Una fila del historial (con el tablero en select_related). También la
+    usa el feed de sync (orders/feed.py).
+    """
+    return {
+        "id": h.id,
+        "fecha": h.fecha.isoformat(),
+        "creado": h.creado.isoformat() if h.creado else None,
+        "tablero": h.tablero.nombre if h.tablero_id else "",
+        "zona": h.zona or (h.tablero.zona if h.tablero_id else ""),
+        "circuito": h.circuito or "",
+        "tarea_realizada": h.tarea_realizada or "",
+        "tarea_pedida": h.tarea_pedida or "",
+        "tarea_pendiente": h.tarea_pendiente or "",
+        "descripcion": h.descripcion or "",
+    }
+
+
 class HistorialView(APIView):
     """
     Historial paginado + filtros, con tablero opcional.
@@ -65,6 +197,8 @@ class HistorialView(APIView):
 
     permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
 
+    @condicional("historial", _version_historial)
+    @cacheada("historial", _clave_historial)
     def get(self, request):
         tablero = (request.query_params.get("tablero") or "").strip()
         circuito = (request.query_params.get("circuito") or "").strip()
@@ -125,22 +259,7 @@ class HistorialView(APIView):
             else:
                 header_tablero = tablero
 
-        results = []
-        for h in rows:
-            results.append(
-                {
-                    "id": h.id,
-                    "fecha": h.fecha.isoformat(),
-                    "creado": h.creado.isoformat() if h.creado else None,
-                    "tablero": h.tablero.nombre if h.tablero_id else "",
-                    "zona": h.zona or (h.tablero.zona if h.tablero_id else ""),
-                    "circuito": h.circuito or "",
-                    "tarea_realizada": h.tarea_realizada or "",
-                    "tarea_pedida": h.tarea_pedida or "",
-                    "tarea_pendiente": h.tarea_pendiente or "",
-                    "descripcion": h.descripcion or "",
-                }
-            )
+        results = [fila_historial(h) for h in rows]
 
         return Response(
             {
@@ -162,6 +281,7 @@ class CircuitosFrecuentesView(APIView):
 
     permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
 
+    @cacheada("historial", _clave_circuitos)
     def get(self, request):
         tablero = (request.query_params.get("tablero") or "").strip()
         limit = int(request.query_params.get("limit") or 8)
@@ -203,7 +323,12 @@ class TableroExistsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        t = Tablero.objects.filter(nombre__iexact=raw).only("nombre", "zona").first()
+        t = (
+            Tablero.objects.vigentes()
+            .filter(nombre__iexact=raw)
+            .only("nombre", "zona")
+            .first()
+        )
         if t:
             return Response(
                 {"exists": True, "nombre": t.nombre, "zona": t.zona},
@@ -214,3 +339,18 @@ class TableroExistsView(APIView):
             {"exists": False, "nombre": raw},
             status=status.HTTP_200_OK,
         )
+
+
+class TableroDetailView(APIView):
+    """
+    DELETE /api/tableros/<id>/ -> baja lógica (solo admin)
+    El tablero sale del catálogo y de /api/tableros/changes/ como "deleted";
+    el historial y las OTs no se tocan.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def delete(self, request, pk):
+        tablero = get_object_or_404(Tablero.objects.vigentes(), pk=pk)
+        tablero.dar_de_baja()
+        return Response(status=status.HTTP_204_NO_CONTENT)
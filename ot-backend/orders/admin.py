@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Material, MaterialAlias
+
+
+class MaterialAliasInline(admin.TabularInline):
+    model = MaterialAlias
+    extra = 1
+
+
+@admin.register(Material)
+class MaterialAdmin(admin.ModelAdmin):
+    inlines = [MaterialAliasInline]
+    list_display = ("id", "nombre", "unidad")
+    search_fields = ("nombre", "alias__alias")
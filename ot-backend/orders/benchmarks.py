@@ -0,0 +1,398 @@
+# orders/benchmarks.py
+"""
+Harness de benchmark para generar_pdf.
+
+Genera OTs sintéticas (TABLERO, LUMINARIA vieja, LUMINARIA por grupos,
+fotos en resolución de celular y firma), mide tiempos de render y
+devuelve un dict JSON-serializable que se puede diffear entre commits.
+
+Uso:
+    python manage.py benchmark_pdf --out bench.json
+    python manage.py benchmark_pdf --casos luminaria_grupos_500 --iteraciones 3
+    python manage.py benchmark_pdf --escalado
+"""
+import gc
+import os
+import sys
+import time
+import platform
+import resource
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from io import BytesIO
+
+import reportlab
+
+from .pdf import generar_pdf
+
+# Resoluciones típicas de cámara de celular (ancho, alto)
+PHONE_RESOLUTIONS = [
+    (4032, 3024),
+    (3024, 4032),
+    (4000, 3000),
+    (1920, 1080),
+]
+
+THEMES = {
+    "print": True,
+    "dark": False,
+}
+
+# nombre -> parámetros del fixture
+CASOS = {
+    "tablero": {"alcance": "TABLERO", "fotos": 0},
+    "tablero_fotos_2": {"alcance": "TABLERO", "fotos": 2},
+    "tablero_fotos_4": {"alcance": "TABLERO", "fotos": 4},
+    "luminaria_legacy": {"alcance": "LUMINARIA", "fotos": 0, "codigos": 8},
+    "luminaria_grupos_10": {"alcance": "LUMINARIA", "grupos": 2, "items": 10},
+    "luminaria_grupos_100": {"alcance": "LUMINARIA", "grupos": 5, "items": 100},
+    "luminaria_grupos_500": {"alcance": "LUMINARIA", "grupos": 10, "items": 500},
+    "luminaria_grupo_unico_1000": {"alcance": "LUMINARIA", "grupos": 1, "items": 1000},
+}
+
+
+# ==========================================================
+# Fixtures sintéticos
+# ==========================================================
+def _foto_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    """
+    JPEG con ruido + gradiente para que el peso se parezca al de una foto
+    real de ~1-2MB (un color plano comprime demasiado bien y falsea el
+    benchmark; ruido puro pesa bastante más que una foto).
+    """
+    from PIL import Image as PILImage, ImageFilter
+
+    noise = PILImage.effect_noise((width, height), 24 + seed % 8).filter(
+        ImageFilter.GaussianBlur(0.8)
+    )
+    grad = PILImage.linear_gradient("L").resize((width, height))
+    r = PILImage.blend(noise, grad, 0.5)
+    g = grad.rotate(90 * (seed % 4), expand=False)
+    im = PILImage.merge("RGB", (r, g, noise))
+
+    out = BytesIO()
+    im.save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+def _firma_png() -> bytes:
+    from PIL import Image as PILImage, ImageDraw
+
+    im = PILImage.new("RGBA", (900, 300), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(im)
+    pts = [(40 + i * 16, 150 + int(60 * ((-1) ** i) * (i % 5) / 5)) for i in range(52)]
+    draw.line(pts, fill=(10, 10, 40, 255), width=6)
+
+    out = BytesIO()
+    im.save(out, format="PNG")
+    return out.getvalue()
+
+
+def escribir_evidencias(media_root: str, max_fotos: int = 4) -> dict:
+    """
+    Escribe fotos y firma de prueba bajo MEDIA_ROOT, igual que
+    _procesar_ot_payload. Devuelve los paths relativos.
+    """
+    rel_folder = os.path.join("bench", "evid")
+    abs_folder = os.path.join(media_root, rel_folder)
+    os.makedirs(abs_folder, exist_ok=True)
+
+    fotos_rel = []
+    for idx in range(max_fotos):
+        w, h = PHONE_RESOLUTIONS[idx % len(PHONE_RESOLUTIONS)]
+        name = f"foto_{idx + 1}.jpg"
+        path = os.path.join(abs_folder, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_foto_jpeg(w, h, seed=idx))
+        fotos_rel.append(f"bench/evid/{name}")
+
+    firma_path = os.path.join(abs_folder, "firma_tecnico.png")
+    if not os.path.exists(firma_path):
+        with open(firma_path, "wb") as f:
+            f.write(_firma_png())
+
+    return {
+        "fotos": fotos_rel,
+        "firma": "bench/evid/firma_tecnico.png",
+    }
+
+
+def _codigo(n: int) -> str:
+    prefijos = ("PC", "CC", "GP", "TC")
+    return f"{prefijos[n % len(prefijos)]}{4000 + n:04d}"
+
+
+def build_pdf_data(caso, evidencias: dict, print_mode: bool) -> dict:
+    """
+    Arma un pdf_data con la misma forma que el que produce
+    _procesar_ot_payload. `caso` es un nombre de CASOS o un dict de
+    parámetros con la misma forma.
+    """
+    params = caso if isinstance(caso, dict) else CASOS[caso]
+    alcance = params["alcance"]
+    n_fotos = params.get("fotos", 0)
+
+    data = {
+        "id_ot": "OT-000001",
+        "fecha": "2026-03-15",
+        "ubicacion": "Colectora Panamericana km 32",
+        "tablero": "TI 1400",
+        "zona": "Gral. Paz – Acceso Norte / La Noria",
+        "circuito": "C1",
+        "vehiculo": "AF 123 XY",
+        "km_inicial": "10500.00",
+        "km_final": "10580.50",
+        "km_total": "80.50",
+        "tecnicos": [
+            {"legajo": "8174", "nombre": "Tecnico Campo"},
+            {"legajo": "8201", "nombre": "Ayudante Campo"},
+        ],
+        "materiales": [
+            {"material": "Terminales", "cantidad": "12", "unidad": "u"},
+            {"material": "Cinta aisladora", "cantidad": "2", "unidad": "u"},
+            {"material": "Cable 2x2,5", "cantidad": "10", "unidad": "m"},
+        ],
+        "tarea_pedida": "Revisión general del tablero y circuitos de iluminación.",
+        "tarea_realizada": (
+            "Se verificaron bornes, se reemplazaron contactores y se "
+            "midió aislación en todos los circuitos. " * 3
+        ),
+        "tarea_pendiente": "Reemplazo de fotocontrol.",
+        "observaciones": "Sin novedades.",
+        "firma_tecnico": "Tecnico Campo",
+        "firma_supervisor": "",
+        "alcance": alcance,
+        "resultado": "COMPLETO",
+        "estado_tablero": "OPERATIVO" if alcance == "TABLERO" else "",
+        "luminaria_estado": "OPERATIVA" if alcance == "LUMINARIA" else "",
+        "print_mode": print_mode,
+        "tablero_catalogado": True,
+        "firma_tecnico_path": evidencias.get("firma", ""),
+        "fotos_paths": list(evidencias.get("fotos", []))[:n_fotos],
+        "luminarias_por_tablero": [],
+    }
+
+    if alcance == "LUMINARIA" and params.get("grupos"):
+        n_grupos = params["grupos"]
+        n_items = params["items"]
+        grupos = []
+        for g in range(n_grupos):
+            # reparto de items lo más parejo posible
+            cant = n_items // n_grupos + (1 if g < n_items % n_grupos else 0)
+            base = sum(
+                n_items // n_grupos + (1 if k < n_items % n_grupos else 0)
+                for k in range(g)
+            )
+            grupos.append(
+                {
+                    "tablero": f"TI {1400 - g * 100}",
+                    "zona": data["zona"],
+                    "circuito": f"C{g + 1}",
+                    "ramal": "ACC_NORTE",
+                    "resultado": "COMPLETO",
+                    "luminaria_estado": "OPERATIVA",
+                    "tarea_pedida": "Relevamiento",
+                    "tarea_realizada": "Recambio de equipos",
+                    "tarea_pendiente": "",
+                    "observaciones": "",
+                    "items": [
+                        {
+                            "orden": i,
+                            "codigo_luminaria": _codigo(base + i),
+                            "km_luminaria": round(10 + (base + i) * 0.05, 2),
+                        }
+                        for i in range(cant)
+                    ],
+                }
+            )
+        data["luminarias_por_tablero"] = grupos
+
+    elif alcance == "LUMINARIA":
+        cods = [_codigo(i) for i in range(params.get("codigos", 1))]
+        data["ramal"] = "ACC_NORTE"
+        data["km_luminaria"] = "12.50"
+        data["codigos_luminarias"] = cods
+        data["codigo_luminaria"] = cods[0]
+        data["luminaria_equipos"] = ", ".join(cods)
+
+    return data
+
+
+# ==========================================================
+# Medición
+# ==========================================================
+def _percentil(valores, p: float) -> float:
+    if not valores:
+        return 0.0
+    s = sorted(valores)
+    k = (len(s) - 1) * p
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def _rss_max_kb() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reporta bytes, Linux KB
+    return int(rss / 1024) if sys.platform == "darwin" else int(rss)
+
+
+def medir_caso(pdf_data: dict, iteraciones: int = 5, warmup: int = 1) -> dict:
+    """
+    Corre generar_pdf `iteraciones` veces (más warmup) y devuelve
+    p50/p95 en ms, tamaño de salida y picos de memoria.
+    """
+    for _ in range(warmup):
+        generar_pdf(pdf_data)
+
+    tiempos = []
+    size = 0
+    for _ in range(max(1, iteraciones)):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = generar_pdf(pdf_data)
+        tiempos.append((time.perf_counter() - t0) * 1000.0)
+        size = len(out)
+        del out
+
+    # El pico de memoria se mide en una corrida aparte: tracemalloc
+    # distorsiona los tiempos.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        generar_pdf(pdf_data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iteraciones": len(tiempos),
+        "p50_ms": round(_percentil(tiempos, 0.50), 2),
+        "p95_ms": round(_percentil(tiempos, 0.95), 2),
+        "min_ms": round(min(tiempos), 2),
+        "max_ms": round(max(tiempos), 2),
+        "size_bytes": size,
+        "peak_alloc_kb": int(peak / 1024),
+        "rss_max_kb": _rss_max_kb(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return ""
+
+
+def run_benchmark(
+    media_root: str,
+    casos=None,
+    themes=None,
+    iteraciones: int = 5,
+    warmup: int = 1,
+    on_result=None,
+) -> dict:
+    """
+    Ejecuta la matriz casos x temas. Un caso que falla (ej: LayoutError
+    por flowable demasiado grande) queda registrado con 'error' en vez de
+    cortar la corrida.
+    """
+    casos = list(casos or CASOS.keys())
+    themes = list(themes or THEMES.keys())
+
+    max_fotos = max((CASOS[c].get("fotos", 0) for c in casos), default=0)
+    evidencias = escribir_evidencias(media_root, max_fotos=max(max_fotos, 0))
+
+    results = []
+    for caso in casos:
+        for theme in themes:
+            pdf_data = build_pdf_data(caso, evidencias, print_mode=THEMES[theme])
+            row = {"caso": caso, "theme": theme}
+            try:
+                row.update(medir_caso(pdf_data, iteraciones=iteraciones, warmup=warmup))
+            except Exception as e:
+                row["error"] = f"{type(e).__name__}: {e}"[:300]
+
+            results.append(row)
+            if on_result:
+                on_result(row)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "plataforma": platform.platform(),
+            "iteraciones": iteraciones,
+        },
+        "results": results,
+    }
+
+
+def medir_escalado(items=(50, 100, 200, 400, 800, 1600), iteraciones: int = 3):
+    """
+    Render de un único grupo LUMINARIA con N items, para ver cómo crece
+    el tiempo con la cantidad. Con el modo LongTable `ms_por_item` tiene
+    que mantenerse aproximadamente constante (crecimiento lineal).
+    """
+    out = []
+    for n in items:
+        pdf_data = build_pdf_data(
+            {"alcance": "LUMINARIA", "grupos": 1, "items": n},
+            {},
+            print_mode=True,
+        )
+
+        tiempos = []
+        for _ in range(max(1, iteraciones)):
+            t0 = time.perf_counter()
+            generar_pdf(pdf_data)
+            tiempos.append((time.perf_counter() - t0) * 1000.0)
+
+        p50 = _percentil(tiempos, 0.50)
+        out.append(
+            {
+                "items": n,
+                "p50_ms": round(p50, 2),
+                "ms_por_item": round(p50 / n, 4),
+            }
+        )
+    return out
+
+
+def comparar(actual: dict, baseline: dict) -> list:
+    """
+    Delta p50/p95/size por (caso, theme) contra un JSON previo.
+    """
+    prev = {(r["caso"], r["theme"]): r for r in baseline.get("results", [])}
+    out = []
+    for r in actual.get("results", []):
+        b = prev.get((r["caso"], r["theme"]))
+        if not b or "error" in r or "error" in b:
+            continue
+
+        def pct(key):
+            if not b.get(key):
+                return None
+            return round((r[key] - b[key]) * 100.0 / b[key], 1)
+
+        out.append(
+            {
+                "caso": r["caso"],
+                "theme": r["theme"],
+                "p50_pct": pct("p50_ms"),
+                "p95_pct": pct("p95_ms"),
+                "size_pct": pct("size_bytes"),
+            }
+        )
+    return out
@@ -0,0 +1,283 @@
+# orders/benchmarks_api.py
+"""
+Harness de benchmark para la API de lectura de OTs.
+
+Crea N OTs sintéticas dentro de una transacción que se deshace al final
+(no deja nada en la DB) y mide:
+- listado: serializer vs encoder de filas, en ms por cada 1000 filas.
+- json: encode/decode (stdlib vs orjson) de los payloads reales de
+  /api/ordenes/, /api/luminarias/historial/ y un body de sync.
+
+Uso:
+    python manage.py benchmark_api
+    python manage.py benchmark_api --filas 5000 --iteraciones 5 --out api.json
+    python manage.py benchmark_api --json --filas 5000
+"""
+import base64
+import gc
+import io
+import os
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import UserProfile
+from core.renderers import ORJSONParser, ORJSONRenderer
+
+from .benchmarks import _git_commit, _percentil
+from .models import OrdenTrabajo
+from .serializers import OrdenTrabajoRowEncoder, OrdenTrabajoSerializer
+from .views import OrdenListCreateView
+from .views_luminarias import LuminariasHistorialView
+
+
+class _Rollback(Exception):
+    pass
+
+
+def crear_ots_sinteticas(n: int, user=None):
+    """
+    OTs con forma realista (decimales, listas JSON, textos). Pensado para
+    correr dentro de una transacción que después se deshace.
+    """
+    base = date(2025, 1, 1)
+    objs = []
+    for i in range(n):
+        objs.append(
+            OrdenTrabajo(
+                fecha=base + timedelta(days=i % 365),
+                ubicacion=f"Ubicación {i}",
+                tablero=f"TC{i % 200:03d}",
+                zona=f"Zona {i % 7}",
+                circuito=f"C{i % 12}",
+                vehiculo=f"AB{i % 50:03d}CD",
+                km_inicial=Decimal("1000.50") + i,
+                km_final=Decimal("1040.25") + i,
+                km_total=Decimal("39.75"),
+                ramal="",
+                km_luminaria=Decimal(f"{i % 100}.{i % 100:02d}"),
+                codigo_luminaria=f"PC{4000 + i % 900}",
+                codigos_luminarias=[f"PC{4000 + i % 900}", f"CC{4100 + i % 50}"],
+                tecnicos=[{"legajo": "1001", "nombre": "Técnico Uno"}],
+                materiales=[{"material": "Fotocélula", "cant": 1, "unidad": "u"}],
+                tarea_pedida="Revisión de circuito",
+                tarea_realizada="Cambio de fotocélula y prueba",
+                luminaria_equipos="PC4026, CC4105",
+                firma_tecnico="Técnico Uno",
+                fotos=[f"evidencias/2025/01/foto_{i}.jpg"],
+                alcance="LUMINARIA",
+                created_by=user,
+            )
+        )
+    OrdenTrabajo.objects.bulk_create(objs, batch_size=500)
+
+
+def _listado_serializer(qs):
+    # el camino anterior del listado: instancia + serializer + perfil por fila
+    data = []
+    for ot in qs.select_related("created_by"):
+        row = OrdenTrabajoSerializer(ot).data
+        row["creado_por_legajo"] = ot.created_by.username if ot.created_by_id else ""
+        profile = getattr(ot.created_by, "profile", None) if ot.created_by_id else None
+        row["creado_por_nombre"] = profile.nombre_completo if profile else ""
+        data.append(row)
+    return data
+
+
+def _listado_encoder(qs):
+    encoder = OrdenTrabajoRowEncoder()
+    return encoder.encode_many(encoder.values(qs))
+
+
+CAMINOS = {
+    "serializer": _listado_serializer,
+    "encoder": _listado_encoder,
+}
+
+
+def _tiempos(fn, iteraciones: int, warmup: int) -> list:
+    for _ in range(warmup):
+        fn()
+
+    tiempos = []
+    for _ in range(iteraciones):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return tiempos
+
+
+def _medir(fn, qs, filas: int, iteraciones: int, warmup: int) -> dict:
+    tiempos = _tiempos(lambda: fn(qs), iteraciones, warmup)
+    p50 = _percentil(tiempos, 0.50)
+    return {
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(_percentil(tiempos, 0.95), 2),
+        "ms_por_1k": round(p50 * 1000 / filas, 2) if filas else 0.0,
+    }
+
+
+def _bench_user(role=UserProfile.Role.TECHNICIAN):
+    user = get_user_model().objects.create_user(username="bench_api", password="x")
+    UserProfile.objects.update_or_create(
+        user=user, defaults={"nombre_completo": "Bench API", "role": role}
+    )
+    return user
+
+
+def medir_listado_ots(filas: int = 1000, iteraciones: int = 5, warmup: int = 1) -> dict:
+    """
+    Listado completo (query + serialización) por cada camino.
+    Devuelve {"meta": ..., "results": [{camino, p50_ms, p95_ms, ms_por_1k}]}.
+    """
+    results = []
+    try:
+        with transaction.atomic():
+            user = _bench_user()
+            crear_ots_sinteticas(filas, user=user)
+            qs = OrdenTrabajo.objects.filter(created_by=user).order_by("-id")
+
+            for nombre, fn in CAMINOS.items():
+                row = {"camino": nombre, "filas": filas}
+                row.update(_medir(fn, qs, filas, iteraciones, warmup))
+                results.append(row)
+
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    base = results[0]["p50_ms"] if results else 0
+    for row in results:
+        row["speedup"] = round(base / row["p50_ms"], 2) if row["p50_ms"] else 0.0
+
+    return {
+        "meta": {"commit": _git_commit(), "filas": filas, "iteraciones": iteraciones},
+        "results": results,
+    }
+
+
+# ==========================================================
+# JSON: stdlib vs orjson sobre payloads reales
+# ==========================================================
+BACKENDS_JSON = {
+    "stdlib": (JSONRenderer, JSONParser),
+    "orjson": (ORJSONRenderer, ORJSONParser),
+}
+
+
+def _payload_vista(view_cls, path: str, user):
+    request = APIRequestFactory().get(path)
+    force_authenticate(request, user=user)
+    return view_cls.as_view()(request).data
+
+
+def _payload_sync(filas: int, fotos_kb: int = 150) -> dict:
+    """
+    Body de /api/ordenes/sync/: OTs completas con fotos en base64
+    (el caso de varios MB que manda el celular al recuperar señal).
+    """
+    foto = base64.b64encode(os.urandom(fotos_kb * 1024)).decode()
+    rows = []
+    for i in range(filas):
+        rows.append(
+            {
+                "fecha": "2025-01-01",
+                "tablero": f"TC{i % 200:03d}",
+                "zona": f"Zona {i % 7}",
+                "alcance": "LUMINARIA",
+                "km_inicial": "1000.50",
+                "km_final": "1040.25",
+                "tecnicos": [{"legajo": "1001", "nombre": "Técnico Uno"}],
+                "materiales": [{"material": "Fotocélula", "cant": 1}],
+                "tarea_realizada": "Cambio de fotocélula y prueba",
+                "luminarias_por_tablero": [
+                    {
+                        "tablero": f"TC{i % 200:03d}",
+                        "items": [
+                            {"codigo_luminaria": f"PC{4000 + j}", "km_luminaria": "12.30"}
+                            for j in range(10)
+                        ],
+                    }
+                ],
+                "fotos_b64": [foto] * 2,
+            }
+        )
+    return {"ordenes": rows}
+
+
+def recolectar_payloads(filas: int = 1000, sync_filas: int = 20) -> dict:
+    """
+    Arma los payloads dentro de una transacción que se deshace.
+    """
+    payloads = {}
+    try:
+        with transaction.atomic():
+            user = _bench_user(role=UserProfile.Role.ADMIN)
+            crear_ots_sinteticas(filas, user=user)
+            payloads["ordenes_listado"] = _payload_vista(
+                OrdenListCreateView, "/api/ordenes/", user
+            )
+            payloads["luminarias_historial"] = _payload_vista(
+                LuminariasHistorialView, "/api/luminarias/historial/", user
+            )
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    payloads["sync_body"] = _payload_sync(sync_filas)
+    return payloads
+
+
+def _pico_kb(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return int(peak / 1024)
+
+
+def medir_json(payloads: dict, iteraciones: int = 5, warmup: int = 1) -> dict:
+    """
+    Por payload y backend: p50 de encode/decode, pico de memoria y tamaño.
+    """
+    results = []
+    for nombre, data in payloads.items():
+        for backend, (renderer_cls, parser_cls) in BACKENDS_JSON.items():
+            renderer, parser = renderer_cls(), parser_cls()
+            body = renderer.render(data)
+
+            def encode():
+                renderer.render(data)
+
+            def decode():
+                parser.parse(io.BytesIO(body))
+
+            enc = _tiempos(encode, iteraciones, warmup)
+            dec = _tiempos(decode, iteraciones, warmup)
+            results.append(
+                {
+                    "payload": nombre,
+                    "backend": backend,
+                    "size_bytes": len(body),
+                    "encode_p50_ms": round(_percentil(enc, 0.50), 2),
+                    "decode_p50_ms": round(_percentil(dec, 0.50), 2),
+                    "encode_peak_kb": _pico_kb(encode),
+                    "decode_peak_kb": _pico_kb(decode),
+                }
+            )
+
+    return {
+        "meta": {"commit": _git_commit(), "iteraciones": iteraciones},
+        "results": results,
+    }
@@ -0,0 +1,157 @@
+# orders/consumo.py
+"""
+Consumo de materiales: catálogo con alias y rollup mensual.
+
+- Catálogo: {nombre o alias normalizado: (id, nombre, unidad)}, en el
+  namespace "materiales" del cache (lo invalida cualquier cambio de
+  Material / MaterialAlias).
+- Rollup: ConsumoMaterialMensual por (mes, material, unidad, zona,
+  ramal). orders/detalle.py llama a aplicar(nuevas, viejas) cuando
+  reescribe las filas de una OT: se suma la diferencia, sin releer el
+  resto de las OTs.
+- Un cambio de catálogo (alias nuevo) no se aplica hacia atrás solo:
+  para eso está manage.py reconstruir_consumo_materiales.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core import cache
+
+from .materiales import normalizar_nombre
+from .models import ConsumoMaterialMensual, Material, MaterialAlias, OrdenTrabajoMaterial
+
+
+# ==========================================================
+# Catálogo
+# ==========================================================
+def catalogo_materiales() -> dict:
+    def cargar():
+        out = {}
+        for pk, nombre, unidad in Material.objects.values_list("id", "nombre", "unidad"):
+            out[normalizar_nombre(nombre)] = (pk, nombre, unidad)
+        # un alias nunca pisa el nombre de otro material
+        for alias, pk, nombre, unidad in MaterialAlias.objects.values_list(
+            "alias", "material_id", "material__nombre", "material__unidad"
+        ):
+            out.setdefault(alias, (pk, nombre, unidad))
+        return out
+
+    return cache.get_or_set("materiales", ("catalogo",), cargar)
+
+
+def buscar_material(nombre: str):
+    """(id, nombre, unidad) del catálogo o None."""
+    clave = normalizar_nombre(nombre)
+    if not clave:
+        return None
+    return catalogo_materiales().get(clave)
+
+
+# ==========================================================
+# Rollup por deltas
+# ==========================================================
+def _mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _clave(fila) -> tuple:
+    if fila.material_ref_id:
+        clave = f"m:{fila.material_ref_id}"
+    else:
+        clave = f"t:{normalizar_nombre(fila.material)}"[:210]
+    return (_mes(fila.fecha), clave, fila.unidad_norm, fila.zona, fila.ramal)
+
+
+def _contribuciones(filas) -> dict:
+    out = {}
+    for f in filas:
+        catalogado = buscar_material(f.material) if f.material_ref_id else None
+        c = out.setdefault(
+            _clave(f),
+            {
+                # catalogado: el nombre del catálogo, no la variante de la OT
+                "nombre": catalogado[1] if catalogado else f.material,
+                "material_id": f.material_ref_id,
+                "cantidad": Decimal(0),
+                "lineas": 0,
+                "sin_cantidad": 0,
+                "ots": set(),
+            },
+        )
+        c["lineas"] += 1
+        if f.cantidad_num is None:
+            c["sin_cantidad"] += 1
+        else:
+            c["cantidad"] += f.cantidad_num
+        c["ots"].add(f.ot_id)
+    return out
+
+
+def _sumar(key, d):
+    mes, clave, unidad, zona, ramal = key
+    filtro = dict(mes=mes, clave=clave, unidad=unidad, zona=zona, ramal=ramal)
+    cambios = dict(
+        cantidad=F("cantidad") + d["cantidad"],
+        lineas=F("lineas") + d["lineas"],
+        sin_cantidad=F("sin_cantidad") + d["sin_cantidad"],
+        ots=F("ots") + d["ots"],
+    )
+    if ConsumoMaterialMensual.objects.filter(**filtro).update(**cambios):
+        return
+    try:
+        with transaction.atomic():
+            ConsumoMaterialMensual.objects.create(
+                **filtro,
+                material_id=d["material_id"],
+                nombre=d["nombre"],
+                cantidad=d["cantidad"],
+                lineas=d["lineas"],
+                sin_cantidad=d["sin_cantidad"],
+                ots=d["ots"],
+            )
+    except IntegrityError:
+        # otro request creó la fila entre el UPDATE y el INSERT
+        ConsumoMaterialMensual.objects.filter(**filtro).update(**cambios)
+
+
+def aplicar(nuevas, viejas=()):
+    """
+    Suma al rollup las filas `nuevas` y resta las `viejas` (las que se
+    reemplazaron). Un UPDATE por clave afectada.
+    """
+    delta = {}
+    for signo, filas in ((1, nuevas), (-1, viejas)):
+        for key, c in _contribuciones(filas).items():
+            d = delta.setdefault(
+                key,
+                {
+                    "nombre": c["nombre"],
+                    "material_id": c["material_id"],
+                    "cantidad": Decimal(0),
+                    "lineas": 0,
+                    "sin_cantidad": 0,
+                    "ots": 0,
+                },
+            )
+            d["cantidad"] += signo * c["cantidad"]
+            d["lineas"] += signo * c["lineas"]
+            d["sin_cantidad"] += signo * c["sin_cantidad"]
+            d["ots"] += signo * len(c["ots"])
+
+    restas = False
+    # orden fijo: dos requests concurrentes bloquean filas en el mismo orden
+    for key, d in sorted(delta.items()):
+        if not (d["cantidad"] or d["lineas"] or d["sin_cantidad"] or d["ots"]):
+            continue
+        restas = restas or d["lineas"] < 0
+        _sumar(key, d)
+
+    if restas:
+        ConsumoMaterialMensual.objects.filter(lineas__lte=0).delete()
+
+
+def sumar_ots(ot_ids):
+    """Suma al rollup las filas actuales de esas OTs (reconstrucción)."""
+    aplicar(list(OrdenTrabajoMaterial.objects.filter(ot_id__in=ot_ids)))
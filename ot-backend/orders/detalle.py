@@ -0,0 +1,126 @@
+# orders/detalle.py
+"""
+Técnicos y materiales de cada OT en tablas (OrdenTrabajoTecnico /
+OrdenTrabajoMaterial), espejo de los JSON OrdenTrabajo.tecnicos y
+.materiales, que siguen siendo lo que lee el PDF y el frontend.
+
+- Escritura: la señal post_save de OrdenTrabajo (orders/signals.py)
+  llama a sincronizar() con la OT: borra sus filas y las vuelve a crear
+  con un bulk_create por tabla, pasa la diferencia de materiales al
+  rollup mensual (orders/consumo.py) y marca los días de los técnicos
+  que la OT deja (orders/productividad.py).
+- Backfill: manage.py backfill_detalle_ot, por tandas de OTs.
+"""
+from django.utils.dateparse import parse_date
+
+from . import consumo, productividad
+from .materiales import normalizar_unidad, parse_cantidad
+from .models import OrdenTrabajoMaterial, OrdenTrabajoTecnico
+
+# campos de la OT que cambian las filas: un save(update_fields=...) sin
+# ninguno de estos no las toca
+CAMPOS = {"tecnicos", "materiales", "fecha", "zona", "ramal"}
+
+
+def _fecha(ot):
+    # recién creada con OrdenTrabajo.objects.create(fecha="2026-03-05")
+    # la instancia todavía tiene el string
+    return ot.fecha if hasattr(ot.fecha, "year") else parse_date(str(ot.fecha))
+
+
+def filas_tecnicos(ot) -> list:
+    out = []
+    fecha = _fecha(ot)
+    for idx, t in enumerate(ot.tecnicos or []):
+        # OTs viejas pueden traer otra cosa que dicts
+        if not isinstance(t, dict):
+            continue
+        legajo = str(t.get("legajo") or "").strip()[:30]
+        nombre = str(t.get("nombre") or "").strip()[:150]
+        if not (legajo or nombre):
+            continue
+        out.append(
+            OrdenTrabajoTecnico(
+                ot_id=ot.id, orden=idx, legajo=legajo, nombre=nombre, fecha=fecha
+            )
+        )
+    return out
+
+
+def filas_materiales(ot) -> list:
+    out = []
+    fecha = _fecha(ot)
+    for idx, m in enumerate(ot.materiales or []):
+        if not isinstance(m, dict):
+            continue
+        material = str(m.get("material") or "").strip()[:200]
+        if not material:
+            continue
+        cantidad = str(m.get("cantidad") or m.get("cant") or "").strip()[:50]
+        unidad = str(m.get("unidad") or "").strip()[:30]
+
+        valor, unidad_cantidad = parse_cantidad(cantidad)
+        catalogo = consumo.buscar_material(material)
+        # la unidad explícita manda; después la de "10 m"; después la del catálogo
+        unidad_norm = (
+            normalizar_unidad(unidad)
+            or unidad_cantidad
+            or (catalogo[2] if catalogo else "")
+        )
+
+        out.append(
+            OrdenTrabajoMaterial(
+                ot_id=ot.id,
+                orden=idx,
+                material=material,
+                material_ref_id=catalogo[0] if catalogo else None,
+                cantidad=cantidad,
+                unidad=unidad,
+                cantidad_num=valor,
+                unidad_norm=unidad_norm,
+                fecha=fecha,
+                zona=(ot.zona or "").strip()[:200],
+                ramal=ot.ramal or "",
+            )
+        )
+    return out
+
+
+def sincronizar(ots, reemplazar: bool = True, rollup: bool = True) -> tuple:
+    """
+    Reescribe las filas de `ots` desde sus JSON: un DELETE y un
+    bulk_create por tabla para toda la lista. Con reemplazar=False (OT
+    recién creada) no borra. Con rollup=False no toca los rollups
+    (ConsumoMaterialMensual / ProductividadTecnicoDiaria), para las
+    reconstrucciones. Devuelve (técnicos, materiales) creados.
+    """
+    ots = list(ots)
+    if not ots:
+        return 0, 0
+
+    viejos = []
+    pares_viejos = []
+    if reemplazar:
+        ids = [ot.id for ot in ots]
+        if rollup:
+            viejos = list(OrdenTrabajoMaterial.objects.filter(ot_id__in=ids))
+            pares_viejos = list(
+                OrdenTrabajoTecnico.objects.filter(ot_id__in=ids).values_list(
+                    "legajo", "fecha"
+                )
+            )
+        OrdenTrabajoTecnico.objects.filter(ot_id__in=ids).delete()
+        OrdenTrabajoMaterial.objects.filter(ot_id__in=ids).delete()
+
+    tecnicos = [f for ot in ots for f in filas_tecnicos(ot)]
+    materiales = [f for ot in ots for f in filas_materiales(ot)]
+    OrdenTrabajoTecnico.objects.bulk_create(tecnicos, batch_size=1000)
+    OrdenTrabajoMaterial.objects.bulk_create(materiales, batch_size=1000)
+
+    if rollup:
+        consumo.aplicar(materiales, viejos)
+        # días que la OT deja (otro legajo / otra fecha): se recalculan
+        # con las filas nuevas ya escritas
+        if pares_viejos:
+            productividad.marcar(pares=pares_viejos)
+    return len(tecnicos), len(materiales)
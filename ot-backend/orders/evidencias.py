@@ -0,0 +1,346 @@
+# orders/evidencias.py
+"""
+Evidencias binarias (fotos / firma): se escriben a disco por chunks, con
+tope de tamaño, sin pasar por base64 ni cargar el archivo en memoria.
+"""
+import hashlib
+import os
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Evidencia, EvidenciaUpload
+
+CHUNK_SIZE = 64 * 1024
+
+
+class EvidenciaMuyGrande(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "La evidencia supera el tamaño máximo."
+    default_code = "evidencia_muy_grande"
+
+
+class OffsetInvalido(APIException):
+    """
+    El cliente mandó un chunk desde un offset que no es el confirmado.
+    La respuesta incluye el offset correcto para reanudar.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_code = "offset_invalido"
+
+    def __init__(self, offset: int, detail="Offset inválido."):
+        super().__init__(detail)
+        # offset como número (APIException convierte todo a string)
+        self.detail = {"detail": self.detail, "offset": offset}
+
+
+def max_bytes() -> int:
+    return int(getattr(settings, "OT_EVIDENCIA_MAX_BYTES", 10 * 1024 * 1024))
+
+
+# ==========================================================
+# Formato (por magic bytes, no por el Content-Type del cliente)
+# ==========================================================
+def detectar_formato(head: bytes):
+    """
+    Devuelve (content_type, extensión) o None si no es una imagen aceptada.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic", "heic"
+    return None
+
+
+def carpeta_evidencias(when=None) -> str:
+    when = when or timezone.now()
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        "evidencias",
+        when.strftime("%Y"),
+        when.strftime("%m"),
+    )
+
+
+def _limpiar(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+# ==========================================================
+# Alta
+# ==========================================================
+def registrar_evidencia(tmp_path: str, size: int, sha256: str, head: bytes, tipo, user=None):
+    """
+    Mueve un archivo temporal ya completo a su lugar final y crea la
+    Evidencia. El temporal tiene que estar en la misma carpeta de destino
+    (os.replace atómico).
+    """
+    formato = detectar_formato(head)
+    if not formato:
+        _limpiar(tmp_path)
+        raise ValidationError({"archivo": "Formato no soportado (JPEG, PNG, WebP o HEIC)."})
+
+    content_type, ext = formato
+    evid_id = uuid.uuid4()
+    final = os.path.join(os.path.dirname(tmp_path), f"{evid_id}.{ext}")
+
+    # mkstemp crea con 0600; tiene que quedar legible para quien sirve /media
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, final)
+
+    rel = os.path.relpath(final, settings.MEDIA_ROOT).replace("\\", "/")
+    return Evidencia.objects.create(
+        id=evid_id,
+        tipo=tipo or Evidencia.Tipo.FOTO,
+        archivo=rel,
+        content_type=content_type,
+        size_bytes=size,
+        sha256=sha256,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+
+
+def guardar_evidencia(chunks, tipo=Evidencia.Tipo.FOTO, user=None):
+    """
+    `chunks` es un iterable de bytes (UploadedFile.chunks() o el body
+    crudo leído por partes). Corta apenas se pasa del máximo.
+    """
+    limite = max_bytes()
+    folder = carpeta_evidencias()
+    os.makedirs(folder, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".up_")
+    sha = hashlib.sha256()
+    size = 0
+    head = b""
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > limite:
+                    raise EvidenciaMuyGrande(
+                        f"La evidencia supera el máximo de {limite} bytes."
+                    )
+                if len(head) < 16:
+                    head += chunk[: 16 - len(head)]
+                sha.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        _limpiar(tmp)
+        raise
+
+    if not size:
+        _limpiar(tmp)
+        raise ValidationError({"archivo": "El archivo está vacío."})
+
+    return registrar_evidencia(tmp, size, sha.hexdigest(), head, tipo, user=user)
+
+
+# ==========================================================
+# Uso desde el payload de la OT
+# ==========================================================
+def resolver_evidencias(fotos_ids, firma_id, user=None):
+    """
+    Valida que las evidencias existan, sean del usuario y no estén usadas
+    por otra OT. Devuelve (fotos, firma) respetando el orden de fotos_ids.
+    """
+    ids = [i for i in list(fotos_ids or []) + [firma_id] if i]
+    if not ids:
+        return [], None
+
+    qs = Evidencia.objects.filter(id__in=ids, ot__isnull=True)
+    if user is not None and getattr(user, "is_authenticated", False):
+        qs = qs.filter(created_by=user)
+    encontradas = {e.id: e for e in qs}
+
+    faltantes = [str(i) for i in ids if i not in encontradas]
+    if faltantes:
+        raise ValidationError(
+            {"evidencias": f"Evidencias inexistentes o ya usadas: {', '.join(faltantes)}"}
+        )
+
+    fotos = [encontradas[i] for i in fotos_ids or []]
+    firma = encontradas[firma_id] if firma_id else None
+    return fotos, firma
+
+
+def asignar_evidencias(evidencias, ot):
+    """
+    Toma las evidencias para `ot`. resolver_evidencias las validó antes,
+    pero dos syncs que citan la misma foto pasan los dos esa validación:
+    el UPDATE lleva `ot IS NULL` y, si tomó menos filas de las pedidas,
+    otra OT llegó primero. Correr dentro del atomic que crea la OT, así el
+    ValidationError la deshace.
+    """
+    ids = [e.id for e in evidencias if e is not None]
+    if not ids:
+        return
+
+    tomadas = Evidencia.objects.filter(id__in=ids, ot__isnull=True).update(ot=ot)
+    if tomadas != len(ids):
+        raise ValidationError(
+            {"evidencias": "Alguna evidencia ya fue usada por otra OT."}
+        )
+
+
+# ==========================================================
+# Subida reanudable: init -> PUT por offset -> finalizar
+# ==========================================================
+def _abs(rel: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, rel)
+
+
+def iniciar_upload(tipo, size_total: int, sha256: str = "", user=None):
+    limite = max_bytes()
+    if size_total <= 0:
+        raise ValidationError({"size": "El tamaño tiene que ser mayor a 0."})
+    if size_total > limite:
+        raise EvidenciaMuyGrande(f"La evidencia supera el máximo de {limite} bytes.")
+
+    folder = carpeta_evidencias()
+    os.makedirs(folder, exist_ok=True)
+
+    upload_id = uuid.uuid4()
+    # el parcial va en la carpeta final: al terminar es un os.replace
+    parcial = os.path.join(folder, f".part_{upload_id}")
+    open(parcial, "wb").close()
+
+    return EvidenciaUpload.objects.create(
+        id=upload_id,
+        tipo=tipo or Evidencia.Tipo.FOTO,
+        size_total=size_total,
+        sha256=(sha256 or "").strip().lower(),
+        parcial=os.path.relpath(parcial, settings.MEDIA_ROOT).replace("\\", "/"),
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+
+
+def escribir_chunk(upload_id, offset: int, chunks, user=None):
+    """
+    Agrega bytes desde `offset`, que tiene que coincidir con lo ya
+    confirmado. Si la conexión se corta a mitad del body, se confirma lo
+    que llegó: el cliente reanuda desde ahí.
+    """
+    error = None
+    with transaction.atomic():
+        upload = obtener_upload(upload_id, user, lock=True)
+
+        if offset != upload.recibido:
+            raise OffsetInvalido(upload.recibido)
+
+        recibido = upload.recibido
+        try:
+            with open(_abs(upload.parcial), "r+b") as f:
+                # un PUT anterior pudo escribir de más sin confirmar
+                f.truncate(recibido)
+                f.seek(recibido)
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if recibido + len(chunk) > upload.size_total:
+                        raise ValidationError(
+                            {"detail": "El chunk excede el tamaño declarado."}
+                        )
+                    f.write(chunk)
+                    recibido += len(chunk)
+        except Exception as e:
+            # se guarda el avance igual; el error sale fuera del atomic
+            error = e
+
+        if recibido != upload.recibido:
+            upload.recibido = recibido
+            upload.save(update_fields=["recibido", "actualizado"])
+
+    if error is not None:
+        raise error
+    return upload
+
+
+def finalizar_upload(upload_id, sha256: str = "", user=None):
+    with transaction.atomic():
+        upload = obtener_upload(upload_id, user, lock=True)
+
+        if upload.recibido != upload.size_total:
+            raise OffsetInvalido(upload.recibido, detail="La subida está incompleta.")
+
+        esperado = (sha256 or upload.sha256 or "").strip().lower()
+        if not esperado:
+            raise ValidationError({"sha256": "Falta el sha256 del archivo."})
+
+        path = _abs(upload.parcial)
+        sha = hashlib.sha256()
+        head = b""
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                if len(head) < 16:
+                    head += chunk[: 16 - len(head)]
+                sha.update(chunk)
+
+        # los errores se levantan fuera del atomic para no deshacer el
+        # reinicio / descarte
+        error = None
+        if sha.hexdigest() != esperado:
+            # bytes corruptos en algún lado: se arranca de cero
+            with open(path, "wb"):
+                pass
+            upload.recibido = 0
+            upload.save(update_fields=["recibido", "actualizado"])
+            error = ValidationError(
+                {"sha256": "El sha256 no coincide; la subida se reinició.", "offset": 0}
+            )
+        elif not detectar_formato(head):
+            descartar_upload(upload)
+            error = ValidationError(
+                {"archivo": "Formato no soportado (JPEG, PNG, WebP o HEIC)."}
+            )
+        else:
+            evidencia = registrar_evidencia(
+                path,
+                upload.size_total,
+                esperado,
+                head,
+                upload.tipo,
+                user=upload.created_by,
+            )
+            upload.delete()
+
+    if error is not None:
+        raise error
+    return evidencia
+
+
+def descartar_upload(upload):
+    try:
+        os.unlink(_abs(upload.parcial))
+    except OSError:
+        pass
+    upload.delete()
+
+
+def obtener_upload(upload_id, user=None, lock=False):
+    qs = EvidenciaUpload.objects.all()
+    if lock:
+        qs = qs.select_for_update()
+    if user is not None and getattr(user, "is_authenticated", False):
+        qs = qs.filter(created_by=user)
+    try:
+        return qs.get(pk=upload_id)
+    except EvidenciaUpload.DoesNotExist:
+        raise Http404("Subida inexistente o vencida.")
@@ -0,0 +1,217 @@
+# orders/feed.py
+"""
+Feed de cambios para sync offline del historial y de las luminarias.
+
+- Outbox: cada alta / edición / baja de HistorialTarea o de una OT (con
+  sus grupos e items) deja una fila en CambioFeed con la clave del objeto
+  ("h:<id>" o "l:<ot_id>"). Las señales están en orders/signals.py.
+- El id de CambioFeed es la secuencia: el token del cliente es el último
+  id que recibió.
+- En el pull se leen los objetos tocados tal como están ahora, en
+  columnas ({"col": [valores]}), filtrados por zona / ramal.
+
+Dentro de agrupar() las claves se juntan y se escriben juntas al salir:
+el alta de una OT toca OT + grupos + items + historial y deja una fila
+por clave, no una por save().
+
+podar() (manage.py podar_feed) borra las filas que ningún token
+necesita: las de una clave que tiene otra fila más nueva. El outbox
+queda del tamaño de las claves, no de las ediciones.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Max, Prefetch, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from core import changes
+from historial.models import HistorialTarea
+from historial.views import fila_historial
+
+from .models import CambioFeed, OrdenTrabajo
+from .views_luminarias import filas_luminaria, grupos_con_items
+
+_lote = ContextVar("ot_feed_lote", default=None)
+
+COLUMNAS_HISTORIAL = (
+    "clave",
+    "id",
+    "fecha",
+    "creado",
+    "tablero",
+    "zona",
+    "circuito",
+    "tarea_realizada",
+    "tarea_pedida",
+    "tarea_pendiente",
+    "descripcion",
+)
+
+COLUMNAS_LUMINARIAS = (
+    "clave",
+    "id",
+    "ot_id",
+    "id_ot",
+    "fecha",
+    "ramal",
+    "km",
+    "resultado",
+    "luminaria_estado",
+    "ubicacion",
+    "codigo",
+    "tablero",
+    "zona",
+    "circuito",
+)
+
+
+def clave_historial(historial_id) -> str:
+    return f"h:{historial_id}"
+
+
+def clave_luminarias(ot_id) -> str:
+    return f"l:{ot_id}"
+
+
+# ==========================================================
+# Escritura
+# ==========================================================
+def _escribir(claves):
+    CambioFeed.objects.bulk_create([CambioFeed(clave=c) for c in claves])
+
+
+def marcar(*claves):
+    lote = _lote.get()
+    if lote is not None:
+        lote.update(claves)
+    else:
+        _escribir(claves)
+
+
+@contextmanager
+def agrupar():
+    if _lote.get() is not None:
+        # anidado: escribe el de afuera
+        yield
+        return
+
+    lote = set()
+    token = _lote.set(lote)
+    try:
+        yield
+    finally:
+        _lote.reset(token)
+        if lote:
+            _escribir(sorted(lote))
+
+
+def podar() -> int:
+    """
+    Borra las filas de una clave que tiene otra más nueva; devuelve
+    cuántas. Ningún `since` las necesita: si la vieja quedaba después
+    del token, la nueva también, y el pull trae la clave igual (con los
+    datos de ahora). since=0 sigue siendo el snapshot completo. Las del
+    solapamiento no se tocan: una más nueva todavía puede no verse.
+    """
+    corte = timezone.now() - changes.solapamiento()
+    ultimas = CambioFeed.objects.values("clave").annotate(ultima=Max("id"))
+    borradas, _ = (
+        CambioFeed.objects.filter(creado__lte=corte)
+        .exclude(id__in=ultimas.values("ultima"))
+        .delete()
+    )
+    return borradas
+
+
+# ==========================================================
+# Lectura
+# ==========================================================
+def leer_eventos(since: int, limit: int):
+    """
+    ([claves sin repetir, en orden], último id, hay_mas).
+
+    Solo entran filas con más de OT_CHANGES_OVERLAP_S de antigüedad: un
+    id más bajo todavía sin commitear quedaría salteado por el token.
+    """
+    corte = timezone.now() - changes.solapamiento()
+    rows = list(
+        CambioFeed.objects.filter(id__gt=since, creado__lte=corte)
+        .order_by("id")
+        .values_list("id", "clave")[: limit + 1]
+    )
+    hay_mas = len(rows) > limit
+    rows = rows[:limit]
+
+    claves = list(dict.fromkeys(c for _, c in rows))
+    ultimo = rows[-1][0] if rows else since
+    return claves, ultimo, hay_mas
+
+
+def _ids(claves, prefijo: str):
+    out = []
+    for c in claves:
+        tipo, _, pk = c.partition(":")
+        if tipo == prefijo and pk.isdigit():
+            out.append(int(pk))
+    return out
+
+
+def filas_historial(ids, zona: str = ""):
+    qs = HistorialTarea.objects.select_related("tablero").filter(id__in=ids)
+    if zona:
+        # la misma zona que manda fila_historial: la propia o la del tablero
+        qs = qs.annotate(
+            zona_fila=Coalesce(NullIf("zona", Value("")), "tablero__zona")
+        ).filter(zona_fila__iexact=zona)
+
+    out = []
+    for h in qs.order_by("id"):
+        fila = fila_historial(h)
+        fila["clave"] = clave_historial(h.id)
+        out.append(fila)
+    return out
+
+
+def filas_luminarias(ot_ids, zona: str = "", ramal: str = ""):
+    qs = (
+        OrdenTrabajo.objects.filter(id__in=ot_ids, alcance="LUMINARIA")
+        .prefetch_related(Prefetch("luminaria_grupos", queryset=grupos_con_items()))
+        .order_by("id")
+    )
+
+    out = []
+    for ot in qs:
+        clave = clave_luminarias(ot.id)
+        for fila in filas_luminaria(ot, list(ot.luminaria_grupos.all())):
+            if zona and (fila["zona"] or "").lower() != zona.lower():
+                continue
+            if ramal and (fila["ramal"] or "") != ramal:
+                continue
+            fila["clave"] = clave
+            out.append(fila)
+    return out
+
+
+def columnar(filas, columnas) -> dict:
+    return {c: [f.get(c) for f in filas] for c in columnas}
+
+
+def pull(since: int, limit: int, zona: str = "", ramal: str = "") -> dict:
+    """
+    El cliente, por cada clave de `claves`, borra lo que tenga guardado
+    con esa clave y después inserta las filas recibidas: así se aplican
+    altas, ediciones, bajas y filas que salieron de su zona / ramal.
+    """
+    claves, ultimo, hay_mas = leer_eventos(since, limit)
+
+    historial = filas_historial(_ids(claves, "h"), zona) if claves else []
+    luminarias = filas_luminarias(_ids(claves, "l"), zona, ramal) if claves else []
+
+    return {
+        "token": str(ultimo),
+        "more": hay_mas,
+        "claves": claves,
+        "historial": columnar(historial, COLUMNAS_HISTORIAL),
+        "luminarias": columnar(luminarias, COLUMNAS_LUMINARIAS),
+    }
@@ -0,0 +1,81 @@
+# orders/luminarias.py
+"""
+Códigos de luminaria: un solo lugar para las dos reglas que conviven.
+
+- Estricta (carga nueva): PC4026, CC4105... sin separadores.
+  La usan el serializer (items y luminaria_equipos).
+- Tolerante (texto libre legado): acepta "PC 4026", "pc-4026", etc. y lo
+  canoniza a PC4026. La usan el historial, el PDF y el alta en modo viejo.
+"""
+import re
+from functools import lru_cache
+
+# Estricta: 1-4 letras + 3-6 dígitos
+CODE_RE = re.compile(r"\b[A-Z]{1,4}\d{3,6}\b")
+
+# Tolerante: letras y dígitos en grupos separados, así el canónico sale de
+# concatenarlos sin un re.sub por match.
+_LEGACY_RE = re.compile(r"\b([A-Z]{2,4})\s*-?\s*(\d{3,6})\b", re.IGNORECASE)
+
+PARSE_CACHE_SIZE = 4096
+
+
+def es_codigo_valido(codigo: str) -> bool:
+    return bool(CODE_RE.match(codigo or ""))
+
+
+def _dedupe(codes):
+    seen = set()
+    out = []
+    for c in codes:
+        if c in seen:
+            continue
+        seen.add(c)
+        out.append(c)
+    return out
+
+
+def extraer_codigos(text: str):
+    """
+    Regla estricta sobre texto libre (en mayúsculas), sin repetidos.
+    """
+    if not text:
+        return []
+    return _dedupe(CODE_RE.findall(str(text).upper()))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(text: str) -> tuple:
+    # el upper() previo se mantiene: define qué matchea \b con caracteres
+    # no ASCII, igual que el parser original
+    return tuple(
+        _dedupe(
+            (letras + digitos).upper()
+            for letras, digitos in _LEGACY_RE.findall(text.upper())
+        )
+    )
+
+
+def parse_luminaria_codes(text: str):
+    """
+    Regla tolerante: "PC 4026, pc-4027" -> ["PC4026", "PC4027"].
+    Los textos repetidos (mismo luminaria_equipos en muchas OTs) salen
+    del LRU.
+    """
+    if not text:
+        return []
+    return list(_parse_cached(str(text)))
+
+
+def parse_luminaria_codes_many(texts):
+    """
+    Versión batch: una lista de resultados, en el mismo orden.
+    """
+    memo = {}
+    out = []
+    for text in texts:
+        key = str(text) if text else ""
+        if key not in memo:
+            memo[key] = list(_parse_cached(key)) if key else []
+        out.append(list(memo[key]))
+    return out
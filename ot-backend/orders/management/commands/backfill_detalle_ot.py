@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import invalidar
+from orders import detalle
+from orders.models import OrdenTrabajo
+
+
+class Command(BaseCommand):
+    help = (
+        "Reescribe OrdenTrabajoTecnico / OrdenTrabajoMaterial desde los JSON "
+        "tecnicos y materiales de cada OT (por tandas; idempotente)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=500,
+            help="OTs leídas de la DB por tanda",
+        )
+        parser.add_argument(
+            "--desde-id",
+            type=int,
+            default=0,
+            help="Reanudar desde OT id > N (el último id que mostró el progreso)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta las OTs a procesar",
+        )
+
+    def handle(self, *args, **opts):
+        chunk = max(1, opts["chunk"])
+        last = max(0, opts["desde_id"])
+
+        qs = OrdenTrabajo.objects.only(
+            "id", "fecha", "zona", "ramal", "tecnicos", "materiales"
+        )
+        total = qs.filter(id__gt=last).count()
+        self.stdout.write(f"OTs a procesar: {total}")
+
+        if opts["dry_run"] or not total:
+            return
+
+        t0 = time.monotonic()
+        hechas = n_tecnicos = n_materiales = 0
+
+        while True:
+            batch = list(qs.filter(id__gt=last).order_by("id")[:chunk])
+            if not batch:
+                break
+
+            # la tanda entera o nada: cortar a mitad no deja OTs sin filas
+            with transaction.atomic():
+                t, m = detalle.sincronizar(batch)
+
+            last = batch[-1].id
+            hechas += len(batch)
+            n_tecnicos += t
+            n_materiales += m
+
+            elapsed = time.monotonic() - t0
+            rate = hechas / elapsed if elapsed else 0.0
+            eta = (total - hechas) / rate if rate else 0.0
+            self.stdout.write(
+                f"{hechas}/{total} OTs (último id {last}) · {rate:.0f} OT/s · "
+                f"ETA {eta:.0f}s"
+            )
+
+        # con redis / file limpia el cache de todos los workers; con locmem
+        # los cubre el token de datos de las claves (views_detalle._clave)
+        invalidar("stats")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {hechas} OTs, {n_tecnicos} técnicos, "
+                f"{n_materiales} materiales en {time.monotonic() - t0:.1f}s"
+            )
+        )
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.cache import invalidar
+from historial.models import Tablero
+from orders.models import OrdenTrabajo
+from orders.services import backfill_tablero_ref
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa OrdenTrabajo.tablero_ref a partir del texto de tablero "
+        "(por tandas; se puede cortar y volver a correr)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=1000,
+            help="OTs leídas de la DB por tanda",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta las OTs sin tablero_ref",
+        )
+
+    def handle(self, *args, **opts):
+        pendientes = (
+            OrdenTrabajo.objects.filter(tablero_ref__isnull=True)
+            .exclude(tablero="")
+            .count()
+        )
+        self.stdout.write(f"OTs sin tablero_ref: {pendientes}")
+
+        if opts["dry_run"] or not pendientes:
+            return
+
+        t0 = time.monotonic()
+
+        def progreso(revisadas, asignadas, total):
+            elapsed = time.monotonic() - t0
+            rate = revisadas / elapsed if elapsed else 0.0
+            eta = (total - revisadas) / rate if rate else 0.0
+            self.stdout.write(
+                f"{revisadas}/{total} OTs · {asignadas} asignadas · "
+                f"{rate:.0f} OT/s · ETA {eta:.0f}s"
+            )
+
+        revisadas, asignadas = backfill_tablero_ref(
+            OrdenTrabajo, Tablero, chunk=max(1, opts["chunk"]), progreso=progreso
+        )
+
+        # mismos namespaces que invalida el save de una OT
+        invalidar("luminarias", "stats")
+
+        # las que quedan no están en el catálogo (texto libre sin Tablero)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {asignadas}/{revisadas} OTs con tablero_ref "
+                f"en {time.monotonic() - t0:.1f}s, sin catálogo: {revisadas - asignadas}"
+            )
+        )
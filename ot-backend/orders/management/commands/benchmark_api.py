@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from orders.benchmarks_api import medir_json, medir_listado_ots, recolectar_payloads
+
+
+class Command(BaseCommand):
+    help = "Benchmark de la API: listado de OTs (ms por 1k filas) y JSON stdlib vs orjson"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=1000)
+        parser.add_argument("--iteraciones", type=int, default=5)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--out", default="", help="Archivo JSON de salida")
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Mide encode/decode (stdlib vs orjson) en vez del listado",
+        )
+        parser.add_argument(
+            "--sync-filas",
+            type=int,
+            default=20,
+            help="OTs en el body de sync sintético (con 2 fotos c/u)",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["json"]:
+            payloads = recolectar_payloads(
+                filas=opts["filas"], sync_filas=opts["sync_filas"]
+            )
+            result = medir_json(
+                payloads, iteraciones=opts["iteraciones"], warmup=opts["warmup"]
+            )
+            for row in result["results"]:
+                self.stdout.write(
+                    f"{row['payload']:<22} {row['backend']:<7} "
+                    f"size={row['size_bytes'] / 1024:>9.1f}KB "
+                    f"enc={row['encode_p50_ms']:>8.1f}ms dec={row['decode_p50_ms']:>8.1f}ms "
+                    f"peak_enc={row['encode_peak_kb'] / 1024:>6.1f}MB "
+                    f"peak_dec={row['decode_peak_kb'] / 1024:>6.1f}MB"
+                )
+            self._guardar(result, opts["out"])
+            return
+
+        result = medir_listado_ots(
+            filas=opts["filas"],
+            iteraciones=opts["iteraciones"],
+            warmup=opts["warmup"],
+        )
+
+        for row in result["results"]:
+            self.stdout.write(
+                f"{row['camino']:<12} filas={row['filas']:>6} "
+                f"p50={row['p50_ms']:>9.1f}ms p95={row['p95_ms']:>9.1f}ms "
+                f"ms/1k={row['ms_por_1k']:>8.1f} x{row['speedup']}"
+            )
+
+        self._guardar(result, opts["out"])
+
+    def _guardar(self, result, out):
+        if not out:
+            return
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self.stdout.write(self.style.SUCCESS(f"Resultados en {out}"))
@@ -0,0 +1,106 @@
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from orders.benchmarks import (
+    CASOS,
+    THEMES,
+    run_benchmark,
+    comparar,
+    medir_escalado,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark de generar_pdf con OTs sintéticas (p50/p95, memoria, tamaño)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--casos",
+            nargs="*",
+            choices=sorted(CASOS.keys()),
+            help="Casos a correr (default: todos)",
+        )
+        parser.add_argument(
+            "--themes",
+            nargs="*",
+            choices=sorted(THEMES.keys()),
+            help="Temas a correr (default: print y dark)",
+        )
+        parser.add_argument("--iteraciones", type=int, default=5)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--out", default="", help="Archivo JSON de salida")
+        parser.add_argument(
+            "--escalado",
+            action="store_true",
+            help="Solo mide tiempo vs cantidad de luminarias en un grupo",
+        )
+        parser.add_argument(
+            "--baseline",
+            default="",
+            help="JSON de una corrida previa para mostrar deltas",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["escalado"]:
+            rows = medir_escalado(iteraciones=opts["iteraciones"])
+            for row in rows:
+                self.stdout.write(
+                    f"items={row['items']:>5} p50={row['p50_ms']:>9.1f}ms "
+                    f"ms/item={row['ms_por_item']:.4f}"
+                )
+            if opts["out"]:
+                with open(opts["out"], "w", encoding="utf-8") as f:
+                    json.dump({"escalado": rows}, f, indent=2, sort_keys=True)
+                    f.write("\n")
+            return
+
+        baseline = None
+        if opts["baseline"]:
+            try:
+                with open(opts["baseline"], encoding="utf-8") as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer baseline: {e}")
+
+        def on_result(row):
+            if "error" in row:
+                self.stdout.write(
+                    self.style.ERROR(f"{row['caso']:<24} {row['theme']:<6} {row['error']}")
+                )
+                return
+            self.stdout.write(
+                f"{row['caso']:<24} {row['theme']:<6} "
+                f"p50={row['p50_ms']:>9.1f}ms p95={row['p95_ms']:>9.1f}ms "
+                f"size={row['size_bytes'] / 1024:>8.1f}KB "
+                f"peak={row['peak_alloc_kb'] / 1024:>7.1f}MB "
+                f"rss={row['rss_max_kb'] / 1024:>7.1f}MB"
+            )
+
+        # Las evidencias sintéticas van a un MEDIA_ROOT temporal para no
+        # ensuciar el real.
+        with tempfile.TemporaryDirectory(prefix="bench_pdf_") as tmp:
+            with override_settings(MEDIA_ROOT=tmp):
+                result = run_benchmark(
+                    tmp,
+                    casos=opts["casos"],
+                    themes=opts["themes"],
+                    iteraciones=opts["iteraciones"],
+                    warmup=opts["warmup"],
+                    on_result=on_result,
+                )
+
+        if opts["out"]:
+            with open(opts["out"], "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, sort_keys=True, ensure_ascii=False)
+                f.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Resultados en {opts['out']}"))
+
+        if baseline:
+            for d in comparar(result, baseline):
+                self.stdout.write(
+                    f"Δ {d['caso']:<24} {d['theme']:<6} "
+                    f"p50={d['p50_pct']}% p95={d['p95_pct']}% size={d['size_pct']}%"
+                )
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.evidencias import descartar_upload
+from orders.models import EvidenciaUpload
+
+
+class Command(BaseCommand):
+    help = "Borra subidas reanudables abandonadas (fila + archivo parcial)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horas",
+            type=int,
+            default=72,
+            help="Antigüedad mínima desde el último chunk (default: 72)",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        limite = timezone.now() - timedelta(hours=max(1, opts["horas"]))
+        viejas = EvidenciaUpload.objects.filter(actualizado__lt=limite)
+
+        total = 0
+        liberados = 0
+        for upload in viejas.iterator():
+            total += 1
+            liberados += upload.recibido
+            if not opts["dry_run"]:
+                descartar_upload(upload)
+
+        accion = "a borrar" if opts["dry_run"] else "borradas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Subidas {accion}: {total} ({liberados / 1_048_576:.1f} MB)"
+            )
+        )
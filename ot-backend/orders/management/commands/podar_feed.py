@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from orders import feed
+from orders.models import CambioFeed
+
+
+class Command(BaseCommand):
+    help = (
+        "Poda el outbox del feed de sync (CambioFeed): borra las filas de "
+        "una clave que tiene otra más nueva. Ningún token deja de servir"
+    )
+
+    def handle(self, *args, **opts):
+        antes = CambioFeed.objects.count()
+        borradas = feed.podar()
+        self.stdout.write(
+            self.style.SUCCESS(f"Feed podado: {borradas}/{antes} filas borradas")
+        )
@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import invalidar
+from orders import consumo, detalle
+from orders.models import ConsumoMaterialMensual, OrdenTrabajo
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye ConsumoMaterialMensual desde los materiales de las OTs: "
+        "vuelve a leer cantidades y catálogo (alias nuevos) por tandas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=500,
+            help="OTs leídas de la DB por tanda",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta las OTs a procesar",
+        )
+
+    def handle(self, *args, **opts):
+        chunk = max(1, opts["chunk"])
+        qs = OrdenTrabajo.objects.only(
+            "id", "fecha", "zona", "ramal", "tecnicos", "materiales"
+        )
+        total = qs.count()
+        self.stdout.write(f"OTs a procesar: {total}")
+
+        if opts["dry_run"]:
+            return
+
+        # una sola transacción: mientras corre, /api/materiales/consumo/
+        # sigue viendo el rollup anterior y si falla no queda a medio armar
+        t0 = time.monotonic()
+        hechas = 0
+        last = 0
+        with transaction.atomic():
+            borradas, _ = ConsumoMaterialMensual.objects.all().delete()
+            self.stdout.write(f"Rollup vaciado ({borradas} filas)")
+
+            while True:
+                batch = list(qs.filter(id__gt=last).order_by("id")[:chunk])
+                if not batch:
+                    break
+
+                detalle.sincronizar(batch, rollup=False)
+                consumo.sumar_ots([ot.id for ot in batch])
+
+                last = batch[-1].id
+                hechas += len(batch)
+
+                elapsed = time.monotonic() - t0
+                rate = hechas / elapsed if elapsed else 0.0
+                eta = (total - hechas) / rate if rate else 0.0
+                self.stdout.write(
+                    f"{hechas}/{total} OTs · {rate:.0f} OT/s · ETA {eta:.0f}s"
+                )
+
+        invalidar("stats")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {ConsumoMaterialMensual.objects.count()} filas de rollup "
+                f"en {time.monotonic() - t0:.1f}s"
+            )
+        )
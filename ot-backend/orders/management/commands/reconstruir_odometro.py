@@ -0,0 +1,115 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+
+from core.cache import invalidar
+from orders import odometro
+from orders.models import KmVehiculoMensual, LecturaOdometro, OrdenTrabajo
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye LecturaOdometro y KmVehiculoMensual desde las OTs con "
+        "vehículo: lecturas por tandas, una pasada por la secuencia de cada "
+        "vehículo para los avisos y el rollup mensual con un GROUP BY"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=1000,
+            help="OTs leídas de la DB por tanda",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta las OTs con vehículo",
+        )
+
+    def handle(self, *args, **opts):
+        chunk = max(1, opts["chunk"])
+        qs = OrdenTrabajo.objects.exclude(vehiculo="").values(
+            "id", "vehiculo", "fecha", "km_inicial", "km_final", "km_total"
+        )
+        total = qs.count()
+        self.stdout.write(f"OTs con vehículo: {total}")
+
+        if opts["dry_run"]:
+            return
+
+        # una sola transacción: mientras corre, /api/vehiculos/ sigue viendo
+        # el libro anterior y si falla no queda a medio armar
+        t0 = time.monotonic()
+        hechas = 0
+        last = 0
+        with transaction.atomic():
+            borradas, _ = LecturaOdometro.objects.all().delete()
+            self.stdout.write(f"Libro vaciado ({borradas} filas)")
+
+            while True:
+                batch = list(qs.filter(id__gt=last).order_by("id")[:chunk])
+                if not batch:
+                    break
+
+                LecturaOdometro.objects.bulk_create(odometro.lecturas_de(batch))
+
+                last = batch[-1]["id"]
+                hechas += len(batch)
+
+                elapsed = time.monotonic() - t0
+                rate = hechas / elapsed if elapsed else 0.0
+                eta = (total - hechas) / rate if rate else 0.0
+                self.stdout.write(
+                    f"{hechas}/{total} OTs · {rate:.0f} OT/s · ETA {eta:.0f}s"
+                )
+
+            # una sola pasada; las sin km_final van donde las ubica
+            # odometro.anterior(): por km_inicial, después de las que
+            # terminaron en el mismo km
+            secuencia = (
+                LecturaOdometro.objects.filter(
+                    Q(km_final__isnull=False) | Q(km_inicial__isnull=False)
+                )
+                .order_by(
+                    "vehiculo",
+                    "fecha",
+                    Coalesce("km_final", "km_inicial"),
+                    F("km_final").asc(nulls_last=True),
+                    "id",
+                )
+                .only(
+                    "id",
+                    "ot_id",
+                    "vehiculo",
+                    "fecha",
+                    "km_inicial",
+                    "km_final",
+                    "fuera_de_secuencia",
+                    "avisos",
+                )
+            )
+            # se juntan antes de escribir: son pocas y SQLite no quiere
+            # UPDATEs mientras el cursor del iterator sigue abierto
+            marcadas = list(
+                odometro.fuera_de_secuencia(secuencia.iterator(chunk_size=chunk))
+            )
+            LecturaOdometro.objects.bulk_update(
+                marcadas, ["avisos", "fuera_de_secuencia"], batch_size=chunk
+            )
+            self.stdout.write(f"Lecturas fuera de secuencia: {len(marcadas)}")
+
+            meses = odometro.reconstruir_meses()
+
+        invalidar("stats")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {LecturaOdometro.objects.count()} lecturas, {meses} meses "
+                f"de {KmVehiculoMensual.objects.values('vehiculo').distinct().count()} "
+                f"vehículos en {time.monotonic() - t0:.1f}s"
+            )
+        )
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import invalidar
+from orders import productividad
+from orders.models import OrdenTrabajoTecnico, ProductividadTecnicoDiaria
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye ProductividadTecnicoDiaria desde OrdenTrabajoTecnico "
+        "(correr antes backfill_detalle_ot si faltan filas de técnicos)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=500,
+            help="Pares (legajo, día) recalculados por tanda",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta los pares (legajo, día) a recalcular",
+        )
+
+    def handle(self, *args, **opts):
+        chunk = max(1, opts["chunk"])
+        pares = list(
+            OrdenTrabajoTecnico.objects.exclude(legajo="")
+            .values_list("fecha", "legajo")
+            .distinct()
+            .order_by("fecha", "legajo")
+        )
+        total = len(pares)
+        self.stdout.write(f"Pares (legajo, día) a recalcular: {total}")
+
+        if opts["dry_run"]:
+            return
+
+        # una sola transacción: mientras corre, /api/tecnicos/productividad/
+        # sigue viendo el rollup anterior y si falla no queda a medio armar
+        t0 = time.monotonic()
+        filas = 0
+        with transaction.atomic():
+            borradas, _ = ProductividadTecnicoDiaria.objects.all().delete()
+            self.stdout.write(f"Rollup vaciado ({borradas} filas)")
+
+            for i in range(0, total, chunk):
+                tanda = [(legajo, fecha) for fecha, legajo in pares[i : i + chunk]]
+                filas += productividad.recalcular(tanda, reconstruccion=True)
+
+                hechos = min(i + chunk, total)
+                elapsed = time.monotonic() - t0
+                rate = hechos / elapsed if elapsed else 0.0
+                eta = (total - hechos) / rate if rate else 0.0
+                self.stdout.write(
+                    f"{hechos}/{total} pares · hasta {tanda[-1][1]} · "
+                    f"{rate:.0f} pares/s · ETA {eta:.0f}s"
+                )
+
+        invalidar("stats")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {filas} filas de rollup en {time.monotonic() - t0:.1f}s"
+            )
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import ReportePDF
+from orders.reportes import colgados, generar_reporte, recuperar_colgados
+
+
+class Command(BaseCommand):
+    help = (
+        "Reportes PDF que quedaron PENDIENTE / PROCESANDO porque el proceso "
+        "que los armaba se reinició: los marca ERROR o los vuelve a armar "
+        "(correr después de cada deploy / reinicio de workers)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutos",
+            type=int,
+            default=None,
+            help="Antigüedad mínima (default: OT_REPORTE_COLGADO_MIN)",
+        )
+        parser.add_argument(
+            "--relanzar",
+            action="store_true",
+            help="Los arma de nuevo en este proceso en vez de marcarlos ERROR",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        minutos = opts["minutos"]
+        ids = list(colgados(minutos).order_by("id").values_list("id", flat=True))
+        self.stdout.write(f"Reportes colgados: {len(ids)}")
+
+        if opts["dry_run"] or not ids:
+            return
+
+        if not opts["relanzar"]:
+            marcados = recuperar_colgados(minutos, ids=ids)
+            self.stdout.write(self.style.SUCCESS(f"Marcados ERROR: {marcados}"))
+            return
+
+        # vuelven a PENDIENTE para que generar_reporte los tome
+        colgados(minutos).filter(pk__in=ids).update(
+            estado=ReportePDF.Estado.PENDIENTE, iniciado=None, error=""
+        )
+        listos = 0
+        for reporte_id in ids:
+            reporte = generar_reporte(reporte_id)
+            listos += int(reporte.estado == ReportePDF.Estado.LISTO)
+            self.stdout.write(f"Reporte {reporte_id}: {reporte.estado}")
+
+        self.stdout.write(self.style.SUCCESS(f"Relanzados: {listos}/{len(ids)} listos"))
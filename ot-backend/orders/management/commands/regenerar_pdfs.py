@@ -0,0 +1,253 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_date
+
+from historial.models import Tablero
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+from orders.pdf import PERFILES
+from orders.services import (
+    pdf_data_desde_ot,
+    pdf_path_para_ot,
+    registrar_artefactos_pdf,
+)
+
+
+# ==========================================================
+# Worker (corre en otro proceso)
+# ==========================================================
+def _init_worker():
+    # Con "spawn" (macOS/Windows) el hijo arranca sin Django configurado.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _render_uno(job):
+    """
+    job = (ot_id, path, pdf_data). Devuelve (ot_id, bytes, error).
+    No toca la DB: todo lo necesario viene en pdf_data.
+    """
+    from orders.services import renderizar_pdf
+
+    ot_id, path, pdf_data = job
+    try:
+        return ot_id, renderizar_pdf(pdf_data, path), ""
+    except Exception as e:
+        return ot_id, 0, f"{type(e).__name__}: {e}"[:300]
+
+
+# ==========================================================
+# Checkpoint
+# ==========================================================
+def _leer_checkpoint(path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Checkpoint ilegible ({path}): {e}")
+
+
+def _guardar_checkpoint(path: str, state: dict):
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera los PDFs de OTs históricas en paralelo "
+        "(reanudable con --checkpoint)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", default="", help="Fecha OT desde (YYYY-MM-DD)")
+        parser.add_argument("--hasta", default="", help="Fecha OT hasta (YYYY-MM-DD)")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Procesos de render (default: núcleos disponibles)",
+        )
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=200,
+            help="OTs leídas de la DB por tanda",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="",
+            help="Archivo JSON para reanudar una corrida cortada",
+        )
+        parser.add_argument(
+            "--perfil",
+            choices=sorted(PERFILES.keys()),
+            default="",
+            help="Perfil de render (default: el último usado por cada OT, o default)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo cuenta las OTs a regenerar",
+        )
+
+    def _queryset(self, desde, hasta):
+        grupos_qs = OrdenTrabajoLuminariaGrupo.objects.select_related(
+            "tablero"
+        ).prefetch_related(
+            Prefetch(
+                "items",
+                queryset=OrdenTrabajoLuminariaItem.objects.order_by("orden", "id"),
+            )
+        )
+
+        qs = OrdenTrabajo.objects.select_related("pdf").prefetch_related(
+            Prefetch("luminaria_grupos", queryset=grupos_qs.order_by("orden", "id"))
+        )
+        if desde:
+            qs = qs.filter(fecha__gte=desde)
+        if hasta:
+            qs = qs.filter(fecha__lte=hasta)
+        return qs
+
+    def _chunks(self, qs, after_id: int, size: int):
+        """
+        Paginación por keyset (id > último): no usa OFFSET y no carga
+        todas las OTs en memoria.
+        """
+        last = after_id
+        while True:
+            batch = list(qs.filter(id__gt=last).order_by("id")[:size])
+            if not batch:
+                return
+            yield batch
+            last = batch[-1].id
+
+    def _perfil_previo(self, ot) -> str:
+        try:
+            return ot.pdf.perfil
+        except OrdenTrabajo.pdf.RelatedObjectDoesNotExist:
+            return "default"
+
+    def handle(self, *args, **opts):
+        desde = parse_date(opts["desde"]) if opts["desde"] else None
+        hasta = parse_date(opts["hasta"]) if opts["hasta"] else None
+        if opts["desde"] and not desde:
+            raise CommandError("--desde inválido (YYYY-MM-DD)")
+        if opts["hasta"] and not hasta:
+            raise CommandError("--hasta inválido (YYYY-MM-DD)")
+
+        workers = max(1, opts["workers"])
+        chunk = max(1, opts["chunk"])
+        perfil = opts["perfil"]
+        ckpt_path = opts["checkpoint"]
+
+        state = _leer_checkpoint(ckpt_path)
+        filtros = {"desde": opts["desde"], "hasta": opts["hasta"], "perfil": perfil}
+        if state and state.get("filtros") != filtros:
+            raise CommandError(
+                "El checkpoint es de otra corrida (filtros distintos). "
+                "Borralo o usá otro archivo."
+            )
+
+        after_id = int(state.get("ultimo_id") or 0)
+        ok = int(state.get("ok") or 0)
+        fallidos = list(state.get("fallidos") or [])
+
+        qs = self._queryset(desde, hasta)
+        pendientes = qs.filter(id__gt=after_id).count()
+
+        if after_id:
+            self.stdout.write(f"Reanudando desde OT id>{after_id} ({ok} ya hechas)")
+        self.stdout.write(f"OTs a regenerar: {pendientes} con {workers} workers")
+
+        if opts["dry_run"] or not pendientes:
+            return
+
+        # catálogo en memoria: evita un query por OT para tablero_catalogado
+        catalogo = {
+            n.lower() for n in Tablero.objects.values_list("nombre", flat=True)
+        }
+
+        t0 = time.monotonic()
+        hechas = 0
+        total_bytes = 0
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for batch in self._chunks(qs, after_id, chunk):
+                jobs = [
+                    (
+                        ot.id,
+                        pdf_path_para_ot(ot),
+                        pdf_data_desde_ot(
+                            ot,
+                            tablero_catalogado=(ot.tablero or "").lower() in catalogo,
+                            perfil=perfil or self._perfil_previo(ot),
+                        ),
+                    )
+                    for ot in batch
+                ]
+
+                per_worker = max(1, len(jobs) // (workers * 4))
+                perfiles = {ot_id: data["perfil_pdf"] for ot_id, _, data in jobs}
+                paths = {ot_id: path for ot_id, path, _ in jobs}
+                artefactos = []
+                for ot_id, size, error in pool.map(
+                    _render_uno, jobs, chunksize=per_worker
+                ):
+                    hechas += 1
+                    if error:
+                        fallidos.append({"id": ot_id, "error": error})
+                        self.stderr.write(f"OT {ot_id}: {error}")
+                    else:
+                        ok += 1
+                        total_bytes += size
+                        artefactos.append(
+                            (ot_id, paths[ot_id], perfiles[ot_id], size)
+                        )
+
+                registrar_artefactos_pdf(artefactos)
+
+                # el checkpoint avanza solo con tandas completas
+                _guardar_checkpoint(
+                    ckpt_path,
+                    {
+                        "filtros": filtros,
+                        "ultimo_id": batch[-1].id,
+                        "ok": ok,
+                        "fallidos": fallidos,
+                    },
+                )
+
+                elapsed = time.monotonic() - t0
+                rate = hechas / elapsed if elapsed else 0.0
+                eta = (pendientes - hechas) / rate if rate else 0.0
+                self.stdout.write(
+                    f"{hechas}/{pendientes} OTs · {rate:.1f} OT/s · "
+                    f"{total_bytes / 1_048_576:.1f} MB · ETA {eta:.0f}s"
+                )
+
+        elapsed = time.monotonic() - t0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Listo: {hechas} OTs en {elapsed:.1f}s "
+                f"({hechas / elapsed if elapsed else 0:.1f} OT/s), "
+                f"fallidas: {len(fallidos)}"
+            )
+        )
@@ -0,0 +1,73 @@
+# orders/materiales.py
+"""
+Normalización del texto libre de OrdenTrabajo.materiales
+(material / cantidad / unidad, ver validate_materiales).
+
+- normalizar_nombre: clave de comparación para el catálogo y sus alias
+  ("Led-150W " == "led 150w").
+- parse_cantidad: "2", "2,5", "3 u", "10 m" -> (Decimal, unidad).
+- normalizar_unidad: "mts" / "metros" -> "m", "unid" -> "u", etc.
+"""
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+_UNIDADES = {
+    "u": "u",
+    "un": "u",
+    "uni": "u",
+    "unid": "u",
+    "unidad": "u",
+    "unidades": "u",
+    "pza": "u",
+    "pzas": "u",
+    "m": "m",
+    "mt": "m",
+    "mts": "m",
+    "metro": "m",
+    "metros": "m",
+    "kg": "kg",
+    "kgs": "kg",
+    "kilo": "kg",
+    "kilos": "kg",
+    "l": "l",
+    "lt": "l",
+    "lts": "l",
+    "litro": "l",
+    "litros": "l",
+}
+
+_CANTIDAD = re.compile(r"^(\d+(?:[.,]\d+)?)\s*([^\d\s]*)$")
+
+
+def _sin_acentos(s: str) -> str:
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c)
+    )
+
+
+def normalizar_nombre(raw) -> str:
+    s = _sin_acentos(str(raw or "")).lower()
+    return re.sub(r"[^a-z0-9]+", " ", s).strip()
+
+
+def normalizar_unidad(raw) -> str:
+    s = _sin_acentos(str(raw or "")).strip().lower().rstrip(".")
+    return _UNIDADES.get(s, s[:10])
+
+
+def parse_cantidad(raw) -> tuple:
+    """
+    (Decimal o None, unidad normalizada o ""). La coma o el punto son el
+    separador decimal ("2,5" == "2.5"); lo que no tenga la forma
+    <número> [unidad] da (None, "").
+    """
+    s = str(raw or "").strip()
+    m = _CANTIDAD.match(s)
+    if not m:
+        return None, ""
+    try:
+        valor = Decimal(m.group(1).replace(",", "."))
+    except InvalidOperation:
+        return None, ""
+    return valor, normalizar_unidad(m.group(2)) if m.group(2) else ""
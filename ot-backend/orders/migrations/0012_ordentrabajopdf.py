@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_alter_ordentrabajo_options_ordentrabajo_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrdenTrabajoPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.CharField(max_length=300)),
+                ('perfil', models.CharField(choices=[('print', 'Impresión'), ('mobile', 'Móvil'), ('archive', 'Archivo legal')], default='mobile', max_length=20)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('generado', models.DateTimeField(auto_now=True)),
+                ('ot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pdf', to='orders.ordentrabajo')),
+            ],
+        ),
+    ]
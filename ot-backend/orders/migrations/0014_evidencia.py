@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_reportepdf'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Evidencia',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('FOTO', 'Foto'), ('FIRMA', 'Firma')], default='FOTO', max_length=10)),
+                ('archivo', models.CharField(max_length=300)),
+                ('content_type', models.CharField(blank=True, default='', max_length=50)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='evidencias', to=settings.AUTH_USER_MODEL)),
+                ('ot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='evidencias', to='orders.ordentrabajo')),
+            ],
+            options={
+                'ordering': ['-creado'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:00
+
+from django.db import migrations, models
+
+
+def poblar_feed(apps, schema_editor):
+    # lo que ya existe entra al feed una vez: un pull con since=0 lo trae
+    CambioFeed = apps.get_model("orders", "CambioFeed")
+    HistorialTarea = apps.get_model("historial", "HistorialTarea")
+    OrdenTrabajo = apps.get_model("orders", "OrdenTrabajo")
+
+    claves = [
+        f"h:{pk}"
+        for pk in HistorialTarea.objects.order_by("id").values_list("id", flat=True)
+    ]
+    claves += [
+        f"l:{pk}"
+        for pk in OrdenTrabajo.objects.filter(alcance__iexact="LUMINARIA")
+        .order_by("id")
+        .values_list("id", flat=True)
+    ]
+    CambioFeed.objects.bulk_create(
+        [CambioFeed(clave=c) for c in claves], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historial', '0006_tablero_updated_at_deleted_at'),
+        ('orders', '0015_evidenciaupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=40)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(poblar_feed, migrations.RunPython.noop),
+    ]
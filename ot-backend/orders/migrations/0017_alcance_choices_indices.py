@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:05
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Trim, Upper
+
+ALCANCES = ["TABLERO", "CIRCUITO", "LUMINARIA", "OTRO"]
+
+
+def normalizar_alcance(apps, schema_editor):
+    # " luminaria" -> "LUMINARIA"; texto libre viejo ("correctivo") -> OTRO.
+    # El texto que cambia queda en alcance_original: se puede revisar y la
+    # migración se puede revertir
+    OrdenTrabajo = apps.get_model("orders", "OrdenTrabajo")
+    OrdenTrabajo.objects.exclude(alcance__in=ALCANCES + [""]).update(
+        alcance_original=models.F("alcance")
+    )
+    OrdenTrabajo.objects.update(alcance=Upper(Trim("alcance")))
+    OrdenTrabajo.objects.exclude(alcance__in=ALCANCES + [""]).update(alcance="OTRO")
+
+
+def restaurar_alcance(apps, schema_editor):
+    OrdenTrabajo = apps.get_model("orders", "OrdenTrabajo")
+    OrdenTrabajo.objects.exclude(alcance_original="").update(
+        alcance=models.F("alcance_original"), alcance_original=""
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_cambiofeed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordentrabajo',
+            name='alcance_original',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(normalizar_alcance, restaurar_alcance),
+        migrations.AlterField(
+            model_name='ordentrabajo',
+            name='alcance',
+            field=models.CharField(blank=True, choices=[('TABLERO', 'Tablero'), ('CIRCUITO', 'Circuito'), ('LUMINARIA', 'Luminaria'), ('OTRO', 'Otro')], default='LUMINARIA', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(fields=['alcance', '-fecha', '-id'], name='orders_orde_alcance_3e6b2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(fields=['fecha', 'id'], name='orders_orde_fecha_2c5d4c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordentrabajo',
+            index=models.Index(django.db.models.functions.text.Upper('tablero'), name='ot_tablero_upper_idx'),
+        ),
+    ]
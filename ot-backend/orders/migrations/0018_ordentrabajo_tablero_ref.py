@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:10
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _canon(nombre):
+    # copia de historial.services._canon_tablero a esta fecha
+    s = re.sub(r"\s+", " ", (nombre or "").strip())
+    return s.replace("–", "-").replace("—", "-").lower()
+
+
+def completar_tablero_ref(apps, schema_editor):
+    # las OTs que ya existen. Copia congelada del backfill de
+    # orders.services.backfill_tablero_ref: la migración no importa
+    # código vivo, que puede cambiar después.
+    OrdenTrabajo = apps.get_model("orders", "OrdenTrabajo")
+    Tablero = apps.get_model("historial", "Tablero")
+
+    # con nombres repetidos gana el más viejo
+    catalogo = {}
+    for pk, nombre in Tablero.objects.order_by("-id").values_list("id", "nombre"):
+        catalogo[_canon(nombre)] = pk
+
+    qs = OrdenTrabajo.objects.filter(tablero_ref__isnull=True).exclude(tablero="")
+    last = 0
+    while True:
+        batch = list(
+            qs.filter(id__gt=last).order_by("id").values_list("id", "tablero")[:1000]
+        )
+        if not batch:
+            break
+        last = batch[-1][0]
+
+        por_tablero = {}
+        for ot_id, nombre in batch:
+            pk = catalogo.get(_canon(nombre))
+            if pk:
+                por_tablero.setdefault(pk, []).append(ot_id)
+        for pk, ids in por_tablero.items():
+            OrdenTrabajo.objects.filter(id__in=ids).update(tablero_ref_id=pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('historial', '0007_indices_consultas'),
+        ('orders', '0017_alcance_choices_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordentrabajo',
+            name='tablero_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ordenes', to='historial.tablero'),
+        ),
+        migrations.RunPython(completar_tablero_ref, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:14
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0018_ordentrabajo_tablero_ref'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrdenTrabajoMaterial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveIntegerField(default=0)),
+                ('material', models.CharField(max_length=200)),
+                ('cantidad', models.CharField(blank=True, default='', max_length=50)),
+                ('unidad', models.CharField(blank=True, default='', max_length=30)),
+                ('cantidad_num', models.DecimalField(blank=True, decimal_places=3, max_digits=12, null=True)),
+                ('fecha', models.DateField()),
+                ('ot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='materiales_rel', to='orders.ordentrabajo')),
+            ],
+            options={
+                'ordering': ['orden', 'id'],
+                'indexes': [models.Index(django.db.models.functions.text.Upper('material'), models.F('fecha'), name='ot_material_upper_fecha_idx'), models.Index(fields=['fecha'], name='orders_orde_fecha_7e658d_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrdenTrabajoTecnico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveIntegerField(default=0)),
+                ('legajo', models.CharField(blank=True, default='', max_length=30)),
+                ('nombre', models.CharField(blank=True, default='', max_length=150)),
+                ('fecha', models.DateField()),
+                ('ot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tecnicos_rel', to='orders.ordentrabajo')),
+            ],
+            options={
+                'ordering': ['orden', 'id'],
+                'indexes': [models.Index(fields=['legajo', 'fecha'], name='orders_orde_legajo_228c28_idx'), models.Index(fields=['fecha'], name='orders_orde_fecha_143f04_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0019_tecnicos_materiales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Material',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=200, unique=True)),
+                ('unidad', models.CharField(blank=True, choices=[('u', 'Unidad'), ('m', 'Metro'), ('kg', 'Kilogramo'), ('l', 'Litro')], default='', max_length=10)),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ordentrabajomaterial',
+            name='ramal',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ordentrabajomaterial',
+            name='unidad_norm',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='ordentrabajomaterial',
+            name='zona',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='ordentrabajomaterial',
+            name='material_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lineas', to='orders.material'),
+        ),
+        migrations.CreateModel(
+            name='MaterialAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=200, unique=True)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alias', to='orders.material')),
+            ],
+            options={
+                'ordering': ['alias'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsumoMaterialMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('clave', models.CharField(max_length=210)),
+                ('nombre', models.CharField(max_length=200)),
+                ('unidad', models.CharField(blank=True, default='', max_length=10)),
+                ('zona', models.CharField(blank=True, default='', max_length=200)),
+                ('ramal', models.CharField(blank=True, default='', max_length=20)),
+                ('cantidad', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('lineas', models.IntegerField(default=0)),
+                ('sin_cantidad', models.IntegerField(default=0)),
+                ('ots', models.IntegerField(default=0)),
+                ('material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='consumos', to='orders.material')),
+            ],
+            options={
+                'ordering': ['mes', 'clave'],
+                'indexes': [models.Index(fields=['mes'], name='orders_cons_mes_e3faf0_idx'), models.Index(fields=['clave', 'mes'], name='orders_cons_clave_8f0470_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mes', 'clave', 'unidad', 'zona', 'ramal'), name='uniq_consumo_material_mes')],
+            },
+        ),
+    ]
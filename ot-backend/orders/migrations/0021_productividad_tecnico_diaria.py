@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0020_catalogo_consumo_materiales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductividadTecnicoDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('legajo', models.CharField(max_length=30)),
+                ('nombre', models.CharField(blank=True, default='', max_length=150)),
+                ('ots', models.IntegerField(default=0)),
+                ('luminarias', models.IntegerField(default=0)),
+                ('km', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('completas', models.IntegerField(default=0)),
+                ('parciales', models.IntegerField(default=0)),
+                ('otros_resultados', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['fecha', 'legajo'],
+                'indexes': [models.Index(fields=['fecha'], name='orders_prod_fecha_cb9082_idx')],
+                'constraints': [models.UniqueConstraint(fields=('legajo', 'fecha'), name='uniq_productividad_legajo_fecha')],
+            },
+        ),
+    ]
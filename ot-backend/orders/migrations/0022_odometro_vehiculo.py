@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0021_productividad_tecnico_diaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KmVehiculoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vehiculo', models.CharField(max_length=50)),
+                ('mes', models.DateField()),
+                ('km', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('ots', models.IntegerField(default=0)),
+                ('fuera_de_secuencia', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['vehiculo', 'mes'],
+                'indexes': [models.Index(fields=['mes'], name='orders_kmve_mes_797039_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vehiculo', 'mes'), name='uniq_km_vehiculo_mes')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LecturaOdometro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vehiculo', models.CharField(max_length=50)),
+                ('fecha', models.DateField()),
+                ('km_inicial', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('km_final', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('km', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('fuera_de_secuencia', models.BooleanField(default=False)),
+                ('avisos', models.JSONField(blank=True, default=list)),
+                ('ot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='lectura_odometro', to='orders.ordentrabajo')),
+            ],
+            options={
+                'ordering': ['vehiculo', 'fecha', 'km_final', 'id'],
+                'indexes': [models.Index(fields=['vehiculo', 'fecha', 'km_final'], name='lectura_odometro_secuencia')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0022_odometro_vehiculo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportepdf',
+            name='iniciado',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
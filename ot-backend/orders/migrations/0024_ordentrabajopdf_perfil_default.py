@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0023_reportepdf_iniciado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ordentrabajopdf',
+            name='perfil',
+            field=models.CharField(choices=[('default', 'Predeterminado'), ('print', 'Impresión'), ('mobile', 'Móvil'), ('archive', 'Archivo legal')], default='default', max_length=20),
+        ),
+    ]
@@ -1,6 +1,13 @@
+import uuid
+
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
 from django.conf import settings
 from historial.models import Tablero
+from historial.services import resolver_tablero
+
+from .materiales import normalizar_nombre
 
 
 RAMAL_CHOICES = [
@@ -11,12 +18,47 @@ RAMAL_CHOICES = [
     ("GRAL_PAZ", "Gral Paz"),
 ]
 
+# Siempre en mayúsculas (el serializer normaliza lo que llega)
+ALCANCE_CHOICES = [
+    ("TABLERO", "Tablero"),
+    ("CIRCUITO", "Circuito"),
+    ("LUMINARIA", "Luminaria"),
+    ("OTRO", "Otro"),
+]
+
+# Unidades normalizadas de materiales (ver orders/materiales.py)
+UNIDAD_CHOICES = [
+    ("u", "Unidad"),
+    ("m", "Metro"),
+    ("kg", "Kilogramo"),
+    ("l", "Litro"),
+]
+
+# Perfiles de salida del PDF (ver orders/pdf.py PERFILES)
+PDF_PERFIL_CHOICES = [
+    ("default", "Predeterminado"),
+    ("print", "Impresión"),
+    ("mobile", "Móvil"),
+    ("archive", "Archivo legal"),
+]
+
 
 class OrdenTrabajo(models.Model):
     fecha = models.DateField()
     ubicacion = models.CharField(max_length=200, blank=True, default="")
 
     tablero = models.CharField(max_length=100)
+    # Derivado de `tablero` en save() (historial.services.resolver_tablero,
+    # contra la DB). Null si el texto no está en el catálogo o si la fila
+    # todavía no pasó por backfill_tablero_ref.
+    tablero_ref = models.ForeignKey(
+        Tablero,
+        on_delete=models.SET_NULL,
+        related_name="ordenes",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     zona = models.CharField(max_length=200, blank=True, default="")
 
     circuito = models.CharField(max_length=100, blank=True, default="")
@@ -83,7 +125,17 @@ class OrdenTrabajo(models.Model):
     # =========================
     # Clasificación (Semáforo)
     # =========================
-    alcance = models.CharField(max_length=20, blank=True, default="LUMINARIA")
+    alcance = models.CharField(
+        max_length=20,
+        choices=ALCANCE_CHOICES,
+        blank=True,
+        default="LUMINARIA",
+    )
+    # Texto libre que tenía `alcance` antes de normalizarlo (migración 0017);
+    # vacío en las OTs que ya traían un valor válido
+    alcance_original = models.CharField(
+        max_length=20, blank=True, default="", editable=False
+    )
     resultado = models.CharField(max_length=20, blank=True, default="COMPLETO")
 
     # Solo aplica si alcance es TABLERO o CIRCUITO
@@ -104,10 +156,41 @@ class OrdenTrabajo(models.Model):
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            # historial de luminarias: alcance + rango de fechas, -fecha -id
+            models.Index(fields=["alcance", "-fecha", "-id"]),
+            # reporte combinado: rango de fechas, fecha id
+            models.Index(fields=["fecha", "id"]),
+            # tablero__iexact (reporte): en Postgres es UPPER(tablero)
+            models.Index(Upper("tablero"), name="ot_tablero_upper_idx"),
+        ]
 
     def __str__(self):
         return f"OT {self.id} - {self.tablero}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # el texto tal como está en la DB: save() no re-resuelve si no cambió
+        # (diferido: no está en __dict__ y queda None, se resuelve igual)
+        instance._tablero_db = instance.__dict__.get("tablero")
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        escribe_tablero = update_fields is None or "tablero" in update_fields
+        cambio = self._state.adding or self.tablero != getattr(
+            self, "_tablero_db", None
+        )
+        if escribe_tablero and cambio:
+            t = resolver_tablero(self.tablero)
+            self.tablero_ref_id = t[0] if t else None
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "tablero_ref"}
+        super().save(*args, **kwargs)
+        if escribe_tablero:
+            self._tablero_db = self.tablero
+
 
 class OrdenTrabajoLuminariaGrupo(models.Model):
     ot = models.ForeignKey(
@@ -193,4 +276,438 @@ class OrdenTrabajoLuminariaItem(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.codigo_luminaria} ({self.grupo.tablero.nombre})"
+        # solo campos propios: en listados (admin, logs) no dispara queries
+        return f"{self.codigo_luminaria} (grupo {self.grupo_id})"
+
+
+class OrdenTrabajoTecnico(models.Model):
+    """
+    Un técnico de OrdenTrabajo.tecnicos (el JSON queda por compatibilidad).
+    Se reescribe desde el JSON en cada save de la OT (orders/detalle.py).
+    """
+
+    ot = models.ForeignKey(
+        OrdenTrabajo,
+        on_delete=models.CASCADE,
+        related_name="tecnicos_rel",
+    )
+    orden = models.PositiveIntegerField(default=0)
+
+    legajo = models.CharField(max_length=30, blank=True, default="")
+    nombre = models.CharField(max_length=150, blank=True, default="")
+    # copia de ot.fecha: los rangos por legajo no hacen join
+    fecha = models.DateField()
+
+    class Meta:
+        ordering = ["orden", "id"]
+        indexes = [
+            models.Index(fields=["legajo", "fecha"]),
+            models.Index(fields=["fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.legajo} (OT {self.ot_id})"
+
+
+class Material(models.Model):
+    """
+    Catálogo de materiales (compras). El texto libre de las OTs se
+    asocia por nombre o por alias, normalizados (orders/consumo.py).
+    """
+
+    nombre = models.CharField(max_length=200, unique=True)
+    # unidad de compra; se usa cuando la OT no dice ninguna
+    unidad = models.CharField(
+        max_length=10, choices=UNIDAD_CHOICES, blank=True, default=""
+    )
+
+    class Meta:
+        ordering = ["nombre"]
+
+    def __str__(self):
+        return self.nombre
+
+
+class MaterialAlias(models.Model):
+    material = models.ForeignKey(
+        Material,
+        on_delete=models.CASCADE,
+        related_name="alias",
+    )
+    # se guarda normalizado (normalizar_nombre)
+    alias = models.CharField(max_length=200, unique=True)
+
+    class Meta:
+        ordering = ["alias"]
+
+    def __str__(self):
+        return f"{self.alias} -> {self.material_id}"
+
+    def save(self, *args, **kwargs):
+        self.alias = normalizar_nombre(self.alias)
+        super().save(*args, **kwargs)
+
+
+class OrdenTrabajoMaterial(models.Model):
+    """
+    Un material de OrdenTrabajo.materiales, con la cantidad como vino
+    (texto) y, si se pudo leer, como número + unidad normalizada.
+    Fecha, zona y ramal son copia de la OT (rollup mensual).
+    """
+
+    ot = models.ForeignKey(
+        OrdenTrabajo,
+        on_delete=models.CASCADE,
+        related_name="materiales_rel",
+    )
+    orden = models.PositiveIntegerField(default=0)
+
+    material = models.CharField(max_length=200)
+    material_ref = models.ForeignKey(
+        Material,
+        on_delete=models.SET_NULL,
+        related_name="lineas",
+        null=True,
+        blank=True,
+    )
+    cantidad = models.CharField(max_length=50, blank=True, default="")
+    unidad = models.CharField(max_length=30, blank=True, default="")
+    cantidad_num = models.DecimalField(
+        max_digits=12, decimal_places=3, null=True, blank=True
+    )
+    unidad_norm = models.CharField(max_length=10, blank=True, default="")
+    fecha = models.DateField()
+    zona = models.CharField(max_length=200, blank=True, default="")
+    ramal = models.CharField(max_length=20, blank=True, default="")
+
+    class Meta:
+        ordering = ["orden", "id"]
+        indexes = [
+            # material__iexact + rango de fechas
+            models.Index(Upper("material"), F("fecha"), name="ot_material_upper_fecha_idx"),
+            models.Index(fields=["fecha"]),
+        ]
+
+    def __str__(self):
+        return f"{self.material} (OT {self.ot_id})"
+
+
+class ConsumoMaterialMensual(models.Model):
+    """
+    Rollup de OrdenTrabajoMaterial por mes / material / unidad / zona /
+    ramal. Se mantiene por deltas al escribir las filas de cada OT
+    (orders/consumo.py) y se reconstruye con reconstruir_consumo_materiales.
+    """
+
+    mes = models.DateField()  # primer día del mes
+    # "m:<id>" si está en el catálogo; si no "t:<nombre normalizado>"
+    clave = models.CharField(max_length=210)
+    material = models.ForeignKey(
+        Material,
+        on_delete=models.SET_NULL,
+        related_name="consumos",
+        null=True,
+        blank=True,
+    )
+    nombre = models.CharField(max_length=200)
+    unidad = models.CharField(max_length=10, blank=True, default="")
+    zona = models.CharField(max_length=200, blank=True, default="")
+    ramal = models.CharField(max_length=20, blank=True, default="")
+
+    cantidad = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    lineas = models.IntegerField(default=0)
+    sin_cantidad = models.IntegerField(default=0)
+    ots = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["mes", "clave"]
+        indexes = [
+            models.Index(fields=["mes"]),
+            models.Index(fields=["clave", "mes"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mes", "clave", "unidad", "zona", "ramal"],
+                name="uniq_consumo_material_mes",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} {self.nombre} {self.cantidad} {self.unidad}"
+
+
+class ProductividadTecnicoDiaria(models.Model):
+    """
+    Rollup diario por legajo (orders/productividad.py): se recalcula el
+    (legajo, fecha) de cada OT que se crea / edita / borra y se
+    reconstruye con reconstruir_productividad.
+    """
+
+    fecha = models.DateField()
+    legajo = models.CharField(max_length=30)
+    nombre = models.CharField(max_length=150, blank=True, default="")
+
+    ots = models.IntegerField(default=0)
+    luminarias = models.IntegerField(default=0)
+    # km_total de cada OT en la que estuvo (el vehículo es compartido)
+    km = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    completas = models.IntegerField(default=0)
+    parciales = models.IntegerField(default=0)
+    otros_resultados = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["fecha", "legajo"]
+        indexes = [
+            models.Index(fields=["fecha"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["legajo", "fecha"],
+                name="uniq_productividad_legajo_fecha",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.legajo} {self.fecha} ({self.ots} OTs)"
+
+
+class LecturaOdometro(models.Model):
+    """
+    Libro de odómetro por vehículo (orders/odometro.py): una fila por OT
+    con vehículo, ordenada por (vehiculo, fecha, km_final). La anterior y
+    la siguiente lectura salen del índice, sin releer las OTs.
+    """
+
+    ot = models.OneToOneField(
+        OrdenTrabajo,
+        on_delete=models.CASCADE,
+        related_name="lectura_odometro",
+    )
+    # patente / móvil normalizado ("AB 123-CD" -> "AB123CD")
+    vehiculo = models.CharField(max_length=50)
+    fecha = models.DateField()
+    km_inicial = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    km_final = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    # recorrido de la OT: km_final - km_inicial, o km_total si no hay lecturas
+    km = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    fuera_de_secuencia = models.BooleanField(default=False)
+    avisos = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ["vehiculo", "fecha", "km_final", "id"]
+        indexes = [
+            models.Index(
+                fields=["vehiculo", "fecha", "km_final"],
+                name="lectura_odometro_secuencia",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vehiculo} {self.fecha} {self.km_inicial}-{self.km_final}"
+
+
+class KmVehiculoMensual(models.Model):
+    """
+    Rollup mensual por vehículo sobre LecturaOdometro: se recalcula el
+    (vehiculo, mes) de cada lectura que cambia y se reconstruye con
+    reconstruir_odometro.
+    """
+
+    vehiculo = models.CharField(max_length=50)
+    mes = models.DateField()  # primer día del mes
+
+    km = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    ots = models.IntegerField(default=0)
+    fuera_de_secuencia = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["vehiculo", "mes"]
+        indexes = [
+            models.Index(fields=["mes"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehiculo", "mes"],
+                name="uniq_km_vehiculo_mes",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.vehiculo} {self.mes:%Y-%m} {self.km} km"
+
+
+class OrdenTrabajoPDF(models.Model):
+    """
+    Artefacto PDF generado para una OT (último render).
+    """
+
+    ot = models.OneToOneField(
+        OrdenTrabajo,
+        on_delete=models.CASCADE,
+        related_name="pdf",
+    )
+
+    # Path relativo a MEDIA_ROOT
+    archivo = models.CharField(max_length=300)
+    perfil = models.CharField(
+        max_length=20,
+        choices=PDF_PERFIL_CHOICES,
+        default="default",
+    )
+    size_bytes = models.PositiveIntegerField(default=0)
+
+    generado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"PDF OT {self.ot_id} ({self.perfil})"
+
+
+class ReportePDF(models.Model):
+    """
+    Reporte combinado de varias OTs (carátula + PDFs de cada OT).
+    Se genera en segundo plano; el cliente consulta el estado y descarga.
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        PROCESANDO = "PROCESANDO", "Procesando"
+        LISTO = "LISTO", "Listo"
+        ERROR = "ERROR", "Error"
+
+    filtros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(
+        max_length=12,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+    )
+
+    # Path relativo a MEDIA_ROOT
+    archivo = models.CharField(max_length=300, blank=True, default="")
+    size_bytes = models.PositiveIntegerField(default=0)
+
+    total_ots = models.PositiveIntegerField(default=0)
+    # OTs cuyo PDF ya estaba en disco (no se re-renderizaron)
+    reutilizados = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="reportes_pdf",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    creado = models.DateTimeField(auto_now_add=True)
+    # cuando un worker lo tomó (PROCESANDO)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    terminado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"Reporte {self.id} ({self.estado})"
+
+
+class Evidencia(models.Model):
+    """
+    Foto o firma subida en binario (POST /api/evidencias/) antes de la OT.
+    El payload de la OT la referencia por id en vez de mandar base64.
+    """
+
+    class Tipo(models.TextChoices):
+        FOTO = "FOTO", "Foto"
+        FIRMA = "FIRMA", "Firma"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=10, choices=Tipo.choices, default=Tipo.FOTO)
+
+    # Path relativo a MEDIA_ROOT
+    archivo = models.CharField(max_length=300)
+    content_type = models.CharField(max_length=50, blank=True, default="")
+    size_bytes = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+
+    # Se completa al usarla en una OT; una evidencia no se reutiliza
+    ot = models.ForeignKey(
+        OrdenTrabajo,
+        on_delete=models.SET_NULL,
+        related_name="evidencias",
+        null=True,
+        blank=True,
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="evidencias",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-creado"]
+
+    def __str__(self):
+        return f"{self.tipo} {self.id}"
+
+
+class EvidenciaUpload(models.Model):
+    """
+    Subida reanudable en curso (init -> PUT por offset -> finalizar).
+    El archivo parcial vive junto al destino final; `recibido` es el último
+    byte confirmado y desde ahí reanuda el cliente.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(
+        max_length=10,
+        choices=Evidencia.Tipo.choices,
+        default=Evidencia.Tipo.FOTO,
+    )
+
+    size_total = models.PositiveIntegerField()
+    recibido = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+
+    # Path relativo a MEDIA_ROOT del parcial
+    parcial = models.CharField(max_length=300)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="evidencia_uploads",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    creado = models.DateTimeField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.recibido}/{self.size_total})"
+
+
+class CambioFeed(models.Model):
+    """
+    Outbox del feed de sync offline (GET /api/historial/feed/).
+    Una fila por objeto tocado ("h:<historial_id>" / "l:<ot_id>"); el id
+    es la secuencia de los tokens. La fila no guarda datos: el feed los lee
+    al momento del pull, así varias ediciones se pagan una sola vez.
+    """
+
+    clave = models.CharField(max_length=40)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.id} {self.clave}"
@@ -0,0 +1,385 @@
+# orders/odometro.py
+"""
+Libro de odómetro por vehículo (LecturaOdometro) y km por mes
+(KmVehiculoMensual).
+
+- Cada OT con vehículo deja una lectura. La secuencia de un vehículo es
+  (fecha, km_final, id): la lectura anterior / siguiente sale del índice
+  (vehiculo, fecha, km_final) con un ORDER BY ... LIMIT 1, sin ordenar
+  las OTs del vehículo. Las lecturas sin km_final no son anterior de
+  nadie, pero si traen km_inicial se ubican por (fecha, km_inicial) y se
+  revisan contra la anterior como cualquier otra (y suman km al mes si
+  traen km_total).
+- Avisos: km_final < km_inicial y km_total que no cuadra quedan en la
+  propia lectura; "retroceso" es cuando arranca por debajo de donde
+  terminó la anterior (fuera_de_secuencia). Al insertar / mover / borrar
+  una lectura se revisa también la siguiente, que cambia de anterior.
+- Los avisos no frenan el alta: la OT se guarda igual y POST
+  /api/ordenes/ y /api/ordenes/sync/ los devuelven en `avisos_km`.
+- KmVehiculoMensual se recalcula por (vehiculo, mes) desde las lecturas
+  de ese mes; reconstruir_odometro arma las dos tablas de cero, en una
+  sola transacción.
+"""
+import re
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils.dateparse import parse_date
+
+from .models import KmVehiculoMensual, LecturaOdometro
+
+# campos de la OT que entran al libro
+CAMPOS = {"vehiculo", "fecha", "km_inicial", "km_final", "km_total"}
+
+# diferencia aceptada entre km_total y km_final - km_inicial (redondeos)
+TOLERANCIA_KM = Decimal("1")
+
+RETROCESO = "retroceso"
+
+
+def normalizar_vehiculo(raw) -> str:
+    """ "ab 123-cd" -> "AB123CD"; "" si no hay vehículo."""
+    return re.sub(r"[^0-9A-Z]", "", str(raw or "").upper())[:50]
+
+
+def _decimal(valor):
+    # recién creada con create(km_final="1200") la instancia tiene el string
+    if valor in (None, ""):
+        return None
+    try:
+        return Decimal(str(valor)).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def _fecha(valor):
+    return valor if hasattr(valor, "year") else parse_date(str(valor))
+
+
+def _mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _mes_siguiente(mes):
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+# ==========================================================
+# Avisos
+# ==========================================================
+def _recorrido(km_inicial, km_final, km_total):
+    if km_inicial is not None and km_final is not None and km_final >= km_inicial:
+        return km_final - km_inicial
+    return km_total
+
+
+def _avisos_propios(km_inicial, km_final, km_total) -> list:
+    if km_inicial is None or km_final is None:
+        return []
+    if km_final < km_inicial:
+        return [
+            {
+                "tipo": "km_final_menor",
+                "detalle": f"km_final {km_final} es menor que km_inicial {km_inicial}",
+            }
+        ]
+    recorrido = km_final - km_inicial
+    if km_total is not None and abs(km_total - recorrido) > TOLERANCIA_KM:
+        return [
+            {
+                "tipo": "km_total",
+                "detalle": (
+                    f"km_total {km_total} no coincide con "
+                    f"km_final - km_inicial ({recorrido})"
+                ),
+            }
+        ]
+    return []
+
+
+def _aviso_secuencia(lectura, anterior):
+    if anterior is None:
+        return None
+    inicio = lectura.km_inicial if lectura.km_inicial is not None else lectura.km_final
+    if inicio is None or inicio >= anterior.km_final:
+        return None
+    return {
+        "tipo": RETROCESO,
+        "ot_anterior": anterior.ot_id,
+        "detalle": (
+            f"arranca en {inicio} km y la OT #{anterior.ot_id} del "
+            f"{anterior.fecha:%d/%m/%Y} terminó en {anterior.km_final} km"
+        ),
+    }
+
+
+def _con_secuencia(lectura, aviso) -> tuple:
+    """(avisos, fuera_de_secuencia) con el aviso de secuencia reemplazado."""
+    avisos = [a for a in lectura.avisos or [] if a.get("tipo") != RETROCESO]
+    if aviso:
+        avisos.append(aviso)
+    return avisos, aviso is not None
+
+
+# ==========================================================
+# Vecinas (por índice)
+# ==========================================================
+def _secuencia(vehiculo):
+    return LecturaOdometro.objects.filter(vehiculo=vehiculo, km_final__isnull=False)
+
+
+def _anterior_sin_final(lectura):
+    # sin km_final se ubica por km_inicial: las del mismo día que
+    # terminaron en o antes de donde arranca van antes
+    if lectura.km_inicial is None:
+        return None
+    qs = _secuencia(lectura.vehiculo)
+    mismo_dia = (
+        qs.filter(fecha=lectura.fecha, km_final__lte=lectura.km_inicial)
+        .order_by("-km_final", "-id")
+        .first()
+    )
+    if mismo_dia:
+        return mismo_dia
+    return qs.filter(fecha__lt=lectura.fecha).order_by("-fecha", "-km_final", "-id").first()
+
+
+def anterior(lectura):
+    if lectura.km_final is None:
+        return _anterior_sin_final(lectura)
+    qs = _secuencia(lectura.vehiculo)
+    mismo_km = Q(km_final=lectura.km_final)
+    if lectura.pk:
+        mismo_km &= Q(id__lt=lectura.pk)
+    mismo_dia = (
+        qs.filter(fecha=lectura.fecha)
+        .filter(Q(km_final__lt=lectura.km_final) | mismo_km)
+        .order_by("-km_final", "-id")
+        .first()
+    )
+    if mismo_dia:
+        return mismo_dia
+    return qs.filter(fecha__lt=lectura.fecha).order_by("-fecha", "-km_final", "-id").first()
+
+
+def siguiente(lectura):
+    if lectura.km_final is None:
+        return None
+    qs = _secuencia(lectura.vehiculo)
+    mismo_dia = (
+        qs.filter(fecha=lectura.fecha)
+        .filter(
+            Q(km_final__gt=lectura.km_final)
+            | Q(km_final=lectura.km_final, id__gt=lectura.pk)
+        )
+        .order_by("km_final", "id")
+        .first()
+    )
+    if mismo_dia:
+        return mismo_dia
+    return qs.filter(fecha__gt=lectura.fecha).order_by("fecha", "km_final", "id").first()
+
+
+def siguientes(lectura) -> list:
+    """
+    Las que pueden tener a `lectura` como anterior: la siguiente de la
+    secuencia y las sin km_final que caen hasta ella. Se revisan cuando
+    `lectura` aparece, se mueve o se va.
+    """
+    if lectura.km_final is None:
+        return []
+    sig = siguiente(lectura)
+    sin_final = LecturaOdometro.objects.filter(
+        vehiculo=lectura.vehiculo,
+        km_final__isnull=True,
+        km_inicial__isnull=False,
+        fecha__gte=lectura.fecha,
+    )
+    if sig:
+        sin_final = sin_final.filter(fecha__lte=sig.fecha)
+    return [o for o in (sig, *sin_final) if o is not None]
+
+
+def _revisar(lectura) -> bool:
+    """Recalcula el aviso de secuencia; True si cambió fuera_de_secuencia."""
+    avisos, fuera = _con_secuencia(lectura, _aviso_secuencia(lectura, anterior(lectura)))
+    if avisos == lectura.avisos and fuera == lectura.fuera_de_secuencia:
+        return False
+    LecturaOdometro.objects.filter(pk=lectura.pk).update(
+        avisos=avisos, fuera_de_secuencia=fuera
+    )
+    cambio = fuera != lectura.fuera_de_secuencia
+    lectura.avisos, lectura.fuera_de_secuencia = avisos, fuera
+    return cambio
+
+
+# ==========================================================
+# Alta / edición / baja de OTs
+# ==========================================================
+def registrar(ot, creada: bool = False):
+    """Escribe (o mueve, o borra) la lectura de la OT y revisa vecinas."""
+    vehiculo = normalizar_vehiculo(ot.vehiculo)
+    previa = None if creada else LecturaOdometro.objects.filter(ot_id=ot.pk).first()
+    if previa is None and not vehiculo:
+        return
+
+    meses = set()
+    revisar = []
+    if previa:
+        meses.add((previa.vehiculo, _mes(previa.fecha)))
+        # las que le seguían antes pasan a tener otra anterior
+        revisar.extend(siguientes(previa))
+
+    if not vehiculo:
+        previa.delete()
+    else:
+        lectura = previa or LecturaOdometro(ot_id=ot.pk)
+        km_inicial = _decimal(ot.km_inicial)
+        km_final = _decimal(ot.km_final)
+        km_total = _decimal(ot.km_total)
+
+        lectura.vehiculo = vehiculo
+        lectura.fecha = _fecha(ot.fecha)
+        lectura.km_inicial = km_inicial
+        lectura.km_final = km_final
+        lectura.km = _recorrido(km_inicial, km_final, km_total)
+        lectura.avisos = _avisos_propios(km_inicial, km_final, km_total)
+        lectura.avisos, lectura.fuera_de_secuencia = _con_secuencia(
+            lectura, _aviso_secuencia(lectura, anterior(lectura))
+        )
+        lectura.save()
+
+        meses.add((vehiculo, _mes(lectura.fecha)))
+        revisar.extend(siguientes(lectura))
+
+    for otra in {o.pk: o for o in revisar}.values():
+        if _revisar(otra):
+            meses.add((otra.vehiculo, _mes(otra.fecha)))
+
+    recalcular_meses(meses)
+
+
+def quitar(ot_id):
+    """Antes de borrar la OT: saca su lectura y revisa la siguiente."""
+    lectura = LecturaOdometro.objects.filter(ot_id=ot_id).first()
+    if lectura is None:
+        return
+
+    revisar = siguientes(lectura)
+    lectura.delete()
+
+    meses = {(lectura.vehiculo, _mes(lectura.fecha))}
+    for otra in revisar:
+        if _revisar(otra):
+            meses.add((otra.vehiculo, _mes(otra.fecha)))
+    recalcular_meses(meses)
+
+
+def avisos(ot_id) -> list:
+    return (
+        LecturaOdometro.objects.filter(ot_id=ot_id)
+        .values_list("avisos", flat=True)
+        .first()
+        or []
+    )
+
+
+# ==========================================================
+# Rollup mensual
+# ==========================================================
+def recalcular_meses(meses):
+    """Recalcula los (vehiculo, mes) indicados desde las lecturas del mes."""
+    for vehiculo, mes in sorted(meses):
+        agg = LecturaOdometro.objects.filter(
+            vehiculo=vehiculo, fecha__gte=mes, fecha__lt=_mes_siguiente(mes)
+        ).aggregate(
+            km=Sum("km"),
+            ots=Count("id"),
+            fuera=Count("id", filter=Q(fuera_de_secuencia=True)),
+        )
+        if agg["ots"]:
+            KmVehiculoMensual.objects.update_or_create(
+                vehiculo=vehiculo,
+                mes=mes,
+                defaults={
+                    "km": agg["km"] or 0,
+                    "ots": agg["ots"],
+                    "fuera_de_secuencia": agg["fuera"],
+                },
+            )
+        else:
+            KmVehiculoMensual.objects.filter(vehiculo=vehiculo, mes=mes).delete()
+
+
+# ==========================================================
+# Reconstrucción (manage.py reconstruir_odometro)
+# ==========================================================
+def lecturas_de(ots) -> list:
+    """LecturaOdometro sin guardar (ni aviso de secuencia) para esas OTs."""
+    out = []
+    for o in ots:
+        vehiculo = normalizar_vehiculo(o["vehiculo"])
+        if not vehiculo:
+            continue
+        km_inicial = _decimal(o["km_inicial"])
+        km_final = _decimal(o["km_final"])
+        km_total = _decimal(o["km_total"])
+        out.append(
+            LecturaOdometro(
+                ot_id=o["id"],
+                vehiculo=vehiculo,
+                fecha=o["fecha"],
+                km_inicial=km_inicial,
+                km_final=km_final,
+                km=_recorrido(km_inicial, km_final, km_total),
+                avisos=_avisos_propios(km_inicial, km_final, km_total),
+            )
+        )
+    return out
+
+
+def fuera_de_secuencia(lecturas):
+    """
+    Recorre lecturas ordenadas por (vehiculo, fecha, km_final o
+    km_inicial, con km_final primero, id) y devuelve las que cambian de
+    aviso de secuencia: una pasada, sin búsquedas por vecina. Las sin
+    km_final se revisan pero no son anterior de la que sigue.
+    """
+    previa = None
+    for lectura in lecturas:
+        if previa is not None and previa.vehiculo != lectura.vehiculo:
+            previa = None
+        avisos, fuera = _con_secuencia(lectura, _aviso_secuencia(lectura, previa))
+        if avisos != lectura.avisos or fuera != lectura.fuera_de_secuencia:
+            lectura.avisos, lectura.fuera_de_secuencia = avisos, fuera
+            yield lectura
+        if lectura.km_final is not None:
+            previa = lectura
+
+
+@transaction.atomic
+def reconstruir_meses() -> int:
+    """Rearma KmVehiculoMensual entero; borrar + llenar en una transacción."""
+    KmVehiculoMensual.objects.all().delete()
+    filas = [
+        KmVehiculoMensual(
+            vehiculo=r["vehiculo"],
+            mes=r["mes"],
+            km=r["km"] or 0,
+            ots=r["ots"],
+            fuera_de_secuencia=r["fuera"],
+        )
+        for r in LecturaOdometro.objects.annotate(mes=TruncMonth("fecha"))
+        .values("vehiculo", "mes")
+        .annotate(
+            km=Sum("km"),
+            ots=Count("id"),
+            fuera=Count("id", filter=Q(fuera_de_secuencia=True)),
+        )
+        .order_by("vehiculo", "mes")
+    ]
+    KmVehiculoMensual.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
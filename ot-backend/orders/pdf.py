@@ -19,11 +19,16 @@ from reportlab.platypus import (
     Paragraph,
     Spacer,
     Table,
+    LongTable,
     TableStyle,
     KeepTogether,
     Image,
 )
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from .luminarias import parse_luminaria_codes
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,10 @@ try:
 except Exception:
     pass
 
+# A partir de cuántas luminarias un grupo deja de ir en KeepTogether y se
+# renderiza como LongTable partida entre páginas.
+LONG_TABLE_UMBRAL = 40
+
 _DATAURL_RE = re.compile(r"^data:(image\/[a-zA-Z0-9.+-]+);base64,(.*)$", re.S)
 
 
@@ -107,11 +116,38 @@ def _static_abs(static_rel: str) -> str:
     return p or ""
 
 
-def _img_flowable_path(abs_path: str, w_cm: float, h_cm: float, h_align="LEFT"):
+def _px_para(w_cm: float, h_cm: float, dpi: int) -> int:
+    return int(max(w_cm, h_cm) / 2.54 * dpi)
+
+
+def _img_flowable_path(
+    abs_path: str,
+    w_cm: float,
+    h_cm: float,
+    h_align="LEFT",
+    dpi=None,
+    quality=82,
+):
     if not abs_path or not os.path.exists(abs_path):
         return None
+
+    # Con dpi: se re-escala al tamaño de impresión en vez de embeber la
+    # foto original del celular (12MP -> unos cientos de KB).
+    src = abs_path
+    if dpi and PIL_OK:
+        try:
+            with open(abs_path, "rb") as f:
+                raw = f.read()
+            buf = _image_bytes_to_jpeg_buffer(
+                raw, max_side=_px_para(w_cm, h_cm, dpi), quality=quality
+            )
+            if buf:
+                src = buf
+        except OSError as e:
+            logger.warning("No se pudo leer imagen '%s': %s", abs_path, e)
+
     try:
-        im = Image(abs_path, width=w_cm * cm, height=h_cm * cm)
+        im = Image(src, width=w_cm * cm, height=h_cm * cm)
         im.hAlign = h_align
         return im
     except Exception as e:
@@ -205,14 +241,150 @@ def get_theme(data):
     }
 
 
-def generar_pdf(data):
+# =========================
+# PERFILES DE SALIDA
+# =========================
+# - default: lo que se generaba antes de los perfiles y lo que sigue
+#   recibiendo quien no pide uno. Tema según print_mode, fotos base64
+#   a 1800px q82, fotos del disco sin re-escalar y la compresión por
+#   defecto de ReportLab.
+# - print: tema claro, fotos a 200 dpi, páginas sin comprimir (se manda
+#   a la impresora recién generado: se ahorra el deflate y no se guarda).
+# - mobile: tema oscuro de la app, fotos livianas para descargar con datos;
+#   páginas comprimidas.
+# - archive: auditoría legal; tema claro, fuentes TTF embebidas (subset),
+#   sin transparencias, páginas comprimidas. No es PDF/A estricto (faltan
+#   XMP y OutputIntent, que ReportLab open source no genera).
+PERFILES = {
+    "default": {
+        "print_mode": None,
+        "foto_dpi": None,
+        "foto_max_side": 1800,
+        "foto_quality": 82,
+        "page_compression": None,
+        "fuentes_embebidas": False,
+        "transparencias": True,
+    },
+    "print": {
+        "print_mode": True,
+        "foto_dpi": 200,
+        "foto_max_side": None,
+        "foto_quality": 85,
+        "page_compression": 0,
+        "fuentes_embebidas": False,
+        "transparencias": True,
+    },
+    "mobile": {
+        "print_mode": False,
+        "foto_dpi": 110,
+        "foto_max_side": None,
+        "foto_quality": 70,
+        "page_compression": 1,
+        "fuentes_embebidas": False,
+        "transparencias": True,
+    },
+    "archive": {
+        "print_mode": True,
+        "foto_dpi": 150,
+        "foto_max_side": None,
+        "foto_quality": 80,
+        "page_compression": 1,
+        "fuentes_embebidas": True,
+        "transparencias": False,
+    },
+}
+
+
+def get_perfil(data):
+    """
+    Devuelve (nombre, perfil). Los perfiles son opt-in: sin perfil
+    explícito (o con uno desconocido) va "default", que deja la salida
+    como antes y toma el tema del print_mode.
+    """
+    data = data or {}
+    nombre = str(data.get("perfil_pdf") or "").strip().lower()
+    if nombre not in PERFILES:
+        nombre = "default"
+    return nombre, PERFILES[nombre]
+
+
+FUENTES_STD = {
+    "regular": "Helvetica",
+    "bold": "Helvetica-Bold",
+    "italic": "Helvetica-Oblique",
+}
+
+_FUENTES_TTF = None
+
+
+def _fuentes_ttf():
+    """
+    Registra una familia TTF para embeber (ReportLab embebe solo el subset
+    de glifos usados). Prueba OT_PDF_TTF_DIR (DejaVu) y si no, Vera, que
+    viene con ReportLab. Si nada funciona cae a las estándar.
+    """
+    global _FUENTES_TTF
+    if _FUENTES_TTF is not None:
+        return _FUENTES_TTF
+
+    import reportlab
+
+    candidatos = [
+        (
+            getattr(settings, "OT_PDF_TTF_DIR", ""),
+            ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf"),
+        ),
+        (
+            os.path.join(os.path.dirname(reportlab.__file__), "fonts"),
+            ("Vera.ttf", "VeraBd.ttf", "VeraIt.ttf"),
+        ),
+    ]
+
+    for folder, archivos in candidatos:
+        if not folder:
+            continue
+        paths = [os.path.join(folder, a) for a in archivos]
+        if not all(os.path.exists(p) for p in paths):
+            continue
+        try:
+            nombres = ("OTSans", "OTSans-Bold", "OTSans-Oblique")
+            for nombre, path in zip(nombres, paths):
+                pdfmetrics.registerFont(TTFont(nombre, path))
+            pdfmetrics.registerFontFamily(
+                "OTSans",
+                normal="OTSans",
+                bold="OTSans-Bold",
+                italic="OTSans-Oblique",
+                boldItalic="OTSans-Bold",
+            )
+            _FUENTES_TTF = dict(zip(("regular", "bold", "italic"), nombres))
+            return _FUENTES_TTF
+        except Exception as e:
+            logger.warning("No se pudo registrar TTF desde '%s': %s", folder, e)
+
+    _FUENTES_TTF = FUENTES_STD
+    return _FUENTES_TTF
+
+
+def generar_pdf(data, destino=None):
+    """
+    Renderiza la OT.
+    - sin destino: devuelve los bytes del PDF.
+    - con destino (path o archivo abierto en "wb"): ReportLab escribe
+      directo ahí y se devuelve el mismo destino, sin copia en memoria.
+    """
     data = data or {}
-    theme = get_theme(data)
+    perfil_nombre, perfil = get_perfil(data)
+    print_mode = perfil["print_mode"]
+    if print_mode is None:
+        print_mode = bool(data.get("print_mode", False))
+    theme = get_theme({"print_mode": print_mode})
+    fuentes = _fuentes_ttf() if perfil["fuentes_embebidas"] else FUENTES_STD
 
     tablero_catalogado = bool(data.get("tablero_catalogado", True))
     tablero_nombre = (str(data.get("tablero") or "")).strip()
 
-    buffer = BytesIO()
+    buffer = BytesIO() if destino is None else destino
     doc = SimpleDocTemplate(
         buffer,
         pagesize=A4,
@@ -222,10 +394,12 @@ def generar_pdf(data):
         bottomMargin=2.0 * cm,
         title="Orden de Trabajo",
         author="conurbaDEV",
+        subject=f"Orden de Trabajo ({perfil_nombre})",
+        creator="conurbaDEV OT",
+        pageCompression=perfil["page_compression"],
     )
 
     styles = getSampleStyleSheet()
-    print_mode = bool(data.get("print_mode"))
 
     # =========================
     # TIPOGRAFÍA
@@ -233,7 +407,7 @@ def generar_pdf(data):
     H2 = ParagraphStyle(
         "H2",
         parent=styles["Normal"],
-        fontName="Helvetica-Bold",
+        fontName=fuentes["bold"],
         fontSize=10.8,
         leading=13,
         textColor=theme["text"] if print_mode else theme["muted"],
@@ -244,7 +418,7 @@ def generar_pdf(data):
     H3 = ParagraphStyle(
         "H3",
         parent=styles["Normal"],
-        fontName="Helvetica-Bold",
+        fontName=fuentes["bold"],
         fontSize=9.6,
         leading=12,
         textColor=theme["text"],
@@ -255,7 +429,7 @@ def generar_pdf(data):
     LABEL = ParagraphStyle(
         "LABEL",
         parent=styles["Normal"],
-        fontName="Helvetica-Bold",
+        fontName=fuentes["bold"],
         fontSize=8.6,
         leading=10.5,
         textColor=theme["muted"],
@@ -264,7 +438,7 @@ def generar_pdf(data):
     VALUE = ParagraphStyle(
         "VALUE",
         parent=styles["Normal"],
-        fontName="Helvetica-Bold" if not print_mode else "Helvetica",
+        fontName=fuentes["bold"] if not print_mode else fuentes["regular"],
         fontSize=10.0,
         leading=12.8,
         textColor=theme["text"],
@@ -273,7 +447,7 @@ def generar_pdf(data):
     BODY = ParagraphStyle(
         "BODY",
         parent=styles["Normal"],
-        fontName="Helvetica",
+        fontName=fuentes["regular"],
         fontSize=9.6,
         leading=13.6,
         textColor=theme["text"],
@@ -282,7 +456,7 @@ def generar_pdf(data):
     MUTED = ParagraphStyle(
         "MUTED",
         parent=styles["Normal"],
-        fontName="Helvetica-Oblique",
+        fontName=fuentes["italic"],
         fontSize=8.3,
         leading=11,
         textColor=theme["muted"],
@@ -291,7 +465,7 @@ def generar_pdf(data):
     SMALL = ParagraphStyle(
         "SMALL",
         parent=styles["Normal"],
-        fontName="Helvetica",
+        fontName=fuentes["regular"],
         fontSize=8.6,
         leading=10.8,
         textColor=theme["text"],
@@ -404,12 +578,7 @@ def generar_pdf(data):
         if c:
             return [c]
 
-        try:
-            from .views_luminarias import parse_luminaria_codes
-
-            return parse_luminaria_codes(pdf_data.get("luminaria_equipos", "")) or []
-        except Exception:
-            return []
+        return parse_luminaria_codes(pdf_data.get("luminaria_equipos", ""))
 
     def get_tableros_resumen(pdf_data: dict):
         grupos = get_luminaria_grupos(pdf_data)
@@ -616,12 +785,58 @@ def generar_pdf(data):
 
         cods = get_codigos_luminarias(data)
         cods_txt = ", ".join(cods) if cods else "-"
-        story.append(bloque_texto("Códigos de luminarias", cods_txt, empty="-"))
+        if len(cods) > LONG_TABLE_UMBRAL:
+            # Un prose_box es una celda de Table: no se puede partir y con
+            # cientos de códigos no entra en una página. Paragraph suelto sí.
+            story.append(Paragraph("CÓDIGOS DE LUMINARIAS", H2))
+            story.append(P(cods_txt, BODY))
+            story.append(Spacer(1, 7))
+        else:
+            story.append(bloque_texto("Códigos de luminarias", cods_txt, empty="-"))
 
         grupos = get_luminaria_grupos(data)
         if grupos:
             story.append(Paragraph("DETALLE POR TABLERO TRABAJADO", H2))
 
+            # Anchos y estilos de la tabla de items: se calculan una sola vez
+            items_col_widths = [doc.width - 5.2 * cm, 5.2 * cm]
+            items_style_cmds = [
+                ("BACKGROUND", (0, 0), (-1, 0), theme["panel2"]),
+                ("TEXTCOLOR", (0, 0), (-1, 0), theme["muted"]),
+                ("BOX", (0, 0), (-1, -1), 1, theme["border"]),
+                ("INNERGRID", (0, 0), (-1, -1), 0.6, theme["border"]),
+                (
+                    "ROWBACKGROUNDS",
+                    (0, 1),
+                    (-1, -1),
+                    [theme["panel"], theme["row_alt"]],
+                ),
+                ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 10),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+                ("TOPPADDING", (0, 0), (-1, -1), 8),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ]
+            items_style = TableStyle(items_style_cmds)
+
+            # Modo largo: celdas de texto plano (sin Paragraph por celda) y
+            # la fuente definida por estilo.
+            items_long_style = TableStyle(
+                items_style_cmds
+                + [
+                    ("FONTNAME", (0, 0), (-1, 0), LABEL.fontName),
+                    ("FONTSIZE", (0, 0), (-1, 0), LABEL.fontSize),
+                    ("FONTNAME", (0, 1), (-1, -1), VALUE.fontName),
+                    ("FONTSIZE", (0, 1), (-1, -1), VALUE.fontSize),
+                    ("LEADING", (0, 0), (-1, -1), VALUE.leading),
+                    ("TEXTCOLOR", (0, 1), (-1, -1), theme["text"]),
+                ]
+            )
+            # Alto fijo por fila: ReportLab no re-mide celdas en cada split
+            items_row_height = VALUE.leading + 16
+            H3_NEXT = ParagraphStyle("H3_NEXT", parent=H3, keepWithNext=1)
+
             for idx, grupo in enumerate(grupos, start=1):
                 tablero_g = grupo.get("tablero") or "-"
                 zona_g = grupo.get("zona") or "-"
@@ -696,6 +911,37 @@ def generar_pdf(data):
                     ),
                 ]
 
+                if len(items) > LONG_TABLE_UMBRAL:
+                    # =========================
+                    # MODO LARGO: el grupo no entra en una página.
+                    # Encabezado junto, tabla partida con header repetido.
+                    # =========================
+                    # mismo layout que la tabla corta: solo "CÓDIGO" rotulado
+                    rows = [["CÓDIGO", ""]]
+                    for item in items:
+                        km_item = item.get("km_luminaria", None)
+                        rows.append(
+                            [
+                                safe(item.get("codigo_luminaria")).upper(),
+                                "-" if km_item in (None, "") else safe(km_item),
+                            ]
+                        )
+
+                    story.append(KeepTogether(bloque))
+                    story.append(Paragraph("LUMINARIAS DEL GRUPO", H3_NEXT))
+                    story.append(
+                        LongTable(
+                            rows,
+                            colWidths=items_col_widths,
+                            rowHeights=[items_row_height] * len(rows),
+                            repeatRows=1,
+                            hAlign="LEFT",
+                            style=items_long_style,
+                        )
+                    )
+                    story.append(Spacer(1, 16))
+                    continue
+
                 if items:
                     rows = [
                         [P("CÓDIGO", LABEL)],
@@ -714,31 +960,10 @@ def generar_pdf(data):
 
                     items_table = Table(
                         rows,
-                        colWidths=[doc.width - 5.2 * cm, 5.2 * cm],
+                        colWidths=items_col_widths,
                         hAlign="LEFT",
                     )
-                    items_table.setStyle(
-                        TableStyle(
-                            [
-                                ("BACKGROUND", (0, 0), (-1, 0), theme["panel2"]),
-                                ("TEXTCOLOR", (0, 0), (-1, 0), theme["muted"]),
-                                ("BOX", (0, 0), (-1, -1), 1, theme["border"]),
-                                ("INNERGRID", (0, 0), (-1, -1), 0.6, theme["border"]),
-                                (
-                                    "ROWBACKGROUNDS",
-                                    (0, 1),
-                                    (-1, -1),
-                                    [theme["panel"], theme["row_alt"]],
-                                ),
-                                ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-                                ("LEFTPADDING", (0, 0), (-1, -1), 10),
-                                ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-                                ("TOPPADDING", (0, 0), (-1, -1), 8),
-                                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                            ]
-                        )
-                    )
+                    items_table.setStyle(items_style)
                     bloque.extend(
                         [
                             Paragraph("LUMINARIAS DEL GRUPO", H3),
@@ -1041,8 +1266,11 @@ def generar_pdf(data):
                     w_cm=8.2,
                     h_cm=6.0,
                     h_align="CENTER",
-                    max_side=1800,
-                    quality=82,
+                    max_side=(
+                        perfil["foto_max_side"]
+                        or _px_para(8.2, 6.0, perfil["foto_dpi"])
+                    ),
+                    quality=perfil["foto_quality"],
                 )
                 if not im:
                     cells.append(
@@ -1053,7 +1281,14 @@ def generar_pdf(data):
                 else:
                     cells.append(im)
             else:
-                im = _img_flowable_path(val, w_cm=8.2, h_cm=6.0, h_align="CENTER")
+                im = _img_flowable_path(
+                    val,
+                    w_cm=8.2,
+                    h_cm=6.0,
+                    h_align="CENTER",
+                    dpi=perfil["foto_dpi"],
+                    quality=perfil["foto_quality"],
+                )
                 if not im:
                     cells.append(
                         _placeholder_box(
@@ -1132,6 +1367,8 @@ def generar_pdf(data):
     # Header/Footer por página
     # =========================
     logo_path = _static_abs("orders/rayo.png")
+    # Un solo ImageReader para todas las páginas (el logo se embebe una vez)
+    logo = ImageReader(logo_path) if logo_path and os.path.exists(logo_path) else None
 
     def on_page(canv, _doc):
         canv.saveState()
@@ -1144,12 +1381,12 @@ def generar_pdf(data):
         canv.setFillColor(accent_header)
         canv.rect(0, h - 2.9 * cm, w, 0.18 * cm, stroke=0, fill=1)
 
-        if logo_path and os.path.exists(logo_path):
+        if logo:
             size = 1.85 * cm
             x = 1.6 * cm
             y = h - 2.70 * cm
             canv.drawImage(
-                ImageReader(logo_path),
+                logo,
                 x,
                 y,
                 width=size,
@@ -1159,33 +1396,38 @@ def generar_pdf(data):
             )
 
         canv.setFillColor(theme["text"])
-        canv.setFont("Helvetica-Bold", 12)
+        canv.setFont(fuentes["bold"], 12)
         canv.drawString(3.5 * cm, h - 1.55 * cm, "SECTOR MANTENIMIENTO ELÉCTRICO")
 
-        canv.setFont("Helvetica", 10)
+        canv.setFont(fuentes["regular"], 10)
         canv.drawString(3.5 * cm, h - 2.05 * cm, "ORDEN DE TRABAJO")
 
         if not tablero_catalogado:
-            try:
-                canv.setFillAlpha(0.08)
-            except Exception:
-                pass
+            if perfil["transparencias"]:
+                try:
+                    canv.setFillAlpha(0.08)
+                except Exception:
+                    pass
+                canv.setFillColor(colors.HexColor("#94a3b8"))
+            else:
+                # archive: sin transparencias, gris muy claro opaco
+                canv.setFillColor(colors.HexColor("#eef0f3"))
 
-            canv.setFont("Helvetica-Bold", 48)
-            canv.setFillColor(colors.HexColor("#94a3b8"))
+            canv.setFont(fuentes["bold"], 48)
             canv.saveState()
             canv.translate(w / 2, h / 2)
             canv.rotate(35)
             canv.drawCentredString(0, 0, "TABLERO NO CATALOGADO")
             canv.restoreState()
 
-            try:
-                canv.setFillAlpha(1)
-            except Exception:
-                pass
+            if perfil["transparencias"]:
+                try:
+                    canv.setFillAlpha(1)
+                except Exception:
+                    pass
 
         canv.setFillColor(theme["muted"])
-        canv.setFont("Helvetica-Oblique", 8)
+        canv.setFont(fuentes["italic"], 8)
 
         footer_left = "Sistema de Mantenimiento Eléctrico — Desarrollado por conurbaDEV"
         if not tablero_catalogado:
@@ -1197,4 +1439,124 @@ def generar_pdf(data):
         canv.restoreState()
 
     doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    if destino is not None:
+        return destino
+    return buffer.getvalue()
+
+
+# ==========================================================
+# REPORTE MULTI-OT: carátula con tabla resumen
+# ==========================================================
+def generar_pdf_resumen(filas, filtros_txt="", destino=None):
+    """
+    Carátula del reporte combinado: una fila por OT.
+    filas = [{"id_ot", "fecha", "tablero", "circuito", "alcance",
+              "resultado", "tecnicos"}]
+    Mismo contrato de destino que generar_pdf.
+    """
+    theme = get_theme({"print_mode": True})
+    fuentes = FUENTES_STD
+
+    buffer = BytesIO() if destino is None else destino
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=1.6 * cm,
+        rightMargin=1.6 * cm,
+        topMargin=3.2 * cm,
+        bottomMargin=2.0 * cm,
+        title="Reporte de Órdenes de Trabajo",
+        author="conurbaDEV",
+        creator="conurbaDEV OT",
+    )
+
+    styles = getSampleStyleSheet()
+    H2 = ParagraphStyle(
+        "H2",
+        parent=styles["Normal"],
+        fontName=fuentes["bold"],
+        fontSize=10.8,
+        leading=13,
+        textColor=theme["text"],
+        spaceAfter=6,
+    )
+    BODY = ParagraphStyle(
+        "BODY",
+        parent=styles["Normal"],
+        fontName=fuentes["regular"],
+        fontSize=9,
+        leading=11.5,
+        textColor=theme["muted"],
+    )
+
+    story = [
+        Paragraph(f"Resumen: {len(filas)} órdenes de trabajo", H2),
+    ]
+    if filtros_txt:
+        story.append(Paragraph(escape(filtros_txt), BODY))
+    story.append(Spacer(1, 8))
+
+    header = ["OT", "FECHA", "TABLERO", "CIRCUITO", "ALCANCE", "RESULTADO", "TÉCNICOS"]
+    rows = [header]
+    for f in filas:
+        rows.append(
+            [
+                f.get("id_ot", ""),
+                str(f.get("fecha") or ""),
+                str(f.get("tablero") or "")[:28],
+                str(f.get("circuito") or "")[:16],
+                str(f.get("alcance") or ""),
+                str(f.get("resultado") or ""),
+                str(f.get("tecnicos") or "")[:34],
+            ]
+        )
+
+    widths = [2.0, 1.9, 3.4, 2.0, 2.0, 2.1, 4.4]
+    t = LongTable(
+        rows,
+        colWidths=[w * cm for w in widths],
+        rowHeights=[0.62 * cm] * len(rows),
+        repeatRows=1,
+    )
+    t.setStyle(
+        TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, 0), fuentes["bold"]),
+                ("FONTNAME", (0, 1), (-1, -1), fuentes["regular"]),
+                ("FONTSIZE", (0, 0), (-1, -1), 7.8),
+                ("TEXTCOLOR", (0, 0), (-1, -1), theme["text"]),
+                ("BACKGROUND", (0, 0), (-1, 0), theme["panel2"]),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, theme["row_alt"]]),
+                ("LINEBELOW", (0, 0), (-1, 0), 0.6, theme["border"]),
+                ("BOX", (0, 0), (-1, -1), 0.6, theme["border"]),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ]
+        )
+    )
+    story.append(t)
+
+    generado = datetime.now().strftime("%d/%m/%Y %H:%M")
+
+    def on_page(canv, _doc):
+        canv.saveState()
+        w, h = A4
+
+        canv.setFillColor(colors.HexColor("#9ca3af"))
+        canv.rect(0, h - 2.9 * cm, w, 0.18 * cm, stroke=0, fill=1)
+
+        canv.setFillColor(theme["text"])
+        canv.setFont(fuentes["bold"], 12)
+        canv.drawString(1.6 * cm, h - 1.55 * cm, "SECTOR MANTENIMIENTO ELÉCTRICO")
+        canv.setFont(fuentes["regular"], 10)
+        canv.drawString(1.6 * cm, h - 2.05 * cm, "REPORTE DE ÓRDENES DE TRABAJO")
+
+        canv.setFillColor(theme["muted"])
+        canv.setFont(fuentes["italic"], 8)
+        canv.drawString(1.6 * cm, 1.2 * cm, f"Generado {generado}")
+        canv.drawRightString(w - 1.6 * cm, 1.2 * cm, f"Página {_doc.page}")
+        canv.restoreState()
+
+    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    if destino is not None:
+        return destino
     return buffer.getvalue()
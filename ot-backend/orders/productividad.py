@@ -0,0 +1,157 @@
+# orders/productividad.py
+"""
+Rollup diario por técnico (ProductividadTecnicoDiaria).
+
+No se mantiene por deltas: cada cambio marca pares (legajo, fecha) y
+esos pares se recalculan desde OrdenTrabajoTecnico + las OTs del día,
+que son pocas filas por índice (legajo, fecha). Así el resultado es el
+mismo se llegue por donde se llegue (alta, edición, items sueltos,
+reconstrucción).
+
+- marcar(pares=..., ots=...): pares explícitos (los viejos de una OT
+  editada o borrada) u OTs, cuyos pares se leen al recalcular.
+- agrupar(): igual que feed.agrupar; el alta de una OT toca OT + grupos
+  + items y se recalcula una vez al salir, con los items ya creados.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db.models import Count
+
+from .models import OrdenTrabajo, OrdenTrabajoTecnico, ProductividadTecnicoDiaria
+
+_lote = ContextVar("ot_productividad_lote", default=None)
+
+# campos de la OT que entran al rollup
+CAMPOS = {"tecnicos", "fecha", "km_total", "resultado", "codigos_luminarias"}
+
+
+# ==========================================================
+# Marcado
+# ==========================================================
+def marcar(pares=(), ots=()):
+    lote = _lote.get()
+    if lote is not None:
+        lote["pares"].update(pares)
+        lote["ots"].update(ots)
+    else:
+        recalcular(set(pares), set(ots))
+
+
+@contextmanager
+def agrupar():
+    if _lote.get() is not None:
+        yield
+        return
+
+    lote = {"pares": set(), "ots": set()}
+    token = _lote.set(lote)
+    try:
+        yield
+    finally:
+        _lote.reset(token)
+        if lote["pares"] or lote["ots"]:
+            recalcular(lote["pares"], lote["ots"])
+
+
+# ==========================================================
+# Cálculo
+# ==========================================================
+def _filas(pares) -> dict:
+    """{(legajo, fecha): valores del rollup} de los pares con alguna OT."""
+    legajos = {l for l, _ in pares}
+    fechas = {f for _, f in pares}
+
+    tecnicos = [
+        (legajo, fecha, nombre, ot_id)
+        for legajo, fecha, nombre, ot_id in OrdenTrabajoTecnico.objects.filter(
+            legajo__in=legajos, fecha__in=fechas
+        ).values_list("legajo", "fecha", "nombre", "ot_id")
+        if (legajo, fecha) in pares
+    ]
+
+    ots = {
+        o["id"]: o
+        for o in OrdenTrabajo.objects.filter(id__in={t[3] for t in tecnicos})
+        .annotate(n_items=Count("luminaria_grupos__items"))
+        .values("id", "km_total", "resultado", "codigos_luminarias", "n_items")
+    }
+
+    out = {}
+    vistos = set()
+    for legajo, fecha, nombre, ot_id in tecnicos:
+        # el mismo legajo dos veces en una OT cuenta una vez
+        if (legajo, fecha, ot_id) in vistos or ot_id not in ots:
+            continue
+        vistos.add((legajo, fecha, ot_id))
+
+        ot = ots[ot_id]
+        fila = out.setdefault(
+            (legajo, fecha),
+            {
+                "nombre": nombre,
+                "ots": 0,
+                "luminarias": 0,
+                "km": Decimal(0),
+                "completas": 0,
+                "parciales": 0,
+                "otros_resultados": 0,
+            },
+        )
+        fila["nombre"] = fila["nombre"] or nombre
+        fila["ots"] += 1
+        # modo nuevo: items de los grupos; modo viejo: codigos_luminarias
+        fila["luminarias"] += ot["n_items"] or len(ot["codigos_luminarias"] or [])
+        fila["km"] += ot["km_total"] or 0
+
+        resultado = (ot["resultado"] or "").upper()
+        if resultado == "COMPLETO":
+            fila["completas"] += 1
+        elif resultado == "PARCIAL":
+            fila["parciales"] += 1
+        else:
+            fila["otros_resultados"] += 1
+    return out
+
+
+def recalcular(pares, ots=(), reconstruccion: bool = False):
+    """
+    Recalcula los pares (legajo, fecha) indicados más los de las OTs
+    `ots`. Con reconstruccion=True la tabla se vació antes: bulk_create
+    directo, sin upsert por par.
+    """
+    pares = set(pares)
+    if ots:
+        pares.update(
+            OrdenTrabajoTecnico.objects.filter(ot_id__in=ots)
+            .exclude(legajo="")
+            .values_list("legajo", "fecha")
+        )
+    pares = {(l, f) for l, f in pares if l}
+    if not pares:
+        return 0
+
+    filas = _filas(pares)
+
+    if reconstruccion:
+        ProductividadTecnicoDiaria.objects.bulk_create(
+            [
+                ProductividadTecnicoDiaria(legajo=l, fecha=f, **v)
+                for (l, f), v in sorted(filas.items())
+            ],
+            batch_size=1000,
+        )
+        return len(filas)
+
+    for legajo, fecha in sorted(pares):
+        valores = filas.get((legajo, fecha))
+        if valores:
+            ProductividadTecnicoDiaria.objects.update_or_create(
+                legajo=legajo, fecha=fecha, defaults=valores
+            )
+        else:
+            ProductividadTecnicoDiaria.objects.filter(
+                legajo=legajo, fecha=fecha
+            ).delete()
+    return len(filas)
@@ -0,0 +1,469 @@
+# orders/reportes.py
+"""
+Reporte combinado multi-OT: carátula con tabla resumen + el PDF de cada
+OT concatenado. Los PDFs que ya están en disco (OrdenTrabajoPDF) se
+reutilizan tal cual; solo se renderizan los que faltan.
+
+- El combinado se escribe en streaming (_Concatenador): en memoria hay
+  un PDF de OT por vez, no el reporte entero.
+- Los jobs corren en threads del proceso web. Si el proceso se reinicia
+  a mitad de un job la fila queda PENDIENTE / PROCESANDO:
+  recuperar_colgados() las pasa a ERROR (lo llaman las vistas de estado
+  / descarga y manage.py recuperar_reportes, que también puede
+  relanzarlas).
+"""
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+    create_string_object,
+)
+
+from historial.models import Tablero
+from historial.services import buscar_tablero
+
+from .models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+    ReportePDF,
+)
+from .pdf import generar_pdf_resumen
+from .services import (
+    _rel_media_path,
+    escribir_atomico,
+    pdf_data_desde_ot,
+    pdf_path_para_ot,
+    registrar_artefacto_pdf,
+    renderizar_pdf,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+# ==========================================================
+# Selección de OTs
+# ==========================================================
+def filtrar_ots(filtros: dict):
+    qs = OrdenTrabajo.objects.all()
+
+    if filtros.get("tablero"):
+        # catalogado: join por id (tablero_ref); si no, el texto tal cual
+        t = buscar_tablero(filtros["tablero"])
+        if t:
+            qs = qs.filter(tablero_ref_id=t[0])
+        else:
+            qs = qs.filter(tablero__iexact=filtros["tablero"])
+    if filtros.get("zona"):
+        qs = qs.filter(zona__iexact=filtros["zona"])
+    if filtros.get("ramal"):
+        qs = qs.filter(ramal=filtros["ramal"])
+    if filtros.get("desde"):
+        qs = qs.filter(fecha__gte=filtros["desde"])
+    if filtros.get("hasta"):
+        qs = qs.filter(fecha__lte=filtros["hasta"])
+
+    return qs.order_by("fecha", "id")
+
+
+def _filtros_txt(filtros: dict) -> str:
+    partes = []
+    for key, label in (
+        ("tablero", "Tablero"),
+        ("zona", "Zona"),
+        ("ramal", "Ramal"),
+        ("desde", "Desde"),
+        ("hasta", "Hasta"),
+    ):
+        if filtros.get(key):
+            partes.append(f"{label}: {filtros[key]}")
+    return " · ".join(partes)
+
+
+def _fila_resumen(ot) -> dict:
+    tecnicos = ", ".join(
+        str(t.get("nombre") or t.get("legajo") or "")
+        for t in (ot.tecnicos or [])
+        if isinstance(t, dict)
+    )
+    return {
+        "id_ot": f"OT-{ot.id:06d}",
+        "fecha": ot.fecha.strftime("%d/%m/%Y") if ot.fecha else "",
+        "tablero": ot.tablero,
+        "circuito": ot.circuito,
+        "alcance": ot.alcance,
+        "resultado": ot.resultado,
+        "tecnicos": tecnicos,
+    }
+
+
+# ==========================================================
+# PDF por OT (reutiliza el artefacto si está en disco)
+# ==========================================================
+def _pdf_de_ot(ot, catalogo) -> tuple:
+    """
+    Devuelve (path, reutilizado).
+    """
+    # RelatedObjectDoesNotExist hereda de AttributeError
+    artefacto = getattr(ot, "pdf", None)
+    if artefacto and artefacto.archivo:
+        path = os.path.join(settings.MEDIA_ROOT, artefacto.archivo)
+        if os.path.exists(path):
+            return path, True
+
+    perfil = artefacto.perfil if artefacto else "default"
+    path = pdf_path_para_ot(ot)
+    data = pdf_data_desde_ot(
+        ot,
+        tablero_catalogado=(ot.tablero or "").lower() in catalogo,
+        perfil=perfil,
+    )
+    size = renderizar_pdf(data, path)
+    registrar_artefacto_pdf(ot, path, perfil, size)
+    return path, False
+
+
+def reporte_path(reporte) -> str:
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        "reportes",
+        reporte.creado.strftime("%Y"),
+        reporte.creado.strftime("%m"),
+        f"reporte_{reporte.id}.pdf",
+    )
+
+
+# ==========================================================
+# Concatenación en streaming
+# ==========================================================
+def _ref(idnum: int) -> IndirectObject:
+    return IndirectObject(idnum, 0, None)
+
+
+class _Concatenador:
+    """
+    Escribe el PDF combinado a medida que lee cada fuente: los objetos de
+    cada PDF se renumeran y van directo al archivo, los streams sin
+    decodificar. Entre fuentes solo quedan en memoria los ids de las
+    páginas, los marcadores y los offsets para el xref.
+    """
+
+    # 1: catálogo, 2: árbol de páginas, 3: outline (se escriben al cerrar)
+    CATALOGO, PAGINAS, OUTLINE = 1, 2, 3
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.siguiente_id = 4
+        self.paginas = []
+        self.marcadores = []
+        f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _nuevo_id(self) -> int:
+        idnum = self.siguiente_id
+        self.siguiente_id += 1
+        return idnum
+
+    def _escribir(self, idnum: int, obj):
+        self.offsets[idnum] = self.f.tell()
+        self.f.write(f"{idnum} 0 obj\n".encode())
+        obj.write_to_stream(self.f)
+        self.f.write(b"\nendobj\n")
+
+    def agregar(self, fuente, titulo: str = ""):
+        """Agrega todas las páginas de `fuente` (path o archivo)."""
+        reader = PdfReader(fuente)
+        mapa = {}
+        pendientes = []
+
+        def ref(ind):
+            clave = (ind.idnum, ind.generation)
+            if clave not in mapa:
+                mapa[clave] = self._nuevo_id()
+                pendientes.append(ind)
+            return _ref(mapa[clave])
+
+        def copiar(obj):
+            if isinstance(obj, IndirectObject):
+                return ref(obj)
+            if isinstance(obj, StreamObject):
+                nuevo = StreamObject()
+                nuevo._data = obj._data
+                for k, v in obj.items():
+                    # /Length lo recalcula write_to_stream
+                    if k != "/Length":
+                        nuevo[NameObject(k)] = copiar(v)
+                return nuevo
+            if isinstance(obj, DictionaryObject):
+                return DictionaryObject(
+                    {NameObject(k): copiar(v) for k, v in obj.items()}
+                )
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(copiar(v) for v in obj)
+            return obj
+
+        # reader.pages ya trae heredados (/Resources, /MediaBox) en cada
+        # página; /Parent pasa a ser el árbol del combinado
+        paginas = {}
+        for page in reader.pages:
+            paginas[page.indirect_reference.idnum] = page
+            self.paginas.append(ref(page.indirect_reference).idnum)
+        if titulo and paginas:
+            self.marcadores.append((titulo, self.paginas[-len(paginas)]))
+
+        while pendientes:
+            ind = pendientes.pop()
+            if ind.idnum in paginas:
+                obj = DictionaryObject(
+                    {
+                        NameObject(k): copiar(v)
+                        for k, v in paginas[ind.idnum].items()
+                        if k != "/Parent"
+                    }
+                )
+                obj[NameObject("/Parent")] = _ref(self.PAGINAS)
+            else:
+                obj = copiar(ind.get_object())
+            self._escribir(mapa[(ind.idnum, ind.generation)], obj)
+
+    def cerrar(self):
+        self._escribir(
+            self.PAGINAS,
+            DictionaryObject(
+                {
+                    NameObject("/Type"): NameObject("/Pages"),
+                    NameObject("/Kids"): ArrayObject(_ref(n) for n in self.paginas),
+                    NameObject("/Count"): NumberObject(len(self.paginas)),
+                }
+            ),
+        )
+
+        ids = [self._nuevo_id() for _ in self.marcadores]
+        for i, (titulo, pagina) in enumerate(self.marcadores):
+            item = DictionaryObject(
+                {
+                    NameObject("/Title"): create_string_object(titulo),
+                    NameObject("/Parent"): _ref(self.OUTLINE),
+                    NameObject("/Dest"): ArrayObject([_ref(pagina), NameObject("/Fit")]),
+                }
+            )
+            if i:
+                item[NameObject("/Prev")] = _ref(ids[i - 1])
+            if i < len(ids) - 1:
+                item[NameObject("/Next")] = _ref(ids[i + 1])
+            self._escribir(ids[i], item)
+
+        outline = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Outlines"),
+                NameObject("/Count"): NumberObject(len(ids)),
+            }
+        )
+        if ids:
+            outline[NameObject("/First")] = _ref(ids[0])
+            outline[NameObject("/Last")] = _ref(ids[-1])
+        self._escribir(self.OUTLINE, outline)
+
+        self._escribir(
+            self.CATALOGO,
+            DictionaryObject(
+                {
+                    NameObject("/Type"): NameObject("/Catalog"),
+                    NameObject("/Pages"): _ref(self.PAGINAS),
+                    NameObject("/Outlines"): _ref(self.OUTLINE),
+                }
+            ),
+        )
+
+        inicio = self.f.tell()
+        self.f.write(f"xref\n0 {self.siguiente_id}\n".encode())
+        self.f.write(b"0000000000 65535 f \n")
+        for idnum in range(1, self.siguiente_id):
+            self.f.write(f"{self.offsets[idnum]:010d} 00000 n \n".encode())
+        self.f.write(b"trailer\n")
+        DictionaryObject(
+            {
+                NameObject("/Size"): NumberObject(self.siguiente_id),
+                NameObject("/Root"): _ref(self.CATALOGO),
+            }
+        ).write_to_stream(self.f)
+        self.f.write(f"\nstartxref\n{inicio}\n%%EOF\n".encode())
+
+
+# ==========================================================
+# Job
+# ==========================================================
+def _timeout_min() -> int:
+    return getattr(settings, "OT_REPORTE_TIMEOUT_MIN", 15)
+
+
+def generar_reporte(reporte_id: int):
+    # se toma solo si sigue PENDIENTE: uno que recuperar_colgados() ya
+    # dio por perdido (o que tomó otro worker) no se arma dos veces
+    tomado = ReportePDF.objects.filter(
+        pk=reporte_id, estado=ReportePDF.Estado.PENDIENTE
+    ).update(estado=ReportePDF.Estado.PROCESANDO, iniciado=timezone.now())
+    reporte = ReportePDF.objects.get(pk=reporte_id)
+    if not tomado:
+        return reporte
+
+    # corte cooperativo entre OTs: un thread no se puede matar desde afuera
+    limite = time.monotonic() + _timeout_min() * 60
+
+    try:
+        grupos_qs = OrdenTrabajoLuminariaGrupo.objects.select_related(
+            "tablero"
+        ).prefetch_related(
+            Prefetch(
+                "items",
+                queryset=OrdenTrabajoLuminariaItem.objects.order_by("orden", "id"),
+            )
+        )
+        ots = list(
+            filtrar_ots(reporte.filtros)
+            .select_related("pdf")
+            .prefetch_related(
+                Prefetch("luminaria_grupos", queryset=grupos_qs.order_by("orden", "id"))
+            )
+        )
+
+        catalogo = {
+            n.lower() for n in Tablero.objects.values_list("nombre", flat=True)
+        }
+
+        resumen = BytesIO()
+        generar_pdf_resumen(
+            [_fila_resumen(ot) for ot in ots],
+            filtros_txt=_filtros_txt(reporte.filtros),
+            destino=resumen,
+        )
+        resumen.seek(0)
+
+        reutilizados = 0
+
+        def escribir(f):
+            nonlocal reutilizados
+            combinado = _Concatenador(f)
+            combinado.agregar(resumen)
+            for ot in ots:
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"El reporte superó {_timeout_min()} min")
+                path, reutilizado = _pdf_de_ot(ot, catalogo)
+                reutilizados += int(reutilizado)
+                # copia las páginas tal cual: no hay re-render
+                combinado.agregar(path, titulo=f"OT-{ot.id:06d} {ot.tablero}")
+            combinado.cerrar()
+
+        destino = reporte_path(reporte)
+        escribir_atomico(destino, escribir)
+
+        resultado = {
+            "archivo": _rel_media_path(destino),
+            "size_bytes": os.path.getsize(destino),
+            "total_ots": len(ots),
+            "reutilizados": reutilizados,
+            "estado": ReportePDF.Estado.LISTO,
+            "error": "",
+        }
+    except Exception as e:
+        logger.exception("Reporte %s falló", reporte_id)
+        resultado = {
+            "estado": ReportePDF.Estado.ERROR,
+            "error": f"{type(e).__name__}: {e}"[:1000],
+        }
+
+    # solo si la fila sigue siendo de este job: mientras corría pudo
+    # darse por colgada (ERROR) o relanzarse (otro `iniciado`)
+    escrito = ReportePDF.objects.filter(
+        pk=reporte_id,
+        estado=ReportePDF.Estado.PROCESANDO,
+        iniciado=reporte.iniciado,
+    ).update(terminado=timezone.now(), **resultado)
+    if not escrito:
+        logger.warning("Reporte %s cambió mientras se armaba; se descarta", reporte_id)
+
+    reporte.refresh_from_db()
+    return reporte
+
+
+def _job(reporte_id: int):
+    close_old_connections()
+    try:
+        generar_reporte(reporte_id)
+    finally:
+        close_old_connections()
+
+
+def lanzar_reporte(reporte):
+    """
+    Encola el reporte en un pool de threads del proceso (no hay broker).
+    Se lanza en on_commit para que el thread vea la fila ya guardada.
+    """
+    global _executor
+
+    if getattr(settings, "OT_REPORTE_EN_LINEA", False):
+        generar_reporte(reporte.id)
+        reporte.refresh_from_db()
+        return
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "OT_REPORTE_WORKERS", 2),
+            thread_name_prefix="reporte_pdf",
+        )
+
+    reporte_id = reporte.id
+    transaction.on_commit(lambda: _executor.submit(_job, reporte_id))
+
+
+# ==========================================================
+# Jobs colgados (el proceso se reinició a mitad del job)
+# ==========================================================
+def colgados(minutos: int = None):
+    """PENDIENTE / PROCESANDO desde hace más de `minutos`."""
+    if minutos is None:
+        minutos = getattr(settings, "OT_REPORTE_COLGADO_MIN", 30)
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return ReportePDF.objects.filter(
+        Q(estado=ReportePDF.Estado.PENDIENTE, creado__lt=limite)
+        | Q(estado=ReportePDF.Estado.PROCESANDO, iniciado__lt=limite)
+        # filas de antes de que existiera `iniciado`
+        | Q(
+            estado=ReportePDF.Estado.PROCESANDO,
+            iniciado__isnull=True,
+            creado__lt=limite,
+        )
+    )
+
+
+def recuperar_colgados(minutos: int = None, ids=None) -> int:
+    """
+    Pasa a ERROR los reportes colgados; devuelve cuántos. El límite tiene
+    que ser mayor que OT_REPORTE_TIMEOUT_MIN: un job vivo se corta solo
+    antes de llegar.
+    """
+    qs = colgados(minutos)
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+    return qs.update(
+        estado=ReportePDF.Estado.ERROR,
+        error="Interrumpido: el proceso que armaba el reporte se reinició.",
+        terminado=timezone.now(),
+    )
@@ -1,17 +1,21 @@
-import re
+from django.db.models import Q
+from django.db.models.functions import Lower
 from rest_framework import serializers
 
 from historial.models import Tablero
 
 from .models import (
+    ALCANCE_CHOICES,
+    Evidencia,
     OrdenTrabajo,
     OrdenTrabajoLuminariaGrupo,
     OrdenTrabajoLuminariaItem,
+    PDF_PERFIL_CHOICES,
     RAMAL_CHOICES,
+    ReportePDF,
 )
+from .luminarias import es_codigo_valido, extraer_codigos
 
-# Extrae códigos tipo: PC4026, CC4105, GP0012, etc.
-CODE_RE = re.compile(r"\b[A-Z]{1,4}\d{3,6}\b")
 
 
 class OrdenTrabajoLuminariaItemSerializer(serializers.ModelSerializer):
@@ -27,13 +31,42 @@ class OrdenTrabajoLuminariaItemSerializer(serializers.ModelSerializer):
         ]
 
 
+def resolver_tableros(refs):
+    """
+    refs = [(tablero_id, nombre), ...] -> [Tablero | None, ...]
+    Un solo query para todos los grupos: ids por IN y nombres por
+    lower(nombre) IN (equivale al iexact que se hacía grupo por grupo).
+    """
+    ids = {i for i, _ in refs if i}
+    nombres = {n.lower() for i, n in refs if not i and n}
+    if not ids and not nombres:
+        return [None] * len(refs)
+
+    filtro = Q(id__in=ids) if ids else Q()
+    if nombres:
+        filtro |= Q(nombre_lower__in=nombres)
+
+    por_id = {}
+    por_nombre = {}
+    qs = Tablero.objects.annotate(nombre_lower=Lower("nombre")).filter(filtro)
+    for t in qs:
+        por_id[t.id] = t
+        # mismo desempate que .first() con el ordering por nombre
+        por_nombre.setdefault(t.nombre.lower(), t)
+
+    return [
+        por_id.get(i) if i else por_nombre.get((n or "").lower())
+        for i, n in refs
+    ]
+
+
 class OrdenTrabajoLuminariaGrupoSerializer(serializers.Serializer):
-    # Puede venir id directo
-    tablero_id = serializers.PrimaryKeyRelatedField(
-        queryset=Tablero.objects.all(),
-        source="tablero_obj",
+    # Puede venir id directo (se resuelve junto con el resto de los grupos,
+    # no un query por grupo)
+    tablero_id = serializers.IntegerField(
         required=False,
         allow_null=True,
+        min_value=1,
     )
 
     # O puede venir el nombre del tablero desde el frontend
@@ -81,16 +114,26 @@ class OrdenTrabajoLuminariaGrupoSerializer(serializers.Serializer):
         Acepta:
         - tablero_id (preferido)
         - o tablero por nombre exacto/iexact
+
+        Anidado en OrdenTrabajoSerializer solo guarda la referencia: la OT
+        resuelve todos los grupos en un query (ver resolver_tableros).
         """
-        tablero_obj = attrs.get("tablero_obj")
-        tablero_nombre = str(attrs.get("tablero") or "").strip()
+        ref = (
+            attrs.pop("tablero_id", None),
+            str(attrs.get("tablero") or "").strip(),
+        )
 
-        if not tablero_obj and tablero_nombre:
-            tablero_obj = Tablero.objects.filter(nombre__iexact=tablero_nombre).first()
+        if self.parent is not None:
+            attrs["tablero"] = None
+            attrs["_tablero_ref"] = ref
+            return attrs
 
         # Normalizamos todo a la key final 'tablero'
-        attrs["tablero"] = tablero_obj
-        attrs.pop("tablero_obj", None)
+        (attrs["tablero"],) = resolver_tableros([ref])
+        if ref[0] and attrs["tablero"] is None:
+            raise serializers.ValidationError(
+                {"tablero_id": f"Tablero inexistente ({ref[0]})."}
+            )
 
         return attrs
 
@@ -107,7 +150,24 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
         required=False,
         write_only=True,
     )
+    # Evidencias ya subidas por POST /api/evidencias/ (reemplazan al base64)
+    fotos_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        write_only=True,
+    )
+    firma_tecnico_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        write_only=True,
+    )
     print_mode = serializers.BooleanField(required=False, write_only=True)
+    perfil_pdf = serializers.ChoiceField(
+        choices=PDF_PERFIL_CHOICES,
+        required=False,
+        allow_blank=True,
+        write_only=True,
+    )
 
     codigos_luminarias = serializers.ListField(
         child=serializers.CharField(),
@@ -115,6 +175,10 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
         allow_empty=True,
     )
 
+    # CharField y no ChoiceField: validate_alcance normaliza lo que mandan
+    # clientes viejos / la cola offline en vez de rechazarlo
+    alcance = serializers.CharField(required=False, allow_blank=True, max_length=20)
+
     luminarias_por_tablero = OrdenTrabajoLuminariaGrupoSerializer(
         many=True,
         required=False,
@@ -130,6 +194,7 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
             "fecha",
             "ubicacion",
             "tablero",
+            "tablero_ref",
             "zona",
             "circuito",
             "vehiculo",
@@ -158,11 +223,15 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
             "luminaria_estado",
             "firma_tecnico_img",
             "fotos_b64",
+            "fotos_ids",
+            "firma_tecnico_id",
             "print_mode",
+            "perfil_pdf",
             "luminarias_por_tablero",
         ]
         read_only_fields = [
             "id",
+            "tablero_ref",
             "creado",
             "fotos",
             "firma_tecnico_path",
@@ -182,7 +251,6 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
             "observaciones": {"required": False, "allow_blank": True},
             "firma_tecnico": {"required": False, "allow_blank": True},
             "firma_supervisor": {"required": False, "allow_blank": True},
-            "alcance": {"required": False, "allow_blank": True},
             "resultado": {"required": False, "allow_blank": True},
             "estado_tablero": {"required": False, "allow_blank": True},
             "luminaria_estado": {"required": False, "allow_blank": True},
@@ -200,6 +268,16 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
                 )
         return value
 
+    def validate_alcance(self, value):
+        """
+        " luminaria" -> "LUMINARIA"; lo que no es una opción conocida
+        ("correctivo", texto libre viejo) queda como OTRO.
+        """
+        value = (value or "").strip().upper()
+        if value and value not in dict(ALCANCE_CHOICES):
+            return "OTRO"
+        return value
+
     def validate_tecnicos(self, value):
         if value in (None, "", []):
             return []
@@ -278,6 +356,12 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
         """
         alcance = str(attrs.get("alcance") or "").strip().upper()
 
+        fotos_ids = attrs.get("fotos_ids") or []
+        if len(set(fotos_ids)) != len(fotos_ids):
+            raise serializers.ValidationError({"fotos_ids": "Fotos repetidas."})
+        if len(fotos_ids) + len(attrs.get("fotos_b64") or []) > 4:
+            raise serializers.ValidationError({"fotos_ids": "Máximo 4 fotos."})
+
         # normalizar codigo_luminaria (compat)
         if "codigo_luminaria" in attrs and attrs["codigo_luminaria"] is not None:
             attrs["codigo_luminaria"] = str(attrs["codigo_luminaria"]).strip().upper()
@@ -328,70 +412,7 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
                         }
                     )
 
-                for i, grupo in enumerate(luminarias_por_tablero):
-                    tablero = grupo.get("tablero")
-                    if not tablero:
-                        raise serializers.ValidationError(
-                            {
-                                "luminarias_por_tablero": (
-                                    f"Grupo {i+1}: tablero obligatorio."
-                                )
-                            }
-                        )
-
-                    ramal = str(grupo.get("ramal") or "").strip()
-                    if not ramal:
-                        raise serializers.ValidationError(
-                            {
-                                "luminarias_por_tablero": (
-                                    f"Grupo {i+1}: ramal obligatorio."
-                                )
-                            }
-                        )
-
-                    items = grupo.get("items") or []
-                    if not items:
-                        raise serializers.ValidationError(
-                            {
-                                "luminarias_por_tablero": (
-                                    f"Grupo {i+1}: cargá al menos una luminaria."
-                                )
-                            }
-                        )
-
-                    seen_codes = set()
-                    for j, item in enumerate(items):
-                        codigo = str(item.get("codigo_luminaria") or "").strip().upper()
-                        if not codigo:
-                            raise serializers.ValidationError(
-                                {
-                                    "luminarias_por_tablero": (
-                                        f"Grupo {i+1}, item {j+1}: código obligatorio."
-                                    )
-                                }
-                            )
-
-                        if not CODE_RE.match(codigo):
-                            raise serializers.ValidationError(
-                                {
-                                    "luminarias_por_tablero": (
-                                        f"Grupo {i+1}, item {j+1}: "
-                                        f"código inválido ({codigo})."
-                                    )
-                                }
-                            )
-
-                        if codigo in seen_codes:
-                            raise serializers.ValidationError(
-                                {
-                                    "luminarias_por_tablero": (
-                                        f"Grupo {i+1}: código repetido ({codigo})."
-                                    )
-                                }
-                            )
-
-                        seen_codes.add(codigo)
-                        item["codigo_luminaria"] = codigo
+                self._validar_grupos(luminarias_por_tablero)
 
                 # si viene estructura nueva, anulamos compat vieja
                 attrs["codigos_luminarias"] = []
@@ -435,25 +456,198 @@ class OrdenTrabajoSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def _validar_grupos(self, grupos):
+        """
+        Resuelve los tableros de todos los grupos en un query y valida
+        tablero, ramal, códigos y repetidos en una sola pasada.
+        """
+        pendientes = [i for i, g in enumerate(grupos) if "_tablero_ref" in g]
+        if pendientes:
+            refs = [grupos[i].pop("_tablero_ref") for i in pendientes]
+            for i, ref, tablero in zip(pendientes, refs, resolver_tableros(refs)):
+                if ref[0] and tablero is None:
+                    raise serializers.ValidationError(
+                        {
+                            "luminarias_por_tablero": (
+                                f"Grupo {i + 1}: tablero inexistente ({ref[0]})."
+                            )
+                        }
+                    )
+                grupos[i]["tablero"] = tablero
+
+        match = es_codigo_valido
+
+        for i, grupo in enumerate(grupos, start=1):
+            if not grupo.get("tablero"):
+                raise serializers.ValidationError(
+                    {"luminarias_por_tablero": f"Grupo {i}: tablero obligatorio."}
+                )
+
+            if not str(grupo.get("ramal") or "").strip():
+                raise serializers.ValidationError(
+                    {"luminarias_por_tablero": f"Grupo {i}: ramal obligatorio."}
+                )
+
+            items = grupo.get("items") or []
+            if not items:
+                raise serializers.ValidationError(
+                    {
+                        "luminarias_por_tablero": (
+                            f"Grupo {i}: cargá al menos una luminaria."
+                        )
+                    }
+                )
+
+            seen_codes = set()
+            for j, item in enumerate(items, start=1):
+                codigo = str(item.get("codigo_luminaria") or "").strip().upper()
+                if not codigo:
+                    error = f"Grupo {i}, item {j}: código obligatorio."
+                elif not match(codigo):
+                    error = f"Grupo {i}, item {j}: código inválido ({codigo})."
+                elif codigo in seen_codes:
+                    error = f"Grupo {i}: código repetido ({codigo})."
+                else:
+                    seen_codes.add(codigo)
+                    item["codigo_luminaria"] = codigo
+                    continue
+
+                raise serializers.ValidationError({"luminarias_por_tablero": error})
+
     def validate_luminaria_equipos(self, value):
         v = (value or "").strip()
         if not v:
             return ""
 
         has_any_alnum = any(ch.isalnum() for ch in v)
-        codes = CODE_RE.findall(v.upper())
+        codes = extraer_codigos(v)
 
         if has_any_alnum and not codes:
             raise serializers.ValidationError(
                 "Formato inválido. Cargá códigos tipo PC4026 separados por coma."
             )
 
-        seen = set()
-        out = []
-        for c in codes:
-            if c in seen:
-                continue
-            seen.add(c)
-            out.append(c)
+        return ", ".join(codes)
+
+
+# ==========================================================
+# Lectura: listado de OTs
+# ==========================================================
+class OrdenTrabajoRowEncoder:
+    """
+    Camino de lectura del listado: codifica dicts de .values() con la misma
+    salida que OrdenTrabajoSerializer(ot).data, sin instanciar el
+    serializer (ni sus campos write-only / anidados) por fila.
+
+    Los campos salen del propio OrdenTrabajoSerializer (los no write-only),
+    así que un campo nuevo en Meta.fields aparece acá sin tocar nada. Solo
+    los que necesitan formato (decimales, fechas, listas) pasan por el
+    to_representation del campo DRF, instanciado una sola vez.
+    """
+
+    # formato = identidad para el resto (CharField, IntegerField, JSONField)
+    _CON_FORMATO = (
+        serializers.DecimalField,
+        serializers.DateTimeField,
+        serializers.DateField,
+        serializers.ListField,
+    )
+
+    EXTRA = {
+        "creado_por_legajo": "created_by__username",
+        "creado_por_nombre": "created_by__profile__nombre_completo",
+    }
+
+    def __init__(self):
+        campos = [
+            (name, field)
+            for name, field in OrdenTrabajoSerializer().fields.items()
+            if not field.write_only
+        ]
+        self.fields = [name for name, _ in campos]
+        self._formatos = {
+            name: field.to_representation
+            for name, field in campos
+            if isinstance(field, self._CON_FORMATO)
+        }
+
+    def values(self, qs):
+        return qs.values(*self.fields, *self.EXTRA.values())
+
+    def encode(self, row: dict) -> dict:
+        out = {}
+        formatos = self._formatos
+        for name in self.fields:
+            value = row[name]
+            # igual que Serializer.to_representation: None no se formatea
+            if value is not None and name in formatos:
+                value = formatos[name](value)
+            out[name] = value
+
+        for key, src in self.EXTRA.items():
+            out[key] = row[src] or ""
+        return out
+
+    def encode_many(self, rows):
+        encode = self.encode
+        return [encode(row) for row in rows]
+
 
-        return ", ".join(out)
+class EvidenciaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Evidencia
+        fields = [
+            "id",
+            "tipo",
+            "content_type",
+            "size_bytes",
+            "sha256",
+            "creado",
+        ]
+
+
+# ==========================================================
+# Reporte combinado multi-OT
+# ==========================================================
+class ReporteFiltroSerializer(serializers.Serializer):
+    tablero = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    zona = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    ramal = serializers.ChoiceField(
+        choices=RAMAL_CHOICES, required=False, allow_blank=True
+    )
+    desde = serializers.DateField(required=False, allow_null=True)
+    hasta = serializers.DateField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if not any(attrs.get(k) for k in ("tablero", "zona", "ramal", "desde", "hasta")):
+            raise serializers.ValidationError("Indicá al menos un filtro.")
+
+        desde, hasta = attrs.get("desde"), attrs.get("hasta")
+        if desde and hasta and desde > hasta:
+            raise serializers.ValidationError(
+                {"hasta": "hasta debe ser posterior a desde."}
+            )
+
+        # JSON-friendly para guardar en ReportePDF.filtros
+        return {
+            k: (v.isoformat() if hasattr(v, "isoformat") else v.strip())
+            for k, v in attrs.items()
+            if v
+        }
+
+
+class ReportePDFSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportePDF
+        fields = [
+            "id",
+            "filtros",
+            "estado",
+            "total_ots",
+            "reutilizados",
+            "size_bytes",
+            "error",
+            "creado",
+            "iniciado",
+            "terminado",
+        ]
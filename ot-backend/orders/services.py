@@ -0,0 +1,258 @@
+# orders/services.py
+import os
+import re
+import tempfile
+
+from django.conf import settings
+
+from historial.services import _canon_tablero
+
+from .models import OrdenTrabajoPDF
+from .pdf import PERFILES, generar_pdf, get_perfil
+
+
+# ==========================================================
+# Nombres / rutas de PDF
+# ==========================================================
+def _safe_filename(s: str) -> str:
+    s = (s or "").strip()
+    s = s.replace("/", "-").replace("\\", "-")
+    s = re.sub(r'[:*"<>|?]', "", s)
+    s = re.sub(r"\s+", " ", s)
+    return s[:80] or "OT"
+
+
+def pdf_filename(fecha, tablero, ot_id: int) -> str:
+    fecha = _safe_filename(str(fecha or ""))
+    tablero = _safe_filename(str(tablero or "OT"))
+    return f"OT_{fecha}_{tablero}_{ot_id}.pdf"
+
+
+def pdf_folder(when) -> str:
+    """
+    Carpeta absoluta del PDF: MEDIA_ROOT/ordenes/<año>/<mes>.
+    `when` es el datetime de creación de la OT.
+    """
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        "ordenes",
+        when.strftime("%Y"),
+        when.strftime("%m"),
+    )
+
+
+def _rel_media_path(abs_path: str) -> str:
+    if not abs_path:
+        return ""
+
+    rel = os.path.relpath(abs_path, settings.MEDIA_ROOT)
+    return rel.replace("\\", "/")
+
+
+def pdf_path_para_ot(ot) -> str:
+    return os.path.join(
+        pdf_folder(ot.creado),
+        pdf_filename(ot.fecha, ot.tablero, ot.id),
+    )
+
+
+def escribir_atomico(path: str, content) -> str:
+    """
+    Escribe en un temporal del mismo directorio y hace os.replace:
+    un lector nunca ve un PDF a medio escribir.
+    `content` puede ser bytes o un callable que recibe el archivo abierto
+    (para que el renderer escriba directo, sin armar los bytes en memoria).
+    """
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if callable(content):
+                content(f)
+            else:
+                f.write(content)
+        # mkstemp crea con 0600; el PDF tiene que quedar legible para quien
+        # sirve /media
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    return path
+
+
+def renderizar_pdf(pdf_data: dict, path: str) -> int:
+    """
+    Renderiza directo al archivo final (escritura atómica).
+    Devuelve el tamaño en bytes.
+    """
+    escribir_atomico(path, lambda f: generar_pdf(pdf_data, destino=f))
+    return os.path.getsize(path)
+
+
+def registrar_artefacto_pdf(ot, path: str, perfil: str, size_bytes: int):
+    OrdenTrabajoPDF.objects.update_or_create(
+        ot=ot,
+        defaults={
+            "archivo": _rel_media_path(path),
+            "perfil": perfil,
+            "size_bytes": size_bytes,
+        },
+    )
+
+
+def registrar_artefactos_pdf(rows):
+    """
+    Upsert en bloque de artefactos: rows = [(ot_id, path, perfil, size)].
+    """
+    objs = [
+        OrdenTrabajoPDF(
+            ot_id=ot_id,
+            archivo=_rel_media_path(path),
+            perfil=perfil,
+            size_bytes=size,
+        )
+        for ot_id, path, perfil, size in rows
+    ]
+    if not objs:
+        return
+    OrdenTrabajoPDF.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["ot"],
+        update_fields=["archivo", "perfil", "size_bytes", "generado"],
+    )
+
+
+# ==========================================================
+# Reconstrucción de pdf_data desde la DB
+# ==========================================================
+OT_PDF_FIELDS = [
+    "fecha",
+    "ubicacion",
+    "tablero",
+    "zona",
+    "circuito",
+    "vehiculo",
+    "km_inicial",
+    "km_final",
+    "km_total",
+    "ramal",
+    "km_luminaria",
+    "codigo_luminaria",
+    "codigos_luminarias",
+    "tecnicos",
+    "materiales",
+    "tarea_pedida",
+    "tarea_realizada",
+    "tarea_pendiente",
+    "luminaria_equipos",
+    "observaciones",
+    "firma_tecnico",
+    "firma_supervisor",
+    "alcance",
+    "resultado",
+    "estado_tablero",
+    "luminaria_estado",
+]
+
+
+def _grupos_para_pdf(ot):
+    """
+    Igual forma que _serialize_grupos_for_pdf, pero desde los modelos.
+    Usa los grupos/items prefetcheados si están.
+    """
+    out = []
+    for grupo in ot.luminaria_grupos.all():
+        out.append(
+            {
+                "tablero": grupo.tablero.nombre if grupo.tablero_id else "",
+                "zona": grupo.zona,
+                "circuito": grupo.circuito,
+                "ramal": grupo.ramal,
+                "resultado": grupo.resultado or "COMPLETO",
+                "luminaria_estado": grupo.luminaria_estado,
+                "tarea_pedida": grupo.tarea_pedida,
+                "tarea_realizada": grupo.tarea_realizada,
+                "tarea_pendiente": grupo.tarea_pendiente,
+                "observaciones": grupo.observaciones,
+                "items": [
+                    {
+                        "orden": item.orden,
+                        "codigo_luminaria": item.codigo_luminaria,
+                        "km_luminaria": item.km_luminaria,
+                    }
+                    for item in grupo.items.all()
+                ],
+            }
+        )
+    return out
+
+
+def pdf_data_desde_ot(ot, tablero_catalogado: bool, perfil: str = "default") -> dict:
+    """
+    Arma el dict que consume generar_pdf a partir de una OT persistida.
+    """
+    perfil, _ = get_perfil({"perfil_pdf": perfil})
+
+    data = {f: getattr(ot, f) for f in OT_PDF_FIELDS}
+    data["perfil_pdf"] = perfil
+    data["print_mode"] = bool(PERFILES[perfil]["print_mode"])
+    data["id_ot"] = f"OT-{ot.id:06d}"
+    data["firma_tecnico_path"] = ot.firma_tecnico_path or ""
+    data["fotos_paths"] = list(ot.fotos or [])
+    data["luminarias_por_tablero"] = _grupos_para_pdf(ot)
+    data["tablero_catalogado"] = bool(tablero_catalogado)
+    return data
+
+
+# ==========================================================
+# Backfill de OrdenTrabajo.tablero_ref
+# ==========================================================
+def backfill_tablero_ref(OrdenTrabajo, Tablero, chunk: int = 1000, progreso=None):
+    """
+    Completa tablero_ref de las OTs que no lo tienen, a partir del texto
+    de `tablero`, en tandas de `chunk` ids (keyset, sin OFFSET).
+
+    Recibe los modelos (la migración 0018 tiene su propia copia, con los
+    modelos históricos). `progreso(revisadas, asignadas, total)` se
+    llama después de cada tanda. Devuelve (revisadas, asignadas).
+    """
+    catalogo = {}
+    # orden por -id: con nombres repetidos gana el más viejo (igual que
+    # historial.services.catalogo_tableros)
+    for pk, nombre in Tablero.objects.order_by("-id").values_list("id", "nombre"):
+        catalogo[_canon_tablero(nombre).lower()] = pk
+
+    qs = OrdenTrabajo.objects.filter(tablero_ref__isnull=True).exclude(tablero="")
+    total = qs.count()
+
+    last = revisadas = asignadas = 0
+    while True:
+        batch = list(
+            qs.filter(id__gt=last).order_by("id").values_list("id", "tablero")[:chunk]
+        )
+        if not batch:
+            break
+        last = batch[-1][0]
+
+        # un UPDATE por tablero de la tanda, no uno por OT
+        por_tablero = {}
+        for ot_id, nombre in batch:
+            pk = catalogo.get(_canon_tablero(nombre).lower())
+            if pk:
+                por_tablero.setdefault(pk, []).append(ot_id)
+        for pk, ids in por_tablero.items():
+            asignadas += OrdenTrabajo.objects.filter(id__in=ids).update(tablero_ref_id=pk)
+
+        revisadas += len(batch)
+        if progreso:
+            progreso(revisadas, asignadas, total)
+
+    return revisadas, asignadas
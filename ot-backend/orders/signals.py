@@ -1,8 +1,31 @@
-from django.db.models.signals import post_save
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import OrdenTrabajo
-from historial.services import registrar_historial_desde_ot
+from core.cache import invalidar_al_cambiar
+from core.metrics import span
+from . import consumo, detalle, feed, odometro, productividad
+from .models import (
+    Material,
+    MaterialAlias,
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+from historial.models import HistorialTarea
+from historial.services import registrar_historial_desde_ot, resolver_tablero
+
+logger = logging.getLogger("ot.historial")
+
+# Cache de lecturas (core/cache.py)
+invalidar_al_cambiar(OrdenTrabajo, "luminarias", "stats")
+invalidar_al_cambiar(OrdenTrabajoLuminariaGrupo, "luminarias")
+# "stats": la productividad cuenta luminarias. El alta de una OT corre en
+# cache.agrupar(): sus items invalidan una vez, no una por save()
+invalidar_al_cambiar(OrdenTrabajoLuminariaItem, "luminarias", "stats")
+invalidar_al_cambiar(Material, "materiales")
+invalidar_al_cambiar(MaterialAlias, "materiales")
 
 
 @receiver(post_save, sender=OrdenTrabajo)
@@ -13,16 +36,121 @@ def registrar_historial_al_crear_ot(
         return
 
     try:
-        registrar_historial_desde_ot(
-            {
-                "tablero": instance.tablero,
-                "zona": instance.zona,
-                "circuito": instance.circuito,
-                "fecha": instance.fecha,
-                "tarea_realizada": instance.tarea_realizada,
-                "tarea_pedida": instance.tarea_pedida,
-                "tarea_pendiente": instance.tarea_pendiente,
-            }
+        with span("historial"):
+            registrar_historial_desde_ot(
+                {
+                    "tablero": instance.tablero,
+                    "zona": instance.zona,
+                    "circuito": instance.circuito,
+                    "fecha": instance.fecha,
+                    "tarea_realizada": instance.tarea_realizada,
+                    "tarea_pedida": instance.tarea_pedida,
+                    "tarea_pendiente": instance.tarea_pendiente,
+                }
+            )
+    except Exception:
+        logger.exception(
+            "No se pudo registrar el historial de la OT",
+            extra={"datos": {"ot_id": instance.id}},
         )
-    except Exception as e:
-        print("ERROR HISTORIAL (signal):", e)
+        return
+
+    # tablero nuevo: lo acaba de crear el historial, save() no lo encontró
+    if instance.tablero_ref_id is None:
+        t = resolver_tablero(instance.tablero)
+        if t:
+            instance.tablero_ref_id = t[0]
+            OrdenTrabajo.objects.filter(pk=instance.pk).update(tablero_ref_id=t[0])
+
+
+# ==========================================================
+# Técnicos / materiales en tablas (orders/detalle.py)
+# ==========================================================
+@receiver(post_save, sender=OrdenTrabajo)
+def sincronizar_detalle_ot(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not detalle.CAMPOS & set(update_fields):
+        return
+    detalle.sincronizar([instance], reemplazar=not created)
+
+
+@receiver(pre_delete, sender=OrdenTrabajo)
+def restar_consumo_ot(sender, instance, **kwargs):
+    # las filas se van por CASCADE: antes se restan del rollup
+    consumo.aplicar([], list(instance.materiales_rel.all()))
+
+
+# ==========================================================
+# Productividad por técnico (orders/productividad.py)
+# ==========================================================
+# después de sincronizar_detalle_ot: lee las filas de técnicos ya escritas
+@receiver(post_save, sender=OrdenTrabajo)
+def productividad_ot(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not productividad.CAMPOS & set(update_fields):
+        return
+    productividad.marcar(ots=[instance.id])
+
+
+@receiver(post_delete, sender=OrdenTrabajo)
+def productividad_ot_borrada(sender, instance, **kwargs):
+    # las filas de técnicos ya no están: los pares salen del JSON
+    productividad.marcar(
+        pares=[(t.legajo, t.fecha) for t in detalle.filas_tecnicos(instance)]
+    )
+
+
+@receiver(post_save, sender=OrdenTrabajoLuminariaItem)
+@receiver(post_delete, sender=OrdenTrabajoLuminariaItem)
+def productividad_item(sender, instance, **kwargs):
+    try:
+        ot_id = instance.grupo.ot_id
+    except OrdenTrabajoLuminariaGrupo.DoesNotExist:
+        return
+    productividad.marcar(ots=[ot_id])
+
+
+# ==========================================================
+# Libro de odómetro por vehículo (orders/odometro.py)
+# ==========================================================
+@receiver(post_save, sender=OrdenTrabajo)
+def odometro_ot(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not odometro.CAMPOS & set(update_fields):
+        return
+    odometro.registrar(instance, creada=created)
+
+
+@receiver(pre_delete, sender=OrdenTrabajo)
+def odometro_ot_borrada(sender, instance, **kwargs):
+    # antes del CASCADE: la siguiente lectura se revisa contra su nueva anterior
+    odometro.quitar(instance.pk)
+
+
+# ==========================================================
+# Feed de sync offline (orders/feed.py)
+# ==========================================================
+@receiver(post_save, sender=HistorialTarea)
+@receiver(post_delete, sender=HistorialTarea)
+def feed_historial(sender, instance, **kwargs):
+    feed.marcar(feed.clave_historial(instance.id))
+
+
+@receiver(post_save, sender=OrdenTrabajo)
+@receiver(post_delete, sender=OrdenTrabajo)
+def feed_ot(sender, instance, **kwargs):
+    feed.marcar(feed.clave_luminarias(instance.id))
+
+
+@receiver(post_save, sender=OrdenTrabajoLuminariaGrupo)
+@receiver(post_delete, sender=OrdenTrabajoLuminariaGrupo)
+def feed_grupo(sender, instance, **kwargs):
+    feed.marcar(feed.clave_luminarias(instance.ot_id))
+
+
+@receiver(post_save, sender=OrdenTrabajoLuminariaItem)
+@receiver(post_delete, sender=OrdenTrabajoLuminariaItem)
+def feed_item(sender, instance, **kwargs):
+    # en el alta el grupo ya viene cacheado en la instancia
+    try:
+        ot_id = instance.grupo.ot_id
+    except OrdenTrabajoLuminariaGrupo.DoesNotExist:
+        return
+    feed.marcar(feed.clave_luminarias(ot_id))
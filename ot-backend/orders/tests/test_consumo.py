@@ -0,0 +1,187 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from orders import consumo
+from orders.materiales import normalizar_nombre, normalizar_unidad, parse_cantidad
+from orders.models import (
+    ConsumoMaterialMensual,
+    Material,
+    MaterialAlias,
+    OrdenTrabajo,
+)
+
+User = get_user_model()
+
+
+class ParserTests(SimpleTestCase):
+    def test_quantities(self):
+        for raw, esperado in (
+            ("2", (Decimal("2"), "")),
+            ("2,5", (Decimal("2.5"), "")),
+            ("3 u", (Decimal("3"), "u")),
+            ("10 m", (Decimal("10"), "m")),
+            ("10mts.", (Decimal("10"), "m")),
+            ("1.5 Kilos", (Decimal("1.5"), "kg")),
+            ("dos", (None, "")),
+            ("", (None, "")),
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(parse_cantidad(raw), esperado)
+
+    def test_names_and_units(self):
+        self.assertEqual(normalizar_nombre(" Led-150W  Exterior "), "led 150w exterior")
+        self.assertEqual(normalizar_nombre("Fotocélula"), "fotocelula")
+        self.assertEqual(normalizar_unidad("Unidades"), "u")
+        self.assertEqual(normalizar_unidad("rollo"), "rollo")
+
+
+def crear_ot(fecha, materiales, zona="Zona 1", ramal=""):
+    return OrdenTrabajo.objects.create(
+        fecha=fecha, tablero="TI 1400", zona=zona, ramal=ramal, materiales=materiales
+    )
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.led = Material.objects.create(nombre="Luminaria LED 150W", unidad="u")
+        MaterialAlias.objects.create(material=self.led, alias="LED 150W")
+        MaterialAlias.objects.create(material=self.led, alias="led 150 w")
+
+    def fila(self, **filtro):
+        return ConsumoMaterialMensual.objects.get(**filtro)
+
+    def test_aliases_roll_up_into_the_catalog_material(self):
+        crear_ot("2026-03-05", [{"material": "LED 150W", "cantidad": "2"}])
+        crear_ot("2026-03-20", [{"material": "Led 150 w", "cantidad": "3 u"}])
+
+        fila = self.fila(clave=f"m:{self.led.id}")
+        self.assertEqual(
+            (fila.nombre, fila.unidad, fila.cantidad, fila.lineas, fila.ots),
+            ("Luminaria LED 150W", "u", Decimal("5"), 2, 2),
+        )
+
+    def test_edits_and_deletes_apply_deltas(self):
+        ot = crear_ot("2026-03-05", [{"material": "LED 150W", "cantidad": "2"}])
+        crear_ot("2026-03-06", [{"material": "LED 150W", "cantidad": "1"}])
+
+        ot.materiales = [{"material": "LED 150W", "cantidad": "4"}]
+        ot.save(update_fields=["materiales"])
+        self.assertEqual(self.fila(zona="Zona 1").cantidad, Decimal("5"))
+
+        # cambiar de zona mueve la contribución de fila
+        ot.zona = "Zona 2"
+        ot.save(update_fields=["zona"])
+        self.assertEqual(self.fila(zona="Zona 1").cantidad, Decimal("1"))
+        self.assertEqual(self.fila(zona="Zona 2").cantidad, Decimal("4"))
+
+        ot.delete()
+        self.assertFalse(ConsumoMaterialMensual.objects.filter(zona="Zona 2").exists())
+
+    def test_rebuild_picks_up_new_aliases(self):
+        crear_ot("2026-03-05", [{"material": "Fotocélula", "cantidad": "1"}])
+        crear_ot("2026-04-05", [{"material": "fotocelula", "cantidad": "2"}])
+        foto = Material.objects.create(nombre="Fotocélula NA", unidad="u")
+        MaterialAlias.objects.create(material=foto, alias="Fotocélula")
+        antes = set(ConsumoMaterialMensual.objects.values_list("clave", flat=True))
+        self.assertEqual(antes, {"t:fotocelula"})
+
+        out = StringIO()
+        call_command("reconstruir_consumo_materiales", "--chunk", "1", stdout=out)
+
+        self.assertEqual(
+            list(ConsumoMaterialMensual.objects.values_list("clave", "cantidad")),
+            [(f"m:{foto.id}", Decimal("1")), (f"m:{foto.id}", Decimal("2"))],
+        )
+        self.assertIn("2/2 OTs", out.getvalue())
+
+    def test_failed_rebuild_leaves_the_previous_rollup(self):
+        crear_ot("2026-03-05", [{"material": "LED 150W", "cantidad": "2"}])
+        crear_ot("2026-04-05", [{"material": "LED 150W", "cantidad": "1"}])
+        esperado = list(ConsumoMaterialMensual.objects.values_list("mes", "cantidad"))
+        original = consumo.sumar_ots
+        llamadas = []
+
+        def falla_en_la_segunda(ot_ids):
+            llamadas.append(ot_ids)
+            if len(llamadas) > 1:
+                raise RuntimeError("se cortó")
+            return original(ot_ids)
+
+        with mock.patch.object(consumo, "sumar_ots", falla_en_la_segunda):
+            with self.assertRaises(RuntimeError):
+                call_command(
+                    "reconstruir_consumo_materiales", "--chunk", "1", stdout=StringIO()
+                )
+
+        self.assertEqual(
+            list(ConsumoMaterialMensual.objects.values_list("mes", "cantidad")), esperado
+        )
+
+
+class ConsumoApiTests(APITestCase):
+    url = "/api/materiales/consumo/"
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="1000", password="Admin12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        led = Material.objects.create(nombre="Luminaria LED 150W", unidad="u")
+        MaterialAlias.objects.create(material=led, alias="LED 150W")
+
+        crear_ot("2026-02-10", [{"material": "LED 150W", "cantidad": "1"}], ramal="PILAR")
+        crear_ot(
+            "2026-03-05",
+            [
+                {"material": "LED 150W", "cantidad": "2,5"},
+                {"material": "Cable 2x4", "cantidad": "10 m"},
+            ],
+            ramal="PILAR",
+        )
+        crear_ot(
+            "2026-03-20",
+            [{"material": "LED 150W", "cantidad": "2"}],
+            zona="Zona 2",
+            ramal="CAMPANA",
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_monthly_by_zona(self):
+        res = self.client.get(
+            self.url, {"material": "led 150w", "desde": "2026-03", "por": "mes,zona"}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [(r["mes"], r["zona"], r["cantidad"], r["ots"]) for r in res.data["items"]],
+            [("2026-03", "Zona 1", 2.5, 1), ("2026-03", "Zona 2", 2.0, 1)],
+        )
+        self.assertTrue(res.data["items"][0]["catalogado"])
+
+    def test_totals_by_ramal(self):
+        res = self.client.get(self.url, {"ramal": "PILAR"})
+
+        self.assertEqual(
+            [(r["material"], r["unidad"], r["cantidad"]) for r in res.data["items"]],
+            [("Cable 2x4", "m", 10.0), ("Luminaria LED 150W", "u", 3.5)],
+        )
+
+    def test_answers_from_the_rollup(self):
+        # permisos + token de datos (feed, rollup) + 1 query al rollup
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {"hasta": "2026-02-28"})
+
+    def test_invalid_month_is_400(self):
+        self.assertEqual(self.client.get(self.url, {"desde": "2026-13"}).status_code, 400)
@@ -0,0 +1,152 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from orders.models import OrdenTrabajo, OrdenTrabajoMaterial, OrdenTrabajoTecnico
+
+User = get_user_model()
+
+TECNICOS = [{"legajo": "1234", "nombre": "Ana"}, {"legajo": "5678", "nombre": "Luis"}]
+MATERIALES = [
+    {"material": "LED 150W", "cantidad": "2", "unidad": "u"},
+    {"material": "Cable 2x4", "cantidad": "10 m", "unidad": ""},
+]
+
+
+class SincronizacionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_rows_follow_the_json(self):
+        ot = OrdenTrabajo.objects.create(
+            fecha="2026-03-05", tablero="TI 1400", tecnicos=TECNICOS, materiales=MATERIALES
+        )
+
+        self.assertEqual(
+            list(ot.tecnicos_rel.values_list("legajo", "fecha")),
+            [("1234", date(2026, 3, 5)), ("5678", date(2026, 3, 5))],
+        )
+        self.assertEqual(
+            list(ot.materiales_rel.values_list("material", "cantidad_num")),
+            [("LED 150W", Decimal("2")), ("Cable 2x4", Decimal("10"))],
+        )
+
+        ot.tecnicos = [{"legajo": "9999", "nombre": "Eva"}]
+        ot.save(update_fields=["tecnicos"])
+        self.assertEqual(list(ot.tecnicos_rel.values_list("legajo", flat=True)), ["9999"])
+
+        ot.circuito = "C1"
+        with self.assertNumQueries(2):
+            # UPDATE + feed: las filas no se tocan
+            ot.save(update_fields=["circuito"])
+
+    def test_legacy_entries_are_skipped(self):
+        ot = OrdenTrabajo.objects.create(
+            fecha="2026-03-05",
+            tablero="TI 1400",
+            tecnicos=["Ana", {"legajo": "", "nombre": ""}],
+            materiales=[{"material": ""}],
+        )
+        self.assertFalse(ot.tecnicos_rel.exists())
+        self.assertFalse(ot.materiales_rel.exists())
+
+    def test_backfill_command(self):
+        for _ in range(3):
+            OrdenTrabajo.objects.create(
+                fecha="2026-03-05", tablero="TI 1400", tecnicos=TECNICOS, materiales=MATERIALES
+            )
+        OrdenTrabajoTecnico.objects.all().delete()
+        OrdenTrabajoMaterial.objects.all().delete()
+
+        out = StringIO()
+        call_command("backfill_detalle_ot", "--chunk", "2", stdout=out)
+
+        self.assertEqual(OrdenTrabajoTecnico.objects.count(), 6)
+        self.assertEqual(OrdenTrabajoMaterial.objects.count(), 6)
+        self.assertIn("2/3 OTs", out.getvalue())
+
+        # idempotente
+        call_command("backfill_detalle_ot", stdout=StringIO())
+        self.assertEqual(OrdenTrabajoTecnico.objects.count(), 6)
+
+
+class AgregadosApiTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="1000", password="Admin12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        for dia, tecnicos in ((1, TECNICOS), (2, TECNICOS[:1]), (20, TECNICOS[1:])):
+            OrdenTrabajo.objects.create(
+                fecha=f"2026-03-{dia:02d}",
+                tablero="TI 1400",
+                tecnicos=tecnicos,
+                materiales=MATERIALES,
+            )
+        self.client.force_authenticate(self.admin)
+
+    def test_workload(self):
+        res = self.client.get("/api/tecnicos/carga/", {"hasta": "2026-03-10"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [(r["legajo"], r["ots"]) for r in res.data["items"]],
+            [("1234", 2), ("5678", 1)],
+        )
+
+    def test_consumption(self):
+        res = self.client.get("/api/materiales/consumo/", {"material": "led  150w"})
+
+        self.assertEqual(
+            res.data["items"],
+            [
+                {
+                    "material": "LED 150W",
+                    "catalogado": False,
+                    "unidad": "u",
+                    "ots": 3,
+                    "lineas": 3,
+                    "cantidad": 6.0,
+                    "sin_cantidad": 0,
+                }
+            ],
+        )
+
+    def test_new_ot_invalidates_the_cache(self):
+        self.client.get("/api/materiales/consumo/")
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-21", tablero="TI 1400", materiales=MATERIALES[:1]
+        )
+
+        res = self.client.get("/api/materiales/consumo/", {})
+        led = [r for r in res.data["items"] if r["material"] == "LED 150W"][0]
+        self.assertEqual(led["cantidad"], 8.0)
+
+    def test_list_filter_by_legajo(self):
+        res = self.client.get("/api/ordenes/", {"legajo": "5678"})
+        self.assertEqual(
+            sorted(o["fecha"] for o in res.data), ["2026-03-01", "2026-03-20"]
+        )
+
+    def test_invalid_date_is_400(self):
+        res = self.client.get("/api/tecnicos/carga/", {"desde": "03/2026"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_admin_only(self):
+        tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+        self.client.force_authenticate(tech)
+
+        self.assertEqual(self.client.get("/api/tecnicos/carga/").status_code, 403)
@@ -0,0 +1,320 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image as PILImage
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import Tablero
+from orders.evidencias import resolver_evidencias
+from orders.models import Evidencia, EvidenciaUpload, OrdenTrabajo
+
+User = get_user_model()
+
+
+def _imagen(fmt="JPEG", size=(64, 48)):
+    buf = BytesIO()
+    PILImage.new("RGB", size, (200, 120, 40)).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class EvidenciasUploadTests(APITestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="evidencias_test_")
+        self._override = override_settings(MEDIA_ROOT=self._tmp.name)
+        self._override.enable()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        self.other = User.objects.create_user(username="8175", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.other)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+
+        self.url = "/api/evidencias/"
+        self.client.force_authenticate(user=self.tech)
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def subir_multipart(self, raw, tipo="FOTO"):
+        archivo = SimpleUploadedFile("foto.jpg", raw, content_type="image/jpeg")
+        return self.client.post(
+            self.url, {"archivo": archivo, "tipo": tipo}, format="multipart"
+        )
+
+    def ot_payload(self, **extra):
+        payload = {
+            "fecha": "2026-03-15",
+            "tablero": "TI 1400",
+            "zona": "Zona 1",
+            "tecnicos": [{"legajo": "8174", "nombre": "Tecnico Campo"}],
+            "materiales": [],
+            "alcance": "TABLERO",
+            "resultado": "COMPLETO",
+            "estado_tablero": "OPERATIVO",
+        }
+        payload.update(extra)
+        return payload
+
+    def test_multipart_upload_streams_to_disk(self):
+        raw = _imagen()
+        response = self.subir_multipart(raw)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        evid = Evidencia.objects.get(pk=response.data["id"])
+        self.assertEqual(evid.content_type, "image/jpeg")
+        self.assertEqual(evid.size_bytes, len(raw))
+        self.assertEqual(evid.sha256, hashlib.sha256(raw).hexdigest())
+        self.assertEqual(evid.created_by, self.tech)
+
+        with open(os.path.join(self._tmp.name, evid.archivo), "rb") as f:
+            self.assertEqual(f.read(), raw)
+
+    def test_raw_body_upload(self):
+        raw = _imagen("PNG")
+        response = self.client.post(
+            f"{self.url}?tipo=firma", data=raw, content_type="image/png"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(response.data["tipo"], Evidencia.Tipo.FIRMA)
+        self.assertEqual(response.data["content_type"], "image/png")
+
+    @override_settings(OT_EVIDENCIA_MAX_BYTES=1024)
+    def test_rejects_oversized_upload_without_leaving_files(self):
+        raw = _imagen(size=(600, 600))
+        self.assertGreater(len(raw), 1024)
+
+        response = self.client.post(self.url, data=raw, content_type="image/jpeg")
+        self.assertEqual(
+            response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        self.assertFalse(Evidencia.objects.exists())
+
+        archivos = [f for _, _, fs in os.walk(self._tmp.name) for f in fs]
+        self.assertEqual(archivos, [])
+
+    def test_rejects_non_image(self):
+        response = self.client.post(
+            self.url, data=b"%PDF-1.4 no soy foto", content_type="application/octet-stream"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Evidencia.objects.exists())
+
+    def test_ot_references_uploaded_evidence(self):
+        foto_id = self.subir_multipart(_imagen()).data["id"]
+        firma_id = self.subir_multipart(_imagen("PNG"), tipo="FIRMA").data["id"]
+
+        response = self.client.post(
+            "/api/ordenes/pdf/",
+            self.ot_payload(fotos_ids=[foto_id], firma_tecnico_id=firma_id),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ot = OrdenTrabajo.objects.get()
+        foto = Evidencia.objects.get(pk=foto_id)
+        firma = Evidencia.objects.get(pk=firma_id)
+        self.assertEqual(ot.fotos, [foto.archivo])
+        self.assertEqual(ot.firma_tecnico_path, firma.archivo)
+        self.assertEqual({foto.ot_id, firma.ot_id}, {ot.id})
+
+        # una evidencia no se puede reutilizar en otra OT
+        response = self.client.post(
+            "/api/ordenes/pdf/", self.ot_payload(fotos_ids=[foto_id]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_plain_create_links_uploaded_evidence(self):
+        foto_id = self.subir_multipart(_imagen()).data["id"]
+        firma_id = self.subir_multipart(_imagen("PNG"), tipo="FIRMA").data["id"]
+
+        response = self.client.post(
+            "/api/ordenes/",
+            self.ot_payload(fotos_ids=[foto_id], firma_tecnico_id=firma_id),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        ot = OrdenTrabajo.objects.get()
+        self.assertEqual(ot.fotos, [Evidencia.objects.get(pk=foto_id).archivo])
+        self.assertEqual(ot.firma_tecnico_path, Evidencia.objects.get(pk=firma_id).archivo)
+        self.assertEqual(
+            set(Evidencia.objects.values_list("ot_id", flat=True)), {ot.id}
+        )
+
+        response = self.client.post(
+            "/api/ordenes/", self.ot_payload(fotos_ids=[foto_id]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(OrdenTrabajo.objects.count(), 1)
+
+    def test_evidence_claimed_by_a_concurrent_sync_is_not_stolen(self):
+        foto_id = self.subir_multipart(_imagen()).data["id"]
+        otra = OrdenTrabajo.objects.create(fecha="2026-03-14", tablero="TI 1400")
+
+        def resolver_y_ganar(*args, **kwargs):
+            out = resolver_evidencias(*args, **kwargs)
+            # el otro sync toma la foto entre la validación y el alta
+            Evidencia.objects.filter(pk=foto_id).update(ot=otra)
+            return out
+
+        with mock.patch("orders.views.resolver_evidencias", side_effect=resolver_y_ganar):
+            response = self.client.post(
+                "/api/ordenes/sync/",
+                {"ordenes": [self.ot_payload(fotos_ids=[foto_id])]},
+                format="json",
+            )
+
+        self.assertEqual(response.data["results"][0]["status"], "error")
+        self.assertEqual(Evidencia.objects.get(pk=foto_id).ot_id, otra.id)
+        self.assertEqual(list(OrdenTrabajo.objects.values_list("id", flat=True)), [otra.id])
+
+    def test_ot_rejects_evidence_from_other_user(self):
+        self.client.force_authenticate(user=self.other)
+        foto_id = self.subir_multipart(_imagen()).data["id"]
+
+        self.client.force_authenticate(user=self.tech)
+        response = self.client.post(
+            "/api/ordenes/pdf/", self.ot_payload(fotos_ids=[foto_id]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrdenTrabajo.objects.exists())
+
+
+class EvidenciasUploadReanudableTests(APITestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="uploads_test_")
+        self._override = override_settings(MEDIA_ROOT=self._tmp.name)
+        self._override.enable()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+        self.client.force_authenticate(user=self.tech)
+
+        self.raw = _imagen(size=(300, 300))
+        self.sha = hashlib.sha256(self.raw).hexdigest()
+        self.url = "/api/evidencias/uploads/"
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def init(self, **extra):
+        body = {"size": len(self.raw), "sha256": self.sha}
+        body.update(extra)
+        response = self.client.post(self.url, body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data["id"]
+
+    def put(self, upload_id, start, data):
+        end = start + len(data) - 1
+        return self.client.put(
+            f"{self.url}{upload_id}/",
+            data=data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(self.raw)}",
+        )
+
+    def test_upload_resumes_from_last_acknowledged_byte(self):
+        upload_id = self.init()
+        corte = len(self.raw) // 3
+
+        response = self.put(upload_id, 0, self.raw[:corte])
+        self.assertEqual(response.data["offset"], corte)
+
+        # el cliente se reconecta y pregunta dónde quedó
+        response = self.client.get(f"{self.url}{upload_id}/")
+        self.assertEqual(response.data["offset"], corte)
+
+        # reintentar desde 0 no se acepta: 409 con el offset correcto
+        response = self.put(upload_id, 0, self.raw)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], corte)
+
+        response = self.put(upload_id, corte, self.raw[corte:])
+        self.assertEqual(response.data["offset"], len(self.raw))
+
+        response = self.client.post(
+            f"{self.url}{upload_id}/finalizar/", {"sha256": self.sha}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        evid = Evidencia.objects.get(pk=response.data["id"])
+        with open(os.path.join(self._tmp.name, evid.archivo), "rb") as f:
+            self.assertEqual(f.read(), self.raw)
+        self.assertFalse(EvidenciaUpload.objects.exists())
+
+    def test_finalize_requires_complete_upload(self):
+        upload_id = self.init()
+        self.put(upload_id, 0, self.raw[:100])
+
+        response = self.client.post(f"{self.url}{upload_id}/finalizar/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 100)
+
+    def test_sha_mismatch_restarts_upload(self):
+        upload_id = self.init(sha256="0" * 64)
+        self.put(upload_id, 0, self.raw)
+
+        response = self.client.post(f"{self.url}{upload_id}/finalizar/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(EvidenciaUpload.objects.get(pk=upload_id).recibido, 0)
+        self.assertFalse(Evidencia.objects.exists())
+
+    def test_chunk_beyond_declared_size_is_rejected(self):
+        upload_id = self.init()
+        response = self.put(upload_id, 0, self.raw + b"extra")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OT_EVIDENCIA_MAX_BYTES=1024)
+    def test_init_rejects_oversized_declaration(self):
+        response = self.client.post(self.url, {"size": 4096}, format="json")
+        self.assertEqual(
+            response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    def test_other_user_cannot_touch_upload(self):
+        upload_id = self.init()
+
+        other = User.objects.create_user(username="8175", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=other)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+        self.client.force_authenticate(user=other)
+
+        response = self.put(upload_id, 0, self.raw)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cleanup_command_removes_stale_uploads(self):
+        upload_id = self.init()
+        self.put(upload_id, 0, self.raw[:100])
+        upload = EvidenciaUpload.objects.get(pk=upload_id)
+        parcial = os.path.join(self._tmp.name, upload.parcial)
+        self.assertTrue(os.path.exists(parcial))
+
+        EvidenciaUpload.objects.filter(pk=upload_id).update(
+            actualizado=timezone.now() - timedelta(days=10)
+        )
+        call_command("limpiar_uploads", stdout=StringIO())
+
+        self.assertFalse(EvidenciaUpload.objects.exists())
+        self.assertFalse(os.path.exists(parcial))
@@ -0,0 +1,187 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import HistorialTarea, Tablero
+from orders.models import (
+    CambioFeed,
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+
+User = get_user_model()
+
+
+@override_settings(OT_CHANGES_OVERLAP_S=0)
+class HistorialFeedTests(APITestCase):
+    url = "/api/historial/feed/"
+
+    def setUp(self):
+        cache.clear()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        self.t1 = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        self.t2 = Tablero.objects.create(nombre="TI 1500", zona="Zona 2")
+        self.client.force_authenticate(self.tech)
+
+    def payload_luminarias(self):
+        grupo = {
+            "zona": "Zona 1",
+            "circuito": "C1",
+            "resultado": "COMPLETO",
+            "luminaria_estado": "OPERATIVA",
+            "items": [{"codigo_luminaria": "PC4026", "km_luminaria": 12.5}],
+        }
+        return {
+            "fecha": "2026-03-15",
+            "tablero": self.t1.nombre,
+            "zona": "Zona 1",
+            "alcance": "LUMINARIA",
+            "resultado": "COMPLETO",
+            "luminaria_estado": "OPERATIVA",
+            "luminarias_por_tablero": [
+                {**grupo, "tablero": self.t1.nombre, "ramal": "PILAR"},
+                {
+                    **grupo,
+                    "tablero": self.t2.nombre,
+                    "zona": "Zona 2",
+                    "ramal": "CAMPANA",
+                    "items": [{"codigo_luminaria": "CC4105", "km_luminaria": 3}],
+                },
+            ],
+        }
+
+    def test_creating_an_ot_writes_one_row_per_key(self):
+        res = self.client.post("/api/ordenes/", self.payload_luminarias(), format="json")
+        self.assertEqual(res.status_code, 201)
+
+        hist = HistorialTarea.objects.get()
+        self.assertEqual(
+            sorted(CambioFeed.objects.values_list("clave", flat=True)),
+            sorted([f"h:{hist.id}", f"l:{res.data['id']}"]),
+        )
+
+    def test_pull_returns_columnar_rows_and_advances(self):
+        self.client.post("/api/ordenes/", self.payload_luminarias(), format="json")
+
+        res = self.client.get(self.url, {"since": 0})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.data["more"])
+        lum = res.data["luminarias"]
+        self.assertEqual(lum["codigo"], ["PC4026", "CC4105"])
+        self.assertEqual(lum["km"], [12.5, 3.0])
+        self.assertEqual(len(set(lum["clave"])), 1)
+        self.assertEqual(res.data["historial"]["tablero"], ["TI 1400"])
+
+        res = self.client.get(self.url, {"since": res.data["token"]})
+        self.assertEqual(res.data["claves"], [])
+        self.assertEqual(res.data["luminarias"]["codigo"], [])
+
+    def test_scope_by_zona_and_ramal(self):
+        self.client.post("/api/ordenes/", self.payload_luminarias(), format="json")
+
+        res = self.client.get(self.url, {"ramal": "CAMPANA"})
+        self.assertEqual(res.data["luminarias"]["codigo"], ["CC4105"])
+        # el historial no tiene ramal: no se filtra
+        self.assertEqual(len(res.data["historial"]["id"]), 1)
+
+        res = self.client.get(self.url, {"zona": "zona 2"})
+        self.assertEqual(res.data["luminarias"]["codigo"], ["CC4105"])
+        self.assertEqual(res.data["historial"]["id"], [])
+
+    def test_zona_falls_back_to_the_tablero_like_the_row(self):
+        sin_zona = HistorialTarea.objects.create(tablero=self.t2, fecha=date(2026, 3, 5))
+        HistorialTarea.objects.create(
+            tablero=self.t2, fecha=date(2026, 3, 5), zona="Zona 3", fingerprint="x"
+        )
+
+        res = self.client.get(self.url, {"zona": "zona 2"})
+
+        self.assertEqual(res.data["historial"]["id"], [sin_zona.id])
+        self.assertEqual(res.data["historial"]["zona"], ["Zona 2"])
+
+    def test_pruning_keeps_what_every_token_would_pull(self):
+        hist = HistorialTarea.objects.create(tablero=self.t1, fecha=date(2026, 3, 5))
+        otra = HistorialTarea.objects.create(
+            tablero=self.t1, fecha=date(2026, 3, 5), fingerprint="x"
+        )
+        hist.descripcion = "editada"
+        hist.save()
+        borrada = HistorialTarea.objects.create(
+            tablero=self.t2, fecha=date(2026, 3, 5), fingerprint="y"
+        )
+        borrada_id = borrada.id
+        borrada.delete()
+        hist.descripcion = "otra vez"
+        hist.save()
+
+        tokens = [0, *CambioFeed.objects.values_list("id", flat=True)]
+        antes = {t: self.client.get(self.url, {"since": t}).data["claves"] for t in tokens}
+
+        out = StringIO()
+        call_command("podar_feed", stdout=out)
+
+        self.assertEqual(
+            sorted(CambioFeed.objects.values_list("clave", flat=True)),
+            sorted([f"h:{hist.id}", f"h:{otra.id}", f"h:{borrada_id}"]),
+        )
+        self.assertIn("Feed podado: 3/6", out.getvalue())
+        for t in tokens:
+            res = self.client.get(self.url, {"since": t})
+            self.assertEqual(sorted(res.data["claves"]), sorted(antes[t]), t)
+
+    def test_edits_and_deletes_reannounce_the_key(self):
+        ot = OrdenTrabajo.objects.create(
+            fecha="2026-03-05", tablero="TI 1400", alcance="LUMINARIA"
+        )
+        grupo = OrdenTrabajoLuminariaGrupo.objects.create(ot=ot, tablero=self.t1)
+        item = OrdenTrabajoLuminariaItem.objects.create(grupo=grupo, codigo_luminaria="PC4026")
+        token = self.client.get(self.url).data["token"]
+
+        item.delete()
+        res = self.client.get(self.url, {"since": token})
+        self.assertEqual(res.data["claves"], [f"l:{ot.id}"])
+        self.assertEqual(res.data["luminarias"]["codigo"], [])
+
+        hist = HistorialTarea.objects.create(tablero=self.t1, fecha=date(2026, 3, 5))
+        hist_id = hist.id
+        hist.delete()
+        res = self.client.get(self.url, {"since": res.data["token"]})
+        self.assertEqual(res.data["claves"], [f"h:{hist_id}"])
+        self.assertEqual(res.data["historial"]["id"], [])
+
+    def test_pagination(self):
+        for i in range(60):
+            HistorialTarea.objects.create(
+                tablero=self.t1, fecha=date(2026, 3, 5), fingerprint=str(i)
+            )
+
+        res = self.client.get(self.url, {"limit": 50})
+        self.assertTrue(res.data["more"])
+        self.assertEqual(len(res.data["historial"]["id"]), 50)
+
+        res = self.client.get(self.url, {"limit": 50, "since": res.data["token"]})
+        self.assertFalse(res.data["more"])
+        self.assertEqual(len(res.data["historial"]["id"]), 10)
+
+    @override_settings(OT_CHANGES_OVERLAP_S=60)
+    def test_recent_rows_wait_for_the_overlap(self):
+        HistorialTarea.objects.create(tablero=self.t1, fecha=date(2026, 3, 5))
+
+        res = self.client.get(self.url)
+        self.assertEqual((res.data["claves"], res.data["token"]), ([], "0"))
+
+    def test_invalid_token_is_400(self):
+        self.assertEqual(self.client.get(self.url, {"since": "-1"}).status_code, 400)
@@ -0,0 +1,134 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core import explain
+from core.testing import ExplainMixin
+from historial.models import HistorialTarea, Tablero
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+from orders.reportes import filtrar_ots
+from orders.serializers import OrdenTrabajoSerializer
+
+User = get_user_model()
+
+
+class ExplainHelpersTests(SimpleTestCase):
+    databases = {"default"}
+
+    def test_sqlite_full_scan_detection(self):
+        lineas = [
+            "SCAN orders_ordentrabajo",
+            "SCAN orders_ordentrabajo USING INDEX orders_orde_alcance_3e6b2b_idx",
+            "SEARCH historial_tablero USING INTEGER PRIMARY KEY (rowid=?)",
+        ]
+        self.assertEqual(
+            explain.recorridos_completos(lineas, "orders_ordentrabajo", "sqlite"),
+            ["SCAN orders_ordentrabajo"],
+        )
+
+    def test_postgres_full_scan_detection(self):
+        lineas = ["Limit", "  ->  Seq Scan on historial_historialtarea  (cost=...)"]
+        self.assertTrue(
+            explain.recorridos_completos(lineas, "historial_historialtarea", "postgresql")
+        )
+
+    def test_unfiltered_aggregates_are_not_checked(self):
+        tabla = "orders_ordentrabajo"
+        self.assertFalse(explain.filtra_tabla(f'SELECT COUNT(*) FROM "{tabla}"', tabla))
+        self.assertTrue(
+            explain.filtra_tabla(f'SELECT "id" FROM "{tabla}" WHERE "id" = 1', tabla)
+        )
+
+    def test_harness_flags_a_missing_index(self):
+        # "ubicacion" no tiene índice: el mixin tiene que fallar
+        caso = type("Caso", (ExplainMixin, TestCase), {"runTest": lambda self: None})()
+        with self.assertRaises(AssertionError):
+            with caso.assertUsesIndex("orders_ordentrabajo"):
+                list(OrdenTrabajo.objects.filter(ubicacion="x"))
+
+
+class AlcanceNormalizationTests(TestCase):
+    def test_alcance_is_upper_case_choice(self):
+        for raw, esperado in (
+            (" luminaria", "LUMINARIA"),
+            ("Tablero", "TABLERO"),
+            ("correctivo", "OTRO"),
+            ("", ""),
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(OrdenTrabajoSerializer().validate_alcance(raw), esperado)
+
+
+class EndpointIndexTests(ExplainMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        for i in range(5):
+            ot = OrdenTrabajo.objects.create(
+                fecha=date(2026, 3, 1 + i), tablero="TI 1400", alcance="LUMINARIA"
+            )
+            grupo = OrdenTrabajoLuminariaGrupo.objects.create(ot=ot, tablero=self.tablero)
+            OrdenTrabajoLuminariaItem.objects.create(grupo=grupo, codigo_luminaria="PC4026")
+            HistorialTarea.objects.create(
+                tablero=self.tablero,
+                fecha=date(2026, 3, 1 + i),
+                circuito=f"FD{i % 2}",
+                fingerprint=str(i),
+            )
+
+        self.client.force_authenticate(self.admin)
+
+    def test_luminarias_historial(self):
+        with self.assertUsesIndex("orders_ordentrabajo"):
+            res = self.client.get(
+                "/api/luminarias/historial/", {"from": "2026-03-02", "to": "2026-03-04"}
+            )
+        self.assertEqual(len(res.data), 3)
+
+    def test_historial_by_tablero(self):
+        with self.assertUsesIndex("historial_historialtarea"):
+            res = self.client.get("/api/historial/", {"tablero": "TI 1400"})
+        # 5 a mano + 5 de las OT (signal)
+        self.assertEqual(res.data["count"], 10)
+
+    def test_circuitos_frecuentes(self):
+        with self.assertUsesIndex("historial_historialtarea"):
+            res = self.client.get("/api/tableros/circuitos/", {"tablero": "TI 1400"})
+        self.assertEqual(len(res.data["items"]), 2)
+
+    def test_reporte_by_date_range(self):
+        with self.assertUsesIndex("orders_ordentrabajo"):
+            ots = list(filtrar_ots({"desde": "2026-03-02", "hasta": "2026-03-03"}))
+        self.assertEqual(len(ots), 2)
+
+    def test_luminaria_children_by_fk(self):
+        with self.assertUsesIndex("orders_ordentrabajoluminariaitem"):
+            self.client.get("/api/luminarias/historial/")
+
+    def test_case_insensitive_lookups_use_upper_indexes_on_postgres(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("iexact en SQLite es LIKE: no usa índices de expresión")
+
+        with self.assertUsesIndex("historial_tablero"):
+            list(Tablero.objects.filter(nombre__iexact="ti 1400"))
+        with self.assertUsesIndex("orders_ordentrabajo"):
+            list(filtrar_ots({"tablero": "ti 1400"}))
+        with self.assertUsesIndex("historial_historialtarea"):
+            list(HistorialTarea.objects.filter(circuito__icontains="fd"))
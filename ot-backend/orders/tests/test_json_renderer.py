@@ -0,0 +1,122 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core.renderers import ORJSONParser, ORJSONRenderer
+from orders.benchmarks_api import BACKENDS_JSON, medir_json, recolectar_payloads
+from orders.models import OrdenTrabajo
+
+User = get_user_model()
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def data(self):
+        return {
+            "km": Decimal("12.30"),
+            "fecha": date(2026, 3, 5),
+            "creado": datetime(2026, 3, 5, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "lazy": gettext_lazy("Técnico"),
+            "texto": "línea\u2028otra\u2029",
+            1: "clave int",
+            "lista": [None, True, 1.5, {"a": []}],
+        }
+
+    def test_output_matches_drf_json_renderer(self):
+        data = self.data()
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indent_is_honoured(self):
+        out = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertIn(b"\n", out)
+        self.assertEqual(json.loads(out), {"a": 1})
+
+    def test_big_ints_fall_back_to_stdlib(self):
+        data = {"n": 2**70}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @override_settings(OT_JSON_ORJSON=False)
+    def test_stdlib_fallback_when_disabled(self):
+        data = self.data()
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def test_parses_like_drf(self):
+        body = '{"tablero": "TI 1400", "km": 1.5, "items": [1, null]}'.encode()
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in (b"{", b'{"km": NaN}'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
+
+    def test_non_utf8_charset_uses_stdlib(self):
+        body = '{"zona": "Ñandú"}'.encode("latin-1")
+        data = ORJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": "latin-1"}
+        )
+        self.assertEqual(data, {"zona": "Ñandú"})
+
+
+class JSONEndpointTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-05", tablero="TI 1400", km_total=Decimal("9.5")
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_list_body_is_byte_identical_to_stdlib(self):
+        res = self.client.get("/api/ordenes/")
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(res.content, JSONRenderer().render(res.data))
+
+    def test_json_body_goes_through_orjson_parser(self):
+        res = self.client.post(
+            "/api/ordenes/sync/", data=b"{no es json", content_type="application/json"
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("JSON parse error", res.data["detail"])
+
+
+class JSONBenchmarkTests(TestCase):
+    def test_harness_measures_every_payload_and_backend(self):
+        payloads = recolectar_payloads(filas=20, sync_filas=1)
+        self.assertEqual(
+            set(payloads), {"ordenes_listado", "luminarias_historial", "sync_body"}
+        )
+        self.assertEqual(len(payloads["ordenes_listado"]), 20)
+        self.assertFalse(OrdenTrabajo.objects.exists())
+
+        result = medir_json(payloads, iteraciones=1, warmup=0)
+        self.assertEqual(len(result["results"]), 3 * len(BACKENDS_JSON))
+
+        por_payload = {}
+        for row in result["results"]:
+            por_payload.setdefault(row["payload"], set()).add(row["size_bytes"])
+        # mismo JSON con los dos backends
+        self.assertTrue(all(len(sizes) == 1 for sizes in por_payload.values()))
@@ -0,0 +1,142 @@
+import random
+import re
+
+from django.test import SimpleTestCase
+
+from orders.luminarias import (
+    _parse_cached,
+    es_codigo_valido,
+    extraer_codigos,
+    parse_luminaria_codes,
+    parse_luminaria_codes_many,
+)
+
+# ==========================================================
+# Implementaciones originales (referencia para comparar)
+# ==========================================================
+_OLD_VIEWS_RE = re.compile(r"\b([A-Z]{2,4}\s*-?\s*\d{3,6})\b", re.IGNORECASE)
+_OLD_SERIALIZER_RE = re.compile(r"\b[A-Z]{1,4}\d{3,6}\b")
+
+
+def _old_parse_luminaria_codes(text):
+    if not text:
+        return []
+
+    s = str(text).upper()
+    found = _OLD_VIEWS_RE.findall(s)
+
+    out = []
+    seen = set()
+    for raw in found:
+        code = re.sub(r"[\s\-]+", "", raw.strip().upper())
+        if not code:
+            continue
+        if code in seen:
+            continue
+        seen.add(code)
+        out.append(code)
+    return out
+
+
+def _old_extraer(text):
+    seen = set()
+    out = []
+    for c in _OLD_SERIALIZER_RE.findall(text.upper()):
+        if c in seen:
+            continue
+        seen.add(c)
+        out.append(c)
+    return out
+
+
+# Alfabeto sesgado hacia lo que aparece en luminaria_equipos reales, más
+# algunos caracteres no ASCII que cambian con upper() o son dígitos Unicode.
+_ALFABETO = (
+    "PCGTKAB" * 4
+    + "pcgtab" * 2
+    + "0123456789" * 5
+    + " -,;/\n\t" * 3
+    + "ßſıñÁé٣K_."
+)
+
+
+def _texto_random(rng):
+    partes = []
+    for _ in range(rng.randint(0, 8)):
+        if rng.random() < 0.5:
+            letras = "".join(rng.choice("PCGTpcgt") for _ in range(rng.randint(1, 5)))
+            sep = rng.choice(["", " ", "-", " - ", "  ", "\t"])
+            digitos = "".join(rng.choice("0123456789") for _ in range(rng.randint(2, 7)))
+            partes.append(letras + sep + digitos)
+        else:
+            partes.append("".join(rng.choice(_ALFABETO) for _ in range(rng.randint(0, 12))))
+    return rng.choice([", ", " ", ";", "\n", ""]).join(partes)
+
+
+class LuminariaCodesEquivalenceTests(SimpleTestCase):
+    """
+    Propiedad: para cualquier texto, el módulo nuevo devuelve exactamente
+    lo mismo que los dos parsers originales.
+    """
+
+    def setUp(self):
+        _parse_cached.cache_clear()
+
+    def test_tolerant_parser_matches_original(self):
+        rng = random.Random(20260301)
+        for _ in range(5000):
+            text = _texto_random(rng)
+            self.assertEqual(
+                parse_luminaria_codes(text),
+                _old_parse_luminaria_codes(text),
+                msg=repr(text),
+            )
+
+    def test_strict_extraction_matches_original(self):
+        rng = random.Random(20260302)
+        for _ in range(5000):
+            text = _texto_random(rng)
+            self.assertEqual(extraer_codigos(text), _old_extraer(text), msg=repr(text))
+
+    def test_strict_validation_matches_original(self):
+        rng = random.Random(20260303)
+        for _ in range(5000):
+            code = _texto_random(rng).strip().upper()[:12]
+            self.assertEqual(
+                es_codigo_valido(code),
+                bool(_OLD_SERIALIZER_RE.match(code)),
+                msg=repr(code),
+            )
+
+    def test_known_examples(self):
+        self.assertEqual(
+            parse_luminaria_codes("pc 4026, PC-4027; cc4105 PC4026"),
+            ["PC4026", "PC4027", "CC4105"],
+        )
+        self.assertEqual(parse_luminaria_codes(""), [])
+        self.assertEqual(parse_luminaria_codes(None), [])
+
+
+class LuminariaCodesCacheTests(SimpleTestCase):
+    def setUp(self):
+        _parse_cached.cache_clear()
+
+    def test_repeated_texts_hit_the_cache(self):
+        for _ in range(10):
+            parse_luminaria_codes("PC4026, PC4027")
+
+        info = _parse_cached.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 9)
+
+    def test_results_are_independent_copies(self):
+        first = parse_luminaria_codes("PC4026")
+        first.append("XX0000")
+        self.assertEqual(parse_luminaria_codes("PC4026"), ["PC4026"])
+
+    def test_batch_api_keeps_order(self):
+        texts = ["PC4026", "", None, "cc 4105, PC4026", "PC4026"]
+        self.assertEqual(
+            parse_luminaria_codes_many(texts),
+            [["PC4026"], [], [], ["CC4105", "PC4026"], ["PC4026"]],
+        )
@@ -0,0 +1,115 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core.renderers import ColumnarRenderer, columnar
+from historial.models import Tablero
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+
+User = get_user_model()
+
+
+def decodificar(payload):
+    filas = [{} for _ in range(payload["n"])]
+    for nombre, valores in payload["columns"].items():
+        tabla = payload["dicts"].get(nombre)
+        for fila, v in zip(filas, valores):
+            fila[nombre] = tabla[v] if tabla is not None else v
+    return filas
+
+
+class ColumnarTests(SimpleTestCase):
+    def test_dictionary_encoding(self):
+        filas = [
+            {"zona": "Zona 1", "km": 1.5},
+            {"zona": "Zona 2", "km": None},
+            {"zona": "Zona 1", "km": 2},
+        ]
+
+        out = columnar(filas, ("zona",))
+
+        self.assertEqual(out["columns"], {"zona": [0, 1, 0], "km": [1.5, None, 2]})
+        self.assertEqual(out["dicts"], {"zona": ["Zona 1", "Zona 2"]})
+        self.assertEqual(decodificar(out), filas)
+
+    def test_non_list_payloads_render_as_plain_json(self):
+        body = ColumnarRenderer().render({"detail": "x"})
+        self.assertEqual(json.loads(body), {"detail": "x"})
+
+    def test_empty_list(self):
+        self.assertEqual(
+            json.loads(ColumnarRenderer().render([])),
+            {"n": 0, "columns": {}, "dicts": {}},
+        )
+
+
+class LuminariasColumnarApiTests(APITestCase):
+    url = "/api/luminarias/historial/"
+
+    def setUp(self):
+        cache.clear()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        for n in range(3):
+            ot = OrdenTrabajo.objects.create(
+                fecha="2026-03-05", tablero="TI 1400", alcance="LUMINARIA"
+            )
+            grupo = OrdenTrabajoLuminariaGrupo.objects.create(
+                ot=ot, tablero=tablero, zona="Zona 1", ramal="PILAR"
+            )
+            for i in range(4):
+                OrdenTrabajoLuminariaItem.objects.create(
+                    grupo=grupo, orden=i, codigo_luminaria=f"PC{4000 + n * 10 + i}"
+                )
+        # modo viejo
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-06",
+            tablero="TI 1400",
+            alcance="LUMINARIA",
+            ramal="CAMPANA",
+            codigos_luminarias=["CC4105"],
+        )
+
+        self.client.force_authenticate(self.tech)
+
+    def test_columnar_decodes_to_the_same_rows(self):
+        filas = self.client.get(self.url).json()
+        res = self.client.get(self.url, {"format": "columnar"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/json")
+        payload = res.json()
+        self.assertEqual(payload["n"], 13)
+        self.assertEqual(payload["dicts"]["tablero"], ["TI 1400"])
+        self.assertEqual(decodificar(payload), filas)
+
+    def test_columnar_is_smaller(self):
+        plano = self.client.get(self.url).content
+        compacto = self.client.get(self.url, {"format": "columnar"}).content
+        self.assertLess(len(compacto), len(plano) * 0.6)
+
+    def test_formats_do_not_share_an_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        res = self.client.get(self.url, {"format": "columnar"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_filters_still_apply(self):
+        payload = self.client.get(self.url, {"format": "columnar", "ramal": "CAMPANA"}).json()
+        self.assertEqual(decodificar(payload)[0]["codigo"], "CC4105")
+        self.assertEqual(payload["n"], 1)
@@ -0,0 +1,148 @@
+import json
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core import metrics
+from historial.models import Tablero
+
+User = get_user_model()
+
+# PNG 1x1
+PNG_B64 = (
+    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR4"
+    "2mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def _usuario(username, role, **kwargs):
+    user = User.objects.create_user(username=username, password="Clave12345!", **kwargs)
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+    profile.role = role
+    profile.save()
+    return user
+
+
+def _server_timing(header: str) -> dict:
+    out = {}
+    for parte in header.split(","):
+        nombre, *params = parte.strip().split(";")
+        dur = next(p for p in params if p.startswith("dur="))
+        out[nombre] = float(dur[4:])
+    return out
+
+
+class MetricsHelpersTests(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_quantiles_interpolate(self):
+        for ms in range(1, 101):
+            metrics.observar("v", "pdf", float(ms))
+
+        fila = metrics.resumen()[("v", "pdf")]
+        self.assertAlmostEqual(fila["p50"], 50.5)
+        self.assertAlmostEqual(fila["p95"], 95.05)
+        self.assertAlmostEqual(fila["p99"], 99.01)
+        self.assertEqual(fila["count"], 100)
+
+    def test_span_outside_a_request_is_a_noop(self):
+        with metrics.span("pdf"):
+            pass
+        self.assertEqual(metrics.resumen(), {})
+
+    def test_repeated_spans_accumulate(self):
+        with metrics.recolectar() as spans:
+            for _ in range(3):
+                with metrics.span("b64"):
+                    pass
+
+        self.assertEqual(spans.veces["b64"], 3)
+        self.assertIn('b64;dur=', spans.server_timing())
+        self.assertIn('desc="x3"', spans.server_timing())
+
+    def test_json_formatter_merges_datos(self):
+        record = logging.LogRecord("ot.timing", logging.INFO, "", 0, "request", None, None)
+        record.datos = {"view": "ordenes", "ms": 1.5}
+
+        out = json.loads(metrics.JSONFormatter().format(record))
+
+        self.assertEqual(out["msg"], "request")
+        self.assertEqual(out["view"], "ordenes")
+        self.assertEqual(out["logger"], "ot.timing")
+
+
+class RequestTimingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+        self.tech = _usuario("8174", UserProfile.Role.TECHNICIAN)
+        self.admin = _usuario("1000", UserProfile.Role.ADMIN, is_staff=True)
+        self.tablero = Tablero.objects.create(nombre="TC20 Septiembre", zona="Zona 1")
+
+    def payload(self):
+        return {
+            "fecha": "2026-03-15",
+            "tablero": self.tablero.nombre,
+            "zona": "Zona 1",
+            "circuito": "C1",
+            "tarea_realizada": "Se ajustaron bornes",
+            "alcance": "TABLERO",
+            "resultado": "COMPLETO",
+            "estado_tablero": "OPERATIVO",
+            "firma_tecnico_img": PNG_B64,
+            "fotos_b64": [],
+        }
+
+    def test_pdf_request_reports_phases(self):
+        self.client.force_authenticate(self.tech)
+
+        with self.assertLogs("ot.timing", level="INFO") as logs:
+            res = self.client.post("/api/ordenes/pdf/", self.payload(), format="json")
+
+        self.assertEqual(res.status_code, 200)
+        fases = _server_timing(res["Server-Timing"])
+        for fase in ("validate", "b64", "evidencias", "db", "historial", "pdf", "total"):
+            self.assertIn(fase, fases)
+        self.assertLessEqual(fases["pdf"], fases["total"])
+
+        registro = logs.records[-1]
+        self.assertEqual(registro.datos["view"], "ordenes-pdf")
+        self.assertEqual(registro.datos["status"], 200)
+        self.assertIn("pdf", registro.datos["spans"])
+
+        self.assertIn(("ordenes-pdf", "pdf"), metrics.resumen())
+
+    def test_validation_errors_are_logged_not_printed(self):
+        self.client.force_authenticate(self.tech)
+        payload = self.payload()
+        payload["fecha"] = "no-es-fecha"
+
+        with self.assertLogs("ot.ordenes", level="INFO") as logs:
+            res = self.client.post("/api/ordenes/pdf/", payload, format="json")
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("fecha", logs.records[0].datos["errores"])
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_authenticate(self.tech)
+        self.client.get("/api/tableros/")
+
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        res = self.client.get("/api/metrics/")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = res.content.decode()
+        self.assertIn("# TYPE ot_request_phase_seconds summary", body)
+        self.assertIn(
+            'ot_request_phase_seconds_count{view="tableros_list",phase="total"} 1', body
+        )
+        self.assertIn('ot_cache_misses_total{namespace="tableros"}', body)
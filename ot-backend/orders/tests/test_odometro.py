@@ -0,0 +1,268 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import Tablero
+from orders.models import KmVehiculoMensual, LecturaOdometro, OrdenTrabajo
+from orders import odometro
+from orders.odometro import normalizar_vehiculo
+
+User = get_user_model()
+
+
+def crear_ot(fecha, km_inicial, km_final, vehiculo="AB 123 CD", **extra):
+    return OrdenTrabajo.objects.create(
+        fecha=fecha,
+        tablero="TI 1400",
+        vehiculo=vehiculo,
+        km_inicial=km_inicial,
+        km_final=km_final,
+        **extra,
+    )
+
+
+def fuera():
+    return set(
+        LecturaOdometro.objects.filter(fuera_de_secuencia=True).values_list(
+            "ot_id", flat=True
+        )
+    )
+
+
+def meses():
+    return {
+        (m.vehiculo, m.mes.strftime("%Y-%m")): (m.km, m.ots, m.fuera_de_secuencia)
+        for m in KmVehiculoMensual.objects.all()
+    }
+
+
+class NormalizarTests(SimpleTestCase):
+    def test_vehicle_key(self):
+        self.assertEqual(normalizar_vehiculo(" ab 123-cd "), "AB123CD")
+        self.assertEqual(normalizar_vehiculo("M-01"), "M01")
+        self.assertEqual(normalizar_vehiculo(None), "")
+
+
+class LibroTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_readings_in_order_roll_up_by_month(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        crear_ot("2026-03-03", "1050", "1120.5", vehiculo="ab-123-cd")
+        crear_ot("2026-04-01", "1120.5", "1200")
+
+        self.assertEqual(fuera(), set())
+        self.assertEqual(
+            meses(),
+            {
+                ("AB123CD", "2026-03"): (Decimal("120.50"), 2, 0),
+                ("AB123CD", "2026-04"): (Decimal("79.50"), 1, 0),
+            },
+        )
+
+    def test_backdated_reading_flags_its_successor_until_removed(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        siguiente = crear_ot("2026-03-03", "1050", "1100")
+
+        # cargada tarde, con km de después: la del 03/03 ahora retrocede
+        tardia = crear_ot("2026-03-02", "2000", "2100")
+        self.assertEqual(fuera(), {siguiente.id})
+        aviso = LecturaOdometro.objects.get(ot=siguiente).avisos[0]
+        self.assertEqual((aviso["tipo"], aviso["ot_anterior"]), ("retroceso", tardia.id))
+        self.assertEqual(meses()[("AB123CD", "2026-03")][2], 1)
+
+        tardia.delete()
+        self.assertEqual(fuera(), set())
+        self.assertEqual(meses()[("AB123CD", "2026-03")], (Decimal("100.00"), 2, 0))
+
+    def test_reading_without_km_final_is_checked_against_the_previous_day(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        # arranca debajo de donde terminó la del 01/03; sin km_final
+        abierta = crear_ot("2026-03-02", "990", None)
+        bien = crear_ot("2026-03-03", "1050", None)
+
+        self.assertEqual(fuera(), {abierta.id})
+        self.assertNotIn(bien.id, fuera())
+
+        # la del mismo día que terminó antes de donde arranca pasa a ser
+        # su anterior (y la que retrocede es esa)
+        cerrada = crear_ot("2026-03-02", "900", "980")
+        self.assertEqual(fuera(), {cerrada.id})
+
+    def test_backdated_reading_rechecks_readings_without_km_final(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        abierta = crear_ot("2026-03-03", "1050", None)
+
+        tardia = crear_ot("2026-03-02", "2000", "2100")
+        self.assertEqual(fuera(), {abierta.id})
+        aviso = LecturaOdometro.objects.get(ot=abierta).avisos[0]
+        self.assertEqual((aviso["tipo"], aviso["ot_anterior"]), ("retroceso", tardia.id))
+
+        tardia.delete()
+        self.assertEqual(fuera(), set())
+
+    def test_edits_move_the_reading(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        ot = crear_ot("2026-03-03", "1050", "1100")
+
+        ot.km_inicial = Decimal("900")
+        ot.save(update_fields=["km_inicial"])
+        self.assertEqual(fuera(), {ot.id})
+
+        # otro vehículo: deja la secuencia del primero
+        ot.vehiculo = "XY 999 ZZ"
+        ot.save(update_fields=["vehiculo"])
+        self.assertEqual(fuera(), set())
+        self.assertEqual(
+            set(meses()), {("AB123CD", "2026-03"), ("XY999ZZ", "2026-03")}
+        )
+
+        ot.vehiculo = ""
+        ot.save(update_fields=["vehiculo"])
+        self.assertFalse(LecturaOdometro.objects.filter(ot=ot).exists())
+        self.assertEqual(set(meses()), {("AB123CD", "2026-03")})
+
+    def test_inconsistent_km_are_flagged_on_the_reading(self):
+        al_reves = crear_ot("2026-03-01", "1100", "1000", vehiculo="M-01")
+        no_cuadra = crear_ot("2026-03-01", "500", "600", vehiculo="M-02", km_total="40")
+        solo_total = crear_ot("2026-03-01", None, None, vehiculo="M-03", km_total="35")
+
+        lecturas = {l.ot_id: l for l in LecturaOdometro.objects.all()}
+        self.assertEqual(lecturas[al_reves.id].avisos[0]["tipo"], "km_final_menor")
+        self.assertEqual(lecturas[no_cuadra.id].avisos[0]["tipo"], "km_total")
+        self.assertEqual(lecturas[no_cuadra.id].km, Decimal("100.00"))
+        self.assertEqual(lecturas[solo_total.id].km, Decimal("35.00"))
+        self.assertEqual(lecturas[solo_total.id].avisos, [])
+
+    def test_rebuild_matches_incremental(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        crear_ot("2026-03-03", "1050", "1100")
+        crear_ot("2026-03-02", "2000", "2100")
+        crear_ot("2026-04-01", "10", "20", vehiculo="M-01", km_total="15")
+        crear_ot("2026-04-01", None, None, vehiculo="", km_total="15")
+        crear_ot("2026-03-04", "1050", None)
+        crear_ot("2026-03-03", "1100", None)
+        libro = list(
+            LecturaOdometro.objects.values_list(
+                "ot_id", "km", "fuera_de_secuencia", "avisos"
+            ).order_by("ot_id")
+        )
+        esperado = meses()
+        LecturaOdometro.objects.update(fuera_de_secuencia=False, avisos=[])
+        KmVehiculoMensual.objects.all().delete()
+
+        out = StringIO()
+        call_command("reconstruir_odometro", "--chunk", "2", stdout=out)
+
+        self.assertEqual(
+            list(
+                LecturaOdometro.objects.values_list(
+                    "ot_id", "km", "fuera_de_secuencia", "avisos"
+                ).order_by("ot_id")
+            ),
+            libro,
+        )
+        self.assertEqual(meses(), esperado)
+        self.assertIn("Lecturas fuera de secuencia: 2", out.getvalue())
+
+    def test_failed_rebuild_leaves_the_previous_book(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        crear_ot("2026-03-02", "1050", "1100")
+        lecturas = list(LecturaOdometro.objects.values_list("id", "ot_id", "km"))
+        esperado = meses()
+
+        # falla después de vaciar el libro y recargar las lecturas
+        with mock.patch.object(
+            odometro, "reconstruir_meses", side_effect=RuntimeError("se cortó")
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command("reconstruir_odometro", stdout=StringIO())
+
+        self.assertEqual(
+            list(LecturaOdometro.objects.values_list("id", "ot_id", "km")), lecturas
+        )
+        self.assertEqual(meses(), esperado)
+
+
+class VehiculosApiTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="1000", password="Admin12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        self.client.force_authenticate(self.admin)
+
+    def test_create_returns_km_warnings(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        payload = {
+            "fecha": "2026-03-15",
+            "tablero": "TI 1400",
+            "alcance": "LUMINARIA",
+            "vehiculo": "AB 123 CD",
+            "km_inicial": "990.00",
+            "km_final": "1020.00",
+            "km_total": "30.00",
+            "luminarias_por_tablero": [
+                {
+                    "tablero": "TI 1400",
+                    "zona": "Zona 1",
+                    "ramal": "PILAR",
+                    "items": [{"codigo_luminaria": "PC4026", "km_luminaria": 12.5}],
+                }
+            ],
+        }
+
+        res = self.client.post("/api/ordenes/", payload, format="json")
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual([a["tipo"] for a in res.data["avisos_km"]], ["retroceso"])
+
+    def test_monthly_km_from_the_rollup(self):
+        crear_ot("2026-02-27", "900", "1000")
+        crear_ot("2026-03-01", "1000", "1050")
+        crear_ot("2026-03-02", "10", "30", vehiculo="M-01")
+
+        # permisos + token de datos (feed, rollup) + 1 query al rollup:
+        # no lee OTs ni lecturas
+        with self.assertNumQueries(4):
+            res = self.client.get("/api/vehiculos/km/", {"desde": "2026-03"})
+
+        self.assertEqual(
+            [(r["vehiculo"], r["mes"], r["km"]) for r in res.data["items"]],
+            [("AB123CD", "2026-03", 50.0), ("M01", "2026-03", 20.0)],
+        )
+        res = self.client.get("/api/vehiculos/km/", {"vehiculo": "ab 123 cd"})
+        self.assertEqual([r["mes"] for r in res.data["items"]], ["2026-02", "2026-03"])
+
+    def test_readings_in_sequence_and_out_of_sequence(self):
+        crear_ot("2026-03-01", "1000", "1050")
+        crear_ot("2026-03-03", "1050", "1100")
+        tardia = crear_ot("2026-03-02", "2000", "2100")
+
+        res = self.client.get("/api/vehiculos/lecturas/", {"vehiculo": "AB123CD"})
+        self.assertEqual(
+            [r["fecha"] for r in res.data["items"]],
+            ["2026-03-01", "2026-03-02", "2026-03-03"],
+        )
+
+        res = self.client.get("/api/vehiculos/lecturas/", {"fuera": "1"})
+        self.assertEqual(
+            [r["avisos"][0]["ot_anterior"] for r in res.data["items"]], [tardia.id]
+        )
+
+        self.assertEqual(self.client.get("/api/vehiculos/lecturas/").status_code, 400)
+        self.assertEqual(
+            self.client.get("/api/vehiculos/km/", {"hasta": "2026-13"}).status_code, 400
+        )
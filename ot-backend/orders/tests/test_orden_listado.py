@@ -0,0 +1,106 @@
+import os
+import unittest
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from orders.benchmarks_api import CAMINOS, _listado_serializer, medir_listado_ots
+from orders.models import OrdenTrabajo
+from orders.serializers import OrdenTrabajoRowEncoder
+
+User = get_user_model()
+
+
+class OrdenTrabajoRowEncoderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        profile.nombre_completo = "Técnico Campo"
+        profile.save()
+
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-05",
+            tablero="TI 1400",
+            km_inicial=Decimal("1000.5"),
+            km_final=Decimal("1010"),
+            km_total=Decimal("9.5"),
+            km_luminaria=Decimal("12.3"),
+            codigos_luminarias=["PC4026", "CC4105"],
+            tecnicos=[{"legajo": "8174", "nombre": "Técnico Campo"}],
+            fotos=["evidencias/2026/03/a.jpg"],
+            created_by=self.user,
+        )
+        # sin creador, sin decimales
+        OrdenTrabajo.objects.create(fecha="2026-03-06", tablero="TC20", alcance="TABLERO")
+
+    def test_encoder_matches_serializer_output(self):
+        qs = OrdenTrabajo.objects.order_by("-id")
+        encoder = OrdenTrabajoRowEncoder()
+
+        esperado = _listado_serializer(qs)
+        obtenido = encoder.encode_many(encoder.values(qs))
+
+        self.assertEqual(obtenido, [dict(r) for r in esperado])
+        self.assertEqual(obtenido[1]["km_inicial"], "1000.50")
+        self.assertEqual(obtenido[1]["creado_por_nombre"], "Técnico Campo")
+        self.assertEqual(obtenido[0]["creado_por_legajo"], "")
+
+    def test_encoder_skips_write_only_fields(self):
+        encoder = OrdenTrabajoRowEncoder()
+
+        for campo in ("fotos_b64", "firma_tecnico_img", "luminarias_por_tablero"):
+            self.assertNotIn(campo, encoder.fields)
+
+
+class OrdenListadoEndpointTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.nombre_completo = "Admin"
+        profile.save()
+
+        for i in range(20):
+            OrdenTrabajo.objects.create(
+                fecha="2026-03-05",
+                tablero=f"TC{i}",
+                km_total=Decimal("1.5"),
+                created_by=self.admin,
+            )
+
+        self.client.force_authenticate(self.admin)
+
+    def test_list_uses_single_query_regardless_of_rows(self):
+        # 1 query para el perfil del request (permiso) + 1 para el listado
+        with self.assertNumQueries(2):
+            res = self.client.get("/api/ordenes/")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(res.data[0]["tablero"], "TC19")
+        self.assertEqual(res.data[0]["km_total"], "1.50")
+        self.assertEqual(res.data[0]["creado_por_nombre"], "Admin")
+        self.assertNotIn("fotos_b64", res.data[0])
+
+
+class ListadoBenchmarkTests(TestCase):
+    def test_harness_reports_both_paths_and_rolls_back(self):
+        result = medir_listado_ots(filas=50, iteraciones=1, warmup=0)
+
+        self.assertEqual([r["camino"] for r in result["results"]], list(CAMINOS))
+        for row in result["results"]:
+            self.assertGreater(row["ms_por_1k"], 0)
+        self.assertFalse(OrdenTrabajo.objects.exists())
+        self.assertFalse(User.objects.filter(username="bench_api").exists())
+
+    @unittest.skipUnless(os.getenv("OT_BENCH"), "OT_BENCH=1 para correr el benchmark")
+    def test_encoder_is_faster_than_serializer(self):
+        result = medir_listado_ots(filas=2000, iteraciones=3)
+        serializer, encoder = result["results"]
+        self.assertLess(encoder["p50_ms"], serializer["p50_ms"])
@@ -365,3 +365,76 @@ class OrdenTrabajoLuminariaGrupoSerializerTests(TestCase):
         self.assertTrue(serializer.is_valid(), serializer.errors)
         data = cast(dict[str, Any], serializer.validated_data)
         self.assertEqual(data["tablero"], self.tablero)
+
+    def test_group_serializer_rejects_unknown_tablero_id(self):
+        serializer = OrdenTrabajoLuminariaGrupoSerializer(
+            data={"tablero_id": self.tablero.pk + 999}
+        )
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("tablero_id", serializer.errors)
+
+
+class OrdenTrabajoSerializerQueryCountTests(TestCase):
+    def setUp(self):
+        self.tableros = [
+            Tablero.objects.create(nombre=f"TI {n}00", zona="Zona 1")
+            for n in range(1, 11)
+        ]
+
+    def payload(self, grupos):
+        return {
+            "fecha": "2026-03-15",
+            "tablero": "TI 100",
+            "tecnicos": [{"legajo": "8174", "nombre": "Tecnico Campo"}],
+            "materiales": [],
+            "alcance": "LUMINARIA",
+            "luminarias_por_tablero": grupos,
+        }
+
+    def grupo(self, idx, tablero, por_id):
+        ref = {"tablero_id": tablero.pk} if por_id else {"tablero": tablero.nombre.lower()}
+        return {
+            **ref,
+            "ramal": "PILAR",
+            "items": [
+                {"codigo_luminaria": f"pc{idx}{k:03d}", "km_luminaria": 10 + k}
+                for k in range(20)
+            ],
+        }
+
+    def test_ten_groups_resolve_tableros_in_one_query(self):
+        grupos = [
+            self.grupo(i, t, por_id=(i % 2 == 0)) for i, t in enumerate(self.tableros)
+        ]
+        serializer = OrdenTrabajoSerializer(data=self.payload(grupos))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        data = cast(dict[str, Any], serializer.validated_data)
+        resueltos = [g["tablero"] for g in data["luminarias_por_tablero"]]
+        self.assertEqual(resueltos, self.tableros)
+        self.assertTrue(all("_tablero_ref" not in g for g in data["luminarias_por_tablero"]))
+
+        items = data["luminarias_por_tablero"][3]["items"]
+        self.assertEqual(items[0]["codigo_luminaria"], "PC3000")
+
+    def test_unknown_tablero_id_in_group_is_reported(self):
+        grupos = [
+            self.grupo(0, self.tableros[0], por_id=True),
+            {"tablero_id": 999999, "ramal": "PILAR", "items": [{"codigo_luminaria": "PC1000"}]},
+        ]
+        serializer = OrdenTrabajoSerializer(data=self.payload(grupos))
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("Grupo 2: tablero inexistente", str(serializer.errors))
+
+    def test_unknown_tablero_name_in_group_is_required_error(self):
+        grupos = [
+            {"tablero": "NO EXISTE", "ramal": "PILAR", "items": [{"codigo_luminaria": "PC1000"}]},
+        ]
+        serializer = OrdenTrabajoSerializer(data=self.payload(grupos))
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("Grupo 1: tablero obligatorio", str(serializer.errors))
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from django.test import SimpleTestCase, override_settings
+
+from orders.benchmarks import (
+    CASOS,
+    build_pdf_data,
+    comparar,
+    medir_escalado,
+    run_benchmark,
+)
+
+
+class PdfBenchmarkHarnessTests(SimpleTestCase):
+    """
+    Smoke del harness: corre rápido en la suite normal.
+    La corrida completa se habilita con OT_BENCH=1.
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="bench_pdf_test_")
+        self.media_root = self._tmp.name
+        self._override = override_settings(MEDIA_ROOT=self.media_root)
+        self._override.enable()
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def test_build_pdf_data_distributes_items_across_groups(self):
+        data = build_pdf_data("luminaria_grupos_100", {}, print_mode=True)
+
+        grupos = data["luminarias_por_tablero"]
+        self.assertEqual(len(grupos), CASOS["luminaria_grupos_100"]["grupos"])
+        self.assertEqual(sum(len(g["items"]) for g in grupos), 100)
+
+        codigos = [i["codigo_luminaria"] for g in grupos for i in g["items"]]
+        self.assertEqual(len(codigos), len(set(codigos)))
+
+    def test_run_benchmark_reports_metrics_per_case_and_theme(self):
+        result = run_benchmark(
+            self.media_root,
+            casos=["tablero", "luminaria_legacy"],
+            iteraciones=1,
+            warmup=0,
+        )
+
+        self.assertIn("meta", result)
+        rows = result["results"]
+        self.assertEqual(len(rows), 4)
+
+        for row in rows:
+            self.assertNotIn("error", row)
+            for key in ("p50_ms", "p95_ms", "size_bytes", "peak_alloc_kb", "rss_max_kb"):
+                self.assertIn(key, row)
+            self.assertGreater(row["size_bytes"], 100)
+
+        deltas = comparar(result, result)
+        self.assertTrue(all(d["p50_pct"] == 0 for d in deltas))
+
+    @unittest.skipUnless(os.getenv("OT_BENCH"), "OT_BENCH=1 para correr la matriz completa")
+    def test_full_matrix(self):
+        result = run_benchmark(self.media_root, iteraciones=3)
+        self.assertEqual(len(result["results"]), len(CASOS) * 2)
+
+    @unittest.skipUnless(os.getenv("OT_BENCH"), "OT_BENCH=1 para correr la matriz completa")
+    def test_long_table_render_time_grows_linearly(self):
+        rows = medir_escalado(items=(200, 1600), iteraciones=3)
+        chico, grande = rows[0]["ms_por_item"], rows[1]["ms_por_item"]
+        # 8x items: el costo por item no debería crecer (margen por ruido)
+        self.assertLess(grande, chico * 1.5)
@@ -5,7 +5,7 @@ from rest_framework.test import APITestCase
 
 from accounts.models import UserProfile
 from historial.models import Tablero
-from orders.models import RAMAL_CHOICES
+from orders.models import OrdenTrabajoPDF, RAMAL_CHOICES
 
 User = get_user_model()
 
@@ -211,7 +211,7 @@ class OrdenesPdfEndpointTests(APITestCase):
         self.assertEqual(
             response.status_code,
             status.HTTP_200_OK,
-            msg=getattr(response, "data", response.content),
+            msg=getattr(response, "data", None),
         )
         content_type = response.get("Content-Type", "")
         self.assertTrue(
@@ -219,7 +219,10 @@ class OrdenesPdfEndpointTests(APITestCase):
             or "application/octet-stream" in content_type.lower(),
             msg=f"Content-Type inesperado: {content_type}",
         )
-        self.assertGreater(len(response.content), 100)
+        # FileResponse: el cuerpo viene en streaming desde el archivo
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content.startswith(b"%PDF-"))
+        self.assertGreater(len(content), 100)
 
     def test_pdf_requires_auth(self):
         response = self.client.post(self.url, {}, format="json")
@@ -234,6 +237,36 @@ class OrdenesPdfEndpointTests(APITestCase):
         )
         self.assert_pdf_response(response)
 
+    def test_pdf_records_artifact_with_requested_profile(self):
+        self.auth_as_tech()
+        payload = self.valid_payload_no_luminaria()
+        payload["perfil_pdf"] = "archive"
+
+        response = self.client.post(self.url, payload, format="json")
+        self.assert_pdf_response(response)
+
+        artefacto = OrdenTrabajoPDF.objects.get()
+        self.assertEqual(artefacto.perfil, "archive")
+        self.assertTrue(artefacto.archivo.startswith("ordenes/"))
+        self.assertGreater(artefacto.size_bytes, 100)
+
+    def test_pdf_without_profile_uses_default(self):
+        self.auth_as_tech()
+        payload = self.valid_payload_no_luminaria()
+        payload["print_mode"] = True
+
+        response = self.client.post(self.url, payload, format="json")
+        self.assert_pdf_response(response)
+        self.assertEqual(OrdenTrabajoPDF.objects.get().perfil, "default")
+
+    def test_pdf_rejects_unknown_profile(self):
+        self.auth_as_tech()
+        payload = self.valid_payload_no_luminaria()
+        payload["perfil_pdf"] = "pdfa"
+
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_pdf_accepts_valid_non_luminaria_payload_for_admin(self):
         self.auth_as_admin()
         response = self.client.post(
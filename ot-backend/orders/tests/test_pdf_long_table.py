@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from orders import pdf as pdf_module
+from orders.benchmarks import build_pdf_data
+from orders.pdf import LONG_TABLE_UMBRAL, generar_pdf
+
+
+class PdfLongTableTests(SimpleTestCase):
+    def luminaria_data(self, grupos, items):
+        return build_pdf_data(
+            {"alcance": "LUMINARIA", "grupos": grupos, "items": items},
+            {},
+            print_mode=True,
+        )
+
+    def test_single_group_with_1000_items_renders(self):
+        # Antes: LayoutError (flowable demasiado grande para la página)
+        out = generar_pdf(self.luminaria_data(grupos=1, items=1000))
+        self.assertTrue(out.startswith(b"%PDF-"))
+
+    def test_large_groups_use_long_table_with_repeated_header(self):
+        n = LONG_TABLE_UMBRAL + 10
+        with mock.patch.object(
+            pdf_module, "LongTable", wraps=pdf_module.LongTable
+        ) as long_table:
+            generar_pdf(self.luminaria_data(grupos=2, items=n * 2))
+
+        self.assertEqual(long_table.call_count, 2)
+        kwargs = long_table.call_args.kwargs
+        self.assertEqual(kwargs["repeatRows"], 1)
+        self.assertEqual(len(kwargs["rowHeights"]), n + 1)
+        # mismo encabezado que la tabla corta de siempre
+        self.assertEqual(long_table.call_args.args[0][0], ["CÓDIGO", ""])
+
+    def test_small_groups_keep_nested_layout(self):
+        with mock.patch.object(
+            pdf_module, "LongTable", wraps=pdf_module.LongTable
+        ) as long_table:
+            generar_pdf(self.luminaria_data(grupos=2, items=10))
+
+        long_table.assert_not_called()
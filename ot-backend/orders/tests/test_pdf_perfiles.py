@@ -0,0 +1,109 @@
+import base64
+import os
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from pypdf import PdfReader
+
+from orders.benchmarks import build_pdf_data, escribir_evidencias
+from orders import pdf
+from orders.pdf import PERFILES, generar_pdf, get_perfil
+
+
+class PdfPerfilesTests(SimpleTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="pdf_perfil_test_")
+        self._override = override_settings(MEDIA_ROOT=self._tmp.name)
+        self._override.enable()
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def test_profiles_are_opt_in(self):
+        self.assertEqual(get_perfil({"print_mode": True})[0], "default")
+        self.assertEqual(get_perfil({"print_mode": False})[0], "default")
+        self.assertEqual(get_perfil({})[0], "default")
+        self.assertEqual(get_perfil({"perfil_pdf": "ARCHIVE"})[0], "archive")
+        self.assertEqual(
+            get_perfil({"perfil_pdf": "otro", "print_mode": True})[0], "default"
+        )
+
+    def test_default_profile_keeps_legacy_output(self):
+        # lo que salía antes de los perfiles: no tocar sin avisar a los
+        # clientes que no mandan perfil_pdf
+        _, perfil = get_perfil({})
+        self.assertEqual(perfil["foto_max_side"], 1800)
+        self.assertEqual(perfil["foto_quality"], 82)
+        self.assertIsNone(perfil["foto_dpi"])
+        self.assertIsNone(perfil["page_compression"])
+        self.assertFalse(perfil["fuentes_embebidas"])
+        self.assertTrue(perfil["transparencias"])
+
+        evidencias = escribir_evidencias(self._tmp.name, max_fotos=1)
+        data = build_pdf_data("tablero_fotos_2", evidencias, print_mode=True)
+        with open(os.path.join(self._tmp.name, evidencias["fotos"][0]), "rb") as f:
+            foto_b64 = "data:image/jpeg;base64," + base64.b64encode(f.read()).decode()
+
+        with patch(
+            "orders.pdf._image_bytes_to_jpeg_buffer",
+            wraps=pdf._image_bytes_to_jpeg_buffer,
+        ) as jpeg:
+            # fotos del disco: se embeben tal cual
+            salida = generar_pdf(data)
+            jpeg.assert_not_called()
+
+            data["fotos_b64"] = [foto_b64]
+            generar_pdf(data)
+            jpeg.assert_called_once()
+            self.assertEqual(jpeg.call_args.kwargs["max_side"], 1800)
+            self.assertEqual(jpeg.call_args.kwargs["quality"], 82)
+
+        self.assertTrue(self._comprimida(salida))
+
+    def test_mobile_profile_downsamples_photos(self):
+        evidencias = escribir_evidencias(self._tmp.name, max_fotos=2)
+
+        sizes = {}
+        for nombre in ("print", "mobile"):
+            data = build_pdf_data(
+                "tablero_fotos_2",
+                evidencias,
+                print_mode=PERFILES[nombre]["print_mode"],
+            )
+            data["perfil_pdf"] = nombre
+            sizes[nombre] = len(generar_pdf(data))
+
+        self.assertLess(sizes["mobile"], sizes["print"])
+
+    def test_archive_profile_embeds_subset_fonts_without_transparency(self):
+        data = build_pdf_data("tablero", {}, print_mode=True)
+
+        data["perfil_pdf"] = "archive"
+        archive = generar_pdf(data)
+        self.assertIn(b"/FontFile2", archive)
+        self.assertNotIn(b"/ca ", archive)
+
+        data["perfil_pdf"] = "print"
+        printed = generar_pdf(data)
+        self.assertNotIn(b"/FontFile2", printed)
+
+    def test_only_print_profile_leaves_pages_uncompressed(self):
+        data = build_pdf_data("tablero", {}, print_mode=True)
+
+        comprimidas = {}
+        for nombre in PERFILES:
+            data["perfil_pdf"] = nombre
+            comprimidas[nombre] = self._comprimida(generar_pdf(data))
+
+        self.assertEqual(
+            comprimidas,
+            {"default": True, "print": False, "mobile": True, "archive": True},
+        )
+
+    def _comprimida(self, salida):
+        pagina = PdfReader(BytesIO(salida)).pages[0]
+        filtro = pagina["/Contents"].get_object().get("/Filter") or []
+        return "/FlateDecode" in filtro
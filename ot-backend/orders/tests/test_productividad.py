@@ -0,0 +1,214 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import Tablero
+from orders import productividad
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+    ProductividadTecnicoDiaria,
+)
+
+User = get_user_model()
+
+ANA = {"legajo": "1234", "nombre": "Ana"}
+LUIS = {"legajo": "5678", "nombre": "Luis"}
+
+
+def rollup():
+    return {
+        (p.legajo, p.fecha.isoformat()): (
+            p.ots,
+            p.luminarias,
+            p.km,
+            p.completas,
+            p.parciales,
+            p.otros_resultados,
+        )
+        for p in ProductividadTecnicoDiaria.objects.all()
+    }
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+
+    def crear(self, fecha="2026-03-05", tecnicos=(ANA,), **extra):
+        return OrdenTrabajo.objects.create(
+            fecha=fecha, tablero="TI 1400", tecnicos=list(tecnicos), **extra
+        )
+
+    def test_ots_of_the_day_add_up(self):
+        self.crear(km_total=Decimal("12.5"), codigos_luminarias=["PC1", "PC2"])
+        self.crear(tecnicos=(ANA, LUIS), resultado="PARCIAL", km_total=Decimal("3"))
+
+        self.assertEqual(
+            rollup(),
+            {
+                ("1234", "2026-03-05"): (2, 2, Decimal("15.50"), 1, 1, 0),
+                ("5678", "2026-03-05"): (1, 0, Decimal("3.00"), 0, 1, 0),
+            },
+        )
+
+    def test_items_count_as_luminarias(self):
+        ot = self.crear(codigos_luminarias=["VIEJO"])
+        grupo = OrdenTrabajoLuminariaGrupo.objects.create(ot=ot, tablero=self.tablero)
+        for codigo in ("PC1", "PC2", "PC3"):
+            OrdenTrabajoLuminariaItem.objects.create(grupo=grupo, codigo_luminaria=codigo)
+
+        self.assertEqual(rollup()[("1234", "2026-03-05")][1], 3)
+
+        grupo.items.first().delete()
+        self.assertEqual(rollup()[("1234", "2026-03-05")][1], 2)
+
+    def test_edits_move_the_day_and_deletes_remove_it(self):
+        ot = self.crear()
+        self.crear()
+
+        ot.fecha = date(2026, 3, 6)
+        ot.tecnicos = [LUIS]
+        ot.save(update_fields=["fecha", "tecnicos"])
+        self.assertEqual(
+            set(rollup()), {("1234", "2026-03-05"), ("5678", "2026-03-06")}
+        )
+        self.assertEqual(rollup()[("1234", "2026-03-05")][0], 1)
+
+        ot.resultado = "NO REALIZADO"
+        ot.save(update_fields=["resultado"])
+        self.assertEqual(rollup()[("5678", "2026-03-06")][5], 1)
+
+        ot.delete()
+        self.assertEqual(set(rollup()), {("1234", "2026-03-05")})
+
+    def test_rebuild_matches_incremental(self):
+        self.crear(km_total=Decimal("10"), codigos_luminarias=["PC1"])
+        self.crear(fecha="2026-03-06", tecnicos=(ANA, LUIS), resultado="PARCIAL")
+        self.crear(fecha="2026-03-07", tecnicos=(LUIS,))
+        esperado = rollup()
+        ProductividadTecnicoDiaria.objects.update(ots=0, km=0)
+
+        out = StringIO()
+        call_command("reconstruir_productividad", "--chunk", "2", stdout=out)
+
+        self.assertEqual(rollup(), esperado)
+        self.assertIn("4/4 pares", out.getvalue())
+
+    def test_failed_rebuild_leaves_the_previous_rollup(self):
+        self.crear()
+        self.crear(fecha="2026-03-06")
+        esperado = rollup()
+        original = productividad.recalcular
+
+        def falla_en_la_segunda(tanda, **kwargs):
+            if tanda[0][1] != date(2026, 3, 5):
+                raise RuntimeError("se cortó")
+            return original(tanda, **kwargs)
+
+        with mock.patch.object(productividad, "recalcular", falla_en_la_segunda):
+            with self.assertRaises(RuntimeError):
+                call_command(
+                    "reconstruir_productividad", "--chunk", "1", stdout=StringIO()
+                )
+
+        self.assertEqual(rollup(), esperado)
+
+
+class ProductividadApiTests(APITestCase):
+    url = "/api/tecnicos/productividad/"
+
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(username="1000", password="Admin12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        self.t1 = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        self.client.force_authenticate(self.admin)
+
+    def test_created_ot_with_groups_is_counted_once(self):
+        payload = {
+            "fecha": "2026-03-15",
+            "tablero": "TI 1400",
+            "alcance": "LUMINARIA",
+            "km_total": "42.00",
+            "tecnicos": [ANA, LUIS],
+            "luminarias_por_tablero": [
+                {
+                    "tablero": "TI 1400",
+                    "zona": "Zona 1",
+                    "ramal": "PILAR",
+                    "resultado": "COMPLETO",
+                    "items": [
+                        {"codigo_luminaria": "PC4026", "km_luminaria": 12.5},
+                        {"codigo_luminaria": "PC4027", "km_luminaria": 12.6},
+                    ],
+                }
+            ],
+        }
+        self.assertEqual(
+            self.client.post("/api/ordenes/", payload, format="json").status_code, 201
+        )
+
+        res = self.client.get(self.url, {"desde": "2026-03-01", "hasta": "2026-03-31"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.data["items"][0],
+            {
+                "legajo": "1234",
+                "nombre": "Ana",
+                "ots": 1,
+                "luminarias": 2,
+                "km": 42.0,
+                "resultados": {"COMPLETO": 1, "PARCIAL": 0, "OTRO": 0},
+                "dias": 1,
+            },
+        )
+
+    def test_daily_rows_from_the_rollup(self):
+        for dia in (1, 2, 2):
+            OrdenTrabajo.objects.create(
+                fecha=f"2026-03-{dia:02d}", tablero="TI 1400", tecnicos=[ANA]
+            )
+
+        # permisos + token de datos (feed, rollup) + 1 query al rollup:
+        # no lee OTs
+        with self.assertNumQueries(4):
+            res = self.client.get(self.url, {"legajo": "1234", "por": "dia"})
+
+        self.assertEqual(
+            [(r["fecha"], r["ots"]) for r in res.data["items"]],
+            [("2026-03-01", 1), ("2026-03-02", 2)],
+        )
+
+    def test_rebuild_in_another_process_is_not_hidden_by_the_cache(self):
+        OrdenTrabajo.objects.create(fecha="2026-03-01", tablero="TI 1400", tecnicos=[ANA])
+        self.assertEqual(self.client.get(self.url).data["items"][0]["ots"], 1)
+
+        # reconstrucción desde otro proceso: filas nuevas, sin señales acá
+        ProductividadTecnicoDiaria.objects.all().delete()
+        ProductividadTecnicoDiaria.objects.bulk_create(
+            [ProductividadTecnicoDiaria(legajo="1234", fecha=date(2026, 3, 1), ots=5)]
+        )
+
+        self.assertEqual(self.client.get(self.url).data["items"][0]["ots"], 5)
+
+    def test_invalid_date_is_400_and_non_admin_is_403(self):
+        self.assertEqual(self.client.get(self.url, {"desde": "2026-02-30"}).status_code, 400)
+
+        tecnico = User.objects.create_user(username="2000", password="Tecnico12345!")
+        self.client.force_authenticate(tecnico)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,137 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core.querybudget import normalizar_sql
+from core.testing import QueryBudgetMixin
+from historial.models import HistorialTarea, Tablero
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+)
+
+User = get_user_model()
+
+
+def crear_ot_con_items(tablero, n_items=6):
+    ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero=tablero.nombre)
+    grupo = OrdenTrabajoLuminariaGrupo.objects.create(ot=ot, tablero=tablero)
+    for i in range(n_items):
+        OrdenTrabajoLuminariaItem.objects.create(
+            grupo=grupo, orden=i, codigo_luminaria=f"PC{4000 + i}"
+        )
+    return ot
+
+
+class NormalizarSqlTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        a = normalizar_sql("SELECT * FROM t WHERE id IN (1, 2, 3) AND n = 'x'")
+        b = normalizar_sql("SELECT *  FROM t\nWHERE id IN (%s) AND n = 'otro'")
+
+        self.assertEqual(a, "SELECT * FROM t WHERE id IN (...) AND n = ?")
+        self.assertEqual(a, b)
+
+
+class QueryBudgetHelperTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        crear_ot_con_items(self.tablero)
+
+    def test_item_str_does_not_query(self):
+        items = list(OrdenTrabajoLuminariaItem.objects.all())
+
+        with self.assertNumQueries(0):
+            labels = [str(i) for i in items]
+        self.assertEqual(labels[0], f"PC4000 (grupo {items[0].grupo_id})")
+
+    def test_repeated_queries_are_reported(self):
+        items = list(OrdenTrabajoLuminariaItem.objects.all())
+
+        with self.assertRaises(AssertionError) as ctx:
+            with self.assertNoRepeatedQueries():
+                [i.grupo.tablero_id for i in items]
+
+        self.assertIn("6x", str(ctx.exception))
+
+    def test_budget_failure_lists_query_shapes(self):
+        with self.assertRaises(AssertionError) as ctx:
+            with self.assertQueryBudget(1):
+                list(Tablero.objects.all())
+                list(OrdenTrabajo.objects.all())
+
+        self.assertIn("2 > 1", str(ctx.exception))
+
+
+class EndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        tableros = [
+            Tablero.objects.create(nombre=f"TI {i}", zona="Zona 1") for i in range(5)
+        ]
+        for t in tableros:
+            crear_ot_con_items(t)
+            HistorialTarea.objects.create(tablero=t, fecha=date(2026, 3, 5))
+
+        self.client.force_authenticate(self.admin)
+
+    def test_read_endpoints_stay_within_budget(self):
+        casos = {
+            "ordenes": "/api/ordenes/",
+            "tableros_list": "/api/tableros/",
+            "tableros_autocomplete": "/api/tableros/autocomplete/?q=TI",
+            "historial": "/api/historial/?tablero=TI%201",
+            "luminarias-historial": "/api/luminarias/historial/",
+        }
+        for vista, url in casos.items():
+            with self.subTest(vista=vista):
+                cache.clear()
+                with self.assertQueryBudget(vista), self.assertNoRepeatedQueries():
+                    res = self.client.get(url)
+                self.assertEqual(res.status_code, 200)
+
+    @override_settings(OT_QUERY_BUDGET=True)
+    def test_middleware_reports_counts(self):
+        res = self.client.get("/api/ordenes/")
+
+        self.assertGreater(int(res["X-Query-Count"]), 0)
+        self.assertIn("X-Query-Time-Ms", res)
+        self.assertFalse(res.has_header("X-Query-Budget"))
+
+    @override_settings(OT_QUERY_BUDGET=True, OT_QUERY_BUDGETS={"ordenes": 0})
+    def test_middleware_flags_exceeded_budget(self):
+        with self.assertLogs("ot.queries", level="WARNING") as logs:
+            res = self.client.get("/api/ordenes/")
+
+        self.assertTrue(res["X-Query-Budget"].startswith("exceeded;"))
+        self.assertIn("ordenes", logs.output[0])
+
+    @override_settings(OT_QUERY_BUDGET=True, OT_QUERY_NPLUS1_MIN=2)
+    def test_middleware_flags_repeated_shapes(self):
+        # el sync procesa OT por OT: las mismas queries se repiten por cada una
+        payload = {
+            "ordenes": [
+                {"fecha": "2026-03-06", "tablero": f"TI {i}", "alcance": "TABLERO"}
+                for i in range(3)
+            ]
+        }
+        with self.assertLogs("ot.queries", level="WARNING"):
+            res = self.client.post("/api/ordenes/sync/", payload, format="json")
+
+        self.assertIn("X-Query-Repeated", res)
+
+    def test_middleware_off_by_default_in_tests(self):
+        res = self.client.get("/api/ordenes/")
+        self.assertFalse(res.has_header("X-Query-Count"))
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from historial.models import Tablero
+from orders.models import (
+    OrdenTrabajo,
+    OrdenTrabajoLuminariaGrupo,
+    OrdenTrabajoLuminariaItem,
+    OrdenTrabajoPDF,
+)
+from orders.services import pdf_path_para_ot
+
+
+class RegenerarPdfsCommandTests(TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="regen_pdf_test_")
+        self._override = override_settings(MEDIA_ROOT=self._tmp.name)
+        self._override.enable()
+
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+
+        self.ot_tablero = OrdenTrabajo.objects.create(
+            fecha="2026-03-10",
+            tablero="TI 1400",
+            alcance="TABLERO",
+            tecnicos=[{"legajo": "8174", "nombre": "Tecnico Campo"}],
+        )
+        self.ot_lum = OrdenTrabajo.objects.create(
+            fecha="2026-03-20",
+            tablero="TI 1400",
+            alcance="LUMINARIA",
+        )
+        grupo = OrdenTrabajoLuminariaGrupo.objects.create(
+            ot=self.ot_lum, tablero=self.tablero, ramal="PILAR"
+        )
+        OrdenTrabajoLuminariaItem.objects.create(
+            grupo=grupo, codigo_luminaria="PC4026", km_luminaria=12.5
+        )
+        self.ot_fuera = OrdenTrabajo.objects.create(
+            fecha="2026-05-01",
+            tablero="TI 1400",
+            alcance="TABLERO",
+        )
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("regenerar_pdfs", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_regenerates_pdfs_in_date_range(self):
+        self.run_command("--desde", "2026-03-01", "--hasta", "2026-03-31", "--workers", "1")
+
+        for ot in (self.ot_tablero, self.ot_lum):
+            path = pdf_path_para_ot(ot)
+            self.assertTrue(os.path.exists(path), path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(5), b"%PDF-")
+
+        self.assertFalse(os.path.exists(pdf_path_para_ot(self.ot_fuera)))
+
+    def test_checkpoint_allows_resume(self):
+        ckpt = os.path.join(self._tmp.name, "ckpt.json")
+
+        self.run_command("--workers", "1", "--chunk", "2", "--checkpoint", ckpt)
+
+        with open(ckpt, encoding="utf-8") as f:
+            state = json.load(f)
+        self.assertEqual(state["ultimo_id"], self.ot_fuera.id)
+        self.assertEqual(state["ok"], 3)
+        self.assertEqual(state["fallidos"], [])
+
+        out = self.run_command("--workers", "1", "--checkpoint", ckpt)
+        self.assertIn("OTs a regenerar: 0", out)
+
+    def test_checkpoint_from_other_filters_is_rejected(self):
+        ckpt = os.path.join(self._tmp.name, "ckpt.json")
+        self.run_command("--workers", "1", "--hasta", "2026-03-31", "--checkpoint", ckpt)
+
+        with self.assertRaisesMessage(Exception, "otra corrida"):
+            self.run_command("--workers", "1", "--checkpoint", ckpt)
+
+    def test_records_artifacts_and_keeps_previous_profile(self):
+        OrdenTrabajoPDF.objects.create(
+            ot=self.ot_tablero, archivo="viejo.pdf", perfil="archive"
+        )
+
+        self.run_command("--workers", "1", "--hasta", "2026-03-31")
+
+        artefactos = {a.ot_id: a for a in OrdenTrabajoPDF.objects.all()}
+        self.assertEqual(set(artefactos), {self.ot_tablero.id, self.ot_lum.id})
+        self.assertEqual(artefactos[self.ot_tablero.id].perfil, "archive")
+        self.assertEqual(artefactos[self.ot_lum.id].perfil, "default")
+        self.assertNotEqual(artefactos[self.ot_tablero.id].archivo, "viejo.pdf")
+        self.assertGreater(artefactos[self.ot_lum.id].size_bytes, 100)
+
+        self.run_command("--workers", "1", "--hasta", "2026-03-31", "--perfil", "print")
+        self.assertEqual(
+            set(OrdenTrabajoPDF.objects.values_list("perfil", flat=True)), {"print"}
+        )
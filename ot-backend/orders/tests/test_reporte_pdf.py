@@ -0,0 +1,288 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from pypdf import PdfReader
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import Tablero
+from orders.models import OrdenTrabajo, OrdenTrabajoPDF, ReportePDF
+from orders import reportes
+from orders.reportes import generar_reporte
+from orders.services import pdf_data_desde_ot, pdf_path_para_ot, renderizar_pdf
+
+User = get_user_model()
+
+
+class ReportePdfEndpointTests(APITestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="reporte_pdf_test_")
+        self._override = override_settings(
+            MEDIA_ROOT=self._tmp.name,
+            OT_REPORTE_EN_LINEA=True,
+        )
+        self._override.enable()
+
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+
+        Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+
+        self.ot_a = OrdenTrabajo.objects.create(
+            fecha="2026-03-05",
+            tablero="TI 1400",
+            alcance="TABLERO",
+            tecnicos=[{"legajo": "8174", "nombre": "Tecnico Campo"}],
+        )
+        self.ot_b = OrdenTrabajo.objects.create(
+            fecha="2026-03-25", tablero="TI 1400", alcance="TABLERO"
+        )
+        OrdenTrabajo.objects.create(
+            fecha="2026-04-02", tablero="TI 1400", alcance="TABLERO"
+        )
+        OrdenTrabajo.objects.create(
+            fecha="2026-03-10", tablero="TC20", alcance="TABLERO"
+        )
+
+        self.url = "/api/ordenes/reporte-pdf/"
+        self.filtros_marzo = {
+            "tablero": "ti 1400",
+            "desde": "2026-03-01",
+            "hasta": "2026-03-31",
+        }
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=self.tech)
+        response = self.client.post(self.url, self.filtros_marzo, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_builds_combined_pdf_with_summary_and_each_ot(self):
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post(self.url, self.filtros_marzo, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+
+        reporte_id = response.data["id"]
+        estado = self.client.get(f"{self.url}{reporte_id}/")
+        self.assertEqual(estado.data["estado"], ReportePDF.Estado.LISTO)
+        self.assertEqual(estado.data["total_ots"], 2)
+        self.assertEqual(estado.data["reutilizados"], 0)
+
+        # los PDFs individuales quedan registrados para la próxima vez
+        self.assertEqual(
+            set(OrdenTrabajoPDF.objects.values_list("ot_id", flat=True)),
+            {self.ot_a.id, self.ot_b.id},
+        )
+
+        download = self.client.get(f"{self.url}{reporte_id}/descargar/")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        reader = PdfReader(BytesIO(b"".join(download.streaming_content)))
+
+        paginas_ots = sum(
+            len(PdfReader(pdf_path_para_ot(ot)).pages) for ot in (self.ot_a, self.ot_b)
+        )
+        self.assertEqual(len(reader.pages), 1 + paginas_ots)
+        self.assertIn("2 órdenes de trabajo", reader.pages[0].extract_text())
+
+        # un marcador por OT, apuntando a su primera página
+        self.assertEqual(
+            [(m.title, reader.get_destination_page_number(m)) for m in reader.outline],
+            [
+                (f"OT-{self.ot_a.id:06d} TI 1400", 1),
+                (f"OT-{self.ot_b.id:06d} TI 1400", 1 + paginas_ots // 2),
+            ],
+        )
+
+    def test_reuses_existing_ot_pdfs(self):
+        path = pdf_path_para_ot(self.ot_a)
+        data = pdf_data_desde_ot(self.ot_a, tablero_catalogado=True)
+        size = renderizar_pdf(data, path)
+        OrdenTrabajoPDF.objects.create(
+            ot=self.ot_a,
+            archivo=os.path.relpath(path, self._tmp.name),
+            size_bytes=size,
+        )
+        mtime = os.path.getmtime(path)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(self.url, self.filtros_marzo, format="json")
+
+        reporte = ReportePDF.objects.get(pk=response.data["id"])
+        self.assertEqual(reporte.estado, ReportePDF.Estado.LISTO)
+        self.assertEqual(reporte.reutilizados, 1)
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+    def test_rejects_missing_filters_and_empty_results(self):
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url, {"desde": "2026-03-31", "hasta": "2026-03-01"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {"tablero": "NO EXISTE"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(OT_REPORTE_EN_LINEA=False)
+    def test_background_job_is_queued_on_commit(self):
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(self.url, self.filtros_marzo, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["estado"], ReportePDF.Estado.PENDIENTE)
+        self.assertEqual(len(callbacks), 1)
+
+        download = self.client.get(f"{self.url}{response.data['id']}/descargar/")
+        self.assertEqual(download.status_code, status.HTTP_409_CONFLICT)
+
+    @override_settings(OT_REPORTE_TIMEOUT_MIN=0)
+    def test_job_over_the_timeout_ends_in_error(self):
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post(self.url, self.filtros_marzo, format="json")
+
+        reporte = ReportePDF.objects.get(pk=response.data["id"])
+        self.assertEqual(reporte.estado, ReportePDF.Estado.ERROR)
+        self.assertIn("TimeoutError", reporte.error)
+        self.assertIsNotNone(reporte.iniciado)
+
+
+class ReporteColgadoTests(APITestCase):
+    url = "/api/ordenes/reporte-pdf/"
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="reporte_pdf_test_")
+        self._override = override_settings(
+            MEDIA_ROOT=self._tmp.name, OT_REPORTE_COLGADO_MIN=30
+        )
+        self._override.enable()
+
+        self.admin = User.objects.create_user(
+            username="1000", password="Admin12345!", is_staff=True
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=self.admin)
+        profile.role = UserProfile.Role.ADMIN
+        profile.save()
+        self.client.force_authenticate(user=self.admin)
+
+        Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400", alcance="TABLERO")
+
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        # el worker que lo armaba murió con el proceso
+        self.colgado = ReportePDF.objects.create(
+            filtros={"tablero": "TI 1400"},
+            estado=ReportePDF.Estado.PROCESANDO,
+        )
+        ReportePDF.objects.filter(pk=self.colgado.pk).update(
+            creado=hace_una_hora, iniciado=hace_una_hora
+        )
+        self.en_curso = ReportePDF.objects.create(
+            filtros={"tablero": "TI 1400"},
+            estado=ReportePDF.Estado.PROCESANDO,
+            iniciado=timezone.now(),
+        )
+
+    def tearDown(self):
+        self._override.disable()
+        self._tmp.cleanup()
+
+    def test_polling_a_stale_job_reports_error(self):
+        estado = self.client.get(f"{self.url}{self.colgado.id}/")
+        self.assertEqual(estado.data["estado"], ReportePDF.Estado.ERROR)
+        self.assertIn("reinició", estado.data["error"])
+
+        download = self.client.get(f"{self.url}{self.colgado.id}/descargar/")
+        self.assertEqual(download.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(download.data["estado"], ReportePDF.Estado.ERROR)
+
+        estado = self.client.get(f"{self.url}{self.en_curso.id}/")
+        self.assertEqual(estado.data["estado"], ReportePDF.Estado.PROCESANDO)
+
+    def test_command_requeues_stale_jobs(self):
+        out = StringIO()
+        call_command("recuperar_reportes", "--relanzar", stdout=out)
+
+        self.assertIn("Reportes colgados: 1", out.getvalue())
+        self.colgado.refresh_from_db()
+        self.en_curso.refresh_from_db()
+        self.assertEqual(self.colgado.estado, ReportePDF.Estado.LISTO)
+        self.assertEqual(self.colgado.total_ots, 1)
+        self.assertEqual(self.en_curso.estado, ReportePDF.Estado.PROCESANDO)
+
+        download = self.client.get(f"{self.url}{self.colgado.id}/descargar/")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+
+    def test_job_given_up_is_not_built_when_its_thread_finally_runs(self):
+        call_command("recuperar_reportes", stdout=StringIO())
+
+        self.colgado.refresh_from_db()
+        self.assertEqual(self.colgado.estado, ReportePDF.Estado.ERROR)
+        self.assertEqual(
+            generar_reporte(self.colgado.id).estado, ReportePDF.Estado.ERROR
+        )
+
+    def _generar_con(self, durante):
+        """Corre el job del reporte colgado y llama `durante` a mitad."""
+        self.colgado.estado = ReportePDF.Estado.PENDIENTE
+        self.colgado.save(update_fields=["estado"])
+        original = reportes._pdf_de_ot
+
+        def pdf_de_ot(ot, catalogo):
+            durante()
+            return original(ot, catalogo)
+
+        with mock.patch.object(reportes, "_pdf_de_ot", pdf_de_ot):
+            return generar_reporte(self.colgado.id)
+
+    def test_job_does_not_overwrite_a_row_recovered_while_it_ran(self):
+        def recuperado():
+            ReportePDF.objects.filter(pk=self.colgado.pk).update(
+                estado=ReportePDF.Estado.ERROR, error="Interrumpido"
+            )
+
+        reporte = self._generar_con(recuperado)
+
+        self.assertEqual(reporte.estado, ReportePDF.Estado.ERROR)
+        self.assertEqual(reporte.error, "Interrumpido")
+        self.assertEqual(reporte.archivo, "")
+
+    def test_job_does_not_overwrite_a_retry_of_the_same_row(self):
+        relanzado = timezone.now() + timedelta(minutes=1)
+
+        def relanzar():
+            ReportePDF.objects.filter(pk=self.colgado.pk).update(
+                estado=ReportePDF.Estado.PROCESANDO, iniciado=relanzado
+            )
+
+        reporte = self._generar_con(relanzar)
+
+        self.assertEqual(reporte.estado, ReportePDF.Estado.PROCESANDO)
+        self.assertEqual(reporte.iniciado, relanzado)
+        self.assertIsNone(reporte.terminado)
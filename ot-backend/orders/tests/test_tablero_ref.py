@@ -0,0 +1,154 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from historial.models import Tablero
+from historial.services import buscar_tablero, catalogo_tableros
+from orders.models import OrdenTrabajo
+from orders.reportes import filtrar_ots
+from orders.views import _resolve_tablero_catalogo
+
+User = get_user_model()
+
+
+class TableroRefTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+
+    def test_save_resolves_name_variants(self):
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="  ti   1400 ")
+        self.assertEqual(ot.tablero_ref_id, self.tablero.id)
+
+    def test_write_path_reads_the_db_not_the_cached_catalog(self):
+        OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400")
+        ot = OrdenTrabajo.objects.get()
+
+        ot.circuito = "C1"
+        ot.tablero = "ti 1400"
+        # SELECT del tablero (índice UPPER) + UPDATE + fila del feed
+        with self.assertNumQueries(3):
+            ot.save(update_fields=["tablero", "circuito"])
+
+    def test_save_without_tablero_change_skips_the_lookup(self):
+        OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400")
+        ot = OrdenTrabajo.objects.get()
+
+        ot.circuito = "C1"
+        # UPDATE + fila del feed; sin SELECT del tablero
+        with self.assertNumQueries(2):
+            ot.save(update_fields=["tablero", "circuito"])
+        with CaptureQueriesContext(connection) as ctx:
+            ot.save()
+        self.assertFalse(
+            any("historial_tablero" in q["sql"] for q in ctx.captured_queries)
+        )
+        self.assertEqual(ot.tablero_ref_id, self.tablero.id)
+
+    def test_tablero_created_behind_a_warm_cache_is_resolved(self):
+        catalogo_tableros()
+        # como si lo creara otro worker: sin señal, el catálogo local no se entera
+        Tablero.objects.bulk_create([Tablero(nombre="TI 2000", zona="Zona 3")])
+        nuevo = Tablero.objects.get(nombre="TI 2000")
+        self.assertIsNone(buscar_tablero("TI 2000"))
+
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="ti 2000")
+
+        self.assertEqual(ot.tablero_ref_id, nuevo.id)
+        self.assertEqual(_resolve_tablero_catalogo("ti  2000"), ("TI 2000", True))
+
+    def test_new_tablero_is_linked_after_the_historial_creates_it(self):
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 9999")
+
+        nuevo = Tablero.objects.get(nombre="TI 9999")
+        self.assertEqual(ot.tablero_ref_id, nuevo.id)
+        ot.refresh_from_db()
+        self.assertEqual(ot.tablero_ref_id, nuevo.id)
+
+    def test_changing_the_text_moves_the_ref(self):
+        otro = Tablero.objects.create(nombre="TI 1500", zona="Zona 2")
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400")
+
+        ot.tablero = "TI 1500"
+        ot.save(update_fields=["tablero"])
+
+        ot.refresh_from_db()
+        self.assertEqual(ot.tablero_ref_id, otro.id)
+
+    def test_reporte_filter_joins_by_id(self):
+        ot = OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1400")
+        OrdenTrabajo.objects.create(fecha="2026-03-05", tablero="TI 1500")
+
+        qs = filtrar_ots({"tablero": "ti  1400"})
+
+        self.assertIn("tablero_ref_id", str(qs.query))
+        self.assertEqual([o.id for o in qs], [ot.id])
+
+
+class BackfillTableroRefTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.t1 = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        self.t2 = Tablero.objects.create(nombre="TI 1500", zona="Zona 2")
+        for nombre in ("TI 1400", "ti 1500", "TI–1500", "TI 1400"):
+            OrdenTrabajo.objects.create(fecha="2026-03-05", tablero=nombre)
+        # filas anteriores al campo
+        OrdenTrabajo.objects.update(tablero_ref=None)
+
+    def test_dry_run_only_counts(self):
+        out = StringIO()
+        call_command("backfill_tablero_ref", "--dry-run", stdout=out)
+
+        self.assertIn("OTs sin tablero_ref: 4", out.getvalue())
+        self.assertFalse(OrdenTrabajo.objects.filter(tablero_ref__isnull=False).exists())
+
+    def test_backfill_in_chunks(self):
+        # "TI–1500" canoniza a "TI-1500": el historial lo dio de alta aparte
+        guion = Tablero.objects.get(nombre="TI-1500")
+
+        out = StringIO()
+        call_command("backfill_tablero_ref", "--chunk", "3", stdout=out)
+
+        refs = list(OrdenTrabajo.objects.order_by("id").values_list("tablero_ref", flat=True))
+        self.assertEqual(refs, [self.t1.id, self.t2.id, guion.id, self.t1.id])
+        self.assertIn("3/4 OTs", out.getvalue())
+        self.assertIn("4/4 OTs", out.getvalue())
+
+        out = StringIO()
+        call_command("backfill_tablero_ref", stdout=out)
+        self.assertIn("OTs sin tablero_ref: 0", out.getvalue())
+
+
+class TableroRefApiTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tech = User.objects.create_user(username="8174", password="Tech12345!")
+        profile, _ = UserProfile.objects.get_or_create(user=self.tech)
+        profile.role = UserProfile.Role.TECHNICIAN
+        profile.save()
+        self.client.force_authenticate(self.tech)
+
+    def test_create_returns_read_only_ref(self):
+        tablero = Tablero.objects.create(nombre="TI 1400", zona="Zona 1")
+        otro = Tablero.objects.create(nombre="TI 1500", zona="Zona 1")
+
+        res = self.client.post(
+            "/api/ordenes/",
+            {
+                "fecha": "2026-03-05",
+                "tablero": "ti 1400",
+                "alcance": "TABLERO",
+                "tablero_ref": otro.id,
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["tablero_ref"], tablero.id)
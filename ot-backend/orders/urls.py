@@ -1,17 +1,93 @@
 # orders/urls.py
 from django.urls import path
 from .views import OrdenListCreateView, OrdenPDFView, OrdenSyncView
+from .views_detalle import (
+    MaterialesConsumoView,
+    TecnicosCargaView,
+    TecnicosProductividadView,
+    VehiculoLecturasView,
+    VehiculosKmView,
+)
+from .views_evidencias import (
+    EvidenciaUploadChunkView,
+    EvidenciaUploadFinalizarView,
+    EvidenciaUploadInitView,
+    EvidenciaUploadView,
+)
+from .views_feed import HistorialFeedView
 from .views_luminarias import LuminariasHistorialView
+from .views_reportes import (
+    ReportePDFCreateView,
+    ReportePDFDetailView,
+    ReportePDFDownloadView,
+)
 
 urlpatterns = [
     # Core OT
     path("ordenes/", OrdenListCreateView.as_view(), name="ordenes"),
     path("ordenes/pdf/", OrdenPDFView.as_view(), name="ordenes-pdf"),
     path("ordenes/sync/", OrdenSyncView.as_view(), name="ordenes-sync"),
+    # Reporte combinado multi-OT
+    path(
+        "ordenes/reporte-pdf/",
+        ReportePDFCreateView.as_view(),
+        name="ordenes-reporte-pdf",
+    ),
+    path(
+        "ordenes/reporte-pdf/<int:pk>/",
+        ReportePDFDetailView.as_view(),
+        name="ordenes-reporte-pdf-detail",
+    ),
+    path(
+        "ordenes/reporte-pdf/<int:pk>/descargar/",
+        ReportePDFDownloadView.as_view(),
+        name="ordenes-reporte-pdf-descargar",
+    ),
+    # Evidencias binarias (fotos / firma)
+    path("evidencias/", EvidenciaUploadView.as_view(), name="evidencias"),
+    path(
+        "evidencias/uploads/",
+        EvidenciaUploadInitView.as_view(),
+        name="evidencias-uploads",
+    ),
+    path(
+        "evidencias/uploads/<uuid:pk>/",
+        EvidenciaUploadChunkView.as_view(),
+        name="evidencias-uploads-chunk",
+    ),
+    path(
+        "evidencias/uploads/<uuid:pk>/finalizar/",
+        EvidenciaUploadFinalizarView.as_view(),
+        name="evidencias-uploads-finalizar",
+    ),
     # Luminarias (mapa / historial)
     path(
         "luminarias/historial/",
         LuminariasHistorialView.as_view(),
         name="luminarias-historial",
     ),
+    # Agregados por técnico / material / vehículo (orders/detalle.py, odometro.py)
+    path("tecnicos/carga/", TecnicosCargaView.as_view(), name="tecnicos-carga"),
+    path(
+        "tecnicos/productividad/",
+        TecnicosProductividadView.as_view(),
+        name="tecnicos-productividad",
+    ),
+    path(
+        "materiales/consumo/",
+        MaterialesConsumoView.as_view(),
+        name="materiales-consumo",
+    ),
+    path("vehiculos/km/", VehiculosKmView.as_view(), name="vehiculos-km"),
+    path(
+        "vehiculos/lecturas/",
+        VehiculoLecturasView.as_view(),
+        name="vehiculos-lecturas",
+    ),
+    # Feed de sync offline: historial + luminarias (?since=<token>)
+    path(
+        "historial/feed/",
+        HistorialFeedView.as_view(),
+        name="historial-feed",
+    ),
 ]
@@ -2,10 +2,12 @@
 import os
 import re
 import base64
+import logging
 
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import FileResponse
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -15,16 +17,32 @@ from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from accounts.permissions import IsAdminRole, IsAdminOrTechnicianRole
+from core import cache
+from core.metrics import span
 
+from . import feed, odometro, productividad
 from .models import (
     OrdenTrabajo,
     OrdenTrabajoLuminariaGrupo,
     OrdenTrabajoLuminariaItem,
+    OrdenTrabajoMaterial,
+    OrdenTrabajoTecnico,
 )
-from .serializers import OrdenTrabajoSerializer
-from .pdf import generar_pdf
+from .serializers import OrdenTrabajoRowEncoder, OrdenTrabajoSerializer
+from .evidencias import asignar_evidencias, resolver_evidencias
+from .luminarias import parse_luminaria_codes
+from .pdf import get_perfil
+from .services import (
+    _rel_media_path,
+    pdf_filename,
+    pdf_folder,
+    registrar_artefacto_pdf,
+    renderizar_pdf,
+)
+
+from historial.services import resolver_tablero
 
-from historial.models import Tablero
+logger = logging.getLogger("ot.ordenes")
 
 
 # ==========================================================
@@ -42,9 +60,10 @@ def _resolve_tablero_catalogo(raw: str):
     if not raw:
         return "", False
 
-    t = Tablero.objects.filter(nombre__iexact=raw).only("nombre").first()
+    # contra la DB, igual que OrdenTrabajo.save() para tablero_ref
+    t = resolver_tablero(raw)
     if t:
-        return t.nombre, True
+        return t[1], True
 
     return raw, False
 
@@ -71,35 +90,21 @@ def _b64_to_bytes(s: str) -> bytes:
 
 
 def _save_b64_image(abs_folder: str, filename: str, b64: str) -> str:
-    raw = _b64_to_bytes(b64)
+    with span("b64"):
+        raw = _b64_to_bytes(b64)
     if not raw:
         return ""
 
-    os.makedirs(abs_folder, exist_ok=True)
-    path = os.path.join(abs_folder, filename)
+    with span("evidencias"):
+        os.makedirs(abs_folder, exist_ok=True)
+        path = os.path.join(abs_folder, filename)
 
-    with open(path, "wb") as f:
-        f.write(raw)
+        with open(path, "wb") as f:
+            f.write(raw)
 
     return path
 
 
-def _rel_media_path(abs_path: str) -> str:
-    if not abs_path:
-        return ""
-
-    rel = os.path.relpath(abs_path, settings.MEDIA_ROOT)
-    return rel.replace("\\", "/")
-
-
-def _safe_filename(s: str) -> str:
-    s = (s or "").strip()
-    s = s.replace("/", "-").replace("\\", "-")
-    s = re.sub(r'[:*"<>|?]', "", s)
-    s = re.sub(r"\s+", " ", s)
-    return s[:80] or "OT"
-
-
 # ==========================================================
 # Helpers luminarias por tablero
 # ==========================================================
@@ -146,8 +151,17 @@ def _persistir_ot_y_grupos(data: dict, user=None):
     if user is not None:
         payload["created_by"] = user
 
-    ot = OrdenTrabajo.objects.create(**payload)
+    # una sola fila de feed por clave para OT + grupos + items + historial,
+    # la productividad se recalcula una vez, con los items ya creados, y
+    # cada namespace del cache se invalida una vez
+    with feed.agrupar(), productividad.agrupar(), cache.agrupar():
+        ot = OrdenTrabajo.objects.create(**payload)
+        _crear_grupos(ot, grupos_data)
+
+    return ot
 
+
+def _crear_grupos(ot, grupos_data):
     for idx, grupo in enumerate(grupos_data):
         tablero_obj = grupo.get("tablero")
         items = grupo.get("items", []) or []
@@ -175,18 +189,17 @@ def _persistir_ot_y_grupos(data: dict, user=None):
                 km_luminaria=item.get("km_luminaria", None),
             )
 
-    return ot
-
 
 # ==========================================================
 # Core de procesamiento OT + PDF
 # ==========================================================
-def _procesar_ot_payload(request_data: dict, user=None, return_pdf_bytes: bool = False):
+def _procesar_ot_payload(request_data: dict, user=None):
     request_data = dict(request_data or {})
     request_data.pop("tablero_catalogado", None)
 
     serializer = OrdenTrabajoSerializer(data=request_data)
-    serializer.is_valid(raise_exception=True)
+    with span("validate"):
+        serializer.is_valid(raise_exception=True)
 
     data = dict(serializer.validated_data)
     alcance = (data.get("alcance") or "").strip().upper()
@@ -194,8 +207,6 @@ def _procesar_ot_payload(request_data: dict, user=None, return_pdf_bytes: bool =
     cods = data.get("codigos_luminarias") or []
     if alcance == "LUMINARIA":
         if not cods:
-            from .views_luminarias import parse_luminaria_codes
-
             cods = parse_luminaria_codes(data.get("luminaria_equipos", "")) or []
 
         data["codigos_luminarias"] = cods
@@ -260,10 +271,19 @@ def _procesar_ot_payload(request_data: dict, user=None, return_pdf_bytes: bool =
 
     firma_b64 = data.pop("firma_tecnico_img", "")
     fotos_b64 = data.pop("fotos_b64", []) or []
+    with span("evidencias"):
+        fotos_evid, firma_evid = resolver_evidencias(
+            data.pop("fotos_ids", []) or [],
+            data.pop("firma_tecnico_id", None),
+            user=user,
+        )
     print_mode = bool(data.pop("print_mode", False))
+    perfil_pdf = data.pop("perfil_pdf", "")
 
     firma_rel = ""
-    if firma_b64:
+    if firma_evid:
+        firma_rel = firma_evid.archivo
+    elif firma_b64:
         firma_abs = _save_b64_image(
             evidence_abs,
             "firma_tecnico.png",
@@ -271,8 +291,8 @@ def _procesar_ot_payload(request_data: dict, user=None, return_pdf_bytes: bool =
         )
         firma_rel = _rel_media_path(firma_abs)
 
-    fotos_rel = []
-    for idx, fb64 in enumerate(list(fotos_b64)[:4], start=1):
+    fotos_rel = [e.archivo for e in fotos_evid]
+    for idx, fb64 in enumerate(list(fotos_b64)[: 4 - len(fotos_rel)], start=1):
         p_abs = _save_b64_image(
             evidence_abs,
             f"foto_{idx}.jpg",
@@ -287,41 +307,38 @@ def _procesar_ot_payload(request_data: dict, user=None, return_pdf_bytes: bool =
     if fotos_rel:
         data["fotos"] = fotos_rel
 
-    ot = _persistir_ot_y_grupos(data, user=user)
+    # incluye "historial", que corre por signal dentro del create
+    with span("db"), transaction.atomic():
+        ot = _persistir_ot_y_grupos(data, user=user)
+        asignar_evidencias([*fotos_evid, firma_evid], ot)
 
     pdf_data = dict(data)
     pdf_data["print_mode"] = print_mode
+    pdf_data["perfil_pdf"], _ = get_perfil(
+        {"perfil_pdf": perfil_pdf, "print_mode": print_mode}
+    )
     pdf_data["id_ot"] = f"OT-{ot.id:06d}"
     pdf_data["firma_tecnico_path"] = firma_rel
     pdf_data["fotos_paths"] = fotos_rel
     pdf_data["luminarias_por_tablero"] = _serialize_grupos_for_pdf(grupos_data)
     pdf_data["tablero_catalogado"] = bool(tablero_ok)
 
-    pdf_bytes = generar_pdf(pdf_data)
+    filename = pdf_filename(pdf_data.get("fecha", ""), pdf_data.get("tablero"), ot.id)
+    filepath = os.path.join(pdf_folder(ahora), filename)
 
-    pdf_folder = os.path.join(settings.MEDIA_ROOT, "ordenes", year, month)
-    os.makedirs(pdf_folder, exist_ok=True)
+    # ReportLab escribe directo al archivo final: el PDF no se copia
+    # a bytes en memoria ni se re-escribe.
+    with span("pdf"):
+        size = renderizar_pdf(pdf_data, filepath)
+        registrar_artefacto_pdf(ot, filepath, pdf_data["perfil_pdf"], size)
 
-    fecha = _safe_filename(str(pdf_data.get("fecha", "")))
-    tablero = _safe_filename(str(pdf_data.get("tablero") or "OT"))
-    filename = f"OT_{fecha}_{tablero}_{ot.id}.pdf"
-    filepath = os.path.join(pdf_folder, filename)
-
-    with open(filepath, "wb") as f:
-        f.write(pdf_bytes)
-
-    result = {
+    return {
         "ot": ot,
         "filename": filename,
         "filepath": filepath,
         "tablero_catalogado": bool(tablero_ok),
     }
 
-    if return_pdf_bytes:
-        result["pdf_bytes"] = pdf_bytes
-
-    return result
-
 
 # ==========================================================
 # API: List + Create
@@ -335,30 +352,28 @@ class OrdenListCreateView(APIView):
         return [IsAuthenticated(), IsAdminOrTechnicianRole()]
 
     def get(self, request):
-        ordenes = (
-            OrdenTrabajo.objects.select_related("created_by").all().order_by("-id")
-        )
-
-        data = []
-        for ot in ordenes:
-            row = OrdenTrabajoSerializer(ot).data
-
-            row["creado_por_legajo"] = (
-                ot.created_by.username if getattr(ot, "created_by_id", None) else ""
-            )
-
-            profile = (
-                getattr(ot.created_by, "profile", None)
-                if getattr(ot, "created_by", None)
-                else None
+        # lectura: dicts de .values() + encoder, sin instancias ni
+        # serializer por fila (ver OrdenTrabajoRowEncoder)
+        qs = OrdenTrabajo.objects.order_by("-id")
+
+        # ?legajo=1234 / ?material=LED 150W: por las tablas indexadas de
+        # orders/detalle.py, no por los JSON
+        legajo = (request.query_params.get("legajo") or "").strip()
+        if legajo:
+            qs = qs.filter(
+                id__in=OrdenTrabajoTecnico.objects.filter(legajo=legajo).values("ot_id")
             )
-            row["creado_por_nombre"] = (
-                getattr(profile, "nombre_completo", "") if profile else ""
+        material = " ".join((request.query_params.get("material") or "").split())
+        if material:
+            qs = qs.filter(
+                id__in=OrdenTrabajoMaterial.objects.filter(
+                    material__iexact=material
+                ).values("ot_id")
             )
 
-            data.append(row)
-
-        return Response(data)
+        encoder = OrdenTrabajoRowEncoder()
+        rows = encoder.values(qs)
+        return Response(encoder.encode_many(rows))
 
     def post(self, request):
         serializer = OrdenTrabajoSerializer(data=request.data)
@@ -368,13 +383,27 @@ class OrdenListCreateView(APIView):
         data.pop("firma_tecnico_img", None)
         data.pop("fotos_b64", None)
         data.pop("print_mode", None)
+        data.pop("perfil_pdf", None)
 
-        ot = _persistir_ot_y_grupos(data, user=request.user)
-
-        return Response(
-            OrdenTrabajoSerializer(ot).data,
-            status=status.HTTP_201_CREATED,
+        # evidencias ya subidas: igual que en /api/ordenes/pdf/ y sync
+        fotos_evid, firma_evid = resolver_evidencias(
+            data.pop("fotos_ids", []) or [],
+            data.pop("firma_tecnico_id", None),
+            user=request.user,
         )
+        if fotos_evid:
+            data["fotos"] = [e.archivo for e in fotos_evid]
+        if firma_evid:
+            data["firma_tecnico_path"] = firma_evid.archivo
+
+        with transaction.atomic():
+            ot = _persistir_ot_y_grupos(data, user=request.user)
+            asignar_evidencias([*fotos_evid, firma_evid], ot)
+
+        body = OrdenTrabajoSerializer(ot).data
+        # km fuera de secuencia / que no cuadran: se avisa, no se rechaza
+        body["avisos_km"] = odometro.avisos(ot.id)
+        return Response(body, status=status.HTTP_201_CREATED)
 
 
 # ==========================================================
@@ -389,18 +418,21 @@ class OrdenPDFView(APIView):
             result = _procesar_ot_payload(
                 request.data,
                 user=request.user,
-                return_pdf_bytes=True,
             )
         except ValidationError as e:
-            print("ERRORES SERIALIZER OT:", e.detail)
+            logger.info(
+                "OT rechazada por el serializer", extra={"datos": {"errores": e.detail}}
+            )
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
-        pdf_bytes = result["pdf_bytes"]
-        filename = result["filename"]
-
-        resp = HttpResponse(pdf_bytes, content_type="application/pdf")
-        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return resp
+        # FileResponse sirve el archivo por chunks (o sendfile vía
+        # wsgi.file_wrapper) sin cargarlo entero en memoria.
+        return FileResponse(
+            open(result["filepath"], "rb"),
+            as_attachment=True,
+            filename=result["filename"],
+            content_type="application/pdf",
+        )
 
 
 # ==========================================================
@@ -428,7 +460,6 @@ class OrdenSyncView(APIView):
                 result = _procesar_ot_payload(
                     item,
                     user=request.user,
-                    return_pdf_bytes=False,
                 )
                 ot = result["ot"]
 
@@ -441,6 +472,7 @@ class OrdenSyncView(APIView):
                         "id_ot": f"OT-{ot.id:06d}",
                         "filename": result["filename"],
                         "tablero_catalogado": result["tablero_catalogado"],
+                        "avisos_km": odometro.avisos(ot.id),
                     }
                 )
             except ValidationError as e:
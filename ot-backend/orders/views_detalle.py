@@ -0,0 +1,376 @@
+# orders/views_detalle.py
+"""
+Agregados sobre OrdenTrabajoTecnico (orders/detalle.py), los rollups
+ProductividadTecnicoDiaria (orders/productividad.py),
+ConsumoMaterialMensual (orders/consumo.py) y KmVehiculoMensual, y el
+libro LecturaOdometro (orders/odometro.py): salen de un GROUP BY o de
+un rango indexado, sin leer los JSON.
+"""
+from django.db.models import Count, Max, Min, Sum
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.permissions import IsAdminRole
+from core.cache import cacheada, generacion
+from core.conditional import filtros, version_de, version_token
+
+from . import consumo, odometro
+from .materiales import normalizar_nombre
+from .models import (
+    CambioFeed,
+    ConsumoMaterialMensual,
+    KmVehiculoMensual,
+    LecturaOdometro,
+    OrdenTrabajoTecnico,
+    ProductividadTecnicoDiaria,
+)
+
+
+def _clave(nombre, *modelos):
+    """
+    Key builder de "stats" con token de datos. La generación solo cambia
+    en el proceso que escribió (locmem); el token es de la DB y lo ven
+    todos los workers:
+    - MAX(id) de CambioFeed: toda alta / edición / baja de OT, grupo o
+      item deja una fila en la misma transacción.
+    - MAX(id) de la tabla que lee la vista: las reconstrucciones (que
+      corren en otro proceso) la vuelven a llenar con ids nuevos.
+    """
+
+    def version(request):
+        token = version_token(
+            CambioFeed.objects.all(), *(m.objects.all() for m in modelos)
+        )
+        return f"{token}/g{generacion('stats')}"
+
+    def key_builder(request):
+        return (nombre, version_de(request, version), filtros(request))
+
+    return key_builder
+
+
+def _fecha(raw: str):
+    # parse_date da None si no tiene la forma, pero ValueError con "2026-13-01"
+    try:
+        return parse_date(raw)
+    except ValueError:
+        return None
+
+
+def _rango(request, qs):
+    """
+    Filtra `qs` por ?desde / ?hasta (YYYY-MM-DD). Devuelve (qs, error).
+    """
+    for param, lookup in (("desde", "fecha__gte"), ("hasta", "fecha__lte")):
+        raw = (request.query_params.get(param) or "").strip()
+        if not raw:
+            continue
+        valor = _fecha(raw) if len(raw) == 10 else None
+        if not valor:
+            return qs, Response(
+                {"detail": f"'{param}' inválido (YYYY-MM-DD)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        qs = qs.filter(**{lookup: valor})
+    return qs, None
+
+
+class TecnicosCargaView(APIView):
+    """
+    OTs por técnico en un rango.
+    GET /api/tecnicos/carga/?desde=2026-03-01&hasta=2026-03-31&legajo=1234
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @cacheada("stats", _clave("tecnicos_carga", OrdenTrabajoTecnico))
+    def get(self, request):
+        qs, error = _rango(request, OrdenTrabajoTecnico.objects.all())
+        if error:
+            return error
+
+        legajo = (request.query_params.get("legajo") or "").strip()
+        if legajo:
+            qs = qs.filter(legajo=legajo)
+
+        rows = (
+            qs.exclude(legajo="")
+            .values("legajo")
+            .annotate(
+                nombre=Max("nombre"),
+                ots=Count("ot", distinct=True),
+                primera=Min("fecha"),
+                ultima=Max("fecha"),
+            )
+            .order_by("-ots", "legajo")
+        )
+        return Response({"items": list(rows)})
+
+
+class TecnicosProductividadView(APIView):
+    """
+    Productividad por técnico desde el rollup diario (orders/productividad.py).
+    GET /api/tecnicos/productividad/?desde=2026-03-01&hasta=2026-03-31&legajo=1234&por=dia
+
+    Sin `por`: un total por legajo en el rango. Con por=dia: una fila por
+    legajo y día.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @cacheada("stats", _clave("tecnicos_productividad", ProductividadTecnicoDiaria))
+    def get(self, request):
+        qs, error = _rango(request, ProductividadTecnicoDiaria.objects.all())
+        if error:
+            return error
+
+        legajo = (request.query_params.get("legajo") or "").strip()
+        if legajo:
+            qs = qs.filter(legajo=legajo)
+
+        por_dia = (request.query_params.get("por") or "").strip() == "dia"
+        if por_dia:
+            rows = qs.order_by("fecha", "legajo").values(
+                "legajo",
+                "nombre",
+                "fecha",
+                "ots",
+                "luminarias",
+                "km",
+                "completas",
+                "parciales",
+                "otros_resultados",
+            )
+        else:
+            rows = (
+                qs.values("legajo")
+                .annotate(
+                    nombre=Max("nombre"),
+                    dias=Count("id"),
+                    ots=Sum("ots"),
+                    luminarias=Sum("luminarias"),
+                    km=Sum("km"),
+                    completas=Sum("completas"),
+                    parciales=Sum("parciales"),
+                    otros_resultados=Sum("otros_resultados"),
+                )
+                .order_by("-ots", "legajo")
+            )
+
+        items = []
+        for r in rows:
+            item = {
+                "legajo": r["legajo"],
+                "nombre": r["nombre"],
+                "ots": r["ots"],
+                "luminarias": r["luminarias"],
+                "km": float(r["km"] or 0),
+                "resultados": {
+                    "COMPLETO": r["completas"],
+                    "PARCIAL": r["parciales"],
+                    "OTRO": r["otros_resultados"],
+                },
+            }
+            if por_dia:
+                item["fecha"] = r["fecha"].isoformat()
+            else:
+                item["dias"] = r["dias"]
+            items.append(item)
+        return Response({"items": items})
+
+
+def _mes(raw: str):
+    """ "2026-03" o "2026-03-15" -> date(2026, 3, 1). None si es inválido."""
+    valor = _fecha(f"{raw}-01" if len(raw) == 7 else raw) if raw else None
+    return valor.replace(day=1) if valor else None
+
+
+class MaterialesConsumoView(APIView):
+    """
+    Consumo de materiales desde el rollup mensual (orders/consumo.py).
+    GET /api/materiales/consumo/?desde=2026-01&hasta=2026-03&material=LED%20150W&zona=Zona%201&ramal=PILAR&por=mes,zona
+
+    - desde / hasta: meses (YYYY-MM; con YYYY-MM-DD cuenta el mes entero).
+    - material: nombre o alias del catálogo, o el texto tal cual.
+    - por: además de material y unidad, separar por mes / zona / ramal.
+
+    `cantidad` suma solo las cantidades que se pudieron leer;
+    `sin_cantidad` cuenta las líneas sin cantidad legible.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    DIMENSIONES = ("mes", "zona", "ramal")
+
+    @cacheada("stats", _clave("materiales_consumo", ConsumoMaterialMensual))
+    def get(self, request):
+        qs = ConsumoMaterialMensual.objects.all()
+
+        for param, lookup in (("desde", "mes__gte"), ("hasta", "mes__lte")):
+            raw = (request.query_params.get(param) or "").strip()
+            if not raw:
+                continue
+            mes = _mes(raw)
+            if not mes:
+                return Response(
+                    {"detail": f"'{param}' inválido (YYYY-MM)."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(**{lookup: mes})
+
+        material = (request.query_params.get("material") or "").strip()
+        if material:
+            catalogado = consumo.buscar_material(material)
+            clave = (
+                f"m:{catalogado[0]}"
+                if catalogado
+                else f"t:{normalizar_nombre(material)}"
+            )
+            qs = qs.filter(clave=clave)
+
+        zona = " ".join((request.query_params.get("zona") or "").split())
+        if zona:
+            qs = qs.filter(zona__iexact=zona)
+        ramal = (request.query_params.get("ramal") or "").strip()
+        if ramal:
+            qs = qs.filter(ramal=ramal)
+
+        pedidas = (d.strip() for d in (request.query_params.get("por") or "").split(","))
+        por = list(dict.fromkeys(d for d in pedidas if d in self.DIMENSIONES))
+
+        rows = (
+            qs.values("clave", "unidad", *por)
+            .annotate(
+                material=Max("nombre"),
+                catalogo=Max("material_id"),
+                ots=Sum("ots"),
+                lineas=Sum("lineas"),
+                cantidad=Sum("cantidad"),
+                sin_cantidad=Sum("sin_cantidad"),
+            )
+            .order_by(*por, "material", "unidad")
+        )
+
+        items = []
+        for r in rows:
+            item = {
+                "material": r["material"],
+                "catalogado": r["catalogo"] is not None,
+                "unidad": r["unidad"],
+                "ots": r["ots"],
+                "lineas": r["lineas"],
+                "cantidad": float(r["cantidad"]),
+                "sin_cantidad": r["sin_cantidad"],
+            }
+            for d in por:
+                item[d] = r[d].strftime("%Y-%m") if d == "mes" else r[d]
+            items.append(item)
+        return Response({"items": items})
+
+
+class VehiculosKmView(APIView):
+    """
+    Km por vehículo y mes desde el rollup (orders/odometro.py).
+    GET /api/vehiculos/km/?desde=2026-01&hasta=2026-03&vehiculo=AB123CD
+
+    `fuera_de_secuencia` cuenta las lecturas del mes cuyo odómetro
+    retrocede respecto de la anterior del mismo vehículo.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @cacheada("stats", _clave("vehiculos_km", KmVehiculoMensual))
+    def get(self, request):
+        qs = KmVehiculoMensual.objects.all()
+
+        for param, lookup in (("desde", "mes__gte"), ("hasta", "mes__lte")):
+            raw = (request.query_params.get(param) or "").strip()
+            if not raw:
+                continue
+            mes = _mes(raw)
+            if not mes:
+                return Response(
+                    {"detail": f"'{param}' inválido (YYYY-MM)."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(**{lookup: mes})
+
+        vehiculo = odometro.normalizar_vehiculo(request.query_params.get("vehiculo"))
+        if vehiculo:
+            qs = qs.filter(vehiculo=vehiculo)
+
+        items = [
+            {
+                "vehiculo": r.vehiculo,
+                "mes": r.mes.strftime("%Y-%m"),
+                "km": float(r.km),
+                "ots": r.ots,
+                "fuera_de_secuencia": r.fuera_de_secuencia,
+            }
+            for r in qs.order_by("vehiculo", "mes")
+        ]
+        return Response({"items": items})
+
+
+class VehiculoLecturasView(APIView):
+    """
+    Lecturas de odómetro en orden de secuencia, con sus avisos.
+    GET /api/vehiculos/lecturas/?vehiculo=AB123CD&desde=2026-03-01&hasta=2026-03-31
+    GET /api/vehiculos/lecturas/?fuera=1   (todas las fuera de secuencia)
+
+    Pide `vehiculo` o `fuera=1`: sin ninguno sería el libro entero.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    @cacheada("stats", _clave("vehiculos_lecturas", LecturaOdometro))
+    def get(self, request):
+        vehiculo = odometro.normalizar_vehiculo(request.query_params.get("vehiculo"))
+        fuera = request.query_params.get("fuera") in ("1", "true")
+        if not vehiculo and not fuera:
+            return Response(
+                {"detail": "Indicar 'vehiculo' o 'fuera=1'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = LecturaOdometro.objects.all()
+        if vehiculo:
+            qs = qs.filter(vehiculo=vehiculo)
+        if fuera:
+            qs = qs.filter(fuera_de_secuencia=True)
+        qs, error = _rango(request, qs)
+        if error:
+            return error
+
+        items = [
+            {
+                "ot": r["ot_id"],
+                "vehiculo": r["vehiculo"],
+                "fecha": r["fecha"].isoformat(),
+                "km_inicial": None if r["km_inicial"] is None else float(r["km_inicial"]),
+                "km_final": None if r["km_final"] is None else float(r["km_final"]),
+                "km": None if r["km"] is None else float(r["km"]),
+                "fuera_de_secuencia": r["fuera_de_secuencia"],
+                "avisos": r["avisos"],
+            }
+            for r in qs.order_by("vehiculo", "fecha", "km_final", "id").values(
+                "ot_id",
+                "vehiculo",
+                "fecha",
+                "km_inicial",
+                "km_final",
+                "km",
+                "fuera_de_secuencia",
+                "avisos",
+            )
+        ]
+        return Response({"items": items})
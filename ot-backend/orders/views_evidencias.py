@@ -0,0 +1,198 @@
+# orders/views_evidencias.py
+import re
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.permissions import IsAdminOrTechnicianRole
+from core.renderers import ORJSONParser
+
+from .evidencias import (
+    CHUNK_SIZE,
+    EvidenciaMuyGrande,
+    escribir_chunk,
+    finalizar_upload,
+    guardar_evidencia,
+    iniciar_upload,
+    max_bytes,
+    obtener_upload,
+)
+from .models import Evidencia
+from .serializers import EvidenciaSerializer
+
+
+def _tipo(raw) -> str:
+    tipo = str(raw or Evidencia.Tipo.FOTO).strip().upper()
+    if tipo not in Evidencia.Tipo.values:
+        raise ValidationError({"tipo": f"Tipo inválido ({tipo})."})
+    return tipo
+
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes\s+(\d+)-(\d+)/(\d+|\*)$")
+
+
+def _offset_del_request(request) -> int:
+    """
+    Offset del chunk: header Content-Range (bytes 0-65535/1234567) o
+    ?offset= como alternativa.
+    """
+    raw_range = (request.META.get("HTTP_CONTENT_RANGE") or "").strip()
+    if raw_range:
+        m = _CONTENT_RANGE_RE.match(raw_range)
+        if not m:
+            raise ValidationError({"detail": "Content-Range inválido."})
+        return int(m.group(1))
+
+    raw = request.query_params.get("offset")
+    if raw is None:
+        raise ValidationError({"detail": "Falta Content-Range u offset."})
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValidationError({"offset": "offset inválido."})
+
+
+def _estado_upload(upload) -> dict:
+    return {
+        "id": str(upload.id),
+        "tipo": upload.tipo,
+        "size": upload.size_total,
+        "offset": upload.recibido,
+    }
+
+
+def _content_length(request) -> int:
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+
+
+# ==========================================================
+# API: Subida binaria de evidencias
+# ==========================================================
+class EvidenciaUploadView(APIView):
+    """
+    POST /api/evidencias/
+    - multipart/form-data: campo "archivo" (+ "tipo" opcional)
+    - body crudo (image/jpeg, image/png, ...): ?tipo=FIRMA opcional
+    Devuelve el id para referenciar desde la OT (fotos_ids / firma_tecnico_id).
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        # Cortamos antes de leer nada si el cliente ya declara un body enorme
+        # (el multipart suma unos cientos de bytes de boundary/headers).
+        if _content_length(request) > max_bytes() + 16 * 1024:
+            raise EvidenciaMuyGrande()
+
+        content_type = (request.content_type or "").split(";")[0].strip().lower()
+
+        if content_type == "multipart/form-data":
+            archivo = request.FILES.get("archivo")
+            if archivo is None:
+                raise ValidationError({"archivo": "Falta el archivo."})
+            tipo = _tipo(request.data.get("tipo"))
+            chunks = archivo.chunks(CHUNK_SIZE)
+        elif content_type.startswith("image/") or content_type == "application/octet-stream":
+            tipo = _tipo(request.query_params.get("tipo"))
+            stream = request.stream
+            if stream is None:
+                raise ValidationError({"archivo": "El archivo está vacío."})
+            chunks = iter(lambda: stream.read(CHUNK_SIZE), b"")
+        else:
+            return Response(
+                {"detail": f"Content-Type no soportado: {content_type or '-'}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        evidencia = guardar_evidencia(chunks, tipo=tipo, user=request.user)
+
+        return Response(
+            EvidenciaSerializer(evidencia).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+# ==========================================================
+# API: Subida reanudable
+# ==========================================================
+class EvidenciaUploadInitView(APIView):
+    """
+    POST /api/evidencias/uploads/
+    Body: {tipo?, size, sha256?} -> {id, size, offset: 0}
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+    parser_classes = [ORJSONParser]
+
+    def post(self, request):
+        try:
+            size = int(request.data.get("size") or 0)
+        except (TypeError, ValueError):
+            raise ValidationError({"size": "size inválido."})
+
+        upload = iniciar_upload(
+            _tipo(request.data.get("tipo")),
+            size,
+            sha256=str(request.data.get("sha256") or ""),
+            user=request.user,
+        )
+        data = _estado_upload(upload)
+        data["chunk_size"] = CHUNK_SIZE * 4
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class EvidenciaUploadChunkView(APIView):
+    """
+    GET /api/evidencias/uploads/<id>/  -> offset confirmado (para reanudar)
+    PUT /api/evidencias/uploads/<id>/  -> body crudo desde Content-Range
+    409 + offset correcto si el cliente está desfasado.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+    parser_classes = [ORJSONParser]
+
+    def get(self, request, pk):
+        return Response(_estado_upload(obtener_upload(pk, request.user)))
+
+    def put(self, request, pk):
+        offset = _offset_del_request(request)
+
+        stream = request.stream
+        chunks = iter(lambda: stream.read(CHUNK_SIZE), b"") if stream else iter(())
+
+        upload = escribir_chunk(pk, offset, chunks, user=request.user)
+        return Response(_estado_upload(upload))
+
+
+class EvidenciaUploadFinalizarView(APIView):
+    """
+    POST /api/evidencias/uploads/<id>/finalizar/
+    Body: {sha256} -> Evidencia (mismo formato que POST /api/evidencias/)
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+    parser_classes = [ORJSONParser]
+
+    def post(self, request, pk):
+        evidencia = finalizar_upload(
+            pk,
+            sha256=str(request.data.get("sha256") or ""),
+            user=request.user,
+        )
+        return Response(
+            EvidenciaSerializer(evidencia).data,
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,46 @@
+# orders/views_feed.py
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.permissions import IsAdminOrTechnicianRole
+
+from . import feed
+
+
+class HistorialFeedView(APIView):
+    """
+    Feed de cambios de historial + luminarias para el cliente offline.
+    GET /api/historial/feed/?since=0&zona=Zona%201&ramal=PILAR&limit=500
+
+    `since`: el `token` de la respuesta anterior (0 = desde el principio).
+    `ramal` solo filtra luminarias (el historial no tiene ramal).
+    Con `more` en true el cliente vuelve a pedir con el token nuevo.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
+
+    def get(self, request):
+        raw = (request.query_params.get("since") or "0").strip()
+        if not raw.isdigit():
+            return Response(
+                {"detail": "Token 'since' inválido."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = int(request.query_params.get("limit") or 500)
+        except ValueError:
+            limit = 500
+        limit = max(50, min(limit, 2000))
+
+        data = feed.pull(
+            int(raw),
+            limit,
+            zona=" ".join((request.query_params.get("zona") or "").split()),
+            ramal=(request.query_params.get("ramal") or "").strip(),
+        )
+        return Response(data)
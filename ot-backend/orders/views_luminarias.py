@@ -1,70 +1,180 @@
 # orders/views_luminarias.py
-import re
-
 from django.db.models import Prefetch
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from accounts.permissions import IsAdminOrTechnicianRole
+from core.cache import cacheada, generacion
+from core.conditional import condicional, filtros, version_de, version_token
+from core.renderers import ColumnarRenderer
+from historial.views import _version_tableros
 from orders.models import (
+    CambioFeed,
     OrdenTrabajo,
     OrdenTrabajoLuminariaGrupo,
     OrdenTrabajoLuminariaItem,
 )
+from orders.luminarias import parse_luminaria_codes
+
+
+def _version_luminarias(request):
+    # toda alta / edición / baja de OT, grupo o item deja una fila en
+    # CambioFeed en la misma transacción; el tablero del grupo sale por
+    # nombre en cada fila
+    token = version_token(CambioFeed.objects.all())
+    tableros = version_de(request, _version_tableros)
+    return f"{token}/{tableros}/g{generacion('luminarias')}"
+
 
-CODE_RE = re.compile(r"\b([A-Z]{2,4}\s*-?\s*\d{3,6})\b", re.IGNORECASE)
+def _clave_luminarias(request):
+    return (version_de(request, _version_luminarias), filtros(request))
 
 
-def parse_luminaria_codes(text: str):
-    if not text:
-        return []
+def grupos_con_items():
+    return (
+        OrdenTrabajoLuminariaGrupo.objects.select_related("tablero")
+        .prefetch_related(
+            Prefetch(
+                "items",
+                queryset=OrdenTrabajoLuminariaItem.objects.all().order_by(
+                    "orden", "id"
+                ),
+            )
+        )
+        .order_by("orden", "id")
+    )
 
-    s = str(text).upper()
-    found = CODE_RE.findall(s)
 
+def filas_luminaria(ot, grupos, ramal: str = "") -> list:
+    """
+    Filas del historial de luminarias de una OT. `grupos`: los de la OT
+    con sus items prefetcheados (y ya filtrados por ramal si corresponde).
+    Sin grupos se lee la OT plana (modo viejo). También la usa el feed de
+    sync (orders/feed.py).
+    """
     out = []
-    seen = set()
-    for raw in found:
-        code = re.sub(r"[\s\-]+", "", raw.strip().upper())
-        if not code:
-            continue
-        if code in seen:
-            continue
-        seen.add(code)
-        out.append(code)
+
+    # ============================================
+    # 1) MODO NUEVO: grupos + items relacionados
+    #    Mostrar TODO, tenga o no tenga KM
+    # ============================================
+    if grupos:
+        for grupo in grupos:
+            items = list(getattr(grupo, "items").all())
+
+            for idx, item in enumerate(items):
+                code = (item.codigo_luminaria or "").strip().upper()
+                if not code:
+                    continue
+
+                km_value = item.km_luminaria
+                km_out = float(km_value) if km_value is not None else None
+
+                out.append(
+                    {
+                        "id": f"{ot.id}-{grupo.id}-{idx}",
+                        "ot_id": ot.id,
+                        "id_ot": f"OT-{ot.id:06d}",
+                        "fecha": ot.fecha.isoformat(),
+                        "ramal": grupo.ramal or "",
+                        "km": km_out,
+                        "resultado": (grupo.resultado or "").upper(),
+                        "luminaria_estado": (grupo.luminaria_estado or "").upper(),
+                        "ubicacion": ot.ubicacion or "",
+                        "codigo": code,
+                        "tablero": (grupo.tablero.nombre if grupo.tablero else ""),
+                        "zona": grupo.zona or "",
+                        "circuito": grupo.circuito or "",
+                    }
+                )
+
+        return out
+
+    # ============================================
+    # 2) MODO VIEJO: OT plana
+    #    Mostrar TODO, tenga o no tenga KM
+    # ============================================
+    if ramal and (ot.ramal or "").strip() != ramal:
+        return out
+
+    codes = []
+    if hasattr(ot, "codigos_luminarias") and isinstance(ot.codigos_luminarias, list):
+        codes = [str(x).strip().upper() for x in ot.codigos_luminarias if str(x).strip()]
+
+    if not codes:
+        codes = parse_luminaria_codes(getattr(ot, "luminaria_equipos", ""))
+
+    if not codes:
+        fallback = (ot.codigo_luminaria or "").strip().upper()
+        if fallback:
+            codes = [fallback]
+
+    if not codes:
+        return out
+
+    km_out = float(ot.km_luminaria) if ot.km_luminaria is not None else None
+
+    base = {
+        "ot_id": ot.id,
+        "id_ot": f"OT-{ot.id:06d}",
+        "fecha": ot.fecha.isoformat(),
+        "ramal": ot.ramal,
+        "km": km_out,
+        "resultado": (ot.resultado or "").upper(),
+        "luminaria_estado": (ot.luminaria_estado or "").upper(),
+        "ubicacion": ot.ubicacion or "",
+        "tablero": ot.tablero or "",
+        "zona": ot.zona or "",
+        "circuito": ot.circuito or "",
+    }
+
+    for idx, code in enumerate(codes):
+        out.append({**base, "id": f"{ot.id}-{idx}", "codigo": code})
+
     return out
 
 
 class LuminariasHistorialView(APIView):
+    """
+    Historial de luminarias (dashboard, historial, autopista 3D).
+    GET /api/luminarias/historial/?ramal=PILAR&from=2026-01-01&to=2026-03-31
+    Con &format=columnar: columnas + tablas de strings (core/renderers.py).
+    """
+
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated, IsAdminOrTechnicianRole]
-
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarRenderer]
+    # strings repetidos fila a fila: van como índice a una tabla
+    columnar_diccionario = (
+        "id_ot",
+        "fecha",
+        "ramal",
+        "resultado",
+        "luminaria_estado",
+        "ubicacion",
+        "tablero",
+        "zona",
+        "circuito",
+    )
+
+    @condicional("luminarias_historial", _version_luminarias)
+    @cacheada("luminarias", _clave_luminarias)
     def get(self, request):
         q_from = request.query_params.get("from", "")
         q_to = request.query_params.get("to", "")
         q_ramal = (request.query_params.get("ramal") or "").strip()
 
-        grupos_qs = (
-            OrdenTrabajoLuminariaGrupo.objects.select_related("tablero")
-            .prefetch_related(
-                Prefetch(
-                    "items",
-                    queryset=OrdenTrabajoLuminariaItem.objects.all().order_by(
-                        "orden", "id"
-                    ),
-                )
-            )
-            .order_by("orden", "id")
-        )
+        grupos_qs = grupos_con_items()
 
         if q_ramal:
             grupos_qs = grupos_qs.filter(ramal=q_ramal)
 
         qs = (
-            OrdenTrabajo.objects.filter(alcance__iexact="LUMINARIA")
+            OrdenTrabajo.objects.filter(alcance="LUMINARIA")
             .prefetch_related(
                 Prefetch(
                     "luminaria_grupos",
@@ -83,102 +193,9 @@ class LuminariasHistorialView(APIView):
         qs = qs[:5000]
 
         out = []
-
         for ot in qs:
             grupos = list(getattr(ot, "luminaria_grupos").all())
-
-            # ============================================
-            # 1) MODO NUEVO: grupos + items relacionados
-            #    Mostrar TODO, tenga o no tenga KM
-            # ============================================
-            if grupos:
-                for grupo in grupos:
-                    items = list(getattr(grupo, "items").all())
-
-                    for idx, item in enumerate(items):
-                        code = (item.codigo_luminaria or "").strip().upper()
-                        if not code:
-                            continue
-
-                        km_value = item.km_luminaria
-                        km_out = float(km_value) if km_value is not None else None
-
-                        out.append(
-                            {
-                                "id": f"{ot.id}-{grupo.id}-{idx}",
-                                "ot_id": ot.id,
-                                "id_ot": f"OT-{ot.id:06d}",
-                                "fecha": ot.fecha.isoformat(),
-                                "ramal": grupo.ramal or "",
-                                "km": km_out,
-                                "resultado": (grupo.resultado or "").upper(),
-                                "luminaria_estado": (
-                                    grupo.luminaria_estado or ""
-                                ).upper(),
-                                "ubicacion": ot.ubicacion or "",
-                                "codigo": code,
-                                "tablero": (
-                                    grupo.tablero.nombre if grupo.tablero else ""
-                                ),
-                                "zona": grupo.zona or "",
-                                "circuito": grupo.circuito or "",
-                            }
-                        )
-
-                continue
-
-            # ============================================
-            # 2) MODO VIEJO: OT plana
-            #    Mostrar TODO, tenga o no tenga KM
-            # ============================================
-            if q_ramal and (ot.ramal or "").strip() != q_ramal:
-                continue
-
-            codes = []
-            if hasattr(ot, "codigos_luminarias") and isinstance(
-                ot.codigos_luminarias, list
-            ):
-                codes = [
-                    str(x).strip().upper()
-                    for x in ot.codigos_luminarias
-                    if str(x).strip()
-                ]
-
-            if not codes:
-                codes = parse_luminaria_codes(getattr(ot, "luminaria_equipos", ""))
-
-            if not codes:
-                fallback = (ot.codigo_luminaria or "").strip().upper()
-                if fallback:
-                    codes = [fallback]
-
-            if not codes:
-                continue
-
-            km_out = float(ot.km_luminaria) if ot.km_luminaria is not None else None
-
-            base = {
-                "ot_id": ot.id,
-                "id_ot": f"OT-{ot.id:06d}",
-                "fecha": ot.fecha.isoformat(),
-                "ramal": ot.ramal,
-                "km": km_out,
-                "resultado": (ot.resultado or "").upper(),
-                "luminaria_estado": (ot.luminaria_estado or "").upper(),
-                "ubicacion": ot.ubicacion or "",
-                "tablero": ot.tablero or "",
-                "zona": ot.zona or "",
-                "circuito": ot.circuito or "",
-            }
-
-            for idx, code in enumerate(codes):
-                out.append(
-                    {
-                        **base,
-                        "id": f"{ot.id}-{idx}",
-                        "codigo": code,
-                    }
-                )
+            out.extend(filas_luminaria(ot, grupos, ramal=q_ramal))
 
         if len(out) > 20000:
             out = out[:20000]
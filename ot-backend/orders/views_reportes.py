@@ -0,0 +1,112 @@
+# orders/views_reportes.py
+import os
+
+from django.conf import settings
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from accounts.permissions import IsAdminRole
+
+from .models import ReportePDF
+from .reportes import filtrar_ots, lanzar_reporte, recuperar_colgados
+from .serializers import ReporteFiltroSerializer, ReportePDFSerializer
+
+
+# ==========================================================
+# API: Reporte combinado multi-OT
+# ==========================================================
+class ReportePDFCreateView(APIView):
+    """
+    POST /api/ordenes/reporte-pdf/
+    Body: {tablero?, zona?, ramal?, desde?, hasta?}
+    Responde 202 con el id; el PDF se arma en segundo plano.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def post(self, request):
+        serializer = ReporteFiltroSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filtros = serializer.validated_data
+
+        total = filtrar_ots(filtros).count()
+        if not total:
+            return Response(
+                {"detail": "No hay OTs para esos filtros."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        max_ots = getattr(settings, "OT_REPORTE_MAX_OTS", 500)
+        if total > max_ots:
+            return Response(
+                {"detail": f"El reporte supera el máximo de {max_ots} OTs ({total})."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        reporte = ReportePDF.objects.create(
+            filtros=filtros,
+            total_ots=total,
+            created_by=request.user,
+        )
+        lanzar_reporte(reporte)
+
+        return Response(
+            ReportePDFSerializer(reporte).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ReportePDFDetailView(APIView):
+    """
+    GET /api/ordenes/reporte-pdf/<id>/ -> estado del job
+    Un job colgado (proceso reiniciado) se informa como ERROR.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request, pk):
+        recuperar_colgados(ids=[pk])
+        reporte = get_object_or_404(ReportePDF, pk=pk)
+        return Response(ReportePDFSerializer(reporte).data)
+
+
+class ReportePDFDownloadView(APIView):
+    """
+    GET /api/ordenes/reporte-pdf/<id>/descargar/
+    409 mientras el job no terminó (o si terminó con ERROR).
+    """
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request, pk):
+        recuperar_colgados(ids=[pk])
+        reporte = get_object_or_404(ReportePDF, pk=pk)
+
+        if reporte.estado != ReportePDF.Estado.LISTO:
+            return Response(
+                {"detail": "El reporte todavía no está listo.", "estado": reporte.estado},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        path = os.path.join(settings.MEDIA_ROOT, reporte.archivo)
+        if not os.path.exists(path):
+            return Response(
+                {"detail": "El archivo del reporte ya no existe."},
+                status=status.HTTP_410_GONE,
+            )
+
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=f"reporte_ot_{reporte.id}.pdf",
+            content_type="application/pdf",
+        )